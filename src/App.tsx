@@ -3,6 +3,7 @@ import { Toaster as Sonner } from "@/components/ui/sonner";
 import { TooltipProvider } from "@/components/ui/tooltip";
 import { QueryClient, QueryClientProvider } from "@tanstack/react-query";
 import { BrowserRouter, Routes, Route } from "react-router-dom";
+import { RouteSettledMarker } from "@/components/RouteSettledMarker";
 import Index from "./pages/Index";
 import NotFound from "./pages/NotFound";
 import AreasRequisitantes from "./pages/AreasRequisitantes";
@@ -43,6 +44,7 @@ const App = () => (
           {/* ADD ALL CUSTOM ROUTES ABOVE THE CATCH-ALL "*" ROUTE */}
           <Route path="*" element={<NotFound />} />
         </Routes>
+        <RouteSettledMarker />
       </BrowserRouter>
     </TooltipProvider>
   </QueryClientProvider>
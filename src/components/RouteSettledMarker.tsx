@@ -0,0 +1,40 @@
+import { useEffect, useRef, useSyncExternalStore } from "react";
+import { useLocation } from "react-router-dom";
+import { useIsFetching, useIsMutating } from "@tanstack/react-query";
+import {
+  SETTLE_QUIET_MS,
+  getPendingRequests,
+  markRouteSettled,
+  resetRouteSettled,
+  subscribePendingRequests,
+} from "@/lib/routeSettled";
+
+/**
+ * Publica o sinal de prontidão da rota atual (ver src/lib/routeSettled.ts).
+ * Deve ficar dentro do BrowserRouter, depois das rotas, para que os efeitos
+ * da página (que disparam as consultas) rodem antes do seu.
+ */
+export const RouteSettledMarker = () => {
+  const location = useLocation();
+  const path = location.pathname + location.search;
+  const pendingRequests = useSyncExternalStore(subscribePendingRequests, getPendingRequests);
+  const busy = pendingRequests + useIsFetching() + useIsMutating() > 0;
+  // Cada rota é marcada uma vez; requisições posteriores (ações do usuário) não a reabrem
+  const settledPath = useRef<string | null>(null);
+
+  useEffect(() => {
+    settledPath.current = null;
+    resetRouteSettled();
+  }, [path]);
+
+  useEffect(() => {
+    if (busy || settledPath.current === path) return;
+    const timer = window.setTimeout(() => {
+      settledPath.current = path;
+      markRouteSettled(path);
+    }, SETTLE_QUIET_MS);
+    return () => window.clearTimeout(timer);
+  }, [busy, path]);
+
+  return null;
+};
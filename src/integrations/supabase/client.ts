@@ -1,5 +1,6 @@
 import { createClient } from '@supabase/supabase-js';
 import type { Database } from './types';
+import { trackedFetch } from '@/lib/routeSettled';
 
 // Validate environment variables at runtime
 const SUPABASE_URL = import.meta.env.VITE_SUPABASE_URL;
@@ -30,5 +31,9 @@ export const supabase = createClient<Database>(
       autoRefreshToken: true,
       detectSessionInUrl: true,
     },
+    global: {
+      // Requisições em andamento entram no sinal de prontidão da rota
+      fetch: trackedFetch,
+    },
   }
 );
\ No newline at end of file
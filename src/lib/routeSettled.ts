@@ -0,0 +1,55 @@
+/**
+ * Sinal de prontidão da rota para os testes automatizados.
+ *
+ * O atributo `data-route-settled` no <html> fica vazio enquanto a rota atual
+ * carrega e recebe o caminho da rota quando as requisições ao Supabase
+ * terminam e a página fica um intervalo curto sem iniciar novas. Nesse
+ * momento também é registrada a marca de performance `route-settled`.
+ */
+
+export const ROUTE_SETTLED_ATTRIBUTE = "data-route-settled";
+export const ROUTE_SETTLED_MARK = "route-settled";
+
+// Intervalo sem requisições pendentes antes de considerar a rota pronta:
+// cobre o tempo entre o fim de uma consulta e o início da seguinte
+// (ex.: a sessão do Auth resolvendo antes do select)
+export const SETTLE_QUIET_MS = 50;
+
+type Listener = () => void;
+
+let pending = 0;
+const listeners = new Set<Listener>();
+
+const notify = () => listeners.forEach((listener) => listener());
+
+export function subscribePendingRequests(listener: Listener) {
+  listeners.add(listener);
+  return () => {
+    listeners.delete(listener);
+  };
+}
+
+export function getPendingRequests() {
+  return pending;
+}
+
+/** fetch que contabiliza as requisições em andamento (usado pelo cliente do Supabase). */
+export const trackedFetch: typeof fetch = (input, init) => {
+  pending += 1;
+  notify();
+  return fetch(input, init).finally(() => {
+    pending -= 1;
+    notify();
+  });
+};
+
+/** Marca o documento como ainda não pronto (nova rota carregando). */
+export function resetRouteSettled() {
+  document.documentElement.setAttribute(ROUTE_SETTLED_ATTRIBUTE, "");
+}
+
+/** Marca a rota como pronta. */
+export function markRouteSettled(path: string) {
+  document.documentElement.setAttribute(ROUTE_SETTLED_ATTRIBUTE, path);
+  performance.mark(ROUTE_SETTLED_MARK, { detail: { path } });
+}
@@ -1,5 +1,9 @@
 import { createRoot } from "react-dom/client";
 import App from "./App.tsx";
 import "./index.css";
+import { resetRouteSettled } from "./lib/routeSettled";
+
+// Anuncia o sinal de prontidão antes do primeiro render
+resetRouteSettled();
 
 createRoot(document.getElementById("root")!).render(<App />);
@@ -0,0 +1,94 @@
+import { describe, it, expect, vi, beforeEach, afterEach } from 'vitest';
+import { act, render } from '@testing-library/react';
+import { QueryClient, QueryClientProvider } from '@tanstack/react-query';
+import { MemoryRouter, NavigateFunction, useNavigate } from 'react-router-dom';
+import { RouteSettledMarker } from '../components/RouteSettledMarker';
+import { ROUTE_SETTLED_ATTRIBUTE, SETTLE_QUIET_MS, trackedFetch } from '../lib/routeSettled';
+
+let navigate: NavigateFunction;
+
+const CaptureNavigate = () => {
+    navigate = useNavigate();
+    return null;
+};
+
+const renderMarker = (path: string) =>
+    render(
+        <QueryClientProvider client={new QueryClient()}>
+            <MemoryRouter initialEntries={[path]}>
+                <CaptureNavigate />
+                <RouteSettledMarker />
+            </MemoryRouter>
+        </QueryClientProvider>
+    );
+
+const settledAttribute = () => document.documentElement.getAttribute(ROUTE_SETTLED_ATTRIBUTE);
+
+beforeEach(() => {
+    vi.useFakeTimers();
+    document.documentElement.removeAttribute(ROUTE_SETTLED_ATTRIBUTE);
+});
+
+afterEach(() => {
+    vi.useRealTimers();
+    vi.unstubAllGlobals();
+});
+
+describe('RouteSettledMarker', () => {
+    it('marks the route after SETTLE_QUIET_MS with no pending requests', () => {
+        renderMarker('/dfds');
+        expect(settledAttribute()).toBe('');
+
+        act(() => {
+            vi.advanceTimersByTime(SETTLE_QUIET_MS - 1);
+        });
+        expect(settledAttribute()).toBe('');
+
+        act(() => {
+            vi.advanceTimersByTime(1);
+        });
+        expect(settledAttribute()).toBe('/dfds');
+    });
+
+    it('waits for pending requests before marking the route', async () => {
+        let resolve!: (response: Response) => void;
+        vi.stubGlobal('fetch', vi.fn(() => new Promise<Response>((res) => (resolve = res))));
+        renderMarker('/dfds');
+
+        let request!: Promise<Response>;
+        act(() => {
+            request = trackedFetch('/rest/v1/dfds');
+        });
+        act(() => {
+            vi.advanceTimersByTime(SETTLE_QUIET_MS * 4);
+        });
+        expect(settledAttribute()).toBe('');
+
+        await act(async () => {
+            resolve(new Response('[]'));
+            await request;
+        });
+        act(() => {
+            vi.advanceTimersByTime(SETTLE_QUIET_MS);
+        });
+        expect(settledAttribute()).toBe('/dfds');
+    });
+
+    it('resets on path change and marks the new path', () => {
+        renderMarker('/dfds');
+        act(() => {
+            vi.advanceTimersByTime(SETTLE_QUIET_MS);
+        });
+        expect(settledAttribute()).toBe('/dfds');
+
+        act(() => {
+            navigate('/consolidacao');
+        });
+        expect(settledAttribute()).toBe('');
+
+        act(() => {
+            vi.advanceTimersByTime(SETTLE_QUIET_MS);
+        });
+        expect(settledAttribute()).toBe('/consolidacao');
+    });
+});
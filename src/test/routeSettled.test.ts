@@ -0,0 +1,83 @@
+import { describe, it, expect, vi, afterEach } from 'vitest';
+import {
+    ROUTE_SETTLED_ATTRIBUTE,
+    ROUTE_SETTLED_MARK,
+    getPendingRequests,
+    markRouteSettled,
+    resetRouteSettled,
+    subscribePendingRequests,
+    trackedFetch,
+} from '../lib/routeSettled';
+
+const deferredFetch = () => {
+    let resolve!: (response: Response) => void;
+    let reject!: (error: Error) => void;
+    const promise = new Promise<Response>((res, rej) => {
+        resolve = res;
+        reject = rej;
+    });
+    vi.stubGlobal('fetch', vi.fn(() => promise));
+    return { resolve, reject };
+};
+
+afterEach(() => {
+    vi.unstubAllGlobals();
+    vi.restoreAllMocks();
+});
+
+describe('trackedFetch', () => {
+    it('counts the request as pending until it resolves', async () => {
+        const { resolve } = deferredFetch();
+
+        const request = trackedFetch('/rest/v1/dfds');
+        expect(getPendingRequests()).toBe(1);
+
+        resolve(new Response('[]'));
+        await request;
+        expect(getPendingRequests()).toBe(0);
+    });
+
+    it('releases the pending count when the fetch is rejected', async () => {
+        const { reject } = deferredFetch();
+
+        const request = trackedFetch('/rest/v1/dfds');
+        expect(getPendingRequests()).toBe(1);
+
+        reject(new TypeError('Failed to fetch'));
+        await expect(request).rejects.toThrow('Failed to fetch');
+        expect(getPendingRequests()).toBe(0);
+    });
+
+    it('notifies subscribers on start and on completion', async () => {
+        const { resolve } = deferredFetch();
+        const listener = vi.fn();
+        const unsubscribe = subscribePendingRequests(listener);
+
+        const request = trackedFetch('/rest/v1/dfds');
+        expect(listener).toHaveBeenCalledTimes(1);
+
+        resolve(new Response('[]'));
+        await request;
+        expect(listener).toHaveBeenCalledTimes(2);
+
+        unsubscribe();
+        const { resolve: resolveNext } = deferredFetch();
+        const next = trackedFetch('/rest/v1/dfds');
+        resolveNext(new Response('[]'));
+        await next;
+        expect(listener).toHaveBeenCalledTimes(2);
+    });
+});
+
+describe('route settled attribute', () => {
+    it('is cleared on reset and set to the path when marked', () => {
+        const mark = vi.spyOn(performance, 'mark');
+
+        resetRouteSettled();
+        expect(document.documentElement.getAttribute(ROUTE_SETTLED_ATTRIBUTE)).toBe('');
+
+        markRouteSettled('/dfds');
+        expect(document.documentElement.getAttribute(ROUTE_SETTLED_ATTRIBUTE)).toBe('/dfds');
+        expect(mark).toHaveBeenCalledWith(ROUTE_SETTLED_MARK, { detail: { path: '/dfds' } });
+    });
+});
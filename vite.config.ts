@@ -16,7 +16,8 @@ export default defineConfig({
   },
   build: {
     outDir: "dist",
-    sourcemap: false,
+    // "hidden": gera os .map sem referenciá-los nos bundles (cobertura de JS por módulo nos testes)
+    sourcemap: process.env.VITE_BUILD_SOURCEMAP === "hidden" ? "hidden" : false,
     rollupOptions: {
       output: {
         manualChunks: {
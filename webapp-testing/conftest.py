@@ -1,6 +1,142 @@
 """Configuração do pytest para os testes webapp."""
+import os
+import sys
+
 import pytest
 
+# Permite importar os módulos auxiliares de tests/ a partir das fixtures
+TESTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "tests")
+if TESTS_DIR not in sys.path:
+    sys.path.insert(0, TESTS_DIR)
+# ... e o servidor compartilhado de scripts/
+SCRIPTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "scripts")
+if SCRIPTS_DIR not in sys.path:
+    sys.path.append(SCRIPTS_DIR)
+
+pytest_plugins = ["perf_plugin", "parallel_plugin"]
+
+# Rotas afetadas por --changed-since (calculadas no controlador)
+affected_routes_key = pytest.StashKey[list]()
+
+
+def pytest_addoption(parser):
+    """Opções de linha de comando do framework."""
+    parser.addoption(
+        "--context-pool-size",
+        type=int,
+        default=1,
+        help="contextos do browser aquecidos por processo (worker do xdist); com a API síncrona cada "
+             "processo usa uma página por vez, então só vale aumentar para testes que usam várias páginas "
+             "do pool ao mesmo tempo",
+    )
+    parser.addoption(
+        "--update-baselines",
+        action="store_true",
+        help="grava as capturas atuais como baselines visuais em vez de compará-las",
+    )
+    parser.addoption(
+        "--visual-threshold",
+        type=float,
+        default=None,
+        help="fração de pixels alterados tolerada na regressão visual (padrão: 0.001)",
+    )
+    parser.addoption(
+        "--screenshot-keep-runs",
+        type=int,
+        default=None,
+        help="execuções mantidas no armazenamento de capturas (padrão: 20)",
+    )
+    parser.addoption(
+        "--changed-since",
+        metavar="REF",
+        default=None,
+        help="testa só as rotas afetadas pelas mudanças desde REF do git (ex.: origin/main, HEAD)",
+    )
+    parser.addoption(
+        "--js-coverage",
+        action="store_true",
+        help="coleta a cobertura de JS (V8) de cada rota, mapeada aos módulos de src/ "
+             "(as métricas da execução não entram no histórico)",
+    )
+    parser.addoption(
+        "--network-mode",
+        choices=("live", "record", "replay"),
+        default="live",
+        help="live: rede real; record: grava as respostas em reports/replay/; "
+             "replay: responde a partir das gravações, sem servidor nem backend",
+    )
+    parser.addoption(
+        "--replay-latency",
+        metavar="MS",
+        default=None,
+        help="latência injetada em cada resposta reproduzida: milissegundos ou 'recorded' (a da gravação)",
+    )
+
+
+def _item_route(item):
+    """Rota exercitada pelo teste: parâmetro "route" do crawl ou marcador route("/")."""
+    callspec = getattr(item, "callspec", None)
+    if callspec is not None and "route" in callspec.params:
+        return callspec.params["route"]
+    marker = item.get_closest_marker("route")
+    return marker.args[0] if marker else None
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_cmdline_main(config):
+    """
+    --network-mode record roda em um só processo: a sequência de respostas de
+    cada requisição é numerada por processo, e workers gravando ao mesmo
+    tempo apagariam e intercalariam as respostas uns dos outros.
+    """
+    if config.getoption("--network-mode") == "record" and getattr(config.option, "numprocesses", None):
+        print("📼 --network-mode record: executando sem workers do xdist (-n 0)")
+        config.option.numprocesses = 0
+
+
+def pytest_configure(config):
+    """Com --changed-since, calcula as rotas afetadas uma vez (no controlador, com o xdist)."""
+    from parallel_plugin import is_worker
+
+    since = config.getoption("--changed-since")
+    if not since or is_worker(config):
+        return
+
+    import impact_analysis
+
+    try:
+        config.stash[affected_routes_key] = impact_analysis.affected_routes(since)
+    except RuntimeError as e:
+        raise pytest.UsageError(f"--changed-since: {e}")
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_configure_node(node):
+    """Repassa aos workers as rotas afetadas, para que não refaçam a análise."""
+    if affected_routes_key in node.config.stash:
+        node.workerinput["webapp_affected_routes"] = node.config.stash[affected_routes_key]
+
+
+def pytest_collection_modifyitems(config, items):
+    """Com --changed-since, desmarca os testes de rotas não afetadas pela mudança."""
+    from parallel_plugin import is_worker
+
+    since = config.getoption("--changed-since")
+    if not since:
+        return
+
+    affected = set(config.workerinput["webapp_affected_routes"] if is_worker(config)
+                   else config.stash[affected_routes_key])
+
+    selected, deselected = [], []
+    for item in items:
+        route = _item_route(item)
+        (deselected if route is not None and route not in affected else selected).append(item)
+    if deselected:
+        config.hook.pytest_deselected(items=deselected)
+        items[:] = selected
+    print(f"\n🎯 {len(affected)} rota(s) afetada(s) desde {since}; {len(deselected)} teste(s) desmarcado(s)")
+
 
 @pytest.fixture(scope="session")
 def browser_context_args(browser_context_args):
@@ -16,6 +152,187 @@ def browser_context_args(browser_context_args):
 
 
 @pytest.fixture(scope="session")
-def base_url():
-    """URL base da aplicação."""
-    return "http://localhost:5173"
+def base_url(pytestconfig):
+    """
+    URL base da aplicação. Sob o with_server.py ela vem em WEBAPP_BASE_URL;
+    sem ele, cada processo (cada worker do xdist) se registra como cliente do
+    servidor compartilhado (server_daemon.py), que sobe uma única vez e é
+    desligado quando o último cliente sai. Com --network-mode replay nenhum
+    servidor é iniciado: vale a URL da gravação.
+    """
+    import route_crawler
+
+    if pytestconfig.getoption("--network-mode") == "replay":
+        from network_replay import ReplayStore
+
+        store = ReplayStore()
+        yield store.get_meta("base_url") or route_crawler.DEFAULT_BASE_URL
+        store.close()
+        return
+
+    if "WEBAPP_BASE_URL" in os.environ:
+        yield route_crawler.DEFAULT_BASE_URL
+        return
+
+    from server_daemon import SharedServerClient
+
+    client = SharedServerClient()
+    url = client.acquire()
+    if url is None:
+        pytest.fail("Servidor da aplicação não ficou disponível", pytrace=False)
+    # Mesmo contrato do with_server.py: o modo real do servidor obtido
+    os.environ[route_crawler.SERVER_MODE_ENV] = client.server_mode
+    yield url
+    client.release()
+
+
+@pytest.fixture(scope="session")
+def network_interceptor(pytestconfig, base_url):
+    """
+    Gravação (--network-mode record) ou reprodução (replay) das respostas de
+    rede, instalada em cada contexto do pool; None com a rede real.
+    """
+    from network_replay import NetworkRecorder, NetworkReplay, ReplayStore, parse_latency
+
+    mode = pytestconfig.getoption("--network-mode")
+    if mode == "live":
+        yield None
+        return
+
+    try:
+        latency = parse_latency(pytestconfig.getoption("--replay-latency"))
+    except ValueError as e:
+        raise pytest.UsageError(f"--replay-latency: {e}")
+
+    store = ReplayStore()
+    if mode == "record":
+        interceptor = NetworkRecorder(store, base_url)
+    else:
+        interceptor = NetworkReplay(store, latency)
+        if not len(interceptor):
+            store.close()
+            pytest.fail(f"Nenhuma gravação em {store.root}; rode antes com --network-mode record", pytrace=False)
+    yield interceptor
+    interceptor.print_summary()
+    store.close()
+
+
+@pytest.fixture(scope="session")
+def context_pool(browser, browser_context_args, base_url, network_interceptor, pytestconfig):
+    """Pool de contextos aquecidos compartilhado por toda a sessão."""
+    from browser_pool import BrowserContextPool
+
+    pool = BrowserContextPool(
+        browser,
+        browser_context_args,
+        size=pytestconfig.getoption("--context-pool-size"),
+        warmup_url=f"{base_url}/",
+        context_setup=network_interceptor.attach if network_interceptor is not None else None,
+    )
+    pool.start()
+    yield pool
+    pool.close()
+
+
+@pytest.fixture
+def pooled_page(context_pool):
+    """Página emprestada do pool, reinicializada ao final do teste."""
+    with context_pool.page() as page:
+        yield page
+
+
+@pytest.fixture
+def page_metrics(pooled_page):
+    """
+    Coletor de métricas de performance da página do teste. A ElementDiscovery
+    registra nele as métricas de cada URL visitada (results[url] e last);
+    measure(url) navega e coleta diretamente.
+    """
+    from page_metrics import PageMetricsCollector
+
+    collector = PageMetricsCollector(pooled_page).install()
+    yield collector
+    collector.close()
+
+
+@pytest.fixture
+def network_capture(pooled_page, pytestconfig):
+    """
+    Captura de rede (CDP) da página do teste. A ElementDiscovery a inicia antes
+    de cada navegação e grava o log ao lado do relatório (<rota>.network.json).
+    """
+    from network_capture import NetworkCapture, compression_expected
+
+    # O uncompressed só vale com a rede real contra o build de produção
+    live = pytestconfig.getoption("--network-mode") == "live"
+    capture = NetworkCapture(pooled_page, check_compression=live and compression_expected())
+    yield capture
+    capture.close()
+
+
+@pytest.fixture
+def js_coverage(pooled_page, pytestconfig):
+    """
+    Cobertura de JS (CDP) da página do teste com --js-coverage; None sem a
+    opção. A ElementDiscovery a liga antes de cada navegação e grava o
+    relatório ao lado do de elementos (<rota>.coverage.json).
+    """
+    if not pytestconfig.getoption("--js-coverage"):
+        yield None
+        return
+
+    from js_coverage import JSCoverage
+
+    coverage = JSCoverage(pooled_page)
+    yield coverage
+    coverage.close()
+
+
+@pytest.fixture(scope="session")
+def visual_baselines(pytestconfig):
+    """Baselines visuais aprovadas (baselines/) compartilhadas pela sessão."""
+    from visual_regression import DEFAULT_THRESHOLD, BaselineStore
+
+    threshold = pytestconfig.getoption("--visual-threshold")
+    return BaselineStore(
+        threshold=DEFAULT_THRESHOLD if threshold is None else threshold,
+        update=pytestconfig.getoption("--update-baselines"),
+    )
+
+
+@pytest.fixture(scope="session")
+def screenshot_store(pytestconfig):
+    """
+    Armazenamento das capturas da sessão (reports/screenshots/). Ao final,
+    aplica a retenção, sempre mantendo a execução atual.
+    """
+    from parallel_plugin import is_worker, shared_run_id
+    from screenshot_store import ScreenshotStore
+
+    store = ScreenshotStore()
+    store.begin_run(shared_run_id(pytestconfig))
+    yield store
+    # Com o xdist, a retenção é aplicada uma vez, pelo controlador (pytest_sessionfinish)
+    if not is_worker(pytestconfig):
+        _prune_screenshots(pytestconfig, store)
+    store.close()
+
+
+def _prune_screenshots(config, store):
+    from screenshot_store import DEFAULT_KEEP_RUNS
+
+    keep_runs = config.getoption("--screenshot-keep-runs")
+    store.prune(DEFAULT_KEEP_RUNS if keep_runs is None else keep_runs, keep=[store.run_id])
+
+
+def pytest_sessionfinish(session, exitstatus):
+    """Controlador do xdist: aplica a retenção das capturas depois que todos os workers terminaram."""
+    from parallel_plugin import is_controller, shared_run_id
+    from screenshot_store import SCREENSHOTS_DIR, ScreenshotStore
+
+    if not is_controller(session.config) or not os.path.exists(SCREENSHOTS_DIR):
+        return
+    store = ScreenshotStore()
+    store.run_id = shared_run_id(session.config)
+    _prune_screenshots(session.config, store)
+    store.close()
@@ -0,0 +1,37 @@
+"""
+Gravação atômica de arquivos, compartilhada pelos scripts e pelos módulos de tests/.
+O conteúdo vai para um temporário no mesmo diretório (nome único por processo e
+thread) e substitui o destino com os.replace: leitores concorrentes (workers do
+xdist, o daemon do servidor) nunca veem um arquivo pela metade.
+"""
+
+import json
+import os
+import threading
+from typing import Union
+
+
+def atomic_write(path: str, data: Union[bytes, str]):
+    """Grava bytes ou texto (UTF-8) em path de forma atômica, criando o diretório."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        if isinstance(data, bytes):
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+        else:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def atomic_write_json(path: str, value, **dump_options):
+    """Grava value como JSON de forma atômica (opções repassadas ao json.dumps)."""
+    dump_options.setdefault("ensure_ascii", False)
+    atomic_write(path, json.dumps(value, **dump_options))
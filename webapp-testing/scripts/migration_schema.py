@@ -0,0 +1,602 @@
+"""
+Esquema do banco lido de supabase/migrations/*.sql.
+Interpreta o subconjunto de DDL usado pelas migrações (CREATE TABLE/TYPE/
+SEQUENCE, ALTER TABLE/TYPE, blocos DO, INSERT de dados iniciais e os
+triggers de código automático e de updated_at) e gera o esquema equivalente
+em SQLite. Usado pelo stand-in do Supabase e pelo gerador de dados.
+"""
+
+import glob
+import os
+import re
+from typing import Dict, List, Optional, Tuple
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+MIGRATIONS_DIR = os.path.join(PROJECT_ROOT, "supabase", "migrations")
+
+# Palavras que encerram o tipo/default na definição de uma coluna
+COLUMN_KEYWORDS = {"NOT", "NULL", "DEFAULT", "PRIMARY", "UNIQUE", "REFERENCES", "CHECK",
+                   "GENERATED", "CONSTRAINT", "COLLATE"}
+TABLE_CONSTRAINTS = {"CONSTRAINT", "PRIMARY", "UNIQUE", "FOREIGN", "CHECK", "EXCLUDE"}
+
+TYPE_ALIASES = {
+    "timestamp with time zone": "timestamptz",
+    "timestamp without time zone": "timestamp",
+    "character varying": "text",
+    "varchar": "text",
+    "char": "text",
+    "character": "text",
+    "int": "integer",
+    "int4": "integer",
+    "int8": "bigint",
+    "int2": "smallint",
+    "serial4": "serial",
+    "bigserial": "serial",
+    "float": "numeric",
+    "float8": "numeric",
+    "double precision": "numeric",
+    "real": "numeric",
+    "decimal": "numeric",
+    "bool": "boolean",
+    "jsonb": "json",
+}
+INTEGER_TYPES = {"integer", "bigint", "smallint", "serial"}
+REAL_TYPES = {"numeric"}
+
+# NEW.codigo_item := 'MS-' || LPAD(nextval('public.seq')::text, 6, '0');
+AUTO_CODE_PATTERN = re.compile(
+    r"NEW\.(\w+)\s*:?=\s*'([^']*)'\s*\|\|\s*LPAD\(\s*nextval\('([\w.]+)'\)(?:::\w+)?\s*,\s*(\d+)\s*,\s*'0'\s*\)",
+    re.IGNORECASE,
+)
+# NEW.updated_at = now();
+TOUCH_PATTERN = re.compile(r"NEW\.(\w+)\s*:?=\s*(?:now|clock_timestamp)\(\)", re.IGNORECASE)
+
+
+class Column:
+    """Definição de uma coluna (após todas as migrações)."""
+
+    def __init__(self, name: str, type_name: str):
+        self.name = name
+        self.type = type_name
+        self.enum: Optional[str] = None
+        self.not_null = False
+        self.default: Optional[Tuple[str, object]] = None  # ("literal", v), ("function", nome), ("sequence", seq)
+        self.primary_key = False
+        self.unique = False
+        self.references: Optional[Tuple[str, str]] = None
+        self.on_delete: Optional[str] = None
+        self.check: Optional[str] = None
+        self.generated: Optional[str] = None
+        self.auto_code: Optional[Tuple[str, str, int]] = None  # (prefixo, sequência, largura)
+
+    @property
+    def affinity(self) -> str:
+        if self.type in INTEGER_TYPES or self.type == "boolean":
+            return "INTEGER"
+        if self.type in REAL_TYPES:
+            return "REAL"
+        return "TEXT"
+
+    def __repr__(self):
+        return f"Column({self.name!r}, {self.type!r})"
+
+
+class Table:
+    """Tabela do esquema public."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.columns: Dict[str, Column] = {}
+        self.unique_constraints: Dict[str, Tuple[str, ...]] = {}
+        self.touch_on_update: List[str] = []
+        self.seed_rows: List[dict] = []
+
+    @property
+    def primary_key(self) -> Optional[str]:
+        for column in self.columns.values():
+            if column.primary_key:
+                return column.name
+        return None
+
+    def __repr__(self):
+        return f"Table({self.name!r}, {list(self.columns)})"
+
+
+class Schema:
+    """Tabelas, enums e sequências resultantes das migrações."""
+
+    def __init__(self):
+        self.tables: Dict[str, Table] = {}
+        self.enums: Dict[str, List[str]] = {}
+        self.sequences: Dict[str, int] = {}
+        self.functions: Dict[str, str] = {}
+
+    @classmethod
+    def load(cls, migrations_dir: str = MIGRATIONS_DIR) -> "Schema":
+        """Aplica as migrações em ordem (pelo nome do arquivo)."""
+        schema = cls()
+        for path in sorted(glob.glob(os.path.join(migrations_dir, "*.sql"))):
+            with open(path, "r", encoding="utf-8") as f:
+                schema.apply(f.read())
+        return schema
+
+    def apply(self, sql: str):
+        for statement in split_statements(sql):
+            self._apply_statement(statement)
+
+    def enum_values(self, column: Column) -> Optional[List[str]]:
+        return self.enums.get(column.enum) if column.enum else None
+
+    def sqlite_ddl(self) -> List[str]:
+        """CREATE TABLE equivalentes em SQLite (defaults são aplicados pelo stand-in)."""
+        statements = []
+        for table in self.tables.values():
+            parts = []
+            for column in table.columns.values():
+                definition = f'"{column.name}" {column.affinity}'
+                if column.primary_key:
+                    definition += " PRIMARY KEY"
+                if column.not_null and not column.primary_key:
+                    definition += " NOT NULL"
+                if column.unique:
+                    definition += " UNIQUE"
+                if column.references and column.references[0] in self.tables:
+                    ref_table, ref_column = column.references
+                    definition += f' REFERENCES "{ref_table}"("{ref_column}")'
+                    if column.on_delete:
+                        definition += f" ON DELETE {column.on_delete}"
+                if column.check and "::" not in column.check:
+                    definition += f" CHECK ({column.check})"
+                if column.generated:
+                    definition += f" GENERATED ALWAYS AS ({column.generated}) STORED"
+                parts.append(definition)
+            for columns in table.unique_constraints.values():
+                parts.append("UNIQUE (" + ", ".join(f'"{c}"' for c in columns) + ")")
+            statements.append(f'CREATE TABLE IF NOT EXISTS "{table.name}" (' + ", ".join(parts) + ")")
+        return statements
+
+    # --- interpretação das instruções ---
+
+    def _apply_statement(self, statement: str):
+        head = " ".join(statement.split()[:4]).upper()
+
+        if head.startswith("DO "):
+            body = _dollar_body(statement)
+            for inner in split_statements(body or ""):
+                match = re.search(r"\b(ALTER\s+(?:TABLE|TYPE)\b.*)", inner, re.IGNORECASE | re.DOTALL)
+                if match:
+                    self._apply_statement(match.group(1))
+        elif head.startswith("CREATE TYPE"):
+            self._create_type(statement)
+        elif head.startswith("ALTER TYPE"):
+            self._alter_type(statement)
+        elif re.match(r"CREATE (UNLOGGED )?TABLE", head):
+            self._create_table(statement)
+        elif head.startswith("ALTER TABLE"):
+            self._alter_table(statement)
+        elif head.startswith("DROP TABLE"):
+            for name in re.findall(r"[\w.\"]+", statement[len("DROP TABLE"):]):
+                self.tables.pop(_name(name), None)
+        elif head.startswith("CREATE SEQUENCE"):
+            match = re.match(r"CREATE\s+SEQUENCE\s+(?:IF\s+NOT\s+EXISTS\s+)?([\w.\"]+)(?:.*?START\s+(?:WITH\s+)?(\d+))?",
+                             statement, re.IGNORECASE | re.DOTALL)
+            if match:
+                self.sequences.setdefault(_name(match.group(1)), int(match.group(2) or 1))
+        elif re.match(r"CREATE (OR REPLACE )?FUNCTION", head):
+            match = re.match(r"CREATE\s+(?:OR\s+REPLACE\s+)?FUNCTION\s+([\w.\"]+)", statement, re.IGNORECASE)
+            if match:
+                self.functions[_name(match.group(1))] = _dollar_body(statement) or ""
+        elif re.match(r"CREATE (OR REPLACE )?TRIGGER", head):
+            self._create_trigger(statement)
+        elif head.startswith("INSERT INTO"):
+            self._insert(statement)
+
+    def _create_type(self, statement: str):
+        match = re.match(r"CREATE\s+TYPE\s+([\w.\"]+)\s+AS\s+ENUM\s*\((.*)\)", statement, re.IGNORECASE | re.DOTALL)
+        if match:
+            self.enums[_name(match.group(1))] = [_unquote(v) for v in _split_top_level(match.group(2))]
+
+    def _alter_type(self, statement: str):
+        match = re.match(r"ALTER\s+TYPE\s+([\w.\"]+)\s+ADD\s+VALUE\s+(?:IF\s+NOT\s+EXISTS\s+)?('(?:[^']|'')*')",
+                         statement, re.IGNORECASE)
+        if match:
+            values = self.enums.setdefault(_name(match.group(1)), [])
+            value = _unquote(match.group(2))
+            if value not in values:
+                values.append(value)
+
+    def _create_table(self, statement: str):
+        match = re.match(r"CREATE\s+(?:UNLOGGED\s+)?TABLE\s+(?:IF\s+NOT\s+EXISTS\s+)?([\w.\"]+)\s*\(",
+                         statement, re.IGNORECASE)
+        if not match or not _is_public(match.group(1)):
+            return
+        name = _name(match.group(1))
+        if name in self.tables:
+            return
+
+        table = Table(name)
+        self.tables[name] = table
+        body = statement[match.end() - 1:]
+        body = body[1:_matching_paren(body, 0)]
+        for item in _split_top_level(body):
+            tokens = _tokens(item)
+            if tokens and tokens[0].upper() in TABLE_CONSTRAINTS:
+                self._table_constraint(table, tokens)
+            elif tokens:
+                self._add_column(table, tokens)
+
+    def _alter_table(self, statement: str):
+        match = re.match(r"ALTER\s+TABLE\s+(?:IF\s+EXISTS\s+)?(?:ONLY\s+)?([\w.\"]+)\s+", statement, re.IGNORECASE)
+        if not match or _name(match.group(1)) not in self.tables:
+            return
+        table = self.tables[_name(match.group(1))]
+
+        for action in _split_top_level(statement[match.end():]):
+            tokens = _tokens(action)
+            words = [t.upper() for t in tokens]
+            if len(words) < 2:
+                continue
+
+            if words[0] == "ADD":
+                if words[1] == "COLUMN":
+                    rest = tokens[2:]
+                    if [w.upper() for w in rest[:3]] == ["IF", "NOT", "EXISTS"]:
+                        rest = rest[3:]
+                    self._add_column(table, rest)
+                elif words[1] in TABLE_CONSTRAINTS:
+                    self._table_constraint(table, tokens[1:])
+                else:
+                    self._add_column(table, tokens[1:])
+            elif words[0] == "ALTER" and len(words) >= 4:
+                offset = 2 if words[1] == "COLUMN" else 1
+                column = table.columns.get(_name(tokens[offset]))
+                if column is not None:
+                    self._alter_column(column, tokens[offset + 1:])
+            elif words[0] == "DROP" and words[1] == "COLUMN":
+                name = tokens[4] if words[2:4] == ["IF", "EXISTS"] else tokens[2]
+                table.columns.pop(_name(name), None)
+            elif words[0] == "DROP" and words[1] == "CONSTRAINT":
+                name = tokens[4] if words[2:4] == ["IF", "EXISTS"] else tokens[2]
+                table.unique_constraints.pop(_name(name), None)
+            elif words[0] == "RENAME" and words[1] == "COLUMN" and len(tokens) >= 5:
+                old, new = _name(tokens[2]), _name(tokens[4])
+                if old in table.columns:
+                    column = table.columns.pop(old)
+                    column.name = new
+                    table.columns[new] = column
+            elif words[0] == "RENAME" and words[1] == "TO":
+                self.tables.pop(table.name)
+                table.name = _name(tokens[2])
+                self.tables[table.name] = table
+
+    def _add_column(self, table: Table, tokens: List[str]):
+        name = _name(tokens[0])
+        if name in table.columns:
+            return
+
+        type_tokens = []
+        position = 1
+        while position < len(tokens) and tokens[position].upper() not in COLUMN_KEYWORDS:
+            if not tokens[position].startswith("("):
+                type_tokens.append(tokens[position])
+            position += 1
+
+        column = Column(name, "text")
+        self._set_type(column, " ".join(type_tokens))
+        if column.type == "serial":
+            column.not_null = True
+        self._apply_column_constraints(column, tokens[position:])
+        table.columns[name] = column
+
+    def _set_type(self, column: Column, type_text: str):
+        type_name = type_text.lower().strip()
+        if type_name.endswith("[]"):
+            column.type, column.enum = "json", None
+            return
+        bare = _name(type_name)
+        if bare in self.enums or "." in type_name and _is_public(type_name):
+            column.type, column.enum = "enum", bare
+            self.enums.setdefault(bare, [])
+            return
+        column.type, column.enum = TYPE_ALIASES.get(type_name, type_name), None
+
+    def _apply_column_constraints(self, column: Column, tokens: List[str]):
+        position = 0
+        while position < len(tokens):
+            word = tokens[position].upper()
+            if word == "NOT" and position + 1 < len(tokens) and tokens[position + 1].upper() == "NULL":
+                column.not_null = True
+                position += 2
+            elif word == "NULL":
+                position += 1
+            elif word == "PRIMARY":
+                column.primary_key = True
+                column.not_null = True
+                position += 2
+            elif word == "UNIQUE":
+                column.unique = True
+                position += 1
+            elif word == "DEFAULT":
+                end = position + 1
+                while end < len(tokens) and tokens[end].upper() not in COLUMN_KEYWORDS:
+                    end += 1
+                column.default = _parse_default(tokens[position + 1:end])
+                position = end
+            elif word == "REFERENCES":
+                column.references = (_name(tokens[position + 1]) if _is_public(tokens[position + 1]) else None,
+                                     "id")
+                position += 2
+                if position < len(tokens) and tokens[position].startswith("("):
+                    column.references = (column.references[0], _name(tokens[position][1:-1]))
+                    position += 1
+                if column.references[0] is None:
+                    column.references = None
+                while position + 2 < len(tokens) and tokens[position].upper() == "ON":
+                    event = tokens[position + 1].upper()
+                    action = tokens[position + 2].upper()
+                    position += 3
+                    if action in ("SET", "NO") and position < len(tokens):
+                        action = f"{action} {tokens[position].upper()}"
+                        position += 1
+                    if event == "DELETE":
+                        column.on_delete = action
+            elif word == "CHECK":
+                column.check = tokens[position + 1][1:-1].strip()
+                position += 2
+            elif word == "GENERATED":
+                # GENERATED ALWAYS AS (expr) STORED / GENERATED ... AS IDENTITY
+                group = next((t for t in tokens[position:] if t.startswith("(")), None)
+                if group is not None and "IDENTITY" not in [t.upper() for t in tokens[position:]]:
+                    column.generated = group[1:-1].strip()
+                else:
+                    column.type = "serial"
+                position = len(tokens)
+            else:
+                position += 1
+
+    def _alter_column(self, column: Column, tokens: List[str]):
+        words = [t.upper() for t in tokens]
+        if words[:3] == ["DROP", "NOT", "NULL"]:
+            column.not_null = False
+        elif words[:3] == ["SET", "NOT", "NULL"]:
+            column.not_null = True
+        elif words[:2] == ["DROP", "DEFAULT"]:
+            column.default = None
+        elif words[:2] == ["SET", "DEFAULT"]:
+            column.default = _parse_default(tokens[2:])
+        elif words and (words[0] == "TYPE" or words[:3] == ["SET", "DATA", "TYPE"]):
+            start = 1 if words[0] == "TYPE" else 3
+            end = words.index("USING") if "USING" in words else len(words)
+            self._set_type(column, " ".join(t for t in tokens[start:end] if not t.startswith("(")))
+
+    def _table_constraint(self, table: Table, tokens: List[str]):
+        words = [t.upper() for t in tokens]
+        name = None
+        if words[0] == "CONSTRAINT":
+            name = _name(tokens[1])
+            tokens, words = tokens[2:], words[2:]
+        if not tokens:
+            return
+
+        if words[0] == "PRIMARY":
+            columns = tuple(_name(c) for c in _split_top_level(tokens[2][1:-1]))
+            if len(columns) == 1 and columns[0] in table.columns:
+                table.columns[columns[0]].primary_key = True
+            else:
+                table.unique_constraints[name or "_pk"] = columns
+        elif words[0] == "UNIQUE":
+            columns = tuple(_name(c) for c in _split_top_level(tokens[1][1:-1]))
+            table.unique_constraints[name or "_".join((table.name,) + columns + ("key",))] = columns
+        elif words[0] == "FOREIGN":
+            columns = tuple(_name(c) for c in _split_top_level(tokens[2][1:-1]))
+            column = table.columns.get(columns[0])
+            if column is not None and len(columns) == 1:
+                self._apply_column_constraints(column, tokens[3:])
+
+    def _create_trigger(self, statement: str):
+        match = re.match(
+            r"CREATE\s+(?:OR\s+REPLACE\s+)?TRIGGER\s+\S+\s+(BEFORE|AFTER|INSTEAD\s+OF)\s+(.*?)\s+ON\s+([\w.\"]+)"
+            r".*?EXECUTE\s+(?:FUNCTION|PROCEDURE)\s+([\w.\"]+)",
+            statement, re.IGNORECASE | re.DOTALL,
+        )
+        if not match or match.group(1).upper() != "BEFORE" or _name(match.group(3)) not in self.tables:
+            return
+        table = self.tables[_name(match.group(3))]
+        events = match.group(2).upper()
+        function = _name(match.group(4))
+        body = self.functions.get(function, "")
+
+        if "INSERT" in events:
+            for column_name, prefix, sequence, width in AUTO_CODE_PATTERN.findall(body):
+                column = table.columns.get(column_name)
+                if column is not None:
+                    column.auto_code = (prefix, _name(sequence), int(width))
+        if "UPDATE" in events:
+            touched = TOUCH_PATTERN.findall(body)
+            # update_updated_at_column() é criada fora destas migrações
+            if not touched and function == "update_updated_at_column":
+                touched = ["updated_at"]
+            for column_name in touched:
+                if column_name in table.columns and column_name not in table.touch_on_update:
+                    table.touch_on_update.append(column_name)
+
+    def _insert(self, statement: str):
+        match = re.match(r"INSERT\s+INTO\s+([\w.\"]+)\s*\((.*?)\)\s*VALUES\s*", statement, re.IGNORECASE | re.DOTALL)
+        if not match or not _is_public(match.group(1)) or _name(match.group(1)) not in self.tables:
+            return
+        table = self.tables[_name(match.group(1))]
+        columns = [_name(c) for c in _split_top_level(match.group(2))]
+        values = statement[match.end():]
+        values = re.split(r"\bON\s+CONFLICT\b", values, flags=re.IGNORECASE)[0]
+        for group in _split_top_level(values):
+            group = group.strip()
+            if group.startswith("("):
+                row = [_parse_literal(v) for v in _split_top_level(group[1:-1])]
+                table.seed_rows.append(dict(zip(columns, row)))
+
+
+# --- utilitários de parsing ---
+
+def split_statements(sql: str) -> List[str]:
+    """Divide o SQL em instruções, respeitando strings, dollar quoting e comentários."""
+    statements, current = [], []
+    position, length = 0, len(sql)
+    while position < length:
+        char = sql[position]
+        if sql.startswith("--", position):
+            end = sql.find("\n", position)
+            position = length if end == -1 else end
+        elif sql.startswith("/*", position):
+            end = sql.find("*/", position + 2)
+            position = length if end == -1 else end + 2
+        elif char == "'":
+            end = position + 1
+            while end < length:
+                if sql[end] == "'" and sql.startswith("''", end):
+                    end += 2
+                elif sql[end] == "'":
+                    break
+                else:
+                    end += 1
+            current.append(sql[position:end + 1])
+            position = end + 1
+        elif char == "$" and re.match(r"\$\w*\$", sql[position:]):
+            tag = re.match(r"\$\w*\$", sql[position:]).group(0)
+            end = sql.find(tag, position + len(tag))
+            end = length if end == -1 else end + len(tag)
+            current.append(sql[position:end])
+            position = end
+        elif char == ";":
+            statement = "".join(current).strip()
+            if statement:
+                statements.append(statement)
+            current = []
+            position += 1
+        else:
+            current.append(char)
+            position += 1
+
+    statement = "".join(current).strip()
+    if statement:
+        statements.append(statement)
+    return statements
+
+
+def _dollar_body(statement: str) -> Optional[str]:
+    match = re.search(r"(\$\w*\$)(.*?)\1", statement, re.DOTALL)
+    return match.group(2) if match else None
+
+
+def _matching_paren(text: str, start: int) -> int:
+    depth = 0
+    quoted = False
+    for position in range(start, len(text)):
+        char = text[position]
+        if char == "'":
+            quoted = not quoted
+        elif quoted:
+            continue
+        elif char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+            if depth == 0:
+                return position
+    return len(text)
+
+
+def _split_top_level(text: str) -> List[str]:
+    """Divide por vírgulas fora de parênteses e strings."""
+    parts, current, depth, quoted = [], [], 0, False
+    for char in text:
+        if char == "'":
+            quoted = not quoted
+        elif not quoted and char == "(":
+            depth += 1
+        elif not quoted and char == ")":
+            depth -= 1
+        elif not quoted and depth == 0 and char == ",":
+            parts.append("".join(current).strip())
+            current = []
+            continue
+        current.append(char)
+    if "".join(current).strip():
+        parts.append("".join(current).strip())
+    return parts
+
+
+def _tokens(text: str) -> List[str]:
+    """Palavras, strings entre aspas e grupos entre parênteses (um token cada)."""
+    tokens, position, length = [], 0, len(text)
+    while position < length:
+        char = text[position]
+        if char.isspace():
+            position += 1
+        elif char == "(":
+            end = _matching_paren(text, position)
+            tokens.append(text[position:end + 1])
+            position = end + 1
+        elif char == "'":
+            end = position + 1
+            while end < length and not (text[end] == "'" and not text.startswith("''", end)):
+                end += 2 if text.startswith("''", end) else 1
+            tokens.append(text[position:end + 1])
+            position = end + 1
+        else:
+            end = position
+            while end < length and not text[end].isspace() and text[end] not in "('":
+                end += 1
+            tokens.append(text[position:end])
+            position = end
+    return tokens
+
+
+def _name(identifier: str) -> str:
+    """Nome sem schema e sem aspas (public.dfds -> dfds)."""
+    return identifier.strip().split(".")[-1].strip('"')
+
+
+def _is_public(identifier: str) -> bool:
+    parts = identifier.strip().split(".")
+    return len(parts) == 1 or parts[0].strip('"').lower() == "public"
+
+
+def _unquote(value: str) -> str:
+    value = value.strip()
+    if value.startswith("'") and value.endswith("'"):
+        return value[1:-1].replace("''", "'")
+    return value
+
+
+def _parse_literal(value: str):
+    value = re.sub(r"::[\w ]+$", "", value.strip())
+    upper = value.upper()
+    if value.startswith("'"):
+        return _unquote(value)
+    if upper == "NULL":
+        return None
+    if upper in ("TRUE", "FALSE"):
+        return upper == "TRUE"
+    try:
+        return int(value)
+    except ValueError:
+        pass
+    try:
+        return float(value)
+    except ValueError:
+        return value
+
+
+def _parse_default(tokens: List[str]) -> Optional[Tuple[str, object]]:
+    if not tokens:
+        return None
+    first = tokens[0]
+    if first.lower().startswith("nextval"):
+        argument = tokens[1] if len(tokens) > 1 else ""
+        match = re.search(r"'([\w.\"]+)'", argument)
+        return ("sequence", _name(match.group(1))) if match else None
+    if len(tokens) > 1 and tokens[1].startswith("("):
+        return ("function", first.lower())
+    if first.upper() in ("CURRENT_TIMESTAMP", "CURRENT_DATE", "LOCALTIMESTAMP"):
+        return ("function", first.lower())
+    return ("literal", _parse_literal(first))
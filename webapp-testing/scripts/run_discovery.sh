@@ -55,11 +55,11 @@ cd "$WEBAPP_TESTING_DIR"
 if [ "$USE_WITH_SERVER" = true ]; then
     # Executa com with_server (garante que o servidor está rodando)
     echo -e "${BLUE}📋 Usando with_server.py para garantir servidor ativo${NC}"
-    python3 scripts/with_server.py python3 tests/test_login_discovery_simple.py
+    python3 scripts/with_server.py python3 tests/test_login_discovery_simple.py "$@"
 else
     # Executa diretamente
     echo -e "${BLUE}📋 Executando teste diretamente${NC}"
-    python3 tests/test_login_discovery_simple.py
+    python3 tests/test_login_discovery_simple.py "$@"
 fi
 
 EXIT_CODE=$?
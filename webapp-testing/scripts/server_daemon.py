@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""
+Servidor compartilhado entre execuções concorrentes do with_server.py.
+
+A primeira execução inicia um daemon que mantém o servidor (Vite ou build
+de produção) rodando; as seguintes apenas se registram como clientes. Há um
+servidor compartilhado por configuração (modo, stand-in do Supabase e banco
+do stand-in): uma execução com --build nunca reaproveita o servidor de
+desenvolvimento, e vice-versa. O estado de cada um fica em um arquivo
+protegido por lockfile (fcntl.flock) e o daemon desliga o servidor quando
+o último cliente sai (clientes que morreram sem se desregistrar são
+detectados pelo PID). Se a porta 5173 estiver ocupada por outro processo
+(ou por outro servidor compartilhado), uma porta livre é escolhida.
+
+Uso interno: python3 server_daemon.py --port 5173 --mode dev [--supabase-stub PERFIL]
+"""
+
+import argparse
+import errno
+import fcntl
+import hashlib
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from typing import Optional
+
+from atomic_file import atomic_write_json
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Um diretório de estado por checkout do projeto
+STATE_DIR = os.path.join(
+    tempfile.gettempdir(),
+    f"pca-webapp-testing-{hashlib.sha256(PROJECT_ROOT.encode('utf-8')).hexdigest()[:12]}",
+)
+
+DEFAULT_PORT = 5173
+STARTUP_TIMEOUT = 120  # inclui um eventual vite build no modo --build
+POLL_INTERVAL = 0.5
+IDLE_GRACE = 2.0  # segundos sem clientes antes de desligar
+
+
+def server_key(mode: str, supabase_stub: Optional[str] = None, supabase_db: str = ":memory:") -> str:
+    """Identifica o servidor compartilhado pela configuração pedida (ex.: "build-3f2a9c01")."""
+    # Sem o stand-in, o banco não é usado
+    config = json.dumps([mode, supabase_stub, supabase_db if supabase_stub else None])
+    return f"{mode}-{hashlib.sha256(config.encode('utf-8')).hexdigest()[:8]}"
+
+
+class ServerState:
+    """Arquivos de estado, lock e log de um servidor compartilhado."""
+
+    def __init__(self, key: str):
+        self.key = key
+        self.lock_path = os.path.join(STATE_DIR, f"server-{key}.lock")
+        self.path = os.path.join(STATE_DIR, f"server-{key}.json")
+        self.log_path = os.path.join(STATE_DIR, f"server-{key}.log")
+
+    @contextmanager
+    def locked(self):
+        """Seção crítica entre processos sobre o arquivo de estado."""
+        os.makedirs(STATE_DIR, exist_ok=True)
+        with open(self.lock_path, "a+") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def read(self) -> Optional[dict]:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def write(self, state: dict):
+        atomic_write_json(self.path, state)
+
+    def clear(self):
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+
+def pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except OSError as e:
+        return e.errno == errno.EPERM
+    return True
+
+
+def port_is_free(port: int) -> bool:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        try:
+            sock.bind(("", port))
+            return True
+        except OSError:
+            return False
+
+
+def pick_port(preferred: int = DEFAULT_PORT) -> int:
+    """Usa a porta preferida se estiver livre; caso contrário, uma porta livre qualquer."""
+    if port_is_free(preferred):
+        return preferred
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("", 0))
+        return sock.getsockname()[1]
+
+
+class SharedServerClient:
+    """Registra o processo atual como cliente do servidor compartilhado."""
+
+    def __init__(self, mode: str = "dev", host: str = "localhost", supabase_stub: Optional[str] = None,
+                 supabase_db: str = ":memory:"):
+        self.mode = mode
+        self.host = host
+        self.supabase_stub = supabase_stub
+        self.supabase_db = supabase_db
+        self.pid = os.getpid()
+        self.registered = False
+        self.state = ServerState(server_key(mode, supabase_stub, supabase_db))
+        # URL do stand-in do Supabase do servidor compartilhado (se houver)
+        self.supabase_url: Optional[str] = None
+        # Modo em que o servidor obtido de fato roda (repassado aos testes em WEBAPP_SERVER_MODE)
+        self.server_mode: Optional[str] = None
+
+    def acquire(self, timeout: float = STARTUP_TIMEOUT) -> Optional[str]:
+        """Garante o servidor rodando e retorna sua URL base (ou None em caso de falha)."""
+        from with_server import ServerManager
+
+        with self.state.locked():
+            state = self.state.read()
+            if state is not None and not pid_alive(state["daemon_pid"]):
+                self.state.clear()
+                state = None
+
+            if state is None:
+                # Servidor iniciado fora do harness (ex.: npm run dev em outro terminal): só
+                # serve no modo dev e sem o stand-in do Supabase (aponta para o backend do .env)
+                external = ServerManager(port=DEFAULT_PORT, host=self.host)
+                if self.mode == "dev" and not self.supabase_stub and external.is_server_ready():
+                    print(f"✅ Servidor já está rodando em http://{self.host}:{DEFAULT_PORT}")
+                    self.server_mode = "dev"
+                    return f"http://{self.host}:{DEFAULT_PORT}"
+
+                port = pick_port(DEFAULT_PORT)
+                if port != DEFAULT_PORT:
+                    print(f"⚠️  Porta {DEFAULT_PORT} ocupada, usando a porta {port}")
+                state = {
+                    "daemon_pid": self._spawn_daemon(port),
+                    "port": port,
+                    "mode": self.mode,
+                    "supabase_stub": self.supabase_stub,
+                    "supabase_url": None,
+                    "ready": False,
+                    "clients": [],
+                }
+            else:
+                print(f"♻️  Reutilizando servidor compartilhado ({state['mode']}) na porta {state['port']} "
+                      f"({len(state['clients'])} cliente(s) ativo(s))")
+
+            state["clients"].append(self.pid)
+            self.state.write(state)
+            self.registered = True
+
+        return self._wait_until_ready(timeout)
+
+    def _spawn_daemon(self, port: int) -> int:
+        print(f"🚀 Iniciando servidor compartilhado ({self.mode}) na porta {port} (log: {self.state.log_path})...")
+        os.makedirs(STATE_DIR, exist_ok=True)
+        log_file = open(self.state.log_path, "ab")
+        command = [sys.executable, os.path.abspath(__file__), "--port", str(port), "--mode", self.mode,
+                   "--host", self.host]
+        if self.supabase_stub:
+            command += ["--supabase-stub", self.supabase_stub, "--supabase-db", self.supabase_db]
+        process = subprocess.Popen(
+            command,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            stdout=log_file,
+            stderr=subprocess.STDOUT,
+            stdin=subprocess.DEVNULL,
+            start_new_session=True,  # não morre junto com o grupo de processos do cliente
+        )
+        log_file.close()
+        return process.pid
+
+    def _wait_until_ready(self, timeout: float) -> Optional[str]:
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            state = self.state.read()
+            if state is None or not pid_alive(state["daemon_pid"]):
+                print(f"❌ Servidor compartilhado falhou ao iniciar (veja {self.state.log_path})")
+                return None
+            if state["ready"]:
+                self.supabase_url = state.get("supabase_url")
+                self.server_mode = state["mode"]
+                url = f"http://{self.host}:{state['port']}"
+                print(f"✅ Servidor pronto em {url}")
+                return url
+            time.sleep(0.1)
+
+        print(f"❌ Timeout aguardando servidor compartilhado após {timeout} segundos")
+        return None
+
+    def release(self):
+        """Desregistra o cliente; o daemon desliga o servidor se não restar nenhum."""
+        if not self.registered:
+            return
+        with self.state.locked():
+            state = self.state.read()
+            if state is not None and self.pid in state["clients"]:
+                state["clients"].remove(self.pid)
+                self.state.write(state)
+        self.registered = False
+
+
+def run_daemon(port: int, mode: str, host: str, supabase_stub: Optional[str] = None,
+               supabase_db: str = ":memory:") -> int:
+    """Mantém o servidor rodando enquanto houver clientes registrados."""
+    from with_server import ServerManager
+
+    manager = ServerManager(port=port, host=host, mode=mode, supabase_stub=supabase_stub, supabase_db=supabase_db)
+    shared = ServerState(server_key(mode, supabase_stub, supabase_db))
+    stopping = []
+    signal.signal(signal.SIGTERM, lambda *_: stopping.append(True))
+
+    if not manager.start_server():
+        with shared.locked():
+            shared.clear()
+        manager.stop_server()
+        return 1
+
+    with shared.locked():
+        state = shared.read() or {"daemon_pid": os.getpid(), "port": port, "mode": mode, "clients": []}
+        state["ready"] = True
+        state["supabase_url"] = manager.supabase.url if manager.supabase else None
+        shared.write(state)
+
+    idle_since = None
+    try:
+        while not stopping:
+            time.sleep(POLL_INTERVAL)
+            with shared.locked():
+                state = shared.read()
+                if state is None or state["daemon_pid"] != os.getpid():
+                    break
+
+                server_died = manager.server_process is not None and manager.server_process.poll() is not None
+                clients = [pid for pid in state["clients"] if pid_alive(pid)]
+                if clients != state["clients"]:
+                    state["clients"] = clients
+                    shared.write(state)
+
+                if clients:
+                    idle_since = None
+                elif idle_since is None:
+                    idle_since = time.monotonic()
+
+                if server_died or (idle_since is not None and time.monotonic() - idle_since >= IDLE_GRACE):
+                    # Para o servidor ainda com o lock, liberando a porta para o próximo daemon
+                    shared.clear()
+                    manager.stop_server()
+                    return 0
+    finally:
+        manager.stop_server()
+
+    with shared.locked():
+        state = shared.read()
+        if state is not None and state["daemon_pid"] == os.getpid():
+            shared.clear()
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Daemon do servidor compartilhado")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--mode", choices=["dev", "build"], default="dev")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--supabase-stub", default=None)
+    parser.add_argument("--supabase-db", default=":memory:")
+    args = parser.parse_args(argv)
+    return run_daemon(args.port, args.mode, args.host, args.supabase_stub, args.supabase_db)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
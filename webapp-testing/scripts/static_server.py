@@ -0,0 +1,186 @@
+"""
+Servidor estático para o bundle de produção (dist/).
+Usado pelo with_server.py no modo --build: faz o build com o Vite apenas
+quando o código-fonte muda e serve o resultado em processo, com fallback
+de SPA, keep-alive (HTTP/1.1) e assets pré-comprimidos em gzip.
+"""
+
+import gzip
+import hashlib
+import os
+import shutil
+import subprocess
+import threading
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+DIST_DIR = os.path.join(PROJECT_ROOT, "dist")
+BUILD_HASH_FILE = ".build-hash"
+
+# Arquivos e diretórios que influenciam o resultado do vite build
+BUILD_INPUTS = [
+    "src", "public", "index.html", "vite.config.ts", "package.json", "package-lock.json",
+    "tailwind.config.ts", "postcss.config.js", "tsconfig.json", "tsconfig.app.json",
+    "tsconfig.node.json", "components.json", ".env",
+]
+
+COMPRESSIBLE_EXTENSIONS = (".js", ".css", ".html", ".svg", ".json", ".txt", ".map", ".ico")
+MIN_COMPRESS_SIZE = 1024
+
+
+def source_hash(root: str = PROJECT_ROOT, env: Optional[Dict[str, str]] = None) -> str:
+    """Hash do conteúdo de todas as entradas do build (e das variáveis VITE_* embutidas no bundle)."""
+    digest = hashlib.sha256()
+    for name, value in sorted((env or {}).items()):
+        if name.startswith("VITE_"):
+            digest.update(f"{name}={value}".encode("utf-8"))
+    for entry in BUILD_INPUTS:
+        path = os.path.join(root, entry)
+        if os.path.isfile(path):
+            files = [path]
+        elif os.path.isdir(path):
+            files = sorted(
+                os.path.join(dirpath, filename)
+                for dirpath, _, filenames in os.walk(path)
+                for filename in filenames
+            )
+        else:
+            continue
+
+        for filepath in files:
+            digest.update(os.path.relpath(filepath, root).encode("utf-8"))
+            with open(filepath, "rb") as f:
+                for block in iter(lambda: f.read(65536), b""):
+                    digest.update(block)
+    return digest.hexdigest()
+
+
+def precompress(dist_dir: str = DIST_DIR) -> int:
+    """Gera arquivos .gz ao lado dos assets comprimíveis."""
+    count = 0
+    for dirpath, _, filenames in os.walk(dist_dir):
+        for filename in filenames:
+            if not filename.endswith(COMPRESSIBLE_EXTENSIONS):
+                continue
+            path = os.path.join(dirpath, filename)
+            if os.path.getsize(path) < MIN_COMPRESS_SIZE:
+                continue
+            with open(path, "rb") as src, gzip.open(f"{path}.gz", "wb", compresslevel=9) as dst:
+                shutil.copyfileobj(src, dst)
+            count += 1
+    return count
+
+
+def ensure_build(force: bool = False, env: Optional[Dict[str, str]] = None) -> bool:
+    """
+    Executa o vite build somente se o hash das fontes mudou desde o último build.
+    env sobrescreve variáveis do ambiente do build (ex.: VITE_SUPABASE_URL).
+    """
+    current = source_hash(env=env)
+    hash_path = os.path.join(DIST_DIR, BUILD_HASH_FILE)
+
+    if not force and os.path.exists(os.path.join(DIST_DIR, "index.html")) and os.path.exists(hash_path):
+        with open(hash_path, "r", encoding="utf-8") as f:
+            if f.read().strip() == current:
+                print(f"♻️  Build de produção atualizado, reutilizando {DIST_DIR}")
+                return True
+
+    print("🏗️  Executando vite build...")
+    result = subprocess.run(
+        ["npm", "run", "build"],
+        cwd=PROJECT_ROOT,
+        env={**os.environ, **(env or {})},
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+    )
+    if result.returncode != 0:
+        print(f"❌ Build falhou:")
+        print(result.stdout.decode("utf-8", errors="replace"))
+        return False
+
+    compressed = precompress()
+    with open(hash_path, "w", encoding="utf-8") as f:
+        f.write(current)
+
+    print(f"✅ Build concluído ({compressed} assets pré-comprimidos)")
+    return True
+
+
+class SPARequestHandler(SimpleHTTPRequestHandler):
+    """Serve dist/ com fallback para index.html e variantes .gz pré-comprimidas."""
+
+    protocol_version = "HTTP/1.1"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, directory=DIST_DIR, **kwargs)
+
+    def send_head(self):
+        path = self.translate_path(self.path)
+
+        if os.path.isdir(path):
+            path = os.path.join(path, "index.html")
+
+        # Fallback de SPA: rotas do React Router (sem extensão e sem arquivo) recebem o index.html
+        request_path = self.path.split("?", 1)[0].split("#", 1)[0]
+        if not os.path.exists(path) and "." not in os.path.basename(request_path):
+            path = os.path.join(DIST_DIR, "index.html")
+
+        if not os.path.exists(path):
+            self.send_error(404, "File not found")
+            return None
+
+        encoding = None
+        gz_path = f"{path}.gz"
+        if "gzip" in self.headers.get("Accept-Encoding", "") and os.path.exists(gz_path):
+            encoding = "gzip"
+
+        try:
+            f = open(gz_path if encoding else path, "rb")
+        except OSError:
+            self.send_error(404, "File not found")
+            return None
+
+        size = os.fstat(f.fileno()).st_size
+        self.send_response(200)
+        self.send_header("Content-Type", self.guess_type(path))
+        self.send_header("Content-Length", str(size))
+        if encoding:
+            self.send_header("Content-Encoding", encoding)
+        self.send_header("Vary", "Accept-Encoding")
+        if "/assets/" in path:
+            # Arquivos com hash no nome: podem ficar em cache indefinidamente
+            self.send_header("Cache-Control", "public, max-age=31536000, immutable")
+        else:
+            self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        return f
+
+    def log_message(self, format, *args):
+        pass
+
+
+class ReusableHTTPServer(ThreadingHTTPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+
+class StaticServer:
+    """Servidor HTTP do dist/ rodando em uma thread do próprio processo."""
+
+    def __init__(self, host: str, port: int):
+        self.host = host
+        self.port = port
+        self.httpd: Optional[ReusableHTTPServer] = None
+        self.thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self.httpd = ReusableHTTPServer((self.host, self.port), SPARequestHandler)
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        if self.httpd is not None:
+            self.httpd.shutdown()
+            self.httpd.server_close()
+            self.httpd = None
@@ -0,0 +1,856 @@
+#!/usr/bin/env python3
+"""
+Stand-in local do Supabase para os testes (REST, Auth e Storage).
+Serve as tabelas de supabase/migrations a partir de um SQLite (em memória
+por padrão), com o subconjunto da API do PostgREST usado pelo supabase-js:
+select com recursos embutidos, filtros (eq, neq, gt, lt, like, ilike, is,
+in, not, or/and), order, limit/offset, count, single, insert/upsert,
+update e delete. Auth responde com um usuário de teste fixo e o Storage
+guarda os arquivos em memória. Um perfil de latência permite simular um
+backend lento de forma reprodutível.
+
+Uso: python3 supabase_stub.py [--port 54321] [--latency remote] [--db arquivo.sqlite]
+"""
+
+import argparse
+import base64
+import json
+import os
+import random
+import re
+import sqlite3
+import sys
+import threading
+import time
+import uuid
+from datetime import date, datetime, timezone
+from http.server import BaseHTTPRequestHandler
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, unquote, urlsplit
+
+from migration_schema import Column, Schema, Table
+from static_server import ReusableHTTPServer
+
+# Mesma porta da API do "supabase start", mantida fixa para o build de produção
+# (a URL do backend entra no bundle) continuar em cache entre execuções
+DEFAULT_PORT = 54321
+# Limite de linhas por resposta, como o max_rows padrão dos projetos Supabase
+DEFAULT_MAX_ROWS = 1000
+
+LATENCY_PROFILES = {
+    "none": {"mean_ms": 0, "jitter_ms": 0},
+    "lan": {"mean_ms": 5, "jitter_ms": 2},
+    "remote": {"mean_ms": 120, "jitter_ms": 40, "per_row_ms": 0.02},
+    "slow": {"mean_ms": 800, "jitter_ms": 200, "per_row_ms": 0.2},
+}
+
+TEST_USER_ID = "00000000-0000-4000-8000-000000000001"
+TEST_USER = {
+    "id": TEST_USER_ID,
+    "aud": "authenticated",
+    "role": "authenticated",
+    "email": "teste@pca.local",
+    "email_confirmed_at": "2025-01-01T00:00:00+00:00",
+    "app_metadata": {"provider": "email", "providers": ["email"]},
+    "user_metadata": {},
+    "created_at": "2025-01-01T00:00:00+00:00",
+    "updated_at": "2025-01-01T00:00:00+00:00",
+}
+
+RESERVED_PARAMS = {"select", "order", "limit", "offset", "on_conflict", "columns"}
+OPERATORS = {"eq": "=", "neq": "<>", "gt": ">", "gte": ">=", "lt": "<", "lte": "<="}
+SINGLE_OBJECT = "application/vnd.pgrst.object+json"
+SQLITE_MAX_VARIABLES = 900
+
+
+def _jwt(claims: dict) -> str:
+    """JWT sem assinatura válida (o stand-in não verifica tokens)."""
+    def encode(value: dict) -> str:
+        raw = json.dumps(value, separators=(",", ":")).encode("utf-8")
+        return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+    return f"{encode({'alg': 'HS256', 'typ': 'JWT'})}.{encode(claims)}.c3R1Yg"
+
+
+ANON_KEY = _jwt({"iss": "supabase-stub", "role": "anon"})
+
+
+def auth_session() -> dict:
+    """Sessão do usuário de teste, no formato do GoTrue."""
+    expires_at = int(time.time()) + 3600
+    access_token = _jwt({"sub": TEST_USER_ID, "aud": "authenticated", "role": "authenticated",
+                         "email": TEST_USER["email"], "exp": expires_at})
+    return {
+        "access_token": access_token,
+        "token_type": "bearer",
+        "expires_in": 3600,
+        "expires_at": expires_at,
+        "refresh_token": "stub-refresh-token",
+        "user": TEST_USER,
+    }
+
+
+def auth_storage_key(supabase_url: str) -> str:
+    """Chave do localStorage onde o supabase-js guarda a sessão."""
+    return f"sb-{urlsplit(supabase_url).hostname.split('.')[0]}-auth-token"
+
+
+def auth_init_script(supabase_url: str) -> str:
+    """Script (page.add_init_script) que autentica a página com o usuário de teste."""
+    key = json.dumps(auth_storage_key(supabase_url))
+    session = json.dumps(json.dumps(auth_session()))
+    return f"window.localStorage.setItem({key}, {session});"
+
+
+def now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+class PostgrestError(Exception):
+    """Erro no formato de resposta do PostgREST."""
+
+    def __init__(self, status: int, code: str, message: str, details: str = None, hint: str = None):
+        super().__init__(message)
+        self.status = status
+        self.code = code
+        self.message = message
+        self.details = details
+        self.hint = hint
+
+    def to_json(self) -> dict:
+        return {"code": self.code, "message": self.message, "details": self.details, "hint": self.hint}
+
+
+def load_latency_profile(spec: Optional[str]) -> dict:
+    """Perfil pelo nome (none, lan, remote, slow) ou por um arquivo JSON."""
+    if not spec:
+        return dict(LATENCY_PROFILES["none"])
+    if spec in LATENCY_PROFILES:
+        return dict(LATENCY_PROFILES[spec])
+    with open(spec, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+class LatencyModel:
+    """
+    Atraso de cada resposta: mean_ms ± jitter_ms, mais per_row_ms por linha
+    retornada. "tables" sobrescreve os valores por tabela. A sequência de
+    atrasos é determinística para uma mesma seed.
+    """
+
+    def __init__(self, profile: dict, seed: int = 0):
+        self.profile = profile
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def delay(self, table: Optional[str] = None, rows: int = 0) -> float:
+        settings = {**self.profile, **self.profile.get("tables", {}).get(table or "", {})}
+        jitter = settings.get("jitter_ms", 0)
+        with self._lock:
+            offset = self._random.uniform(-jitter, jitter) if jitter else 0
+        ms = settings.get("mean_ms", 0) + offset + settings.get("per_row_ms", 0) * rows
+        return max(0.0, ms / 1000)
+
+
+class SelectItem:
+    """Item do parâmetro select: coluna, * ou recurso embutido."""
+
+    def __init__(self, kind: str, name: str = "*", alias: str = None, hint: str = None,
+                 inner: bool = False, children: list = None):
+        self.kind = kind  # "star", "column" ou "embed"
+        self.name = name
+        self.alias = alias or name
+        self.hint = hint
+        self.inner = inner
+        self.children = children or []
+
+
+def parse_select(text: str) -> List[SelectItem]:
+    """Interpreta o select do PostgREST (ex.: "*, funcoes(nome), autor:agentes_publicos!inner(*)")."""
+    text = re.sub(r'\s+(?=(?:[^"]*"[^"]*")*[^"]*$)', "", text or "*")
+    items = []
+    for part in _split_list(text, "(", ")"):
+        if part == "*":
+            items.append(SelectItem("star"))
+            continue
+        if "(" in part and part.endswith(")"):
+            head, sub = part[:part.index("(")], part[part.index("(") + 1:-1]
+            alias, _, head = head.rpartition(":")
+            name, *modifiers = head.split("!")
+            hint = next((m for m in modifiers if m not in ("inner", "left")), None)
+            items.append(SelectItem("embed", name, alias or None, hint, "inner" in modifiers, parse_select(sub)))
+            continue
+        alias, _, name = part.partition(":") if ":" in part.split("::")[0] else ("", "", part)
+        name = name.split("::")[0].split("->")[0]
+        items.append(SelectItem("column", name, alias or None))
+    return items
+
+
+def _split_list(text: str, open_char: str = "(", close_char: str = ")") -> List[str]:
+    """Divide por vírgulas fora de parênteses e aspas duplas."""
+    parts, current, depth, quoted = [], [], 0, False
+    for char in text:
+        if char == '"':
+            quoted = not quoted
+        elif not quoted and char == open_char:
+            depth += 1
+        elif not quoted and char == close_char:
+            depth -= 1
+        elif not quoted and depth == 0 and char == ",":
+            parts.append("".join(current))
+            current = []
+            continue
+        current.append(char)
+    if current:
+        parts.append("".join(current))
+    return [p.strip() for p in parts if p.strip()]
+
+
+def _unquote_value(value: str) -> str:
+    if len(value) >= 2 and value.startswith('"') and value.endswith('"'):
+        return value[1:-1].replace('\\"', '"')
+    return value
+
+
+class StubDatabase:
+    """Tabelas das migrações em SQLite, com defaults, enums e sequências aplicados em Python."""
+
+    def __init__(self, schema: Schema, path: str = ":memory:"):
+        self.schema = schema
+        self.path = path
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        self.conn.execute("PRAGMA case_sensitive_like = ON")
+        if path != ":memory:":
+            self.conn.execute("PRAGMA journal_mode = WAL")
+        self.lock = threading.RLock()
+
+        with self.lock, self.conn:
+            for statement in schema.sqlite_ddl():
+                self.conn.execute(statement)
+            self.conn.execute('CREATE TABLE IF NOT EXISTS "_sequences" (name TEXT PRIMARY KEY, value INTEGER NOT NULL)')
+            # Índices nas FKs: os recursos embutidos buscam por elas (ex.: itens de milhares de DFDs)
+            for table in schema.tables.values():
+                for column in table.columns.values():
+                    if column.references:
+                        self.conn.execute(f'CREATE INDEX IF NOT EXISTS "{table.name}_{column.name}_idx" '
+                                          f'ON "{table.name}" ("{column.name}")')
+
+        for table in schema.tables.values():
+            if table.seed_rows and self.count(table.name) == 0:
+                self.insert(table.name, table.seed_rows)
+
+    # --- utilitários ---
+
+    def table(self, name: str) -> Table:
+        table = self.schema.tables.get(name)
+        if table is None:
+            raise PostgrestError(404, "PGRST205", f"Could not find the table 'public.{name}' in the schema cache")
+        return table
+
+    def column(self, table: Table, name: str) -> Column:
+        column = table.columns.get(name)
+        if column is None:
+            raise PostgrestError(400, "42703", f"column {table.name}.{name} does not exist")
+        return column
+
+    def count(self, table_name: str) -> int:
+        with self.lock:
+            return self.conn.execute(f'SELECT COUNT(*) FROM "{table_name}"').fetchone()[0]
+
+    def nextval(self, sequence: str, count: int = 1, table: Table = None, column: Column = None) -> int:
+        """Reserva count valores da sequência e retorna o primeiro."""
+        with self.lock:
+            row = self.conn.execute('SELECT value FROM "_sequences" WHERE name = ?', (sequence,)).fetchone()
+            if row is not None:
+                current = row[0]
+            elif table is not None and column is not None and column.type in ("serial", "integer", "bigint"):
+                current = self.conn.execute(f'SELECT COALESCE(MAX("{column.name}"), 0) FROM "{table.name}"').fetchone()[0]
+            else:
+                current = self.schema.sequences.get(sequence, 1) - 1
+            self.conn.execute('INSERT OR REPLACE INTO "_sequences" (name, value) VALUES (?, ?)',
+                              (sequence, current + count))
+            return current + 1
+
+    def _default(self, table: Table, column: Column):
+        if column.type == "serial" and column.default is None:
+            return self.nextval(f"{table.name}_{column.name}_seq", table=table, column=column)
+        if column.default is None:
+            return None
+        kind, value = column.default
+        if kind == "literal":
+            return value
+        if kind == "sequence":
+            return self.nextval(value)
+        value = str(value).split(".")[-1]
+        if value in ("gen_random_uuid", "uuid_generate_v4"):
+            return str(uuid.uuid4())
+        if value in ("now", "current_timestamp", "localtimestamp", "clock_timestamp", "timezone"):
+            return now_iso()
+        if value == "current_date":
+            return date.today().isoformat()
+        return None
+
+    def _encode(self, table: Table, name: str, value):
+        column = table.columns.get(name)
+        if column is None:
+            raise PostgrestError(400, "PGRST204", f"Could not find the '{name}' column of '{table.name}' in the schema cache")
+        if column.generated:
+            raise PostgrestError(400, "428C9", f'cannot insert a non-DEFAULT value into column "{name}"',
+                                 f'Column "{name}" is a generated column.')
+        if value is None:
+            return None
+        enum_values = self.schema.enum_values(column)
+        if enum_values is not None and value not in enum_values:
+            raise PostgrestError(400, "22P02", f'invalid input value for enum {column.enum}: "{value}"')
+        if column.type == "boolean":
+            return 1 if value else 0
+        if column.type == "json" or isinstance(value, (dict, list)):
+            return json.dumps(value, ensure_ascii=False)
+        return value
+
+    def prepare(self, table: Table, row: dict, insert: bool = True) -> dict:
+        """Valida e converte uma linha; na inserção, aplica defaults e códigos automáticos."""
+        values = {name: self._encode(table, name, value) for name, value in row.items()}
+        if not insert:
+            for name in table.touch_on_update:
+                values.setdefault(name, now_iso())
+            return values
+
+        for column in table.columns.values():
+            if column.generated:
+                continue
+            if column.name not in values:
+                values[column.name] = self._encode(table, column.name, self._default(table, column))
+            if column.auto_code and values[column.name] in (None, ""):
+                prefix, sequence, width = column.auto_code
+                values[column.name] = f"{prefix}{str(self.nextval(sequence)).zfill(width)}"
+        return values
+
+    def decode(self, table: Table, row) -> dict:
+        result = dict(row)
+        for name, value in result.items():
+            column = table.columns.get(name)
+            if column is None or value is None:
+                continue
+            if column.type == "boolean":
+                result[name] = bool(value)
+            elif column.type == "json":
+                result[name] = json.loads(value)
+        return result
+
+    def _coerce(self, column: Column, value: str):
+        try:
+            if column.type == "boolean":
+                return {"true": 1, "false": 0, "t": 1, "f": 0}[value.lower()]
+            if column.type in ("integer", "bigint", "smallint", "serial"):
+                return int(value)
+            if column.type == "numeric":
+                return float(value)
+        except (KeyError, ValueError):
+            raise PostgrestError(400, "22P02", f'invalid input syntax for type {column.type}: "{value}"')
+        return value
+
+    def _condition(self, table: Table, name: str, expression: str) -> Tuple[str, list]:
+        negate = expression.startswith("not.")
+        if negate:
+            expression = expression[4:]
+        operator, _, value = expression.partition(".")
+        column = self.column(table, name)
+        quoted = f'"{name}"'
+
+        if operator in OPERATORS:
+            clause, args = f"{quoted} {OPERATORS[operator]} ?", [self._coerce(column, value)]
+        elif operator == "like":
+            clause, args = f"{quoted} LIKE ?", [value.replace("*", "%")]
+        elif operator == "ilike":
+            clause, args = f"lower({quoted}) LIKE lower(?)", [value.replace("*", "%")]
+        elif operator == "is":
+            literal = value.lower()
+            if literal == "null":
+                clause, args = f"{quoted} IS NULL", []
+            elif literal in ("true", "false"):
+                clause, args = f"{quoted} = ?", [1 if literal == "true" else 0]
+            else:
+                raise PostgrestError(400, "PGRST100", f'"failed to parse filter (is.{value})" (line 1, column 4)')
+        elif operator == "in":
+            items = [_unquote_value(v) for v in _split_list(value.strip()[1:-1])]
+            placeholders = ", ".join("?" for _ in items) or "NULL"
+            clause, args = f"{quoted} IN ({placeholders})", [self._coerce(column, v) for v in items]
+        else:
+            raise PostgrestError(400, "PGRST100", f'"failed to parse filter ({operator}.{value})" (line 1, column 1)')
+
+        return (f"NOT ({clause})", args) if negate else (clause, args)
+
+    def _logic(self, table: Table, operator: str, expression: str) -> Tuple[str, list]:
+        """Filtros or=(...) / and=(...), com grupos aninhados."""
+        clauses, args = [], []
+        for item in _split_list(expression.strip()[1:-1]):
+            negate = item.startswith("not.")
+            body = item[4:] if negate else item
+            if body.startswith(("or(", "and(")):
+                nested, _, group = body.partition("(")
+                clause, item_args = self._logic(table, nested, f"({group}")
+                clause = f"NOT {clause}" if negate else clause
+            else:
+                name, _, condition = item.partition(".")
+                clause, item_args = self._condition(table, name, condition)
+            clauses.append(clause)
+            args.extend(item_args)
+        joiner = " OR " if operator == "or" else " AND "
+        return "(" + joiner.join(clauses) + ")", args
+
+    def where(self, table: Table, params: List[Tuple[str, str]]) -> Tuple[str, list]:
+        clauses, args = [], []
+        for key, value in params:
+            if key in RESERVED_PARAMS or "." in key:
+                continue
+            if key in ("or", "and", "not.or", "not.and"):
+                clause, item_args = self._logic(table, key.split(".")[-1], value)
+                clause = f"NOT {clause}" if key.startswith("not.") else clause
+            else:
+                clause, item_args = self._condition(table, key, value)
+            clauses.append(clause)
+            args.extend(item_args)
+        return (" WHERE " + " AND ".join(clauses), args) if clauses else ("", args)
+
+    def order(self, table: Table, text: Optional[str]) -> str:
+        if not text:
+            return ""
+        terms = []
+        for term in _split_list(text):
+            name, *modifiers = term.split(".")
+            self.column(table, name)
+            sql = f'"{name}"'
+            if "desc" in modifiers:
+                sql += " DESC"
+            if "nullsfirst" in modifiers:
+                sql += " NULLS FIRST"
+            elif "nullslast" in modifiers:
+                sql += " NULLS LAST"
+            terms.append(sql)
+        return " ORDER BY " + ", ".join(terms)
+
+    def _integrity_error(self, table: Table, error: sqlite3.IntegrityError) -> PostgrestError:
+        message = str(error)
+        if "UNIQUE" in message:
+            columns = "_".join(part.split(".")[-1] for part in message.split(":", 1)[-1].split(","))
+            return PostgrestError(409, "23505",
+                                  f'duplicate key value violates unique constraint "{table.name}_{columns.strip()}_key"')
+        if "NOT NULL" in message:
+            column = message.split(".")[-1]
+            return PostgrestError(400, "23502",
+                                  f'null value in column "{column}" of relation "{table.name}" violates not-null constraint')
+        if "FOREIGN KEY" in message:
+            return PostgrestError(409, "23503",
+                                  f'insert or update on table "{table.name}" violates foreign key constraint')
+        if "CHECK" in message:
+            return PostgrestError(400, "23514", f'new row for relation "{table.name}" violates check constraint')
+        return PostgrestError(400, "23000", message)
+
+    # --- operações ---
+
+    def select(self, table_name: str, params: List[Tuple[str, str]], count: bool = False) -> Tuple[List[dict], Optional[int]]:
+        table = self.table(table_name)
+        options = dict(params)
+        items = parse_select(options.get("select", "*"))
+        where, args = self.where(table, params)
+        order = self.order(table, options.get("order"))
+
+        paging = ""
+        if "limit" in options:
+            paging = f" LIMIT {int(options['limit'])}"
+        if "offset" in options:
+            paging = (paging or " LIMIT -1") + f" OFFSET {int(options['offset'])}"
+
+        with self.lock:
+            rows = [self.decode(table, row) for row in
+                    self.conn.execute(f'SELECT * FROM "{table.name}"{where}{order}{paging}', args)]
+            total = self.conn.execute(f'SELECT COUNT(*) FROM "{table.name}"{where}', args).fetchone()[0] if count else None
+            return self.shape(table, rows, items), total
+
+    def shape(self, table: Table, rows: List[dict], items: List[SelectItem]) -> List[dict]:
+        """Aplica a projeção do select e busca os recursos embutidos (uma consulta por relação)."""
+        shaped = [{} for _ in rows]
+        keep = [True] * len(rows)
+
+        for item in items:
+            if item.kind == "star":
+                for target, row in zip(shaped, rows):
+                    target.update(row)
+            elif item.kind == "column":
+                self.column(table, item.name)
+                for target, row in zip(shaped, rows):
+                    target[item.alias] = row[item.name]
+            else:
+                embedded = self._embed(table, rows, item)
+                for position, (target, value) in enumerate(zip(shaped, embedded)):
+                    target[item.alias] = value
+                    if item.inner and not value:
+                        keep[position] = False
+
+        return [row for row, kept in zip(shaped, keep) if kept]
+
+    def _relation(self, table: Table, item: SelectItem) -> Tuple[str, str, Table, str]:
+        remote = self.schema.tables.get(item.name)
+        if remote is not None:
+            for column in table.columns.values():
+                if column.references and column.references[0] == remote.name and item.hint in (None, column.name):
+                    return "one", column.name, remote, column.references[1]
+            for column in remote.columns.values():
+                if column.references and column.references[0] == table.name and item.hint in (None, column.name):
+                    return "many", column.references[1], remote, column.name
+        raise PostgrestError(400, "PGRST200",
+                             f"Could not find a relationship between '{table.name}' and '{item.name}' in the schema cache")
+
+    def _embed(self, table: Table, rows: List[dict], item: SelectItem) -> list:
+        kind, local, remote, remote_column = self._relation(table, item)
+        keys = sorted({row[local] for row in rows if row.get(local) is not None}, key=str)
+
+        related = []
+        for start in range(0, len(keys), SQLITE_MAX_VARIABLES):
+            chunk = keys[start:start + SQLITE_MAX_VARIABLES]
+            placeholders = ", ".join("?" for _ in chunk)
+            related.extend(self.decode(remote, row) for row in self.conn.execute(
+                f'SELECT * FROM "{remote.name}" WHERE "{remote_column}" IN ({placeholders})', chunk))
+        shaped = self.shape(remote, related, item.children) if not any(c.inner for c in item.children) else None
+        if shaped is None:
+            pairs = [(raw, self.shape(remote, [raw], item.children)) for raw in related]
+            pairs = [(raw, result[0]) for raw, result in pairs if result]
+        else:
+            pairs = list(zip(related, shaped))
+
+        if kind == "one":
+            index = {raw[remote_column]: value for raw, value in pairs}
+            return [index.get(row.get(local)) for row in rows]
+
+        groups: Dict[object, list] = {}
+        for raw, value in pairs:
+            groups.setdefault(raw[remote_column], []).append(value)
+        return [groups.get(row.get(local), []) for row in rows]
+
+    def insert(self, table_name: str, rows: List[dict], upsert: Optional[str] = None,
+               on_conflict: Optional[str] = None) -> List[dict]:
+        """Insere as linhas (upsert: "merge" ou "ignore") e retorna as linhas gravadas."""
+        table = self.table(table_name)
+        conflict = on_conflict or table.primary_key
+        inserted = []
+        with self.lock:
+            try:
+                for row in rows:
+                    values = self.prepare(table, row)
+                    columns = ", ".join(f'"{name}"' for name in values)
+                    placeholders = ", ".join("?" for _ in values)
+                    sql = f'INSERT INTO "{table.name}" ({columns}) VALUES ({placeholders})'
+                    if upsert == "merge":
+                        updates = ", ".join(f'"{name}" = excluded."{name}"' for name in row if name != conflict)
+                        sql += f' ON CONFLICT ("{conflict}") DO UPDATE SET {updates or conflict + "=" + conflict}'
+                    elif upsert == "ignore":
+                        sql += f' ON CONFLICT ("{conflict}") DO NOTHING'
+                    inserted.extend(self.conn.execute(sql + " RETURNING *", list(values.values())).fetchall())
+                self.conn.commit()
+            except sqlite3.IntegrityError as e:
+                self.conn.rollback()
+                raise self._integrity_error(table, e)
+            except PostgrestError:
+                self.conn.rollback()
+                raise
+        return [self.decode(table, row) for row in inserted]
+
+    def update(self, table_name: str, values: dict, params: List[Tuple[str, str]]) -> List[dict]:
+        table = self.table(table_name)
+        prepared = self.prepare(table, values, insert=False)
+        if not prepared:
+            return []
+        where, args = self.where(table, params)
+        assignments = ", ".join(f'"{name}" = ?' for name in prepared)
+        with self.lock:
+            try:
+                rows = self.conn.execute(f'UPDATE "{table.name}" SET {assignments}{where} RETURNING *',
+                                         list(prepared.values()) + args).fetchall()
+                self.conn.commit()
+            except sqlite3.IntegrityError as e:
+                self.conn.rollback()
+                raise self._integrity_error(table, e)
+        return [self.decode(table, row) for row in rows]
+
+    def delete(self, table_name: str, params: List[Tuple[str, str]]) -> List[dict]:
+        table = self.table(table_name)
+        where, args = self.where(table, params)
+        with self.lock:
+            try:
+                rows = self.conn.execute(f'DELETE FROM "{table.name}"{where} RETURNING *', args).fetchall()
+                self.conn.commit()
+            except sqlite3.IntegrityError as e:
+                self.conn.rollback()
+                raise self._integrity_error(table, e)
+        return [self.decode(table, row) for row in rows]
+
+    def close(self):
+        self.conn.close()
+
+
+class SupabaseStubHandler(BaseHTTPRequestHandler):
+    """Roteia /rest/v1, /auth/v1 e /storage/v1 para o stand-in."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_OPTIONS(self):
+        self._send(204, b"", {})
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_HEAD(self):
+        self._dispatch("HEAD")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def do_PUT(self):
+        self._dispatch("PUT")
+
+    def do_PATCH(self):
+        self._dispatch("PATCH")
+
+    def do_DELETE(self):
+        self._dispatch("DELETE")
+
+    def _dispatch(self, method: str):
+        stub = self.server.stub
+        parts = urlsplit(self.path)
+        params = parse_qsl(parts.query, keep_blank_values=True)
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+
+        table, rows = None, 0
+        try:
+            if parts.path.startswith("/rest/v1/"):
+                table = unquote(parts.path[len("/rest/v1/"):]).strip("/")
+                status, payload, headers, rows = stub.handle_rest(method, table, params, self.headers, body)
+            elif parts.path.startswith("/auth/v1/"):
+                status, payload, headers = stub.handle_auth(method, parts.path[len("/auth/v1/"):], params)
+            elif parts.path.startswith("/storage/v1/"):
+                status, payload, headers = stub.handle_storage(method, unquote(parts.path[len("/storage/v1/"):]),
+                                                               self.headers, body)
+            else:
+                raise PostgrestError(404, "PGRST000", f"Not found: {parts.path}")
+        except PostgrestError as e:
+            status, payload, headers = e.status, e.to_json(), {}
+        except (ValueError, json.JSONDecodeError) as e:
+            status, payload, headers = 400, PostgrestError(400, "PGRST102", f"Invalid request: {e}").to_json(), {}
+        except sqlite3.OperationalError as e:
+            # Ex.: banco (--db) criado antes de uma migração que adicionou a coluna
+            status, payload, headers = 400, PostgrestError(400, "42703", str(e)).to_json(), {}
+
+        time.sleep(stub.latency.delay(table, rows))
+
+        if isinstance(payload, (bytes, bytearray)):
+            data = bytes(payload)
+        elif payload is None:
+            data = b""
+        else:
+            data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+            headers.setdefault("Content-Type", "application/json; charset=utf-8")
+        self._send(status, b"" if method == "HEAD" else data, headers, len(data))
+
+    def _send(self, status: int, data: bytes, headers: dict, length: int = None):
+        self.send_response(status)
+        self.send_header("Access-Control-Allow-Origin", self.headers.get("Origin") or "*")
+        self.send_header("Access-Control-Allow-Methods", "GET, HEAD, POST, PUT, PATCH, DELETE, OPTIONS")
+        self.send_header("Access-Control-Allow-Headers", self.headers.get("Access-Control-Request-Headers") or "*")
+        self.send_header("Access-Control-Expose-Headers", "Content-Range, Content-Location, Range")
+        self.send_header("Access-Control-Max-Age", "86400")
+        self.send_header("Vary", "Origin")
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(data) if length is None else length))
+        self.end_headers()
+        if data:
+            self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def _prefer(headers) -> Dict[str, str]:
+    prefer = {}
+    for item in (headers.get("Prefer") or "").split(","):
+        key, _, value = item.strip().partition("=")
+        if key:
+            prefer[key] = value
+    return prefer
+
+
+def _multipart_file(content_type: str, body: bytes) -> Tuple[str, bytes]:
+    """Extrai o arquivo de um upload multipart do storage-js."""
+    match = re.search(r'boundary="?([^";]+)"?', content_type)
+    if not match:
+        return content_type, body
+    for part in body.split(b"--" + match.group(1).encode("latin-1")):
+        head, _, content = part.partition(b"\r\n\r\n")
+        if b'name=""' in head or b"filename=" in head:
+            part_type = re.search(rb"Content-Type:\s*([^\r\n]+)", head, re.IGNORECASE)
+            return (part_type.group(1).decode("latin-1") if part_type else "application/octet-stream",
+                    content[:-2] if content.endswith(b"\r\n") else content)
+    return content_type, body
+
+
+class SupabaseStub:
+    """Servidor HTTP do stand-in rodando em uma thread do próprio processo."""
+
+    def __init__(self, host: str = "localhost", port: int = DEFAULT_PORT, latency: Optional[str] = None,
+                 db_path: str = ":memory:", schema: Optional[Schema] = None, seed: int = 0,
+                 max_rows: Optional[int] = DEFAULT_MAX_ROWS):
+        self.host = host
+        self.port = port
+        self.max_rows = max_rows
+        self.latency = LatencyModel(load_latency_profile(latency), seed)
+        self.db = StubDatabase(schema or Schema.load(), db_path)
+        self.objects: Dict[Tuple[str, str], Tuple[str, bytes]] = {}
+        self.httpd: Optional[ReusableHTTPServer] = None
+        self.thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def vite_env(self) -> Dict[str, str]:
+        """Variáveis que apontam o supabase-js do app para o stand-in."""
+        return {"VITE_SUPABASE_URL": self.url, "VITE_SUPABASE_PUBLISHABLE_KEY": ANON_KEY}
+
+    def start(self):
+        self.httpd = ReusableHTTPServer((self.host, self.port), SupabaseStubHandler)
+        self.httpd.stub = self
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        if self.httpd is not None:
+            self.httpd.shutdown()
+            self.httpd.server_close()
+            self.httpd = None
+        self.db.close()
+
+    def handle_rest(self, method: str, table: str, params: list, headers, body: bytes):
+        if table.startswith("rpc/"):
+            raise PostgrestError(404, "PGRST202", f"Could not find the function public.{table[4:]} in the schema cache")
+
+        prefer = _prefer(headers)
+        single = SINGLE_OBJECT in (headers.get("Accept") or "")
+        representation = prefer.get("return") == "representation"
+        options = dict(params)
+
+        if method in ("GET", "HEAD"):
+            range_header = headers.get("Range")
+            if range_header and "limit" not in options:
+                start, _, end = range_header.partition("-")
+                params = params + [("offset", start)] + ([("limit", str(int(end) - int(start) + 1))] if end else [])
+            if self.max_rows:
+                limit = min(int(dict(params).get("limit", self.max_rows)), self.max_rows)
+                params = [(k, v) for k, v in params if k != "limit"] + [("limit", str(limit))]
+            rows, total = self.db.select(table, params, count=prefer.get("count") in ("exact", "planned", "estimated"))
+            start = int(dict(params).get("offset", 0))
+            content_range = f"{start}-{start + len(rows) - 1}" if rows else "*"
+            response_headers = {"Content-Range": f"{content_range}/{total if total is not None else '*'}"}
+            if single:
+                return self._single(rows) + (response_headers, len(rows))
+            return 200, rows, response_headers, len(rows)
+
+        # Escrita e recursos embutidos na mesma seção crítica, como na transação do PostgREST
+        with self.db.lock:
+            if method == "POST":
+                payload = json.loads(body or b"[]")
+                rows = payload if isinstance(payload, list) else [payload]
+                resolution = prefer.get("resolution")
+                upsert = {"merge-duplicates": "merge", "ignore-duplicates": "ignore"}.get(resolution)
+                written = self.db.insert(table, rows, upsert, options.get("on_conflict"))
+                status = 201
+            elif method == "PATCH":
+                written = self.db.update(table, json.loads(body or b"{}"), params)
+                status = 200 if representation else 204
+            elif method == "DELETE":
+                written = self.db.delete(table, params)
+                status = 200 if representation else 204
+            else:
+                raise PostgrestError(405, "PGRST117", f"Unsupported HTTP method: {method}")
+
+            if not representation:
+                return (201 if method == "POST" else 204), None, {}, len(written)
+            if "select" in options:
+                written = self.db.shape(self.db.table(table), written, parse_select(options["select"]))
+        if single:
+            return self._single(written) + ({}, len(written))
+        return status if method != "POST" else 201, written, {}, len(written)
+
+    @staticmethod
+    def _single(rows: List[dict]) -> Tuple[int, object]:
+        if len(rows) != 1:
+            return 406, PostgrestError(
+                406, "PGRST116", "JSON object requested, multiple (or no) rows returned",
+                f"The result contains {len(rows)} rows",
+            ).to_json()
+        return 200, rows[0]
+
+    def handle_auth(self, method: str, path: str, params: list):
+        path = path.strip("/")
+        if path in ("token", "signup", "verify") and method == "POST":
+            return 200, auth_session(), {}
+        if path == "user":
+            return 200, TEST_USER, {}
+        if path == "logout":
+            return 204, None, {}
+        if path == "settings":
+            return 200, {"external": {"email": True}, "disable_signup": False, "mailer_autoconfirm": True}, {}
+        return 404, {"code": 404, "error_code": "not_found", "msg": f"Not found: /auth/v1/{path}"}, {}
+
+    def handle_storage(self, method: str, path: str, headers, body: bytes):
+        path = re.sub(r"^object/(?:authenticated|public)/", "object/", path.strip("/"))
+        if not path.startswith("object/"):
+            return 404, {"statusCode": "404", "error": "not_found", "message": "Not found"}, {}
+        bucket, _, name = path[len("object/"):].partition("/")
+
+        if method == "DELETE" and not name:
+            prefixes = json.loads(body or b"{}").get("prefixes", [])
+            removed = [{"name": p, "bucket_id": bucket} for p in prefixes if self.objects.pop((bucket, p), None)]
+            return 200, removed, {}
+        if method in ("POST", "PUT"):
+            content_type, data = _multipart_file(headers.get("Content-Type") or "", body)
+            if method == "POST" and (bucket, name) in self.objects and headers.get("x-upsert") != "true":
+                return 400, {"statusCode": "409", "error": "Duplicate", "message": "The resource already exists"}, {}
+            self.objects[(bucket, name)] = (content_type, data)
+            return 200, {"Id": str(uuid.uuid4()), "Key": f"{bucket}/{name}"}, {}
+        if method in ("GET", "HEAD") and (bucket, name) in self.objects:
+            content_type, data = self.objects[(bucket, name)]
+            return 200, data, {"Content-Type": content_type}
+        return 400, {"statusCode": "404", "error": "not_found", "message": "Object not found"}, {}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stand-in local do Supabase para os testes")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--latency", default="none",
+                        help=f"perfil de latência ({', '.join(LATENCY_PROFILES)}) ou arquivo JSON")
+    parser.add_argument("--db", default=":memory:", help="arquivo SQLite (padrão: em memória)")
+    parser.add_argument("--max-rows", type=int, default=DEFAULT_MAX_ROWS,
+                        help="limite de linhas por resposta (0: sem limite)")
+    args = parser.parse_args(argv)
+
+    stub = SupabaseStub(args.host, args.port, args.latency, args.db, max_rows=args.max_rows or None)
+    stub.start()
+    print(f"✅ Stand-in do Supabase em {stub.url} (latência: {args.latency})")
+    print(f"   VITE_SUPABASE_URL={stub.url}")
+    print(f"   VITE_SUPABASE_PUBLISHABLE_KEY={ANON_KEY}")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        print("\n")
+    finally:
+        stub.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,588 @@
+#!/usr/bin/env python3
+"""
+Gerador de dados sintéticos para testes de escala das tabelas do PCA.
+Lê as colunas e restrições de supabase/migrations (via migration_schema),
+gera as linhas de forma vetorizada com NumPy, com distribuições próximas das
+reais: códigos UASG e CATMAT/CATSER, valores log-normais, prioridades e
+situações ponderadas, datas no ano do PCA e chaves estrangeiras com
+distribuição de Zipf (poucas áreas concentram a maioria dos DFDs). Tabelas
+referenciadas que não foram pedidas (uasgs, areas_requisitantes...) são
+geradas junto.
+
+Destinos da carga:
+  --sqlite ARQUIVO  banco do stand-in do Supabase (with_server.py --supabase-db)
+  --csv DIRETÓRIO   um CSV por tabela e um copy.sql (\\copy) para o PostgreSQL
+  --rest URL        inserção em lote via PostgREST (stand-in ou Supabase real)
+
+Uso:
+    python3 synthetic_data.py --scale 100k --sqlite /tmp/pca-100k.sqlite
+    python3 synthetic_data.py --rows dfds=10000 materiais_servicos=200000 --csv reports/synthetic
+"""
+
+import argparse
+import csv
+import os
+import sys
+import time
+from datetime import date, datetime, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import requests
+
+from migration_schema import Column, Schema, Table
+from supabase_stub import ANON_KEY, TEST_USER_ID, StubDatabase
+
+SCALES = {
+    "10k": {"catalogo_itens": 10_000, "dfds": 2_000, "materiais_servicos": 10_000},
+    "100k": {"catalogo_itens": 100_000, "dfds": 20_000, "materiais_servicos": 100_000},
+    "1m": {"catalogo_itens": 1_000_000, "dfds": 200_000, "materiais_servicos": 1_000_000},
+}
+# Linhas das tabelas referenciadas que não foram pedidas explicitamente
+PARENT_ROWS = {"uasgs": 40, "areas_requisitantes": 250, "agentes_publicos": 200}
+DEFAULT_PARENT_ROWS = 50
+USER_POOL = 500  # usuários distintos (auth.users) donos dos DFDs
+FK_SKEW = 1.1  # expoente de Zipf na escolha das linhas referenciadas
+NULL_FRACTION = 0.2  # fração de nulos nas colunas de texto opcionais
+CHUNK_ROWS = 50_000
+REST_BATCH = 1000
+
+AREAS = [
+    "Secretaria de Administração", "Divisão de Tecnologia da Informação", "Coordenação de Logística",
+    "Departamento de Obras", "Setor de Compras", "Diretoria de Saúde", "Divisão de Ensino",
+    "Coordenação de Patrimônio", "Assessoria Jurídica", "Departamento de Pessoal",
+]
+ORGAOS = [
+    "Comando da 1ª Região", "Hospital Geral", "Base Administrativa", "Instituto Federal",
+    "Superintendência Regional", "Universidade Federal", "Grupamento de Apoio", "Delegacia Regional",
+]
+MATERIAIS = [
+    "Papel A4 75g/m²", "Caneta esferográfica", "Toner para impressora", "Cartucho de tinta", "Notebook",
+    "Monitor LED 24\"", "Cadeira giratória", "Mesa de escritório", "Álcool em gel 70%", "Luva de procedimento",
+    "Cabo de rede Cat6", "Switch gerenciável", "Lâmpada LED", "Extintor de incêndio", "Pneu 175/70 R14",
+    "Óleo lubrificante", "Material de limpeza", "Medicamento genérico", "Gênero alimentício", "Uniforme",
+]
+SERVICOS = [
+    "Manutenção predial", "Limpeza e conservação", "Vigilância patrimonial", "Suporte técnico de TI",
+    "Locação de veículos", "Serviço de impressão", "Manutenção de ar-condicionado", "Capacitação de servidores",
+    "Desenvolvimento de software", "Telefonia móvel", "Coleta de resíduos", "Consultoria especializada",
+]
+QUALIFICADORES = [
+    "padrão", "reforçado", "tipo I", "tipo II", "categoria A", "alto rendimento", "uso contínuo",
+    "com garantia de 12 meses", "sob demanda", "compatível com o parque existente",
+]
+JUSTIFICATIVAS = [
+    "Reposição do estoque para atender a demanda do exercício.",
+    "Substituição de itens inservíveis identificados no inventário anual.",
+    "Atendimento a nova demanda decorrente da ampliação das atividades do setor.",
+    "Continuidade de contrato com vigência encerrando no exercício.",
+    "Adequação às normas de segurança e acessibilidade vigentes.",
+]
+PRIMEIROS_NOMES = ["Ana", "Bruno", "Carla", "Daniel", "Eduarda", "Felipe", "Gabriela", "Henrique", "Isabela",
+                   "João", "Larissa", "Marcos", "Natália", "Otávio", "Paula", "Rafael", "Sofia", "Thiago"]
+SOBRENOMES = ["Silva", "Santos", "Oliveira", "Souza", "Rodrigues", "Ferreira", "Alves", "Pereira", "Lima",
+              "Gomes", "Costa", "Ribeiro", "Martins", "Carvalho", "Almeida", "Lopes"]
+
+# Unidades de medida por tipo de item: (valores, pesos)
+UNIDADES = {
+    "Material": (["UN", "CX", "PCT", "RESMA", "KG", "L", "M", "PAR"], [.45, .15, .12, .06, .08, .06, .05, .03]),
+    "Serviço": (["SERVIÇO", "MÊS", "HORA", "DIÁRIA", "UN"], [.30, .40, .15, .10, .05]),
+}
+# Pesos dos valores de enums e de CHECK (... IN (...)); ausentes = uniformes
+CHOICE_WEIGHTS = {
+    "prioridade": {"Alta": .25, "Média": .50, "Baixa": .25},
+    "situacao_dfd": {"Rascunho": .30, "Enviado": .50, "Vinculado": .20},
+    "tipo_material_servico": {"Material": .65, "Serviço": .35},
+}
+# Colunas copiadas da linha referenciada (a área herda a UASG, o DFD herda a da área)
+INHERITED_COLUMNS = {"numero_uasg"}
+# Totais calculados a partir das linhas filhas: (tabela filha, FK, colunas multiplicadas)
+AGGREGATES = {
+    ("dfds", "valor_total"): ("materiais_servicos", "dfd_id", ("quantidade", "valor_unitario")),
+}
+
+
+def _join(*parts) -> np.ndarray:
+    """Concatena arrays/strings elemento a elemento, como objetos Python."""
+    result = np.asarray(parts[0]).astype(str)
+    for part in parts[1:]:
+        result = np.char.add(result, np.asarray(part).astype(str))
+    return result.astype(object)
+
+
+def _with_nulls(values: np.ndarray, mask: np.ndarray) -> np.ndarray:
+    values = values.astype(object)
+    values[mask] = None
+    return values
+
+
+class SyntheticDataGenerator:
+    """Gera as colunas de cada tabela como arrays NumPy."""
+
+    def __init__(self, schema: Schema, seed: int = 0, year: Optional[int] = None, user_id: Optional[str] = None):
+        self.schema = schema
+        self.rng = np.random.default_rng(seed)
+        self.year = year or date.today().year + 1  # ano do PCA em elaboração
+        self.user_id = user_id
+        self.data: Dict[str, Dict[str, np.ndarray]] = {}
+        # Índice da linha referenciada por cada FK gerada: (tabela, coluna) -> array
+        self.fk_index: Dict[Tuple[str, str], np.ndarray] = {}
+        self.now = datetime.now(timezone.utc).replace(tzinfo=None)
+
+    # --- planejamento ---
+
+    def plan(self, counts: Dict[str, int]) -> List[Tuple[str, int]]:
+        """Tabelas em ordem de dependência, incluindo as referenciadas que faltam."""
+        counts = dict(counts)
+        for name in list(counts):
+            self._require_parents(name, counts)
+
+        ordered, visiting = [], set()
+
+        def visit(name):
+            if name in visiting or name in (n for n, _ in ordered):
+                return
+            visiting.add(name)
+            for parent in self._parents(self.schema.tables[name], counts):
+                visit(parent)
+            ordered.append((name, counts[name]))
+
+        for name in counts:
+            visit(name)
+        return ordered
+
+    def _parents(self, table: Table, counts: Dict[str, int]) -> List[str]:
+        return [c.references[0] for c in table.columns.values()
+                if c.references and c.references[0] in counts and c.references[0] != table.name]
+
+    def _require_parents(self, name: str, counts: Dict[str, int]):
+        if name not in self.schema.tables:
+            raise ValueError(f"Tabela desconhecida: {name}")
+        for column in self.schema.tables[name].columns.values():
+            if not column.references or column.references[0] in counts or column.references[0] == name:
+                continue
+            parent = column.references[0]
+            if column.not_null or parent in PARENT_ROWS:
+                counts[parent] = PARENT_ROWS.get(parent, DEFAULT_PARENT_ROWS)
+                self._require_parents(parent, counts)
+
+    def generate(self, counts: Dict[str, int]) -> Dict[str, Dict[str, np.ndarray]]:
+        for name, count in self.plan(counts):
+            self.data[name] = self.generate_table(self.schema.tables[name], count)
+        self._aggregate()
+        return self.data
+
+    # --- colunas ---
+
+    def generate_table(self, table: Table, count: int) -> Dict[str, np.ndarray]:
+        columns: Dict[str, np.ndarray] = {}
+        # FKs, enums e CHECKs primeiro: as demais colunas podem depender deles (ex.: unidade pelo tipo)
+        ordered = sorted(table.columns.values(),
+                         key=lambda c: 0 if (c.references or c.enum or c.check) else 1)
+        for column in ordered:
+            if column.generated or column.auto_code or column.type == "serial":
+                continue  # calculadas pelo banco ou atribuídas na carga
+            values = self._column(table, column, count, columns)
+            if values is not None:
+                columns[column.name] = values
+        return {name: columns[name] for name in table.columns if name in columns}
+
+    def _column(self, table: Table, column: Column, count: int, columns: Dict[str, np.ndarray]) -> Optional[np.ndarray]:
+        special = getattr(self, f"_col_{table.name}_{column.name}", None) or getattr(self, f"_col_{column.name}", None)
+        if column.references:
+            return self._foreign_key(table, column, count)
+        if column.name in INHERITED_COLUMNS:
+            inherited = self._parent_value(table, column.name)
+            if inherited is not None:
+                return inherited
+        if special is not None:
+            return special(table, column, count, columns)
+        choices = self._choices(column)
+        if choices is not None:
+            return self._weighted(choices, CHOICE_WEIGHTS.get(column.enum or column.name), count)
+        return self._by_type(table, column, count, columns)
+
+    def _choices(self, column: Column) -> Optional[List[str]]:
+        values = self.schema.enum_values(column)
+        if values is None and column.check and " IN " in column.check.upper():
+            inside = column.check[column.check.index("(") + 1:column.check.rindex(")")]
+            values = [item.strip().strip("'") for item in inside.split(",")]
+        return values or None
+
+    def _weighted(self, values: List[str], weights: Optional[Dict[str, float]], count: int) -> np.ndarray:
+        p = np.array([weights.get(v, 0.0) for v in values]) if weights else np.ones(len(values))
+        if p.sum() == 0:
+            p = np.ones(len(values))
+        return self.rng.choice(np.array(values, dtype=object), size=count, p=p / p.sum())
+
+    def _zipf_indices(self, size: int, count: int) -> np.ndarray:
+        """Índices em [0, size) com distribuição de Zipf; se couber, cada índice aparece ao menos uma vez."""
+        ranks = self.rng.permutation(size)
+        weights = 1.0 / np.power(ranks + 1.0, FK_SKEW)
+        if count < size:
+            return self.rng.choice(size, size=count, p=weights / weights.sum())
+        extra = self.rng.choice(size, size=count - size, p=weights / weights.sum())
+        return self.rng.permutation(np.concatenate([np.arange(size), extra]))
+
+    def _foreign_key(self, table: Table, column: Column, count: int) -> Optional[np.ndarray]:
+        parent_name, parent_column = column.references
+        parent = self.data.get(parent_name)
+        if parent is None or parent_column not in parent:
+            return None  # FK opcional para tabela não gerada: fica nula
+        index = self._zipf_indices(len(parent[parent_column]), count)
+        self.fk_index[(table.name, column.name)] = index
+        return parent[parent_column][index]
+
+    def _parent_value(self, table: Table, name: str) -> Optional[np.ndarray]:
+        """Valor de uma coluna homônima na linha referenciada (INHERITED_COLUMNS)."""
+        for column in table.columns.values():
+            key = (table.name, column.name)
+            if column.references and key in self.fk_index:
+                parent = self.data[column.references[0]]
+                if name in parent:
+                    return parent[name][self.fk_index[key]]
+        return None
+
+    def _uuids(self, count: int) -> np.ndarray:
+        raw = self.rng.integers(0, 256, size=(count, 16), dtype=np.uint8)
+        raw[:, 6] = (raw[:, 6] & 0x0F) | 0x40  # versão 4
+        raw[:, 8] = (raw[:, 8] & 0x3F) | 0x80  # variante RFC 4122
+        hexed = raw.tobytes().hex()
+        return np.array([
+            f"{h[0:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:32]}"
+            for h in (hexed[i:i + 32] for i in range(0, len(hexed), 32))
+        ], dtype=object)
+
+    def _dates(self, count: int, start: date, days: int) -> np.ndarray:
+        offsets = self.rng.integers(0, days, size=count)
+        return np.datetime_as_string(np.datetime64(start, "D") + offsets, unit="D").astype(object)
+
+    def _timestamps(self, count: int, base: Optional[np.ndarray] = None) -> np.ndarray:
+        now = np.datetime64(self.now, "s")
+        if base is None:
+            values = now - self.rng.integers(0, 365 * 86400, size=count).astype("timedelta64[s]")
+        else:
+            # Atualizações algumas horas/dias após a criação, sem passar de agora
+            created = np.array(base, dtype="datetime64[s]")
+            delta = self.rng.exponential(3 * 86400, size=count).astype("int64").astype("timedelta64[s]")
+            values = np.minimum(created + delta, now)
+        return _join(np.datetime_as_string(values, unit="s"), "+00:00")
+
+    def _lognormal(self, count: int, median: float, sigma: float) -> np.ndarray:
+        return np.round(self.rng.lognormal(np.log(median), sigma, size=count), 2)
+
+    def _by_type(self, table: Table, column: Column, count: int, columns: Dict[str, np.ndarray]) -> Optional[np.ndarray]:
+        if column.type == "uuid":
+            return self._uuids(count) if column.primary_key or column.not_null else None
+        if column.type == "timestamptz" or column.type == "timestamp":
+            if column.name.startswith("updated") and "created_at" in columns:
+                return self._timestamps(count, np.array([v[:19] for v in columns["created_at"]]))
+            return self._timestamps(count)
+        if column.type == "date":
+            return self._dates(count, date(self.year, 1, 1), 365)
+        if column.type == "boolean":
+            return self.rng.random(count) < 0.95
+        if column.type in ("integer", "bigint", "smallint"):
+            return self.rng.geometric(0.1, size=count)
+        if column.type == "numeric":
+            return self._lognormal(count, 1000, 1.0)
+        if column.type == "json":
+            return None
+        values = _join(f"{column.name} ", np.arange(1, count + 1))
+        if column.not_null or column.unique:
+            return values
+        return _with_nulls(values, self.rng.random(count) < NULL_FRACTION)
+
+    # --- colunas específicas do PCA ---
+
+    def _col_numero_uasg(self, table, column, count, columns):
+        # UASGs têm 6 dígitos; sorteio sem reposição quando a coluna é única
+        codes = self.rng.choice(np.arange(100_000, 1_000_000), size=count, replace=count > 900_000)
+        return codes.astype(str).astype(object)
+
+    def _col_uasgs_nome(self, table, column, count, columns):
+        return _join(self._weighted(ORGAOS, None, count), " - UASG ", columns.get("numero_uasg", np.arange(count)))
+
+    def _col_areas_requisitantes_nome(self, table, column, count, columns):
+        return _join(self._weighted(AREAS, None, count), " ", self.rng.integers(1, 10, size=count))
+
+    def _col_nome(self, table, column, count, columns):
+        return _join(self._weighted(PRIMEIROS_NOMES, None, count), " ",
+                     self._weighted(SOBRENOMES, None, count), " ", self._weighted(SOBRENOMES, None, count))
+
+    def _col_cpf(self, table, column, count, columns):
+        # CPFs válidos: dígitos verificadores calculados em lote
+        digits = self.rng.integers(0, 10, size=(count, 11))
+        for position in (9, 10):
+            weights = np.arange(position + 1, 1, -1)
+            remainder = (digits[:, :position] @ weights) % 11
+            digits[:, position] = np.where(remainder < 2, 0, 11 - remainder)
+        text = (digits.astype(np.uint8) + ord("0")).tobytes().decode("ascii")
+        return np.array([f"{text[i:i + 3]}.{text[i + 3:i + 6]}.{text[i + 6:i + 9]}-{text[i + 9:i + 11]}"
+                         for i in range(0, len(text), 11)], dtype=object)
+
+    def _col_email(self, table, column, count, columns):
+        users = _join("servidor", np.arange(1, count + 1), "@pca.gov.br")
+        return users if column.not_null else _with_nulls(users, self.rng.random(count) < NULL_FRACTION)
+
+    def _col_telefone(self, table, column, count, columns):
+        numbers = _join("(", self.rng.integers(11, 99, size=count), ") 9",
+                        self.rng.integers(1000, 9999, size=count), "-", self.rng.integers(1000, 9999, size=count))
+        return _with_nulls(numbers, self.rng.random(count) < NULL_FRACTION)
+
+    def _col_user_id(self, table, column, count, columns):
+        if self.user_id:
+            return np.full(count, self.user_id, dtype=object)
+        pool = self._uuids(USER_POOL)
+        pool[0] = TEST_USER_ID
+        return pool[self._zipf_indices(USER_POOL, count)]
+
+    def _col_disponibilidade_orcamentaria(self, table, column, count, columns):
+        return self._lognormal(count, 1_500_000 if table.name == "uasgs" else 200_000, 0.8)
+
+    def _col_catalogo_itens_codigo_item(self, table, column, count, columns):
+        # Códigos CATSER (serviços) são menores que os CATMAT (materiais)
+        space = max(990_000, 2 * count)
+        codes = np.sort(self.rng.choice(np.arange(10_000, 10_000 + space), size=count, replace=False))
+        servico = columns["tipo"] == "Serviço"
+        result = np.empty(count, dtype=object)
+        result[servico] = self.rng.permutation(codes[:servico.sum()]).astype(str)
+        result[~servico] = self.rng.permutation(codes[servico.sum():]).astype(str)
+        return result
+
+    def _item_names(self, count: int, tipo: np.ndarray) -> np.ndarray:
+        nouns = np.where(tipo == "Material", self._weighted(MATERIAIS, None, count),
+                         self._weighted(SERVICOS, None, count))
+        return _join(nouns, " ", self._weighted(QUALIFICADORES, None, count))
+
+    def _col_descricao(self, table, column, count, columns):
+        if "tipo" in columns:
+            return self._item_names(count, columns["tipo"])
+        values = _join(self._weighted(QUALIFICADORES, None, count), " ", np.arange(1, count + 1))
+        return values if column.not_null else _with_nulls(values, self.rng.random(count) < NULL_FRACTION)
+
+    def _col_unidade_medida(self, table, column, count, columns):
+        tipo = columns.get("tipo", np.full(count, "Material", dtype=object))
+        result = np.empty(count, dtype=object)
+        for name, (values, weights) in UNIDADES.items():
+            mask = tipo == name
+            result[mask] = self._weighted(values, dict(zip(values, weights)), int(mask.sum()))
+        result[np.equal(result, None)] = "UN"  # tipos sem unidades definidas
+        return result
+
+    def _col_quantidade(self, table, column, count, columns):
+        tipo = columns.get("tipo", np.full(count, "Material", dtype=object))
+        material = np.minimum(self.rng.geometric(1 / 20, size=count), 10_000)
+        servico = self.rng.choice([1, 6, 12], size=count, p=[.5, .2, .3])
+        return np.where(tipo == "Material", material, servico)
+
+    def _unit_values(self, count: int, tipo: np.ndarray) -> np.ndarray:
+        return np.where(tipo == "Material", self._lognormal(count, 60, 1.2), self._lognormal(count, 4_000, 1.0))
+
+    def _col_valor_unitario(self, table, column, count, columns):
+        return self._unit_values(count, columns.get("tipo", np.full(count, "Material", dtype=object)))
+
+    def _col_valor_unitario_referencia(self, table, column, count, columns):
+        return self._unit_values(count, columns["tipo"])
+
+    def _col_valor_total(self, table, column, count, columns):
+        return self._lognormal(count, 50_000, 1.3)  # recalculado por _aggregate se houver itens
+
+    def _col_especificacoes(self, table, column, count, columns):
+        values = _join("Conforme termo de referência, ", self._weighted(QUALIFICADORES, None, count))
+        return _with_nulls(values, self.rng.random(count) < 0.3)
+
+    def _col_dfds_descricao_sucinta(self, table, column, count, columns):
+        servico = self.rng.random(count) < CHOICE_WEIGHTS["tipo_material_servico"]["Serviço"]
+        nouns = np.where(servico, self._weighted(SERVICOS, None, count), self._weighted(MATERIAIS, None, count))
+        return _join(np.where(servico, "Contratação de ", "Aquisição de "), nouns)
+
+    def _justificativas(self, column, count):
+        values = self._weighted(JUSTIFICATIVAS, None, count)
+        return values if column.not_null else _with_nulls(values, self.rng.random(count) < NULL_FRACTION)
+
+    def _col_justificativa_necessidade(self, table, column, count, columns):
+        return self._justificativas(column, count)
+
+    def _col_justificativa(self, table, column, count, columns):
+        return self._justificativas(column, count)
+
+    def _col_data_pretendida(self, table, column, count, columns):
+        return _with_nulls(self._dates(count, date(self.year, 1, 1), 365), self.rng.random(count) < 0.1)
+
+    def _aggregate(self):
+        """Recalcula totais (ex.: valor do DFD = soma dos itens) com np.bincount."""
+        for (table, column), (child, fk, factors) in AGGREGATES.items():
+            index = self.fk_index.get((child, fk))
+            if table not in self.data or index is None:
+                continue
+            amounts = np.prod([self.data[child][name].astype(float) for name in factors], axis=0)
+            totals = np.bincount(index, weights=amounts, minlength=len(next(iter(self.data[table].values()))))
+            self.data[table][column] = np.round(totals, 2)
+
+
+def assign_sequences(table: Table, count: int, nextval: Callable[[str, int, Table, Column], int]) -> Dict[str, np.ndarray]:
+    """Valores de colunas serial e de código automático (MS-001000), reservados em bloco."""
+    assigned = {}
+    for column in table.columns.values():
+        if column.type == "serial" and column.default is None:
+            start = nextval(f"{table.name}_{column.name}_seq", count, table, column)
+            assigned[column.name] = np.arange(start, start + count)
+        elif column.auto_code:
+            prefix, sequence, width = column.auto_code
+            start = nextval(sequence, count, None, None)
+            assigned[column.name] = _join(prefix, np.char.zfill(np.arange(start, start + count).astype(str), width))
+    return assigned
+
+
+def _rows(columns: Dict[str, np.ndarray], start: int, end: int):
+    return zip(*[values[start:end].tolist() for values in columns.values()])
+
+
+def _row_count(columns: Dict[str, np.ndarray]) -> int:
+    return len(next(iter(columns.values())))
+
+
+def load_sqlite(path: str, schema: Schema, data: Dict[str, Dict[str, np.ndarray]]):
+    """Carrega no banco SQLite do stand-in (criando as tabelas e os dados iniciais)."""
+    db = StubDatabase(schema, path)
+    db.conn.execute("PRAGMA synchronous = OFF")
+    try:
+        for name, columns in data.items():
+            table = schema.tables[name]
+            count = _row_count(columns)
+            started = time.perf_counter()
+            with db.lock:
+                columns = {**columns, **assign_sequences(table, count, db.nextval)}
+                names = ", ".join(f'"{c}"' for c in columns)
+                placeholders = ", ".join("?" for _ in columns)
+                sql = f'INSERT INTO "{name}" ({names}) VALUES ({placeholders})'
+                for start in range(0, count, CHUNK_ROWS):
+                    db.conn.executemany(sql, _rows(columns, start, start + CHUNK_ROWS))
+                db.conn.commit()
+            _report(name, count, started)
+    finally:
+        db.close()
+
+
+def write_csv(directory: str, schema: Schema, data: Dict[str, Dict[str, np.ndarray]]):
+    """Um CSV por tabela e um copy.sql com \\copy na ordem das dependências."""
+    os.makedirs(directory, exist_ok=True)
+    counters: Dict[str, int] = {}
+
+    def nextval(sequence, count, table=None, column=None):
+        start = counters.get(sequence, schema.sequences.get(sequence, 1))
+        counters[sequence] = start + count
+        return start
+
+    commands = ["\\set ON_ERROR_STOP on", "BEGIN;"]
+    for name, columns in data.items():
+        table = schema.tables[name]
+        count = _row_count(columns)
+        started = time.perf_counter()
+        columns = {**columns, **assign_sequences(table, count, nextval)}
+        filename = f"{name}.csv"
+        with open(os.path.join(directory, filename), "w", encoding="utf-8", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(columns)
+            for start in range(0, count, CHUNK_ROWS):
+                writer.writerows(_rows(columns, start, start + CHUNK_ROWS))
+        names = ", ".join(columns)
+        commands.append(f"\\copy public.{name} ({names}) FROM '{filename}' WITH (FORMAT csv, HEADER true)")
+        _report(name, count, started)
+
+    # Avança as sequências para depois dos valores carregados
+    for sequence, value in counters.items():
+        table_column = next(((t, c) for t in schema.tables.values() for c in t.columns.values()
+                             if f"{t.name}_{c.name}_seq" == sequence), None)
+        target = f"pg_get_serial_sequence('public.{table_column[0].name}', '{table_column[1].name}')" \
+            if table_column else f"'public.{sequence}'"
+        commands.append(f"SELECT setval({target}, {value - 1});")
+    commands.append("COMMIT;")
+
+    with open(os.path.join(directory, "copy.sql"), "w", encoding="utf-8") as f:
+        f.write("\n".join(commands) + "\n")
+    print(f"📄 Execute no diretório {directory}: psql \"$DATABASE_URL\" -f copy.sql")
+
+
+def post_rest(url: str, key: str, schema: Schema, data: Dict[str, Dict[str, np.ndarray]]):
+    """Inserção em lote via PostgREST (serial e códigos automáticos ficam com o banco)."""
+    session = requests.Session()
+    session.headers.update({"apikey": key, "Authorization": f"Bearer {key}",
+                            "Content-Type": "application/json", "Prefer": "return=minimal"})
+    for name, columns in data.items():
+        count = _row_count(columns)
+        started = time.perf_counter()
+        names = list(columns)
+        for start in range(0, count, REST_BATCH):
+            rows = [dict(zip(names, values)) for values in _rows(columns, start, start + REST_BATCH)]
+            response = session.post(f"{url.rstrip('/')}/rest/v1/{name}", json=rows, timeout=120)
+            if response.status_code >= 300:
+                raise RuntimeError(f"{name}: HTTP {response.status_code} {response.text[:300]}")
+        _report(name, count, started)
+
+
+def _report(name: str, count: int, started: float):
+    elapsed = time.perf_counter() - started
+    print(f"  ✅ {name}: {count:,} linhas em {elapsed:.2f}s ({count / max(elapsed, 1e-9):,.0f} linhas/s)")
+
+
+def parse_rows(items: List[str]) -> Dict[str, int]:
+    counts = {}
+    for item in items:
+        name, _, value = item.partition("=")
+        counts[name] = int(value.replace("_", "").lower().replace("k", "000").replace("m", "000000"))
+    return counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Gera dados sintéticos das tabelas do PCA para testes de escala")
+    parser.add_argument("--scale", choices=sorted(SCALES), help="conjunto de tamanhos predefinido")
+    parser.add_argument("--rows", nargs="+", default=[], metavar="TABELA=N",
+                        help="linhas por tabela (ex.: dfds=10000 materiais_servicos=200k)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--year", type=int, default=None, help="ano do PCA (padrão: próximo ano)")
+    parser.add_argument("--user-id", default=None,
+                        help="dono de todos os DFDs (necessário no PostgreSQL, onde user_id referencia auth.users)")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--sqlite", metavar="ARQUIVO", help="banco do stand-in do Supabase")
+    target.add_argument("--csv", metavar="DIRETÓRIO", help="CSVs e copy.sql para o PostgreSQL")
+    target.add_argument("--rest", metavar="URL", help="URL do Supabase/stand-in (inserção via PostgREST)")
+    parser.add_argument("--key", default=os.environ.get("SUPABASE_SERVICE_ROLE_KEY", ANON_KEY),
+                        help="chave da API para --rest (padrão: $SUPABASE_SERVICE_ROLE_KEY)")
+    args = parser.parse_args(argv)
+
+    counts = {**SCALES.get(args.scale, {}), **parse_rows(args.rows)}
+    if not counts:
+        parser.error("informe --scale ou --rows")
+
+    schema = Schema.load()
+    generator = SyntheticDataGenerator(schema, seed=args.seed, year=args.year, user_id=args.user_id)
+
+    print("=" * 80)
+    print("🧪 GERAÇÃO DE DADOS SINTÉTICOS")
+    print("=" * 80)
+    started = time.perf_counter()
+    try:
+        data = generator.generate(counts)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 1
+    total = sum(_row_count(columns) for columns in data.values())
+    print(f"⚙️  {total:,} linhas geradas em {time.perf_counter() - started:.2f}s")
+    for name, columns in data.items():
+        print(f"  • {name}: {_row_count(columns):,}")
+
+    print("\n📥 Carregando...")
+    if args.sqlite:
+        load_sqlite(args.sqlite, schema, data)
+    elif args.csv:
+        write_csv(args.csv, schema, data)
+    else:
+        post_rest(args.rest, args.key, schema, data)
+    print(f"\n✅ Concluído em {time.perf_counter() - started:.2f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,7 +1,13 @@
 #!/usr/bin/env python3
 """
 Script para garantir que o servidor de desenvolvimento está rodando antes de executar testes.
-Uso: python3 with_server.py [comando_de_teste]
+Uso: python3 with_server.py [--build] [--standalone] [--supabase-stub PERFIL] [comando_de_teste]
+
+Por padrão o servidor é compartilhado entre execuções concorrentes (ver
+server_daemon.py); a URL escolhida é repassada ao comando em WEBAPP_BASE_URL.
+Com --supabase-stub, o app usa o stand-in local do Supabase (ver
+supabase_stub.py), cuja URL é repassada em WEBAPP_SUPABASE_URL. O modo do
+servidor (dev ou build) é repassado em WEBAPP_SERVER_MODE.
 """
 
 import sys
@@ -9,16 +15,49 @@ import subprocess
 import time
 import socket
 import os
+import re
 import signal
+import threading
+from collections import deque
+import argparse
 import requests
-from typing import Optional
+from typing import Dict, Optional
+
+from static_server import StaticServer, ensure_build
+from server_daemon import SharedServerClient, pick_port
+from supabase_stub import DEFAULT_PORT as SUPABASE_PORT, LATENCY_PROFILES, SupabaseStub
+
+# Linhas do Vite que indicam que o servidor está aceitando conexões:
+#   VITE v5.4.19  ready in 312 ms
+#   ➜  Local:   http://localhost:5173/
+READY_PATTERN = re.compile(r"ready in\s+[\d.]+\s*m?s|Local:\s+https?://", re.IGNORECASE)
+ANSI_PATTERN = re.compile(r"\x1b\[[0-9;]*[A-Za-z]")
+
+STARTUP_TIMEOUT = 30
+PROBE_INITIAL_DELAY = 0.05
+PROBE_MAX_DELAY = 1.0
+OUTPUT_TAIL_LINES = 200
+
 
 class ServerManager:
-    def __init__(self, port: int = 5173, host: str = "localhost"):
+    def __init__(self, port: int = 5173, host: str = "localhost", mode: str = "dev",
+                 supabase_stub: Optional[str] = None, supabase_db: str = ":memory:"):
         self.port = port
         self.host = host
+        # "dev": servidor Vite (npm run dev); "build": bundle de produção servido em processo
+        self.mode = mode
+        # Perfil de latência do stand-in do Supabase (None: usa o backend do .env)
+        self.supabase_stub = supabase_stub
+        self.supabase_db = supabase_db
+        self.supabase: Optional[SupabaseStub] = None
         self.server_process: Optional[subprocess.Popen] = None
+        self.static_server: Optional[StaticServer] = None
         self.started_server = False
+        # Sessão com keep-alive para as sondagens HTTP
+        self.session = requests.Session()
+        self._ready_event = threading.Event()
+        self._output = deque(maxlen=OUTPUT_TAIL_LINES)
+        self._reader: Optional[threading.Thread] = None
 
     def is_port_open(self) -> bool:
         """Verifica se a porta está aberta e acessível."""
@@ -34,13 +73,98 @@ class ServerManager:
     def is_server_ready(self) -> bool:
         """Verifica se o servidor está pronto para aceitar requisições."""
         try:
-            response = requests.get(f"http://{self.host}:{self.port}", timeout=2)
+            response = self.session.get(f"http://{self.host}:{self.port}", timeout=2)
             return response.status_code < 500
         except:
             return False
 
+    def _drain_output(self, stream):
+        """
+        Lê continuamente a saída do servidor (evita que o pipe encha e bloqueie
+        o processo) e sinaliza assim que o Vite imprime a linha de "ready".
+        """
+        for raw_line in iter(stream.readline, b""):
+            line = ANSI_PATTERN.sub("", raw_line.decode("utf-8", errors="replace")).rstrip()
+            self._output.append(line)
+            if not self._ready_event.is_set() and READY_PATTERN.search(line):
+                self._ready_event.set()
+        stream.close()
+
+    def _wait_until_ready(self, timeout: float = STARTUP_TIMEOUT) -> bool:
+        """
+        Aguarda a linha de "ready" do Vite; entre as esperas, sonda a porta via
+        HTTP com backoff exponencial (caso a saída não tenha o formato esperado).
+        """
+        start = time.monotonic()
+        deadline = start + timeout
+        delay = PROBE_INITIAL_DELAY
+        next_notice = 2
+
+        while time.monotonic() < deadline:
+            if self._ready_event.wait(min(delay, max(0, deadline - time.monotonic()))):
+                return True
+
+            if self.server_process.poll() is not None:
+                return False
+
+            if self.is_server_ready():
+                return True
+
+            delay = min(delay * 2, PROBE_MAX_DELAY)
+            elapsed = time.monotonic() - start
+            if elapsed >= next_notice:
+                print(f"⏳ Aguardando servidor... ({int(elapsed)}s)")
+                next_notice += 2
+
+        return False
+
+    def start_supabase_stub(self) -> bool:
+        """Inicia o stand-in do Supabase antes do app, para apontar o Vite para ele."""
+        port = pick_port(SUPABASE_PORT)
+        print(f"🗄️  Iniciando stand-in do Supabase na porta {port} (latência: {self.supabase_stub})...")
+        try:
+            self.supabase = SupabaseStub(self.host, port, latency=self.supabase_stub, db_path=self.supabase_db)
+            self.supabase.start()
+        except (OSError, ValueError) as e:
+            print(f"❌ Erro ao iniciar stand-in do Supabase: {e}")
+            self.supabase = None
+            return False
+        print(f"✅ Supabase local em {self.supabase.url}")
+        return True
+
+    def app_env(self) -> Dict[str, str]:
+        """Variáveis extras do ambiente do Vite (dev e build)."""
+        env = self.supabase.vite_env() if self.supabase is not None else {}
+        # Entra no hash do build: ligar/desligar os source maps refaz o build
+        if "VITE_BUILD_SOURCEMAP" in os.environ:
+            env["VITE_BUILD_SOURCEMAP"] = os.environ["VITE_BUILD_SOURCEMAP"]
+        return env
+
+    def start_static_server(self) -> bool:
+        """Faz o build de produção (se necessário) e serve o dist/ em processo."""
+        if not ensure_build(env=self.app_env()):
+            return False
+
+        print(f"🚀 Servindo build de produção na porta {self.port}...")
+        try:
+            self.static_server = StaticServer(self.host, self.port)
+            self.static_server.start()
+        except OSError as e:
+            print(f"❌ Erro ao iniciar servidor estático: {e}")
+            return False
+
+        self.started_server = True
+        print(f"✅ Servidor pronto em http://{self.host}:{self.port}")
+        return True
+
     def start_server(self) -> bool:
         """Inicia o servidor de desenvolvimento."""
+        if self.supabase_stub and self.supabase is None and not self.start_supabase_stub():
+            return False
+
+        if self.mode == "build":
+            return self.start_static_server()
+
         print(f"🚀 Iniciando servidor na porta {self.port}...")
 
         # Navega para o diretório raiz do projeto
@@ -49,35 +173,34 @@ class ServerManager:
         try:
             # Inicia o servidor Vite em background
             self.server_process = subprocess.Popen(
-                ["npm", "run", "dev"],
+                # --strictPort: falha em vez de o Vite trocar de porta silenciosamente
+                ["npm", "run", "dev", "--", "--port", str(self.port), "--strictPort"],
                 cwd=project_root,
+                env={**os.environ, **self.app_env()},
                 stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
                 preexec_fn=os.setsid  # Cria um novo grupo de processos
             )
 
             self.started_server = True
 
-            # Aguarda o servidor estar pronto (até 30 segundos)
-            max_attempts = 60
-            for attempt in range(max_attempts):
-                if self.is_server_ready():
-                    print(f"✅ Servidor pronto em http://{self.host}:{self.port}")
-                    return True
-
-                # Verifica se o processo ainda está rodando
-                if self.server_process.poll() is not None:
-                    stdout, stderr = self.server_process.communicate()
-                    print(f"❌ Servidor falhou ao iniciar:")
-                    print(f"STDOUT: {stdout.decode()}")
-                    print(f"STDERR: {stderr.decode()}")
-                    return False
-
-                time.sleep(0.5)
-                if attempt % 4 == 0:
-                    print(f"⏳ Aguardando servidor... ({attempt//2}s)")
-
-            print(f"❌ Timeout aguardando servidor após {max_attempts//2} segundos")
+            # Drena a saída em background durante toda a vida do servidor
+            self._reader = threading.Thread(
+                target=self._drain_output, args=(self.server_process.stdout,), daemon=True
+            )
+            self._reader.start()
+
+            started = time.monotonic()
+            if self._wait_until_ready():
+                print(f"✅ Servidor pronto em http://{self.host}:{self.port} ({time.monotonic() - started:.2f}s)")
+                return True
+
+            if self.server_process.poll() is not None:
+                self._reader.join(timeout=2)
+                print(f"❌ Servidor falhou ao iniciar:")
+            else:
+                print(f"❌ Timeout aguardando servidor após {STARTUP_TIMEOUT} segundos")
+            print("\n".join(self._output))
             return False
 
         except Exception as e:
@@ -86,6 +209,16 @@ class ServerManager:
 
     def stop_server(self):
         """Para o servidor se foi iniciado por este script."""
+        if self.supabase is not None:
+            self.supabase.stop()
+            self.supabase = None
+
+        if self.started_server and self.static_server:
+            print(f"\n🛑 Parando servidor...")
+            self.static_server.stop()
+            self.static_server = None
+            print("✅ Servidor parado")
+
         if self.started_server and self.server_process:
             print(f"\n🛑 Parando servidor...")
             try:
@@ -103,7 +236,9 @@ class ServerManager:
 
     def ensure_running(self) -> bool:
         """Garante que o servidor está rodando."""
-        if self.is_server_ready():
+        # Um servidor já rodando é o Vite de desenvolvimento apontando para o backend
+        # do .env: não serve para o modo --build nem para o stand-in do Supabase
+        if self.mode == "dev" and not self.supabase_stub and self.is_server_ready():
             print(f"✅ Servidor já está rodando em http://{self.host}:{self.port}")
             return True
 
@@ -111,9 +246,64 @@ class ServerManager:
         return self.start_server()
 
 
-def main():
+def parse_args(argv=None):
+    """Lê as opções do script; tudo após elas é o comando de teste."""
+    parser = argparse.ArgumentParser(description="Garante o servidor rodando e executa um comando")
+    parser.add_argument("--build", action="store_true",
+                        help="serve o build de produção (dist/) em vez do servidor de desenvolvimento do Vite")
+    parser.add_argument("--standalone", action="store_true",
+                        help="não compartilha o servidor com outras execuções (inicia e para o próprio servidor)")
+    parser.add_argument("--supabase-stub", default=None, metavar="PERFIL",
+                        help="serve as tabelas de supabase/migrations em um stand-in local; PERFIL é a "
+                             f"latência simulada ({', '.join(LATENCY_PROFILES)}) ou um arquivo JSON")
+    parser.add_argument("--supabase-db", default=":memory:", metavar="ARQUIVO",
+                        help="banco SQLite do stand-in (padrão: em memória)")
+    parser.add_argument("command", nargs=argparse.REMAINDER, help="comando de teste a executar")
+    return parser.parse_args(argv)
+
+
+def run_command(command, base_url: str, supabase_url: Optional[str] = None, mode: str = "dev") -> int:
+    """Executa o comando de teste (ou aguarda Ctrl+C se não houver comando)."""
+    if command:
+        print(f"\n🧪 Executando testes: {' '.join(command)}")
+        print("=" * 80)
+
+        env = {**os.environ, "WEBAPP_BASE_URL": base_url, "WEBAPP_SERVER_MODE": mode}
+        if supabase_url:
+            env["WEBAPP_SUPABASE_URL"] = supabase_url
+        result = subprocess.run(command, env=env)
+        return result.returncode
+
+    print("\n✅ Servidor está pronto. Pressione Ctrl+C para parar.")
+    try:
+        # Mantém o script rodando
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        print("\n")
+    return 0
+
+
+def main(argv=None):
     """Função principal."""
-    manager = ServerManager()
+    args = parse_args(argv)
+    mode = "build" if args.build else "dev"
+
+    if not args.standalone:
+        supabase_db = os.path.abspath(args.supabase_db) if args.supabase_db != ":memory:" else args.supabase_db
+        client = SharedServerClient(mode=mode, supabase_stub=args.supabase_stub, supabase_db=supabase_db)
+        try:
+            base_url = client.acquire()
+            if base_url is None:
+                print("❌ Falha ao garantir que o servidor está rodando")
+                sys.exit(1)
+            # O modo repassado é o do servidor obtido (lido do estado compartilhado)
+            return run_command(args.command, base_url, client.supabase_url, client.server_mode)
+        finally:
+            # O daemon para o servidor quando o último cliente sair
+            client.release()
+
+    manager = ServerManager(mode=mode, supabase_stub=args.supabase_stub, supabase_db=args.supabase_db)
 
     try:
         # Garante que o servidor está rodando
@@ -121,25 +311,8 @@ def main():
             print("❌ Falha ao garantir que o servidor está rodando")
             sys.exit(1)
 
-        # Executa o comando de teste se fornecido
-        if len(sys.argv) > 1:
-            test_command = sys.argv[1:]
-            print(f"\n🧪 Executando testes: {' '.join(test_command)}")
-            print("=" * 80)
-
-            result = subprocess.run(test_command)
-            exit_code = result.returncode
-        else:
-            print("\n✅ Servidor está pronto. Pressione Ctrl+C para parar.")
-            try:
-                # Mantém o script rodando
-                while True:
-                    time.sleep(1)
-            except KeyboardInterrupt:
-                print("\n")
-                exit_code = 0
-
-        return exit_code
+        return run_command(args.command, f"http://{manager.host}:{manager.port}",
+                           manager.supabase.url if manager.supabase else None, mode)
 
     finally:
         # Para o servidor se foi iniciado por este script
@@ -0,0 +1,117 @@
+"""
+Pool de contextos do browser para os testes Playwright.
+Mantém N contextos aquecidos (com o bundle do Vite já carregado) e entrega
+páginas aos testes. Com a API síncrona cada processo executa um teste por
+vez, então N só passa de 1 para testes que usam várias páginas ao mesmo
+tempo (ex.: dois usuários); o paralelismo vem dos workers do xdist. Entre usos a página é reinicializada em vez de recriada,
+evitando o custo de abrir contexto e dar boot no SPA a cada teste.
+"""
+
+import queue
+from contextlib import contextmanager
+from typing import Callable, List, Optional
+
+from playwright.sync_api import Browser, BrowserContext, Page
+
+from page_readiness import wait_for_route_settled
+
+DEFAULT_POOL_SIZE = 1
+DEFAULT_ACQUIRE_TIMEOUT = 60
+
+# Limpa o estado do app sem descarregar o bundle da página
+RESET_STORAGE_SCRIPT = """
+() => {
+    try { window.localStorage.clear(); } catch (e) {}
+    try { window.sessionStorage.clear(); } catch (e) {}
+}
+"""
+
+
+class BrowserContextPool:
+    """Pool de contextos aquecidos que entrega páginas reutilizáveis."""
+
+    def __init__(self, browser: Browser, context_args: dict, size: int = DEFAULT_POOL_SIZE,
+                 warmup_url: Optional[str] = None,
+                 context_setup: Optional[Callable[[BrowserContext], None]] = None):
+        self.browser = browser
+        self.context_args = context_args
+        self.size = max(1, size)
+        self.warmup_url = warmup_url
+        # Chamado em cada contexto novo, antes do aquecimento (ex.: gravação/reprodução da rede)
+        self.context_setup = context_setup
+        self.contexts: List[BrowserContext] = []
+        self._available: "queue.Queue[Page]" = queue.Queue()
+
+    def start(self):
+        """Cria os contextos e carrega o SPA em cada um."""
+        print(f"\n🔥 Aquecendo {self.size} contexto(s) do browser...")
+        for _ in range(self.size):
+            context = self.browser.new_context(**self.context_args)
+            if self.context_setup is not None:
+                self.context_setup(context)
+            self.contexts.append(context)
+            self._available.put(self._new_page(context))
+        return self
+
+    def _new_page(self, context: BrowserContext) -> Page:
+        """Abre uma página no contexto e pré-carrega o bundle do Vite."""
+        page = context.new_page()
+        if self.warmup_url:
+            try:
+                page.goto(self.warmup_url)
+                wait_for_route_settled(page)
+            except Exception as e:
+                print(f"  ⚠️  Falha ao aquecer contexto em {self.warmup_url}: {e}")
+        return page
+
+    def acquire(self, timeout: float = DEFAULT_ACQUIRE_TIMEOUT) -> Page:
+        """Retira uma página aquecida do pool."""
+        try:
+            return self._available.get(timeout=timeout)
+        except queue.Empty:
+            raise TimeoutError(f"Nenhuma página disponível no pool após {timeout}s")
+
+    def release(self, page: Page):
+        """Reinicializa a página e a devolve ao pool."""
+        context = page.context
+        if page.is_closed():
+            self._available.put(self._new_page(context))
+            return
+
+        try:
+            self._reset(page)
+        except Exception as e:
+            print(f"  ⚠️  Erro ao reinicializar página, recriando: {e}")
+            page.close()
+            page = self._new_page(context)
+
+        self._available.put(page)
+
+    def _reset(self, page: Page):
+        """Remove o estado deixado pelo teste (popups, cookies, storage, permissões)."""
+        context = page.context
+        for other in list(context.pages):
+            if other is not page:
+                other.close()
+
+        context.clear_cookies()
+        context.clear_permissions()
+        page.evaluate(RESET_STORAGE_SCRIPT)
+
+    @contextmanager
+    def page(self, timeout: float = DEFAULT_ACQUIRE_TIMEOUT):
+        """Empresta uma página do pool durante o bloco with."""
+        page = self.acquire(timeout)
+        try:
+            yield page
+        finally:
+            self.release(page)
+
+    def close(self):
+        """Fecha todos os contextos do pool."""
+        for context in self.contexts:
+            try:
+                context.close()
+            except Exception:
+                pass
+        self.contexts.clear()
@@ -0,0 +1,200 @@
+"""
+Cache persistente dos resultados de descoberta.
+As entradas são endereçadas pelo hash do HTML buscado (ou renderizado):
+- pages/: relatório completo (elements + statistics) de uma página inteira;
+- subtrees/: resultados por categoria de um trecho da página, usados para
+  reanalisar apenas as partes que mudaram.
+A limpeza remove entradas antigas e limita o tamanho total do cache.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import List, NamedTuple, Optional
+
+from lxml import etree
+
+import route_crawler
+from atomic_file import atomic_write_json
+
+CACHE_DIR = os.path.join(route_crawler.REPORTS_DIR, "cache")
+# Incrementar quando o formato dos elementos descobertos mudar
+CACHE_VERSION = "1"
+DEFAULT_MAX_BYTES = 200 * 1024 * 1024
+DEFAULT_MAX_AGE_DAYS = 30
+
+PAGES = "pages"
+SUBTREES = "subtrees"
+
+# Tamanho alvo (em elementos) de cada trecho cacheado da página
+CHUNK_ELEMENTS = 256
+# Containers que podem ser divididos em trechos menores. Nenhum deles é
+# descrito a partir do próprio conteúdo (texto/opções), só de atributos.
+SPLITTABLE_TAGS = {
+    "html", "body", "div", "main", "section", "article", "aside", "header", "footer",
+    "nav", "ul", "ol", "li", "dl", "table", "thead", "tbody", "tfoot", "tr", "form", "fieldset",
+}
+
+
+class Shell(NamedTuple):
+    """Container dividido: só a própria tag (os filhos viram outros segmentos)."""
+    name: str
+    attrs: dict
+
+
+class Chunk(NamedTuple):
+    """Trecho da página: elementos irmãos consecutivos e o caminho de tags até eles."""
+    context: List[str]
+    html: str
+    count: int
+
+    def wrapped(self) -> str:
+        """HTML do trecho envolvido pelas tags ancestrais, para reparse no mesmo contexto."""
+        opening = "".join(f"<{name}>" for name in self.context)
+        closing = "".join(f"</{name}>" for name in reversed(self.context))
+        return f"{opening}{self.html}{closing}"
+
+
+def split_document(html: str) -> Optional[list]:
+    """
+    Divide o documento em segmentos (Shell/Chunk), em ordem de documento.
+
+    Usa o parser do lxml (o mesmo que o BeautifulSoup usa por baixo, mas sem
+    montar a árvore Python), então a divisão custa bem menos que o parse
+    completo. Containers grandes são divididos recursivamente; os demais
+    elementos são agrupados em trechos de até CHUNK_ELEMENTS elementos.
+    Retorna None se o documento não puder ser dividido.
+    """
+    parser = etree.HTMLParser(recover=True)
+    parser.feed(html)
+    root = parser.close()
+    if root is None or root.tag != "html":
+        return None
+
+    segments = [Shell(root.tag, dict(root.attrib))]
+    _split(root, [root.tag], segments)
+    return segments
+
+
+def _split(node, context: List[str], segments: list):
+    run, run_size = [], 0
+
+    def flush():
+        if run:
+            fragment = "".join(
+                etree.tostring(elem, method="html", encoding="unicode", with_tail=False) for elem in run
+            )
+            segments.append(Chunk(list(context), fragment, len(run)))
+            run.clear()
+
+    for child in node.iterchildren():
+        if not isinstance(child.tag, str):
+            continue
+        size = sum(1 for _ in child.iter())
+        if child.tag in SPLITTABLE_TAGS and size > CHUNK_ELEMENTS:
+            flush()
+            run_size = 0
+            segments.append(Shell(child.tag, dict(child.attrib)))
+            _split(child, context + [child.tag], segments)
+            continue
+        if run and run_size + size > CHUNK_ELEMENTS:
+            flush()
+            run_size = 0
+        run.append(child)
+        run_size += size
+
+    flush()
+
+
+class DiscoveryCache:
+    """Cache em disco de resultados de descoberta, com despejo por idade e tamanho."""
+
+    def __init__(self, root: str = CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES,
+                 max_age_days: float = DEFAULT_MAX_AGE_DAYS):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_days * 24 * 3600
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(content: str) -> str:
+        """Hash do conteúdo HTML (inclui a versão do formato do cache)."""
+        return hashlib.sha256(f"{CACHE_VERSION}\0{content}".encode("utf-8")).hexdigest()
+
+    def _path(self, kind: str, key: str) -> str:
+        return os.path.join(self.root, kind, key[:2], f"{key}.json")
+
+    def get(self, kind: str, key: str) -> Optional[dict]:
+        """Lê uma entrada do cache, ou None se não existir (ou estiver corrompida)."""
+        path = self._path(kind, key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                value = json.load(f)
+            # Marca a entrada como usada recentemente (despejo por LRU)
+            os.utime(path, None)
+        except (OSError, ValueError):
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self.hits += 1
+        return value
+
+    def put(self, kind: str, key: str, value: dict):
+        """Grava uma entrada de forma atômica."""
+        atomic_write_json(self._path(kind, key), value)
+
+    def get_page(self, key: str) -> Optional[dict]:
+        return self.get(PAGES, key)
+
+    def put_page(self, key: str, value: dict):
+        self.put(PAGES, key, value)
+
+    def get_subtree(self, key: str) -> Optional[dict]:
+        return self.get(SUBTREES, key)
+
+    def put_subtree(self, key: str, value: dict):
+        self.put(SUBTREES, key, value)
+
+    def prune(self) -> int:
+        """Remove entradas mais antigas que max_age e as menos usadas até caber em max_bytes."""
+        entries = []
+        for dirpath, _, filenames in os.walk(self.root):
+            for filename in filenames:
+                path = os.path.join(dirpath, filename)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+        now = time.time()
+        removed = 0
+        kept = []
+        for mtime, size, path in entries:
+            if now - mtime > self.max_age_seconds:
+                removed += self._remove(path)
+            else:
+                kept.append((mtime, size, path))
+
+        total = sum(size for _, size, _ in kept)
+        for mtime, size, path in sorted(kept):
+            if total <= self.max_bytes:
+                break
+            removed += self._remove(path)
+            total -= size
+
+        return removed
+
+    @staticmethod
+    def _remove(path: str) -> int:
+        try:
+            os.remove(path)
+            return 1
+        except OSError:
+            return 0
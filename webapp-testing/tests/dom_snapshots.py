@@ -0,0 +1,166 @@
+"""
+Snapshots do DOM renderizado (pós-hidratação do React).
+Renderiza cada rota uma única vez em um browser headless e grava o HTML
+resultante em disco, endereçado pelo hash do conteúdo. Os analisadores
+BeautifulSoup (SimpleElementDiscovery) podem então rodar sobre esses
+snapshots quantas vezes forem necessárias, sem browser.
+
+O manifesto guarda, por rota, o hash do código-fonte renderizado
+(static_server.source_hash); depois de uma mudança no código o snapshot da
+rota deixa de ser usado até ser renderizado de novo.
+
+Uso: python3 tests/dom_snapshots.py [--routes /dfds /consolidacao] [--base-url URL]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import threading
+from datetime import datetime
+from typing import List, Optional
+from urllib.parse import urlparse
+
+import route_crawler
+
+import static_server
+from atomic_file import atomic_write, atomic_write_json
+
+SNAPSHOTS_DIR = os.path.join(route_crawler.REPORTS_DIR, "snapshots")
+MANIFEST_FILENAME = "manifest.json"
+
+
+def route_key(url_or_route: str) -> str:
+    """Normaliza uma URL ou rota para a chave do manifesto ("/dfds/novo")."""
+    path = urlparse(url_or_route).path or "/"
+    return path if path == "/" else path.rstrip("/")
+
+
+class SnapshotStore:
+    """Armazenamento content-addressed de snapshots HTML com manifesto por rota."""
+
+    def __init__(self, root: str = SNAPSHOTS_DIR):
+        self.root = root
+        self.objects_dir = os.path.join(root, "objects")
+        self.manifest_path = os.path.join(root, MANIFEST_FILENAME)
+        self._lock = threading.Lock()
+        self.manifest = self._load_manifest()
+        self._source: Optional[str] = None
+
+    def _load_manifest(self) -> dict:
+        if not os.path.exists(self.manifest_path):
+            return {"routes": {}}
+        with open(self.manifest_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def save_manifest(self):
+        """Grava o manifesto (rota -> hash do snapshot)."""
+        with self._lock:
+            atomic_write_json(self.manifest_path, self.manifest, indent=2)
+
+    def object_path(self, digest: str) -> str:
+        """Caminho do blob no disco (objects/ab/abcdef....html)."""
+        return os.path.join(self.objects_dir, digest[:2], f"{digest}.html")
+
+    def put(self, html: str) -> str:
+        """Grava o HTML (se ainda não existir) e retorna seu hash SHA-256."""
+        data = html.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.object_path(digest)
+        if not os.path.exists(path):
+            atomic_write(path, data)
+        return digest
+
+    def get(self, digest: str) -> str:
+        """Lê o HTML de um snapshot pelo hash."""
+        with open(self.object_path(digest), "r", encoding="utf-8") as f:
+            return f.read()
+
+    def current_source(self) -> str:
+        """Hash do código-fonte atual (calculado uma vez por store)."""
+        with self._lock:
+            if self._source is None:
+                self._source = static_server.source_hash()
+            return self._source
+
+    def record(self, url: str, digest: str):
+        """Associa a rota da URL ao snapshot, com a versão do código renderizada."""
+        source = self.current_source()
+        with self._lock:
+            self.manifest["routes"][route_key(url)] = {
+                "url": url,
+                "digest": digest,
+                "source_hash": source,
+                "timestamp": datetime.now().isoformat(),
+            }
+
+    def is_current(self, url_or_route: str) -> bool:
+        """O snapshot da rota foi renderizado a partir do código-fonte atual."""
+        entry = self.manifest["routes"].get(route_key(url_or_route))
+        return entry is not None and entry.get("source_hash") == self.current_source()
+
+    def resolve(self, url_or_route: str) -> Optional[str]:
+        """Retorna o hash do snapshot da rota, ou None se não houver."""
+        entry = self.manifest["routes"].get(route_key(url_or_route))
+        return entry["digest"] if entry else None
+
+    def load(self, url_or_route: str) -> Optional[str]:
+        """Retorna o HTML do snapshot da rota, ou None se não houver."""
+        digest = self.resolve(url_or_route)
+        if digest is None or not os.path.exists(self.object_path(digest)):
+            return None
+        return self.get(digest)
+
+
+def render_snapshots(base_url: str, routes: List[str], store: SnapshotStore) -> dict:
+    """Renderiza as rotas em um Chromium headless e grava os snapshots do DOM hidratado."""
+    from playwright.sync_api import sync_playwright
+
+    from page_readiness import wait_for_route_settled
+
+    rendered = {}
+    with sync_playwright() as p:
+        browser = p.chromium.launch()
+        context = browser.new_context(viewport={"width": 1920, "height": 1080}, locale="pt-BR")
+        page = context.new_page()
+
+        for route in routes:
+            url = f"{base_url}{route}"
+            try:
+                page.goto(url)
+                wait_for_route_settled(page)
+                digest = store.put(page.content())
+                store.record(url, digest)
+                rendered[route] = digest
+                print(f"  ✓ {route}: {digest[:12]}")
+            except Exception as e:
+                print(f"  ⚠️  Erro ao renderizar {route}: {e}")
+
+        context.close()
+        browser.close()
+
+    store.save_manifest()
+    return rendered
+
+
+def main(argv=None):
+    """Renderiza os snapshots das rotas informadas (ou de todas de src/App.tsx)."""
+    parser = argparse.ArgumentParser(description="Gera snapshots do DOM renderizado")
+    parser.add_argument("--base-url", default=route_crawler.DEFAULT_BASE_URL, help="URL base da aplicação")
+    parser.add_argument("--routes", nargs="+", metavar="ROTA", help="rotas a renderizar (padrão: todas)")
+    args = parser.parse_args(argv)
+
+    base_url = args.base_url.rstrip("/")
+    routes = args.routes or route_crawler.load_routes()
+
+    print(f"\n📸 Renderizando {len(routes)} rota(s) em {base_url}...")
+    store = SnapshotStore()
+    rendered = render_snapshots(base_url, routes, store)
+
+    print(f"\n📄 Manifesto salvo em: {store.manifest_path}")
+    return 0 if len(rendered) == len(routes) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,68 @@
+"""
+Agendador do pytest-xdist baseado nas durações históricas dos testes.
+
+Os testes são ordenados da maior para a menor duração estimada (LPT,
+longest-processing-time-first). Cada worker recebe um teste de cada vez (e
+mais um de reserva, que o xdist exige para saber qual é o próximo): quem
+termina pega o mais longo ainda pendente. Assim os testes longos (rotas com
+tabelas grandes, fluxos completos) começam logo e os curtos preenchem o
+final, em vez de um worker ficar com uma rota lenta sozinho no fim.
+"""
+
+from itertools import chain
+
+from xdist.scheduler import LoadScheduling
+
+from parallel_plugin import estimate_durations
+
+# Testes enviados por worker: o em execução + o próximo
+PREFETCH = 2
+
+
+class DurationScheduling(LoadScheduling):
+    """LoadScheduling com os testes em ordem LPT e entrega de um em um."""
+
+    def __init__(self, config, log=None, durations: dict = None):
+        super().__init__(config, log)
+        self.durations = durations or {}
+
+    def schedule(self):
+        assert self.collection_is_completed
+
+        if self.collection is not None:
+            for node in self.nodes:
+                self.check_schedule(node)
+            return
+
+        if not self._check_nodes_have_same_collection():
+            self.log("**Different tests collected, aborting run**")
+            return
+
+        self.collection = next(iter(self.node2collection.values()))
+        estimates = estimate_durations(self.collection, self.durations)
+        self.pending[:] = sorted(range(len(self.collection)), key=lambda i: -estimates[self.collection[i]])
+        if not self.collection:
+            return
+
+        # Primeira rodada: os mais longos, um por worker; a segunda em ordem
+        # inversa, para o worker com o teste mais curto receber o maior dos restantes
+        nodes = self.nodes
+        for node in chain(nodes, reversed(nodes)):
+            self._send_tests(node, 1)
+
+        if not self.pending:
+            for node in self.nodes:
+                node.shutdown()
+
+    def check_schedule(self, node, duration: float = 0):
+        if node.shutting_down:
+            return
+
+        if self.pending:
+            missing = PREFETCH - len(self.node2pending[node])
+            if missing > 0:
+                self._send_tests(node, missing)
+        else:
+            node.shutdown()
+
+        self.log("num items waiting for node:", len(self.pending))
@@ -0,0 +1,270 @@
+"""
+Análise de impacto: quais rotas precisam ser testadas para uma mudança.
+
+Monta o grafo de imports de src/ (import/export ... from, import "x" e
+import("x"), com o alias "@/" do vite) e associa cada rota de src/App.tsx
+ao conjunto transitivo de módulos que a página da rota importa. Dada uma
+lista de arquivos alterados (ou um git diff), seleciona só as rotas
+afetadas. Mudanças no que é comum a todas as páginas (main.tsx, App.tsx e o
+que ele importa fora das páginas, dependências, configuração do build e o
+próprio harness) selecionam todas as rotas.
+
+O grafo fica em reports/cache/import_graph.json e é atualizado de forma
+incremental: só os arquivos com mtime/tamanho diferentes são relidos.
+
+Uso: python3 tests/impact_analysis.py affected [--since origin/main] [--files src/hooks/useFormularioPCA.ts]
+     python3 tests/impact_analysis.py routes
+"""
+
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set
+
+import route_crawler
+from atomic_file import atomic_write_json
+
+PROJECT_ROOT = route_crawler.PROJECT_ROOT
+SRC_DIR = os.path.join(PROJECT_ROOT, "src")
+ENTRY_MODULE = "src/main.tsx"
+CACHE_PATH = os.path.join(route_crawler.REPORTS_DIR, "cache", "import_graph.json")
+# Incrementar quando o formato do cache mudar
+GRAPH_VERSION = "1"
+
+SOURCE_EXTENSIONS = (".tsx", ".ts", ".jsx", ".js")
+# Alias do vite.config.ts / tsconfig.json ("@/*" -> "./src/*")
+ALIASES = {"@/": "src/"}
+
+# Arquivos (relativos à raiz do projeto) que afetam todas as rotas
+GLOBAL_FILES = {
+    "index.html", "package.json", "package-lock.json", "bun.lockb", "vite.config.ts",
+    "tailwind.config.ts", "postcss.config.js", "tsconfig.json", "tsconfig.app.json", "components.json",
+    "webapp-testing/conftest.py", "webapp-testing/pytest.ini", "webapp-testing/budgets.json",
+}
+GLOBAL_PREFIXES = ("public/", "supabase/migrations/", "webapp-testing/tests/", "webapp-testing/scripts/")
+
+# import X from "y" / export { X } from "y" / import "y" / import("y")
+IMPORT_PATTERN = re.compile(r"""\bfrom\s+["']([^"']+)["']|\bimport\s*\(?\s*["']([^"']+)["']""")
+# import DFDs from "./pages/DFDs";
+DEFAULT_IMPORT_PATTERN = re.compile(r"""\bimport\s+(\w+)\s+from\s+["']([^"']+)["']""")
+
+
+def _relative(path: str) -> str:
+    """Caminho relativo à raiz do projeto, com "/" (o formato do git diff)."""
+    return os.path.relpath(path, PROJECT_ROOT).replace(os.sep, "/")
+
+
+class ImportGraph:
+    """Grafo de imports dos módulos de src/, com cache incremental em disco."""
+
+    def __init__(self, src_dir: str = SRC_DIR, cache_path: str = CACHE_PATH):
+        self.src_dir = src_dir
+        self.cache_path = cache_path
+        # módulo -> {"mtime": ..., "size": ..., "specifiers": [...]}
+        self.files: Dict[str, dict] = self._load()
+        self.edges: Dict[str, List[str]] = {}
+
+    def _load(self) -> Dict[str, dict]:
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return cache.get("files", {}) if cache.get("version") == GRAPH_VERSION else {}
+
+    def _save(self):
+        atomic_write_json(self.cache_path, {"version": GRAPH_VERSION, "files": self.files})
+
+    def update(self) -> int:
+        """Relê os arquivos novos ou alterados e resolve os imports; retorna quantos foram relidos."""
+        current = {}
+        for dirpath, _, filenames in os.walk(self.src_dir):
+            for filename in filenames:
+                path = os.path.join(dirpath, filename)
+                current[_relative(path)] = os.stat(path)
+
+        reparsed = 0
+        for module, stat in current.items():
+            entry = self.files.get(module)
+            if entry and entry["mtime"] == stat.st_mtime_ns and entry["size"] == stat.st_size:
+                continue
+            specifiers = []
+            if module.endswith(SOURCE_EXTENSIONS):
+                with open(os.path.join(PROJECT_ROOT, module), "r", encoding="utf-8", errors="replace") as f:
+                    specifiers = sorted({a or b for a, b in IMPORT_PATTERN.findall(f.read())})
+            self.files[module] = {"mtime": stat.st_mtime_ns, "size": stat.st_size, "specifiers": specifiers}
+            reparsed += 1
+
+        removed = set(self.files) - set(current)
+        for module in removed:
+            del self.files[module]
+        if reparsed or removed:
+            self._save()
+
+        # A resolução depende dos arquivos existentes (um index.ts novo muda
+        # o destino de "./pasta"), então é refeita sempre; é só busca em set.
+        self.edges = {
+            module: sorted(filter(None, (self.resolve(spec, module) for spec in entry["specifiers"])))
+            for module, entry in self.files.items()
+        }
+        return reparsed
+
+    def resolve(self, specifier: str, importer: str) -> Optional[str]:
+        """Módulo de src/ importado por specifier (None para pacotes do node_modules)."""
+        for alias, target in ALIASES.items():
+            if specifier.startswith(alias):
+                base = target + specifier[len(alias):]
+                break
+        else:
+            if not specifier.startswith("."):
+                return None
+            base = os.path.normpath(os.path.join(os.path.dirname(importer), specifier)).replace(os.sep, "/")
+
+        candidates = [base] + [base + ext for ext in SOURCE_EXTENSIONS] + \
+                     [f"{base}/index{ext}" for ext in SOURCE_EXTENSIONS]
+        for candidate in candidates:
+            if candidate in self.files:
+                return candidate
+        return None
+
+    def closure(self, start: str, stop: Iterable[str] = ()) -> Set[str]:
+        """Módulos alcançáveis a partir de start, sem atravessar os módulos em stop."""
+        stop = set(stop) - {start}
+        seen = {start}
+        pending = [start]
+        while pending:
+            for dependency in self.edges.get(pending.pop(), []):
+                if dependency not in seen and dependency not in stop:
+                    seen.add(dependency)
+                    pending.append(dependency)
+        return seen
+
+
+class ImpactAnalyzer:
+    """Índice rota -> módulos e seleção das rotas afetadas por uma mudança."""
+
+    def __init__(self, graph: Optional[ImportGraph] = None, app_tsx_path: str = route_crawler.APP_TSX_PATH):
+        self.graph = graph or ImportGraph()
+        self.graph.update()
+
+        with open(app_tsx_path, "r", encoding="utf-8") as f:
+            source = f.read()
+        app_module = _relative(app_tsx_path)
+        components = {name: self.graph.resolve(specifier, app_module)
+                      for name, specifier in DEFAULT_IMPORT_PATTERN.findall(source)}
+
+        # Todas as páginas (inclusive o catch-all) limitam o que é comum às rotas
+        pages = {components.get(component) for _, component in route_crawler.ROUTE_PATTERN.findall(source)}
+        pages.discard(None)
+
+        self.route_modules: Dict[str, Set[str]] = {}
+        for route in route_crawler.parse_app_routes(app_tsx_path):
+            page = components.get(route["component"])
+            self.route_modules[route["path"]] = self.graph.closure(page) if page else set()
+        self.shared_modules = self.graph.closure(ENTRY_MODULE, stop=pages) | {app_module}
+
+    @property
+    def routes(self) -> List[str]:
+        return list(self.route_modules)
+
+    def is_global(self, path: str) -> bool:
+        return path in self.shared_modules or path in GLOBAL_FILES or path.startswith(GLOBAL_PREFIXES)
+
+    def affected(self, changed: Iterable[str]) -> Dict[str, List[str]]:
+        """Rotas afetadas (na ordem de src/App.tsx) e os arquivos alterados que as afetam."""
+        changed = sorted(set(changed))
+        shared = [path for path in changed if self.is_global(path)]
+        if shared:
+            return {route: shared for route in self.route_modules}
+
+        module_routes: Dict[str, List[str]] = defaultdict(list)
+        for route, modules in self.route_modules.items():
+            for module in modules:
+                module_routes[module].append(route)
+
+        reasons: Dict[str, List[str]] = defaultdict(list)
+        for path in changed:
+            for route in module_routes.get(path, []):
+                reasons[route].append(path)
+        return {route: reasons[route] for route in self.route_modules if route in reasons}
+
+
+def changed_files(since: str = "HEAD") -> List[str]:
+    """Arquivos alterados desde since (commits, working tree e arquivos novos), relativos à raiz."""
+    commands = [
+        ["git", "diff", "--name-only", "--no-renames", "--relative", since, "--"],
+        ["git", "ls-files", "--others", "--exclude-standard"],
+    ]
+    files = set()
+    for command in commands:
+        result = subprocess.run(command, cwd=PROJECT_ROOT, capture_output=True, text=True)
+        if result.returncode != 0:
+            raise RuntimeError(f"{' '.join(command)} falhou: {result.stderr.strip()}")
+        files.update(line for line in result.stdout.splitlines() if line)
+    return sorted(files)
+
+
+def affected_routes(since: Optional[str] = None, files: Optional[Iterable[str]] = None) -> List[str]:
+    """Atalho: rotas afetadas pelos arquivos informados ou pelo diff desde since."""
+    changed = list(files) if files is not None else changed_files(since or "HEAD")
+    return list(ImpactAnalyzer().affected(changed))
+
+
+def main(argv=None):
+    """Lista as rotas afetadas por uma mudança ou o índice rota -> módulos."""
+    parser = argparse.ArgumentParser(description="Análise de impacto das mudanças nas rotas da aplicação")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    affected_parser = subparsers.add_parser("affected", help="rotas afetadas pelas mudanças")
+    affected_parser.add_argument("--since", default="HEAD", metavar="REF",
+                                 help="compara com esta referência do git (padrão: HEAD, só o que não foi commitado)")
+    affected_parser.add_argument("--files", nargs="+", metavar="ARQUIVO",
+                                 help="arquivos alterados (relativos à raiz do projeto) em vez do git diff")
+    affected_parser.add_argument("--paths", action="store_true",
+                                 help="imprime só as rotas, separadas por espaço (para --routes)")
+    affected_parser.add_argument("--json", action="store_true", help="saída em JSON")
+
+    routes_parser = subparsers.add_parser("routes", help="módulos de src/ de cada rota")
+    routes_parser.add_argument("--json", action="store_true", help="saída em JSON")
+    args = parser.parse_args(argv)
+
+    analyzer = ImpactAnalyzer()
+
+    if args.command == "routes":
+        index = {route: sorted(modules) for route, modules in analyzer.route_modules.items()}
+        if args.json:
+            print(json.dumps({"routes": index, "shared": sorted(analyzer.shared_modules)}, indent=2))
+            return 0
+        print(f"\n🧩 Módulos comuns a todas as rotas: {len(analyzer.shared_modules)}")
+        for route, modules in index.items():
+            print(f"\n📍 {route} ({len(modules)} módulos)")
+            for module in modules:
+                print(f"   {module}")
+        return 0
+
+    try:
+        changed = args.files if args.files else changed_files(args.since)
+    except RuntimeError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 1
+    affected = analyzer.affected(changed)
+
+    if args.paths:
+        print(" ".join(affected))
+    elif args.json:
+        print(json.dumps({"changed": changed, "routes": affected}, indent=2, ensure_ascii=False))
+    else:
+        print(f"\n📝 {len(changed)} arquivo(s) alterado(s)")
+        print(f"🎯 {len(affected)}/{len(analyzer.routes)} rota(s) afetada(s)")
+        for route, reasons in affected.items():
+            more = f" (+{len(reasons) - 3})" if len(reasons) > 3 else ""
+            print(f"   {route}: {', '.join(reasons[:3])}{more}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
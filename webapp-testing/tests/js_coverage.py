@@ -0,0 +1,385 @@
+"""
+Cobertura de JavaScript (V8) por rota: quanto do JS entregue é executado.
+
+Com --js-coverage, a ElementDiscovery liga a cobertura precisa do V8 pelo CDP
+(Profiler.startPreciseCoverage, em blocos) antes de navegar e a lê quando a
+rota fica pronta. Os trechos executados de cada script são mapeados, pelos
+source maps do Vite, de volta aos módulos de src/ (e aos pacotes de
+node_modules/), e o relatório da rota (<rota>.coverage.json) traz, por
+módulo, os bytes entregues e os executados.
+
+Os source maps vêm do próprio script: no servidor de desenvolvimento o Vite
+os embute em cada módulo; no build, eles só existem com
+VITE_BUILD_SOURCEMAP=hidden (ver vite.config.ts), em <chunk>.js.map. Scripts
+sem source map contam inteiros para a própria URL.
+
+Os tamanhos são em caracteres do JS entregue (≈ bytes, antes da compressão).
+A cobertura em blocos desotimiza parte do código: as métricas de performance
+de uma execução com --js-coverage não entram no histórico.
+
+Uso: python3 tests/js_coverage.py reports/routes/ [--limit 20] [--src-only] [--json ARQUIVO]
+"""
+
+import argparse
+import base64
+import hashlib
+import json
+import os
+import re
+import sys
+from bisect import bisect_right
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import unquote, urljoin, urlsplit
+
+from playwright.sync_api import Page
+
+import route_crawler
+
+COVERAGE_SUFFIX = ".coverage.json"
+UNMAPPED = "(sem mapa)"
+# Fração máxima das rotas que executam o módulo para sugeri-lo como lazy-loading
+LAZY_CANDIDATE_RATIO = 0.25
+
+BASE64_DIGITS = {char: value for value, char in
+                 enumerate("ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/")}
+PACKAGE_PATTERN = re.compile(r"node_modules/(?:\.vite/deps/)?((?:@[^/]+/)?[^/]+)")
+
+# Source maps já lidos (por URL do mapa ou digest do data: URL), compartilhados entre as rotas
+_source_maps: Dict[str, Optional["SourceMap"]] = {}
+
+
+def module_name(source: str) -> str:
+    """Nome do módulo de um source do mapa: "src/pages/DFDs.tsx" ou "node_modules/<pacote>"."""
+    path = unquote(urlsplit(source).path or source).replace("\\", "/")
+    package = PACKAGE_PATTERN.search(path)
+    if package:
+        return f"node_modules/{package.group(1)}"
+    position = path.rfind("/src/")
+    if position >= 0:
+        return path[position + 1:]
+    if path.startswith("src/"):
+        return path
+    return path.lstrip("./") or source
+
+
+def decode_vlq(segment: str) -> List[int]:
+    """Decodifica um segmento de mappings (base64 VLQ) em seus campos."""
+    values, value, shift = [], 0, 0
+    for char in segment:
+        digit = BASE64_DIGITS[char]
+        value += (digit & 31) << shift
+        if digit & 32:
+            shift += 5
+            continue
+        values.append(-(value >> 1) if value & 1 else value >> 1)
+        value, shift = 0, 0
+    return values
+
+
+class SourceMap:
+    """Source map v3 reduzido ao necessário: (linha, coluna) gerada -> módulo de origem."""
+
+    def __init__(self, data: dict, map_url: str = ""):
+        root = data.get("sourceRoot") or ""
+        self.modules = [module_name(urljoin(map_url, root + source) if map_url else root + source)
+                        for source in data.get("sources", [])]
+        # Por linha gerada: colunas iniciais dos segmentos e o índice do source (None: sem mapa)
+        self.lines: List[Tuple[List[int], List[Optional[int]]]] = []
+        source = 0
+        for line in data.get("mappings", "").split(";"):
+            column, columns, sources = 0, [], []
+            for segment in line.split(","):
+                if not segment:
+                    continue
+                fields = decode_vlq(segment)
+                column += fields[0]
+                if len(fields) >= 4:
+                    source += fields[1]
+                    sources.append(source)
+                else:
+                    sources.append(None)
+                columns.append(column)
+            self.lines.append((columns, sources))
+
+    def spans(self, code: str) -> List[Tuple[int, str]]:
+        """Início (offset no script) e módulo de cada trecho contíguo; cada um vai até o próximo."""
+        spans: List[Tuple[int, str]] = []
+        offset = 0
+        for number, line in enumerate(code.split("\n")):
+            if number < len(self.lines):
+                columns, sources = self.lines[number]
+                for column, source in zip(columns, sources):
+                    module = self.modules[source] if source is not None and source < len(self.modules) else UNMAPPED
+                    if not spans or spans[-1][1] != module:
+                        spans.append((offset + column, module))
+            offset += len(line) + 1
+        if not spans or spans[0][0] > 0:
+            spans.insert(0, (0, UNMAPPED))
+        return spans
+
+
+def executed_ranges(functions: List[dict]) -> List[Tuple[int, int]]:
+    """
+    Trechos executados de um script a partir da cobertura em blocos do V8.
+    Os ranges são aninhados (o de dentro sobrepõe a contagem do de fora):
+    percorre os pontos de início/fim como parênteses e fica com a contagem
+    do range mais interno em cada trecho.
+    """
+    points = []
+    for function in functions:
+        for block in function["ranges"]:
+            length = block["endOffset"] - block["startOffset"]
+            points.append((block["startOffset"], 1, -length, block["count"]))
+            points.append((block["endOffset"], 0, length, None))
+    # No mesmo offset: fins antes de inícios; o range mais longo abre antes e fecha depois
+    points.sort(key=lambda point: point[:3])
+
+    ranges: List[Tuple[int, int]] = []
+    counts: List[int] = []
+    last = 0
+    for offset, is_start, _, count in points:
+        if counts and counts[-1] > 0 and last < offset:
+            if ranges and ranges[-1][1] == last:
+                ranges[-1] = (ranges[-1][0], offset)
+            else:
+                ranges.append((last, offset))
+        last = offset
+        if is_start:
+            counts.append(count)
+        elif counts:
+            counts.pop()
+    return ranges
+
+
+def attribute(spans: List[Tuple[int, str]], size: int, ranges: List[Tuple[int, int]]) -> Dict[str, List[int]]:
+    """Bytes [entregues, executados] de cada módulo do script."""
+    totals: Dict[str, List[int]] = defaultdict(lambda: [0, 0])
+    starts = [start for start, _ in spans]
+    for index, (start, module) in enumerate(spans):
+        end = spans[index + 1][0] if index + 1 < len(spans) else size
+        totals[module][0] += max(0, end - start)
+    for start, end in ranges:
+        index = max(0, bisect_right(starts, start) - 1)
+        while start < end and index < len(spans):
+            span_end = spans[index + 1][0] if index + 1 < len(spans) else size
+            piece_end = min(end, span_end)
+            if piece_end > start:
+                totals[spans[index][1]][1] += piece_end - start
+            start = max(start, piece_end)
+            index += 1
+    return totals
+
+
+class JSCoverage:
+    """Cobertura precisa do V8 de uma página pelo CDP (indisponível fora do Chromium)."""
+
+    def __init__(self, page: Page):
+        self.page = page
+        self.scripts: Dict[str, dict] = {}
+        self._cdp = None
+
+    def start(self) -> bool:
+        """Liga a cobertura (chamar antes do page.goto); retorna False se o CDP não estiver disponível."""
+        self.scripts = {}
+        if self._cdp is None:
+            try:
+                self._cdp = self.page.context.new_cdp_session(self.page)
+            except Exception:
+                return False
+            self._cdp.on("Debugger.scriptParsed", self._on_script_parsed)
+            # Scripts do documento anterior não contam para a rota
+            self._cdp.on("Runtime.executionContextsCleared", lambda params: self.scripts.clear())
+        self._cdp.send("Runtime.enable")
+        self._cdp.send("Debugger.enable")
+        self._cdp.send("Debugger.setSkipAllPauses", {"skip": True})
+        self._cdp.send("Profiler.enable")
+        self._cdp.send("Profiler.startPreciseCoverage", {"callCount": False, "detailed": True})
+        return True
+
+    def _on_script_parsed(self, params: dict):
+        if params.get("url", "").startswith(("http://", "https://")):
+            self.scripts[params["scriptId"]] = {"url": params["url"], "source_map": params.get("sourceMapURL") or ""}
+
+    def stop(self, url: Optional[str] = None) -> dict:
+        """Lê a cobertura, desliga o profiler e retorna o relatório da rota."""
+        coverage = self._cdp.send("Profiler.takePreciseCoverage")["result"]
+        scripts, modules = [], defaultdict(lambda: [0, 0])
+        for entry in coverage:
+            script = self.scripts.get(entry["scriptId"])
+            if script is None:
+                continue
+            try:
+                code = self._cdp.send("Debugger.getScriptSource", {"scriptId": entry["scriptId"]})["scriptSource"]
+            except Exception:
+                continue
+            ranges = executed_ranges(entry["functions"])
+            source_map = self._source_map(script)
+            spans = source_map.spans(code) if source_map else [(0, module_name(script["url"]))]
+            for module, (shipped, executed) in attribute(spans, len(code), ranges).items():
+                modules[module][0] += shipped
+                modules[module][1] += executed
+            scripts.append({
+                "url": script["url"],
+                "size": len(code),
+                "executed": sum(end - start for start, end in ranges),
+                "source_map": source_map is not None,
+            })
+
+        for method in ("Profiler.stopPreciseCoverage", "Profiler.disable", "Debugger.disable"):
+            try:
+                self._cdp.send(method)
+            except Exception:
+                pass
+        return build_report(url or self.page.url, scripts, modules)
+
+    def _source_map(self, script: dict) -> Optional[SourceMap]:
+        """Source map do script: data: URL embutido, URL declarada ou <script>.map (build com mapas ocultos)."""
+        reference = script["source_map"]
+        if reference.startswith("data:"):
+            key = hashlib.sha256(reference.encode("utf-8")).hexdigest()
+            if key not in _source_maps:
+                _, _, payload = reference.partition(",")
+                data = base64.b64decode(payload) if ";base64" in reference.split(",", 1)[0] else unquote(payload)
+                _source_maps[key] = self._parse_map(data, script["url"])
+            return _source_maps[key]
+
+        map_url = urljoin(script["url"], reference) if reference else f"{script['url'].split('?')[0]}.map"
+        if map_url not in _source_maps:
+            try:
+                response = self.page.request.get(map_url)
+                _source_maps[map_url] = self._parse_map(response.body(), map_url) if response.ok else None
+            except Exception:
+                _source_maps[map_url] = None
+        return _source_maps[map_url]
+
+    @staticmethod
+    def _parse_map(data, map_url: str) -> Optional[SourceMap]:
+        try:
+            return SourceMap(json.loads(data), map_url)
+        except (ValueError, KeyError):
+            return None
+
+    def close(self):
+        if self._cdp is not None:
+            try:
+                self._cdp.detach()
+            except Exception:
+                pass
+            self._cdp = None
+
+
+def build_report(url: str, scripts: List[dict], modules: Dict[str, List[int]]) -> dict:
+    shipped = sum(value[0] for value in modules.values())
+    executed = sum(value[1] for value in modules.values())
+    return {
+        "timestamp": datetime.now().isoformat(),
+        "url": url,
+        "totals": {
+            "shipped": shipped,
+            "executed": executed,
+            "unused_pct": round(100 * (shipped - executed) / shipped, 1) if shipped else 0.0,
+        },
+        "scripts": sorted(scripts, key=lambda script: -script["size"]),
+        "modules": [
+            {"module": module, "shipped": value[0], "executed": value[1]}
+            for module, value in sorted(modules.items(), key=lambda item: item[1][1] - item[1][0])
+        ],
+    }
+
+
+def summarize_coverage(report: Optional[dict]) -> dict:
+    """Resumo da cobertura (para o índice do crawl)."""
+    if not report:
+        return {}
+    return {f"js_{key}": value for key, value in report["totals"].items()}
+
+
+def save_coverage(report: dict, report_path: str) -> str:
+    """Grava a cobertura ao lado do relatório de elementos."""
+    return route_crawler.save_sidecar(report_path, COVERAGE_SUFFIX, report, indent=1)
+
+
+def aggregate(reports: List[dict]) -> List[dict]:
+    """
+    Visão por módulo de todas as rotas: em quantas é entregue e em quantas é
+    executado, e os bytes entregues sem uso somados entre as rotas.
+    """
+    modules: Dict[str, dict] = {}
+    for report in reports:
+        route = urlsplit(report["url"]).path or "/"
+        for entry in report["modules"]:
+            module = modules.setdefault(entry["module"], {
+                "module": entry["module"], "shipped": 0, "loaded_on": [], "executed_on": [], "unused_total": 0,
+            })
+            module["shipped"] = max(module["shipped"], entry["shipped"])
+            module["loaded_on"].append(route)
+            if entry["executed"] > 0:
+                module["executed_on"].append(route)
+            module["unused_total"] += entry["shipped"] - entry["executed"]
+
+    for module in modules.values():
+        loaded = len(module["loaded_on"])
+        module["lazy_candidate"] = (module["module"].startswith("src/") and loaded > 1
+                                    and len(module["executed_on"]) <= LAZY_CANDIDATE_RATIO * loaded)
+    return sorted(modules.values(), key=lambda module: -module["unused_total"])
+
+
+def print_aggregate(reports: List[dict], modules: List[dict], limit: int):
+    print(f"\n📦 Cobertura de JS em {len(reports)} rota(s)")
+    for report in sorted(reports, key=lambda report: urlsplit(report["url"]).path):
+        totals = report["totals"]
+        print(f"  {urlsplit(report['url']).path or '/':<32} {totals['shipped']:>10,} entregues  "
+              f"{totals['executed']:>10,} executados  ({totals['unused_pct']:.0f}% sem uso)")
+
+    print(f"\n{'módulo':<52} {'entregue':>10} {'rotas':>7} {'sem uso (soma)':>15}")
+    for module in modules[:limit]:
+        flag = "  ⚡ lazy-loading" if module["lazy_candidate"] else ""
+        print(f"{module['module'][-52:]:<52} {module['shipped']:>10,} "
+              f"{len(module['executed_on']):>3}/{len(module['loaded_on']):<3} {module['unused_total']:>15,}{flag}")
+
+    candidates = [module for module in modules if module["lazy_candidate"]]
+    if candidates:
+        print(f"\n⚡ {len(candidates)} módulo(s) de src/ entregues em todas as rotas e executados em poucas "
+              f"({sum(module['shipped'] for module in candidates):,} caracteres)")
+
+
+def main(argv=None):
+    """Agrega os relatórios de cobertura gravados (arquivos ou diretórios com *.coverage.json)."""
+    parser = argparse.ArgumentParser(description="Peso do JS por rota e candidatos a lazy-loading")
+    parser.add_argument("paths", nargs="+", help="arquivos .coverage.json ou diretórios")
+    parser.add_argument("--limit", type=int, default=20, help="módulos listados (padrão: 20)")
+    parser.add_argument("--src-only", action="store_true", help="apenas os módulos de src/")
+    parser.add_argument("--json", metavar="ARQUIVO", help="grava a visão por módulo em JSON")
+    args = parser.parse_args(argv)
+
+    files = []
+    for path in args.paths:
+        if os.path.isdir(path):
+            files.extend(sorted(os.path.join(path, name) for name in os.listdir(path) if name.endswith(COVERAGE_SUFFIX)))
+        else:
+            files.append(path)
+    if not files:
+        print("❌ Nenhum relatório de cobertura encontrado")
+        return 1
+
+    reports = []
+    for path in files:
+        with open(path, "r", encoding="utf-8") as f:
+            reports.append(json.load(f))
+
+    modules = aggregate(reports)
+    if args.src_only:
+        modules = [module for module in modules if module["module"].startswith("src/")]
+    print_aggregate(reports, modules, args.limit)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"routes": len(reports), "modules": modules}, f, indent=2, ensure_ascii=False)
+        print(f"\n📄 Visão por módulo salva em: {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,494 @@
+"""
+Detector de vazamentos de memória em uso prolongado do app.
+
+Repete um roteiro (navegação entre rotas pelo próprio SPA ou um ciclo de
+preenchimento do FormularioPCA) N vezes na mesma página, sem recarregar.
+A cada amostra força a coleta de lixo e mede, pelo CDP, o heap JS usado, os
+nós do DOM e os listeners de eventos; em intervalos tira um heap snapshot.
+
+Ao final:
+  - ajusta uma reta (mínimos quadrados) a cada série: crescimento por
+    iteração e R²; crescimento consistente acima do limiar é vazamento;
+  - compara os snapshots: tipos de objeto retidos que crescem (construtores
+    e closures, estas com o módulo e a linha onde foram criadas);
+  - agrupa o DOM destacado (detached) pelo componente React que o criou
+    (pela fibra ainda ligada ao nó) ou, sem fibra, pelo que o retém.
+
+Nomes de componentes e funções só são legíveis no servidor de
+desenvolvimento; no build de produção eles vêm minificados.
+
+Uso: python3 tests/leak_detector.py --scenario navegacao --iterations 50
+     python3 tests/leak_detector.py --scenario formulario --iterations 30 --snapshot-every 10 --save-snapshots
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+from collections import Counter, defaultdict, deque
+from datetime import datetime
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+from playwright.sync_api import Page, sync_playwright
+
+import route_crawler
+from atomic_file import atomic_write_json
+from js_coverage import module_name
+from load_simulator import FormData, SelectorCatalog, supabase_stub
+from page_readiness import wait_for_route_settled
+
+LEAKS_DIR = os.path.join(route_crawler.REPORTS_DIR, "leaks")
+
+NAVIGATION_ROUTES = ["/dfds", "/dfds/novo", "/consolidacao"]
+FORM_ROUTE = "/formacao-pca"
+
+DEFAULT_ITERATIONS = 30
+DEFAULT_WARMUP = 3
+DEFAULT_TIMEOUT = 15.0
+# Crescimento por iteração acima do qual uma série é considerada vazamento
+LEAK_THRESHOLDS = {"heap_used": 20 * 1024, "nodes": 5, "listeners": 1}
+MIN_R_SQUARED = 0.7
+TOP_TYPES = 15
+MAX_RETAINER_DEPTH = 12
+# Retentores que não dizem quem é o dono (segue-se o caminho acima deles)
+GENERIC_RETAINERS = {"", "Object", "Array", "Map", "Set", "system / Context", "(object properties)"}
+
+SPA_NAVIGATE_SCRIPT = """
+(path) => {
+    window.history.pushState({}, "", path);
+    window.dispatchEvent(new PopStateEvent("popstate", { state: {} }));
+}
+"""
+
+
+class Trend(NamedTuple):
+    slope: float        # por iteração
+    r_squared: float
+    first: float
+    last: float
+
+    def leaking(self, threshold: float) -> bool:
+        return self.slope > threshold and self.r_squared >= MIN_R_SQUARED
+
+
+def fit_trend(xs: List[float], ys: List[float]) -> Optional[Trend]:
+    """Reta de mínimos quadrados; R² = 0 quando a série é constante."""
+    if len(xs) < 3:
+        return None
+    slope, _ = statistics.linear_regression(xs, ys)
+    try:
+        r_squared = statistics.correlation(xs, ys) ** 2
+    except statistics.StatisticsError:
+        r_squared = 0.0
+    return Trend(round(slope, 2), round(r_squared, 3), ys[0], ys[-1])
+
+
+def spa_navigate(page: Page, path: str):
+    """Navega pelo roteador do app (sem recarregar o documento, como um usuário)."""
+    page.evaluate(SPA_NAVIGATE_SCRIPT, path)
+    wait_for_route_settled(page, path)
+
+
+def navigation_cycle(routes: List[str]) -> Callable[[Page, int], None]:
+    def cycle(page: Page, iteration: int):
+        for route in routes:
+            spa_navigate(page, route)
+    return cycle
+
+
+def form_cycle() -> Callable[[Page, int], None]:
+    """Abre o FormularioPCA, preenche o requisitante e dois itens e sai sem enviar."""
+    selectors = SelectorCatalog(FORM_ROUTE)
+    rng = random.Random(0)
+
+    def cycle(page: Page, iteration: int):
+        data = FormData(rng, iteration, items=2)
+        spa_navigate(page, FORM_ROUTE)
+        for field in ("responsavel", "cargo", "email", "telefone"):
+            page.locator(selectors[field]).fill(getattr(data, field))
+        for index, item in enumerate(data.items):
+            if index:
+                page.get_by_role("button", name="Adicionar Mais Um Item").click()
+            page.locator(selectors["descricao"]).nth(index).fill(item["descricao"])
+            page.locator(selectors["justificativa"]).nth(index).fill(item["justificativa"])
+        spa_navigate(page, "/")
+    return cycle
+
+
+SCENARIOS = {
+    "navegacao": lambda args: navigation_cycle(args.routes),
+    "formulario": lambda args: form_cycle(),
+}
+
+
+class HeapSnapshot:
+    """Leitura de um heap snapshot do V8 (formato .heapsnapshot do DevTools)."""
+
+    def __init__(self, data: dict, scripts: Dict[str, str]):
+        meta = data["snapshot"]["meta"]
+        self.node_fields = meta["node_fields"]
+        self.node_types = meta["node_types"][0]
+        self.edge_types = meta["edge_types"][0]
+        self.nf = len(self.node_fields)
+        self.ef = len(meta["edge_fields"])
+        self.nodes = data["nodes"]
+        self.edges = data["edges"]
+        self.strings = data["strings"]
+        self.count = len(self.nodes) // self.nf
+        self.scripts = scripts
+
+        field = self.node_fields.index
+        self.TYPE, self.NAME, self.SIZE, self.EDGES = (field(f) for f in ("type", "name", "self_size", "edge_count"))
+        self.DETACHED = field("detachedness") if "detachedness" in self.node_fields else None
+
+        self.first_edge = [0] * (self.count + 1)
+        for node in range(self.count):
+            self.first_edge[node + 1] = self.first_edge[node] + self.nodes[node * self.nf + self.EDGES] * self.ef
+
+        # Local de criação das closures: nó -> (script, linha)
+        self.locations: Dict[int, tuple] = {}
+        location_fields = meta.get("location_fields", [])
+        if location_fields and data.get("locations"):
+            lf = len(location_fields)
+            locations = data["locations"]
+            for start in range(0, len(locations), lf):
+                self.locations[locations[start] // self.nf] = (locations[start + 1], locations[start + 2])
+
+    def type_of(self, node: int) -> str:
+        return self.node_types[self.nodes[node * self.nf + self.TYPE]]
+
+    def name_of(self, node: int) -> str:
+        return self.strings[self.nodes[node * self.nf + self.NAME]]
+
+    def is_detached(self, node: int) -> bool:
+        if self.DETACHED is not None and self.nodes[node * self.nf + self.DETACHED] == 2:
+            return True
+        return self.type_of(node) == "native" and self.name_of(node).startswith("Detached ")
+
+    def _edge_name(self, edge: int) -> Optional[str]:
+        """Nome da propriedade (arestas element/hidden têm índice numérico no lugar do nome)."""
+        if self.edge_types[self.edges[edge]] in ("element", "hidden"):
+            return None
+        return self.strings[self.edges[edge + 1]]
+
+    def edge_to(self, node: int, prefix: str) -> Optional[int]:
+        """Primeiro nó apontado por uma propriedade cujo nome começa com prefix."""
+        for edge in range(self.first_edge[node], self.first_edge[node + 1], self.ef):
+            name = self._edge_name(edge)
+            if name is not None and name.startswith(prefix):
+                return self.edges[edge + 2] // self.nf
+        return None
+
+    def closure_label(self, node: int) -> str:
+        name = self.name_of(node) or "(anônima)"
+        location = self.locations.get(node)
+        if location is None:
+            return f"{name}()"
+        script, line = location
+        return f"{name}() @ {module_name(self.scripts.get(str(script), '?'))}:{line + 1}"
+
+    def type_key(self, node: int) -> Optional[str]:
+        kind = self.type_of(node)
+        if kind == "closure":
+            return self.closure_label(node)
+        if kind in ("object", "native"):
+            return self.name_of(node)
+        if kind in ("synthetic", "hidden"):
+            return None
+        return f"({kind})"
+
+    def type_counts(self) -> Dict[str, List[int]]:
+        """Quantidade e bytes (self size) dos objetos vivos por construtor/closure."""
+        counts: Dict[str, List[int]] = defaultdict(lambda: [0, 0])
+        for node in range(self.count):
+            key = self.type_key(node)
+            if key is not None:
+                counts[key][0] += 1
+                counts[key][1] += self.nodes[node * self.nf + self.SIZE]
+        return counts
+
+    def retainers(self) -> List[List[int]]:
+        """Índice reverso das arestas: quem aponta para cada nó (arestas fracas ignoradas)."""
+        retainers: List[List[int]] = [[] for _ in range(self.count)]
+        for node in range(self.count):
+            for edge in range(self.first_edge[node], self.first_edge[node + 1], self.ef):
+                if self.edge_types[self.edges[edge]] != "weak":
+                    retainers[self.edges[edge + 2] // self.nf].append(node)
+        return retainers
+
+    def _component(self, fiber: int) -> Optional[str]:
+        """Sobe pelas fibras (return) até a de um componente de função/classe."""
+        for _ in range(100):
+            component = self.edge_to(fiber, "type")
+            if component is not None and self.type_of(component) == "closure" and self.name_of(component):
+                return self.name_of(component)
+            fiber = self.edge_to(fiber, "return")
+            if fiber is None:
+                return None
+        return None
+
+    def detached_by_owner(self) -> Dict[str, int]:
+        """
+        Nós de DOM destacados agrupados pelo dono: o componente da fibra React
+        ainda ligada ao nó (__reactFiber$) ou, sem ela, a primeira closure ou
+        objeto nomeado no caminho de retenção até o DOM vivo.
+        """
+        detached = [node for node in range(self.count) if self.is_detached(node)]
+        owners: Counter = Counter()
+        unresolved = []
+        for node in detached:
+            fiber = self.edge_to(node, "__reactFiber$")
+            component = self._component(fiber) if fiber is not None else None
+            if component:
+                owners[component] += 1
+            else:
+                unresolved.append(node)
+        if unresolved:
+            retainers = self.retainers()
+            for node in unresolved:
+                owners[self._owner(node, retainers)] += 1
+        return dict(owners)
+
+    def _owner(self, node: int, retainers: List[List[int]]) -> str:
+        """Primeira closure ou objeto nomeado no caminho de retenção do nó (busca em largura)."""
+        queue, seen = deque([(node, 0)]), {node}
+        while queue:
+            current, depth = queue.popleft()
+            for parent in retainers[current]:
+                if parent in seen:
+                    continue
+                seen.add(parent)
+                if not self.is_detached(parent):
+                    kind = self.type_of(parent)
+                    if kind == "closure":
+                        return self.closure_label(parent)
+                    if kind == "object" and self.name_of(parent) not in GENERIC_RETAINERS:
+                        return self.name_of(parent)
+                if depth + 1 < MAX_RETAINER_DEPTH:
+                    queue.append((parent, depth + 1))
+        return "(retentor não identificado)"
+
+
+class HeapSampler:
+    """Medições de memória da página pelo CDP."""
+
+    def __init__(self, page: Page):
+        self.page = page
+        self.scripts: Dict[str, str] = {}
+        self._chunks: List[str] = []
+        self._cdp = page.context.new_cdp_session(page)
+        self._cdp.on("Debugger.scriptParsed", lambda params: self.scripts.__setitem__(params["scriptId"], params["url"]))
+        self._cdp.on("HeapProfiler.addHeapSnapshotChunk", lambda params: self._chunks.append(params["chunk"]))
+        for method in ("Debugger.enable", "HeapProfiler.enable", "Performance.enable"):
+            self._cdp.send(method)
+        self._cdp.send("Debugger.setSkipAllPauses", {"skip": True})
+
+    def collect_garbage(self):
+        # Duas passadas: a primeira pode liberar objetos com finalizadores pendentes
+        self._cdp.send("HeapProfiler.collectGarbage")
+        self._cdp.send("HeapProfiler.collectGarbage")
+
+    def sample(self, iteration: int) -> dict:
+        self.collect_garbage()
+        heap = self._cdp.send("Runtime.getHeapUsage")
+        metrics = {m["name"]: m["value"] for m in self._cdp.send("Performance.getMetrics")["metrics"]}
+        return {
+            "iteration": iteration,
+            "heap_used": heap["usedSize"],
+            "heap_total": heap["totalSize"],
+            "nodes": metrics.get("Nodes", 0),
+            "listeners": metrics.get("JSEventListeners", 0),
+            "documents": metrics.get("Documents", 0),
+        }
+
+    def snapshot(self, save_path: Optional[str] = None) -> HeapSnapshot:
+        self.collect_garbage()
+        self._chunks = []
+        self._cdp.send("HeapProfiler.takeHeapSnapshot", {"reportProgress": False})
+        raw = "".join(self._chunks)
+        self._chunks = []
+        if save_path:
+            with open(save_path, "w", encoding="utf-8") as f:
+                f.write(raw)
+        return HeapSnapshot(json.loads(raw), self.scripts)
+
+    def close(self):
+        try:
+            self._cdp.detach()
+        except Exception:
+            pass
+
+
+def diff_types(counts: List[Dict[str, List[int]]], limit: int = TOP_TYPES) -> List[dict]:
+    """Tipos que mais cresceram do primeiro ao último snapshot; "steady" se cresceram em todo intervalo."""
+    first, last = counts[0], counts[-1]
+    growth = []
+    for key, (count, size) in last.items():
+        before = first.get(key, [0, 0])
+        if count <= before[0]:
+            continue
+        series = [snapshot.get(key, [0, 0])[0] for snapshot in counts]
+        growth.append({
+            "type": key,
+            "count": series,
+            "added": count - before[0],
+            "bytes_added": size - before[1],
+            "steady": all(later > earlier for earlier, later in zip(series, series[1:])),
+        })
+    growth.sort(key=lambda entry: (-entry["steady"], -entry["bytes_added"]))
+    return growth[:limit]
+
+
+def diff_detached(owners: List[Dict[str, int]]) -> List[dict]:
+    """Donos de DOM destacado cuja quantidade cresceu entre o primeiro e o último snapshot."""
+    growth = []
+    for owner in set().union(*owners):
+        series = [snapshot.get(owner, 0) for snapshot in owners]
+        if series[-1] > series[0]:
+            growth.append({"owner": owner, "nodes": series, "added": series[-1] - series[0],
+                           "steady": all(later >= earlier for earlier, later in zip(series, series[1:]))})
+    return sorted(growth, key=lambda entry: -entry["added"])
+
+
+def run_leak_check(base_url: str, scenario: str, cycle: Callable[[Page, int], None], iterations: int,
+                   warmup: int = DEFAULT_WARMUP, sample_every: int = 1, snapshot_every: Optional[int] = None,
+                   save_snapshots: bool = False, timeout: float = DEFAULT_TIMEOUT,
+                   supabase_url: Optional[str] = None) -> dict:
+    snapshot_every = snapshot_every or max(1, iterations // 2)
+    stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    samples, type_counts, detached, snapshot_files = [], [], [], []
+
+    with sync_playwright() as p:
+        browser = p.chromium.launch(headless=True)
+        context = browser.new_context(viewport={"width": 1920, "height": 1080}, locale="pt-BR")
+        context.set_default_timeout(timeout * 1000)
+        if supabase_url:
+            context.add_init_script(supabase_stub.auth_init_script(supabase_url))
+        page = context.new_page()
+        page.goto(f"{base_url}/")
+        wait_for_route_settled(page)
+        sampler = HeapSampler(page)
+
+        def take_snapshot(iteration: int):
+            os.makedirs(LEAKS_DIR, exist_ok=True)
+            path = os.path.join(LEAKS_DIR, f"{scenario}_{stamp}_{iteration:04d}.heapsnapshot") if save_snapshots else None
+            snapshot = sampler.snapshot(path)
+            type_counts.append(snapshot.type_counts())
+            detached.append(snapshot.detached_by_owner())
+            if path:
+                snapshot_files.append(path)
+            print(f"  📸 Snapshot na iteração {iteration}: {snapshot.count:,} objetos, "
+                  f"{sum(detached[-1].values())} nós destacados")
+
+        try:
+            # Aquecimento: caches, chunks e estados iniciais não contam como crescimento
+            print(f"🔥 Aquecimento: {warmup} iteração(ões)")
+            for iteration in range(warmup):
+                cycle(page, -1 - iteration)
+
+            samples.append(sampler.sample(0))
+            take_snapshot(0)
+            for iteration in range(1, iterations + 1):
+                cycle(page, iteration)
+                if iteration % sample_every == 0 or iteration == iterations:
+                    samples.append(sampler.sample(iteration))
+                    last = samples[-1]
+                    print(f"  ↻ {iteration:>4}: heap {last['heap_used'] / 1024 / 1024:.1f} MB, "
+                          f"{last['nodes']:.0f} nós, {last['listeners']:.0f} listeners")
+                if iteration % snapshot_every == 0 or iteration == iterations:
+                    take_snapshot(iteration)
+        finally:
+            sampler.close()
+            browser.close()
+
+    xs = [sample["iteration"] for sample in samples]
+    trends = {}
+    for series in LEAK_THRESHOLDS:
+        trend = fit_trend(xs, [sample[series] for sample in samples])
+        if trend is not None:
+            trends[series] = {**trend._asdict(), "leaking": trend.leaking(LEAK_THRESHOLDS[series])}
+
+    return {
+        "timestamp": datetime.now().isoformat(),
+        "base_url": base_url,
+        "scenario": scenario,
+        "iterations": iterations,
+        "warmup": warmup,
+        "samples": samples,
+        "trends": trends,
+        "leaking": any(trend["leaking"] for trend in trends.values()),
+        "growing_types": diff_types(type_counts) if len(type_counts) > 1 else [],
+        "detached_dom": diff_detached(detached) if len(detached) > 1 else [],
+        "snapshots": snapshot_files,
+    }
+
+
+def print_report(report: dict):
+    print(f"\n{'=' * 80}")
+    print(f"🧪 {report['scenario']}: {report['iterations']} iterações")
+    units = {"heap_used": "bytes", "nodes": "nós", "listeners": "listeners"}
+    for series, trend in report["trends"].items():
+        status = "❌ cresce" if trend["leaking"] else "✅ estável"
+        print(f"  {status:<10} {series:<10} {trend['first']:>12,.0f} → {trend['last']:>12,.0f}  "
+              f"({trend['slope']:+,.1f} {units[series]}/iteração, R² {trend['r_squared']:.2f})")
+
+    if report["detached_dom"]:
+        print("\n🧩 DOM destacado crescendo, por dono:")
+        for entry in report["detached_dom"][:10]:
+            marker = " (a cada snapshot)" if entry["steady"] else ""
+            print(f"  +{entry['added']:<6} {entry['owner']}  {entry['nodes']}{marker}")
+
+    if report["growing_types"]:
+        print("\n📈 Objetos retidos que mais cresceram:")
+        for entry in report["growing_types"]:
+            marker = " ⚠️" if entry["steady"] else ""
+            print(f"  +{entry['added']:<6} {entry['bytes_added']:>+10,} B  {entry['type'][:90]}{marker}")
+
+
+def save_leak_report(report: dict) -> str:
+    os.makedirs(LEAKS_DIR, exist_ok=True)
+    path = os.path.join(LEAKS_DIR, f"leak_{report['scenario']}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    atomic_write_json(path, report, indent=2)
+    return path
+
+
+def main(argv=None):
+    """Repete o roteiro, mede a memória e aponta o que cresce."""
+    parser = argparse.ArgumentParser(description="Detector de vazamentos de memória por repetição")
+    parser.add_argument("--base-url", default=route_crawler.DEFAULT_BASE_URL, help="URL base da aplicação")
+    parser.add_argument("--scenario", choices=sorted(SCENARIOS), default="navegacao",
+                        help="navegacao: percorre --routes pelo SPA; formulario: preenche o FormularioPCA e sai")
+    parser.add_argument("--routes", nargs="+", default=NAVIGATION_ROUTES, metavar="ROTA",
+                        help=f"rotas do cenário navegacao (padrão: {' '.join(NAVIGATION_ROUTES)})")
+    parser.add_argument("--iterations", type=int, default=DEFAULT_ITERATIONS, help="repetições medidas")
+    parser.add_argument("--warmup", type=int, default=DEFAULT_WARMUP, help="repetições antes da primeira medida")
+    parser.add_argument("--sample-every", type=int, default=1, help="iterações entre as medidas do heap")
+    parser.add_argument("--snapshot-every", type=int, default=None,
+                        help="iterações entre os heap snapshots (padrão: metade das iterações)")
+    parser.add_argument("--save-snapshots", action="store_true",
+                        help="grava os .heapsnapshot em reports/leaks/ (abrem no DevTools)")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT, help="timeout (s) de cada ação")
+    parser.add_argument("--supabase-url", default=os.environ.get("WEBAPP_SUPABASE_URL"),
+                        help="stand-in do Supabase para autenticar a página (padrão: o do with_server.py)")
+    args = parser.parse_args(argv)
+
+    if args.iterations < 3:
+        parser.error("--iterations precisa ser pelo menos 3 para ajustar a tendência")
+
+    print("=" * 80)
+    print(f"🔎 DETECTOR DE VAZAMENTOS ({args.scenario}) - {args.base_url}")
+    print("=" * 80)
+    report = run_leak_check(
+        args.base_url, args.scenario, SCENARIOS[args.scenario](args), args.iterations,
+        warmup=args.warmup, sample_every=max(1, args.sample_every), snapshot_every=args.snapshot_every,
+        save_snapshots=args.save_snapshots, timeout=args.timeout, supabase_url=args.supabase_url,
+    )
+    print_report(report)
+    print(f"\n📄 Relatório salvo em: {save_leak_report(report)}")
+    return 1 if report["leaking"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
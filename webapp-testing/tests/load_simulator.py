@@ -0,0 +1,763 @@
+"""
+Simulador de carga: requisitantes simultâneos percorrendo o fluxo de DFDs.
+Cada usuário virtual executa a jornada completa: preenche o formulário PCA
+(DadosRequisitante + ItemContratacao), cria um DFD em /dfds/novo, anexa um
+arquivo, envia o DFD e abre /consolidacao. Os níveis de concorrência são
+executados em sequência e o relatório aponta o maior nível que ainda cumpre
+o p95 por etapa e a taxa de erro tolerada.
+
+Dois drivers:
+  - browser: asyncio + Playwright, um contexto isolado por usuário no mesmo
+    browser; os seletores vêm dos relatórios do ElementDiscovery.
+  - http: reproduz as chamadas que a aplicação faz ao Supabase (PostgREST e
+    Storage), uma sessão requests por usuário; bem mais leve, permite
+    centenas de usuários em uma única máquina.
+
+Uso: python3 tests/load_simulator.py --users 5 10 20 40 [--driver http] [--base-url URL]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+import requests
+from playwright.async_api import async_playwright
+
+import report_stream
+import route_crawler
+
+import supabase_stub
+
+LOAD_DIR = os.path.join(route_crawler.REPORTS_DIR, "load")
+SCENARIOS = ("formacao-pca", "novo-dfd", "consolidacao")
+SCENARIO_ROUTES = {"formacao-pca": "/formacao-pca", "novo-dfd": "/dfds/novo", "consolidacao": "/consolidacao"}
+DRIVERS = ("browser", "http")
+
+DEFAULT_USERS = [1, 5, 10, 20]
+DEFAULT_ITERATIONS = 1
+DEFAULT_THINK_TIME = 0.5
+DEFAULT_RAMP_UP = 2.0
+DEFAULT_P95_SLO = 3.0
+DEFAULT_MAX_ERROR_RATE = 0.01
+DEFAULT_TIMEOUT = 15.0
+DEFAULT_ITEMS = 2
+PERCENTILES = (50, 95, 99)
+
+ANEXO_BYTES = b"%PDF-1.4\n% anexo gerado pelo simulador de carga\n%%EOF\n"
+
+# Etapas que falham por um defeito conhecido da aplicação, e não pela carga.
+# Por padrão são avaliadas como as demais; com --ignore-known-defects (só no
+# driver browser, que exercita o app) continuam medidas e listadas no
+# relatório, mas não entram na taxa de erro, no p95 nem na conclusão das jornadas.
+KNOWN_DEFECTS = {
+    "formacao-pca:enviar": "useFormularioPCA não envia numero_uasg (obrigatório em dfds) "
+                           "e grava em responsaveis_dfd, tabela inexistente",
+}
+
+# Seletores usados quando o campo não aparece no relatório de descoberta da
+# rota (relatório ausente ou gerado antes de uma mudança no formulário).
+DEFAULT_SELECTORS = {
+    "unidadeGestora": "#unidadeGestora",
+    "areaRequisitante": "#areaRequisitante",
+    "responsavel": "#responsavel",
+    "cargo": "#cargo",
+    "email": "#email",
+    "telefone": "#telefone",
+    "descricao": '[id^="descricao-"]',
+    "justificativa": '[id^="justificativa-"]',
+    "quantidade": '[id^="quantidade-"]',
+    "valorUnitario": '[id^="valorUnitario-"]',
+    "dataPretendida": '[id^="dataPretendida-"]',
+    "file-upload": "#file-upload",
+}
+
+SELECT_OPTION = '[role="option"]'
+ERROR_TOAST = '[data-sonner-toast][data-type="error"], .destructive[role="status"]'
+
+
+class Sample(NamedTuple):
+    """Uma etapa executada por um usuário virtual."""
+    step: str
+    user: int
+    duration: float
+    error: Optional[str]
+
+
+class StepFailed(Exception):
+    """A etapa terminou com erro exibido pela aplicação ou pela API."""
+
+
+class LoadRecorder:
+    """Coleta as amostras de todos os usuários (threads ou tarefas asyncio)."""
+
+    def __init__(self):
+        self.samples: List[Sample] = []
+        self.journeys = 0
+        self._lock = threading.Lock()
+
+    def record(self, step: str, user: int, duration: float, error: Optional[str] = None):
+        with self._lock:
+            self.samples.append(Sample(step, user, duration, error))
+
+    def journey_done(self):
+        with self._lock:
+            self.journeys += 1
+
+
+def _error_message(error: Exception) -> str:
+    if isinstance(error, requests.HTTPError) and error.response is not None:
+        try:
+            body = error.response.json()
+            detail = body.get("message") or body.get("msg") or body.get("error") or ""
+        except ValueError:
+            detail = error.response.reason
+        return f"HTTP {error.response.status_code}: {detail}".strip()
+    return f"{type(error).__name__}: {error}"
+
+
+def percentile_summary(durations: List[float]) -> Dict[str, float]:
+    """p50/p95/p99 (segundos) de uma lista de durações."""
+    if not durations:
+        return {f"p{p}": None for p in PERCENTILES}
+    if len(durations) == 1:
+        return {f"p{p}": round(durations[0], 4) for p in PERCENTILES}
+    cuts = statistics.quantiles(durations, n=100, method="inclusive")
+    return {f"p{p}": round(cuts[p - 1], 4) for p in PERCENTILES}
+
+
+def summarize(recorder: LoadRecorder, users: int, wall_time: float,
+              known_defects: Optional[Dict[str, str]] = None) -> dict:
+    """Agrega as amostras de um nível de concorrência por etapa."""
+    known_defects = known_defects or {}
+    by_step: Dict[str, List[Sample]] = {}
+    for sample in recorder.samples:
+        by_step.setdefault(sample.step, []).append(sample)
+
+    steps = {}
+    for step, samples in by_step.items():
+        ok = [s.duration for s in samples if s.error is None]
+        errors = [s.error for s in samples if s.error is not None]
+        steps[step] = {
+            "count": len(samples),
+            "errors": len(errors),
+            "error_rate": round(len(errors) / len(samples), 4),
+            "mean": round(statistics.fmean(ok), 4) if ok else None,
+            **percentile_summary(ok),
+            "sample_errors": sorted(set(errors))[:5],
+        }
+        if step in known_defects:
+            steps[step]["known_defect"] = known_defects[step]
+
+    counted = [s for s in recorder.samples if s.step not in known_defects]
+    total = len(counted)
+    failed = sum(1 for s in counted if s.error is not None)
+    return {
+        "users": users,
+        "wall_time": round(wall_time, 3),
+        "journeys": recorder.journeys,
+        "throughput": round(recorder.journeys / wall_time, 3) if wall_time else 0.0,
+        "steps_per_second": round(len(recorder.samples) / wall_time, 3) if wall_time else 0.0,
+        "error_rate": round(failed / total, 4) if total else 0.0,
+        "steps": steps,
+    }
+
+
+def evaluate_level(summary: dict, p95_slo: float, max_error_rate: float) -> List[str]:
+    """Lista os limites violados pelo nível (vazia = nível aprovado)."""
+    violations = []
+    if summary["error_rate"] > max_error_rate:
+        violations.append(f"taxa de erro {summary['error_rate']:.1%} > {max_error_rate:.1%}")
+    for step, stats in summary["steps"].items():
+        if "known_defect" in stats:
+            continue
+        if stats["p95"] is not None and stats["p95"] > p95_slo:
+            violations.append(f"{step}: p95 {stats['p95']:.3f}s > {p95_slo:.3f}s")
+    if summary["journeys"] == 0:
+        violations.append("nenhuma jornada concluída")
+    return violations
+
+
+class LoadConfig:
+    """Parâmetros compartilhados pelos usuários virtuais de um nível."""
+
+    def __init__(self, base_url: str, scenarios: List[str], iterations: int = DEFAULT_ITERATIONS,
+                 think_time: float = DEFAULT_THINK_TIME, ramp_up: float = DEFAULT_RAMP_UP,
+                 items: int = DEFAULT_ITEMS, timeout: float = DEFAULT_TIMEOUT, seed: int = 0,
+                 supabase_url: Optional[str] = None, supabase_key: Optional[str] = None,
+                 access_token: Optional[str] = None, known_defects: Optional[Dict[str, str]] = None):
+        self.base_url = base_url.rstrip("/")
+        self.scenarios = scenarios
+        self.iterations = iterations
+        self.think_time = think_time
+        self.ramp_up = ramp_up
+        self.items = items
+        self.timeout = timeout
+        self.seed = seed
+        self.supabase_url = supabase_url.rstrip("/") if supabase_url else None
+        self.supabase_key = supabase_key
+        self.access_token = access_token
+        self.known_defects = known_defects or {}
+
+    def start_offset(self, user: int, users: int) -> float:
+        """Atraso de partida do usuário, distribuindo as chegadas pelo ramp-up."""
+        return self.ramp_up * user / users if users > 1 else 0.0
+
+
+class FormData:
+    """Dados aleatórios (mas reproduzíveis pela semente) de um requisitante."""
+
+    def __init__(self, rng: random.Random, user: int, items: int):
+        self.responsavel = f"Requisitante de Carga {user:04d}"
+        self.cargo = rng.choice(["Analista", "Técnico Administrativo", "Coordenador", "Diretor"])
+        self.email = f"carga{user:04d}@example.gov.br"
+        self.telefone = f"(61) 9{rng.randint(1000, 9999)}-{rng.randint(1000, 9999)}"
+        self.cpf = "".join(str(rng.randint(0, 9)) for _ in range(11))
+        self.justificativa = f"Demanda simulada {uuid.UUID(int=rng.getrandbits(128)).hex[:8]} para teste de carga."
+        self.descricao = "Aquisição de materiais de consumo para o teste de carga"
+        self.items = [
+            {
+                "tipo": rng.choice(["Material", "Serviço"]),
+                "descricao": f"Item {index + 1} do requisitante {user:04d}",
+                "unidade_medida": "UN",
+                "quantidade": rng.randint(1, 50),
+                "valor_unitario": round(rng.uniform(5, 500), 2),
+                "justificativa": "Reposição do estoque do setor",
+                "prioridade": rng.choice(["Baixa", "Média", "Alta"]),
+                "data_pretendida": (date.today() + timedelta(days=rng.randint(30, 300))).isoformat(),
+            }
+            for index in range(items)
+        ]
+
+    @property
+    def valor_total(self) -> float:
+        return round(sum(i["quantidade"] * i["valor_unitario"] for i in self.items), 2)
+
+
+class SelectorCatalog:
+    """
+    Seletores dos campos de uma rota, a partir do relatório do ElementDiscovery
+    (reports/routes/<rota>.json ou .ndjson). Campos repetidos por item
+    (descricao-<uuid>) viram seletores por prefixo de id.
+    """
+
+    def __init__(self, route: str):
+        self.route = route
+        self.ids = set()
+        for extension in (".json", ".ndjson"):
+            path = os.path.join(route_crawler.REPORTS_DIR, route_crawler.route_report_filename(route, extension))
+            if os.path.exists(path):
+                self.ids = self._load_ids(path, extension)
+                break
+
+    @staticmethod
+    def _load_ids(path: str, extension: str) -> set:
+        if extension == ".ndjson":
+            report = report_stream.load_report(path)
+        else:
+            with open(path, "r", encoding="utf-8") as f:
+                report = json.load(f)
+        return {
+            element["id"]
+            for elements in report.get("elements", {}).values()
+            for element in elements
+            if element.get("id")
+        }
+
+    def __getitem__(self, field: str) -> str:
+        if field in self.ids:
+            return f"#{field}"
+        if any(element_id.startswith(f"{field}-") for element_id in self.ids):
+            return f'[id^="{field}-"]'
+        return DEFAULT_SELECTORS[field]
+
+
+class SupabaseClient:
+    """Subconjunto do supabase-js usado pelo fluxo (PostgREST, Storage e Auth)."""
+
+    def __init__(self, supabase_url: str, key: str, access_token: str, timeout: float):
+        self.url = supabase_url
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.headers.update({"apikey": key, "Authorization": f"Bearer {access_token}"})
+
+    def _request(self, method: str, path: str, **kwargs) -> requests.Response:
+        response = self.session.request(method, f"{self.url}{path}", timeout=self.timeout, **kwargs)
+        response.raise_for_status()
+        return response
+
+    def user(self) -> dict:
+        return self._request("GET", "/auth/v1/user").json()
+
+    def select(self, table: str, params: Dict[str, str]) -> List[dict]:
+        return self._request("GET", f"/rest/v1/{table}", params=params).json()
+
+    def insert(self, table: str, rows: List[dict], single: bool = False):
+        headers = {"Prefer": "return=representation" if single else "return=minimal"}
+        if single:
+            headers["Accept"] = supabase_stub.SINGLE_OBJECT
+        response = self._request("POST", f"/rest/v1/{table}", params={"select": "*"} if single else None,
+                                 json=rows, headers=headers)
+        return response.json() if single else None
+
+    def update(self, table: str, values: dict, params: Dict[str, str]):
+        self._request("PATCH", f"/rest/v1/{table}", params=params, json=values,
+                      headers={"Prefer": "return=minimal"})
+
+    def upload(self, bucket: str, name: str, data: bytes, content_type: str):
+        self._request("POST", f"/storage/v1/object/{bucket}/{name}",
+                      files={"": (os.path.basename(name), data, content_type)})
+
+    def close(self):
+        self.session.close()
+
+
+class HttpUser:
+    """Usuário virtual que reproduz as chamadas HTTP da aplicação."""
+
+    def __init__(self, index: int, config: LoadConfig, recorder: LoadRecorder):
+        self.index = index
+        self.config = config
+        self.recorder = recorder
+        self.rng = random.Random(config.seed * 100_003 + index)
+        self.client = SupabaseClient(config.supabase_url, config.supabase_key,
+                                     config.access_token, config.timeout)
+        self.page_session = requests.Session()
+        self.user_id = None
+        self.uasgs = []
+        self.uasg = None
+        self.area = None
+
+    def step(self, name: str, action: Callable[[], None]):
+        """Executa e cronometra uma etapa; o erro interrompe o cenário (exceto os defeitos conhecidos)."""
+        started = time.perf_counter()
+        try:
+            action()
+        except Exception as e:
+            self.recorder.record(name, self.index, time.perf_counter() - started, _error_message(e))
+            if name in self.config.known_defects:
+                return
+            raise
+        self.recorder.record(name, self.index, time.perf_counter() - started)
+        if self.config.think_time:
+            time.sleep(self.rng.uniform(0, self.config.think_time))
+
+    def open_page(self, scenario: str):
+        response = self.page_session.get(f"{self.config.base_url}{SCENARIO_ROUTES[scenario]}",
+                                         timeout=self.config.timeout)
+        response.raise_for_status()
+
+    def load_uasgs(self):
+        self.uasgs = self.client.select("uasgs", {"select": "*", "order": "numero_uasg.asc"})
+        if not self.uasgs:
+            raise StepFailed("nenhuma UASG cadastrada")
+
+    def load_areas(self):
+        """Escolhe uma UASG e uma de suas áreas; UASGs sem áreas são trocadas, como faria o usuário."""
+        for uasg in self.rng.sample(self.uasgs, len(self.uasgs)):
+            areas = self.client.select("areas_requisitantes", {
+                "select": "*", "order": "numero.asc", "uasg_id": f"eq.{uasg['id']}",
+            })
+            if areas:
+                self.uasg = uasg
+                self.area = self.rng.choice(areas)
+                return
+        raise StepFailed("nenhuma UASG com áreas requisitantes cadastradas")
+
+    def create_dfd(self, data: FormData, **values) -> dict:
+        if self.user_id is None:
+            self.user_id = self.client.user()["id"]
+        return self.client.insert("dfds", [{
+            "user_id": self.user_id,
+            "area_requisitante_id": self.area["id"],
+            "situacao": "Rascunho",
+            "valor_total": data.valor_total,
+            "prioridade": "Média",
+            **values,
+        }], single=True)
+
+    def run_formacao_pca(self, data: FormData):
+        def enviar():
+            # Gravações que o envio do useFormularioPCA deveria fazer: com numero_uasg e o
+            # responsável em responsaveis (o hook omite um e grava em responsaveis_dfd, que
+            # não existe; o defeito é reproduzido pelo driver browser)
+            dfd = self.create_dfd(
+                data,
+                numero_uasg=self.area["numero_uasg"],
+                descricao_sucinta=f"Requisição PCA - {self.uasg['nome']}",
+                justificativa_necessidade=f"Requisição criada por {data.responsavel} ({data.cargo})",
+            )
+            self.client.insert("materiais_servicos", [{"dfd_id": dfd["id"], **item} for item in data.items])
+            self.client.insert("responsaveis", [{
+                "dfd_id": dfd["id"], "funcao": "Requisitante", "cargo": data.cargo, "nome": data.responsavel,
+                "cpf": data.cpf, "email": data.email, "telefone": data.telefone,
+            }])
+
+        self.step("formacao-pca:abrir", lambda: (self.open_page("formacao-pca"), self.load_uasgs()))
+        self.step("formacao-pca:requisitante", self.load_areas)
+        self.step("formacao-pca:enviar", enviar)
+
+    def run_novo_dfd(self, data: FormData):
+        state = {}
+
+        def salvar():
+            dfd = self.create_dfd(
+                data,
+                numero_uasg=self.area["numero_uasg"],
+                justificativa_necessidade=data.justificativa,
+                descricao_sucinta=data.descricao,
+            )
+            state["dfd"] = dfd
+            items = [{k: v for k, v in item.items() if k not in ("prioridade", "data_pretendida")}
+                     for item in data.items]
+            self.client.insert("materiais_servicos", [{"dfd_id": dfd["id"], **item} for item in items])
+            self.client.insert("responsaveis", [{
+                "dfd_id": dfd["id"], "funcao": "Requisitante", "cargo": data.cargo, "nome": data.responsavel,
+                "cpf": data.cpf, "email": data.email, "telefone": data.telefone,
+            }])
+
+        def anexar():
+            dfd_id = state["dfd"]["id"]
+            file_name = f"{self.user_id}/{dfd_id}/{int(time.time() * 1000)}-justificativa.pdf"
+            self.client.upload("dfd-anexos", file_name, ANEXO_BYTES, "application/pdf")
+            self.client.insert("anexos_dfd", [{
+                "dfd_id": dfd_id, "nome_arquivo": "justificativa.pdf", "caminho_storage": file_name,
+                "tamanho_bytes": len(ANEXO_BYTES), "tipo_mime": "application/pdf", "uploaded_by": self.user_id,
+            }])
+            self.client.select("anexos_dfd", {"select": "*", "dfd_id": f"eq.{dfd_id}", "order": "created_at.desc"})
+
+        def enviar():
+            self.client.update("dfds", {"situacao": "Enviado"}, {"id": f"eq.{state['dfd']['id']}"})
+
+        self.step("novo-dfd:abrir", lambda: (self.open_page("novo-dfd"), self.load_uasgs()))
+        self.step("novo-dfd:informacoes", self.load_areas)
+        self.step("novo-dfd:salvar", salvar)
+        self.step("novo-dfd:anexar", anexar)
+        self.step("novo-dfd:enviar", enviar)
+
+    def run_consolidacao(self, data: FormData):
+        self.step("consolidacao:abrir", lambda: self.open_page("consolidacao"))
+
+    def run(self, users: int):
+        time.sleep(self.config.start_offset(self.index, users))
+        try:
+            for _ in range(self.config.iterations):
+                data = FormData(self.rng, self.index, self.config.items)
+                completed = True
+                for scenario in self.config.scenarios:
+                    try:
+                        getattr(self, f"run_{scenario.replace('-', '_')}")(data)
+                    except Exception:
+                        completed = False
+                if completed:
+                    self.recorder.journey_done()
+        finally:
+            self.client.close()
+            self.page_session.close()
+
+
+def run_http_level(config: LoadConfig, users: int) -> LoadRecorder:
+    """Executa um nível de concorrência com o driver HTTP (uma thread por usuário)."""
+    recorder = LoadRecorder()
+    with ThreadPoolExecutor(max_workers=users) as executor:
+        futures = [executor.submit(HttpUser(index, config, recorder).run, users) for index in range(users)]
+        for future in futures:
+            future.result()
+    return recorder
+
+
+class BrowserUser:
+    """Usuário virtual que preenche os formulários em um contexto Playwright próprio."""
+
+    def __init__(self, index: int, config: LoadConfig, recorder: LoadRecorder, page):
+        self.index = index
+        self.config = config
+        self.recorder = recorder
+        self.page = page
+        self.rng = random.Random(config.seed * 100_003 + index)
+        self.catalogs = {scenario: SelectorCatalog(route) for scenario, route in SCENARIO_ROUTES.items()}
+
+    async def step(self, name: str, action):
+        started = time.perf_counter()
+        try:
+            await action()
+        except Exception as e:
+            self.recorder.record(name, self.index, time.perf_counter() - started, _error_message(e))
+            if name in self.config.known_defects:
+                return
+            raise
+        self.recorder.record(name, self.index, time.perf_counter() - started)
+        if self.config.think_time:
+            await asyncio.sleep(self.rng.uniform(0, self.config.think_time))
+
+    async def goto(self, scenario: str):
+        await self.page.goto(f"{self.config.base_url}{SCENARIO_ROUTES[scenario]}", wait_until="domcontentloaded")
+
+    async def choose_option(self, trigger):
+        """Abre um Select do Radix e escolhe uma opção aleatória."""
+        await trigger.click()
+        options = self.page.locator(SELECT_OPTION)
+        await options.first.wait_for()
+        await options.nth(self.rng.randrange(await options.count())).click()
+
+    async def wait_outcome(self, success_text: str):
+        """Espera a mensagem de sucesso; um toast de erro encerra a etapa com falha."""
+        success = self.page.get_by_text(success_text).first
+        error = self.page.locator(ERROR_TOAST).first
+        await success.or_(error).wait_for()
+        if not await success.is_visible():
+            raise StepFailed((await error.inner_text()).strip().replace("\n", " "))
+
+    async def run_formacao_pca(self, data: FormData):
+        selectors = self.catalogs["formacao-pca"]
+
+        async def abrir():
+            await self.goto("formacao-pca")
+            await self.page.locator(selectors["responsavel"]).wait_for()
+
+        async def requisitante():
+            await self.choose_option(self.page.locator(selectors["unidadeGestora"]))
+            area = self.page.locator(selectors["areaRequisitante"])
+            await self.page.wait_for_function(
+                "(el) => el && !el.disabled", arg=await area.element_handle())
+            await self.choose_option(area)
+            for field in ("responsavel", "cargo", "email", "telefone"):
+                await self.page.locator(selectors[field]).fill(getattr(data, field))
+
+        async def itens():
+            for index, item in enumerate(data.items):
+                if index:
+                    await self.page.get_by_role("button", name="Adicionar Mais Um Item").click()
+                await self.page.locator(selectors["descricao"]).nth(index).fill(item["descricao"])
+                await self.page.locator(selectors["justificativa"]).nth(index).fill(item["justificativa"])
+                await self.page.locator(selectors["quantidade"]).nth(index).fill(str(item["quantidade"]))
+                await self.page.locator(selectors["valorUnitario"]).nth(index).fill(str(item["valor_unitario"]))
+                await self.page.locator(selectors["dataPretendida"]).nth(index).fill(item["data_pretendida"])
+
+        async def enviar():
+            await self.page.get_by_role("button", name="Enviar Requisição PCA").click()
+            await self.wait_outcome("Requisição PCA Enviada com Sucesso!")
+
+        await self.step("formacao-pca:abrir", abrir)
+        await self.step("formacao-pca:requisitante", requisitante)
+        await self.step("formacao-pca:itens", itens)
+        await self.step("formacao-pca:enviar", enviar)
+
+    async def run_novo_dfd(self, data: FormData):
+        selectors = self.catalogs["novo-dfd"]
+        comboboxes = self.page.get_by_role("combobox")
+
+        async def abrir():
+            await self.goto("novo-dfd")
+            await self.page.get_by_text("Selecione uma UNIDADE GESTORA").wait_for()
+
+        async def informacoes():
+            await self.choose_option(comboboxes.nth(0))
+            await self.choose_option(comboboxes.nth(1))
+            await self.page.get_by_placeholder("Descreva a justificativa da necessidade...").fill(data.justificativa)
+            await self.page.get_by_placeholder("Descreva brevemente o objeto da contratação...").fill(data.descricao)
+
+        async def salvar():
+            await self.page.get_by_role("button", name="Salvar DFD").click()
+            await self.wait_outcome("DFD salvo com sucesso!")
+
+        async def anexar():
+            await self.page.locator(selectors["file-upload"]).set_input_files(
+                {"name": "justificativa.pdf", "mimeType": "application/pdf", "buffer": ANEXO_BYTES})
+            await self.wait_outcome("arquivo(s) enviado(s) com sucesso")
+
+        async def enviar():
+            await self.page.get_by_role("button", name="Enviar DFD").click()
+            await self.wait_outcome("DFD enviado para análise")
+
+        await self.step("novo-dfd:abrir", abrir)
+        await self.step("novo-dfd:informacoes", informacoes)
+        await self.step("novo-dfd:salvar", salvar)
+        await self.step("novo-dfd:anexar", anexar)
+        await self.step("novo-dfd:enviar", enviar)
+
+    async def run_consolidacao(self, data: FormData):
+        async def abrir():
+            await self.goto("consolidacao")
+            await self.page.wait_for_load_state("networkidle")
+
+        await self.step("consolidacao:abrir", abrir)
+
+    async def run(self, users: int):
+        await asyncio.sleep(self.config.start_offset(self.index, users))
+        for _ in range(self.config.iterations):
+            data = FormData(self.rng, self.index, self.config.items)
+            completed = True
+            for scenario in self.config.scenarios:
+                try:
+                    await getattr(self, f"run_{scenario.replace('-', '_')}")(data)
+                except Exception:
+                    completed = False
+            if completed:
+                self.recorder.journey_done()
+
+
+async def _run_browser_level(config: LoadConfig, users: int) -> LoadRecorder:
+    recorder = LoadRecorder()
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=True)
+        try:
+            contexts = []
+            for _ in range(users):
+                context = await browser.new_context()
+                context.set_default_timeout(config.timeout * 1000)
+                if config.supabase_url:
+                    await context.add_init_script(supabase_stub.auth_init_script(config.supabase_url))
+                contexts.append(context)
+            pages = [await context.new_page() for context in contexts]
+            await asyncio.gather(*(
+                BrowserUser(index, config, recorder, page).run(users) for index, page in enumerate(pages)
+            ))
+        finally:
+            await browser.close()
+    return recorder
+
+
+def run_browser_level(config: LoadConfig, users: int) -> LoadRecorder:
+    """Executa um nível de concorrência com o driver Playwright (asyncio, um contexto por usuário)."""
+    return asyncio.run(_run_browser_level(config, users))
+
+
+def run_load_test(config: LoadConfig, levels: List[int], driver: str = "http",
+                  p95_slo: float = DEFAULT_P95_SLO, max_error_rate: float = DEFAULT_MAX_ERROR_RATE,
+                  stop_on_failure: bool = True) -> dict:
+    """Executa os níveis de concorrência em ordem crescente e aponta o maior aprovado."""
+    run_level = run_http_level if driver == "http" else run_browser_level
+    results = []
+    max_users = None
+
+    for users in sorted(set(levels)):
+        print(f"\n👥 Nível: {users} usuário(s) simultâneo(s)...")
+        started = time.perf_counter()
+        recorder = run_level(config, users)
+        summary = summarize(recorder, users, time.perf_counter() - started, config.known_defects)
+        summary["violations"] = evaluate_level(summary, p95_slo, max_error_rate)
+        results.append(summary)
+        print_level(summary)
+
+        if summary["violations"]:
+            for violation in summary["violations"]:
+                print(f"   ❌ {violation}")
+            if stop_on_failure:
+                break
+        else:
+            max_users = users
+            print("   ✅ Dentro dos limites")
+
+    return {
+        "timestamp": datetime.now().isoformat(),
+        "driver": driver,
+        "base_url": config.base_url,
+        "supabase_url": config.supabase_url,
+        "scenarios": config.scenarios,
+        "iterations": config.iterations,
+        "think_time": config.think_time,
+        "p95_slo": p95_slo,
+        "max_error_rate": max_error_rate,
+        "known_defects": config.known_defects,
+        "max_concurrent_users": max_users,
+        "levels": results,
+    }
+
+
+def print_level(summary: dict):
+    print(f"   Jornadas: {summary['journeys']} em {summary['wall_time']:.2f}s "
+          f"({summary['throughput']:.2f}/s, {summary['steps_per_second']:.2f} etapas/s) | "
+          f"erros: {summary['error_rate']:.1%}")
+    print(f"   {'etapa':<28} {'n':>5} {'erros':>6} {'p50':>8} {'p95':>8} {'p99':>8}")
+    for step, stats in summary["steps"].items():
+        cells = [f"{stats[f'p{p}']:.3f}" if stats[f"p{p}"] is not None else "-" for p in PERCENTILES]
+        print(f"   {step:<28} {stats['count']:>5} {stats['errors']:>6} " + " ".join(f"{c:>8}" for c in cells))
+        if "known_defect" in stats:
+            if stats["errors"]:
+                print(f"      🐞 defeito conhecido do app, fora da avaliação: {stats['known_defect']}")
+            else:
+                print("      ℹ️  defeito conhecido não reproduzido; remova a etapa de KNOWN_DEFECTS")
+            continue
+        for message in stats["sample_errors"]:
+            print(f"      ⚠️  {message}")
+
+
+def save_load_report(report: dict) -> str:
+    os.makedirs(LOAD_DIR, exist_ok=True)
+    path = os.path.join(LOAD_DIR, f"load_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    return path
+
+
+def main(argv=None):
+    """Executa o teste de carga nos níveis de concorrência informados."""
+    parser = argparse.ArgumentParser(description="Simula requisitantes simultâneos no fluxo de DFDs")
+    parser.add_argument("--base-url", default=route_crawler.DEFAULT_BASE_URL, help="URL base da aplicação")
+    parser.add_argument("--users", nargs="+", type=int, default=DEFAULT_USERS, metavar="N",
+                        help="níveis de concorrência, em ordem crescente (padrão: 1 5 10 20)")
+    parser.add_argument("--driver", choices=DRIVERS, default="browser",
+                        help="browser (Playwright) ou http (chamadas diretas ao Supabase)")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS),
+                        help="etapas da jornada de cada usuário (padrão: todas)")
+    parser.add_argument("--iterations", type=int, default=DEFAULT_ITERATIONS, help="jornadas por usuário")
+    parser.add_argument("--items", type=int, default=DEFAULT_ITEMS, help="itens de contratação por requisição")
+    parser.add_argument("--think-time", type=float, default=DEFAULT_THINK_TIME,
+                        help="pausa máxima (s) entre as etapas de um usuário")
+    parser.add_argument("--ramp-up", type=float, default=DEFAULT_RAMP_UP,
+                        help="intervalo (s) em que as partidas dos usuários são distribuídas")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT, help="timeout (s) de cada ação")
+    parser.add_argument("--p95-slo", type=float, default=DEFAULT_P95_SLO, help="p95 máximo (s) por etapa")
+    parser.add_argument("--max-error-rate", type=float, default=DEFAULT_MAX_ERROR_RATE,
+                        help="taxa de erro máxima do nível (ex.: 0.01 = 1%%)")
+    parser.add_argument("--no-stop", action="store_true", help="continua após o primeiro nível reprovado")
+    parser.add_argument("--ignore-known-defects", action="store_true",
+                        help="tira da avaliação as etapas com defeito conhecido do app (KNOWN_DEFECTS; driver browser)")
+    parser.add_argument("--seed", type=int, default=0, help="semente dos dados gerados")
+    parser.add_argument("--supabase-url", default=os.environ.get("WEBAPP_SUPABASE_URL"),
+                        help="URL do Supabase (padrão: o stand-in exportado pelo with_server.py)")
+    parser.add_argument("--supabase-key", default=os.environ.get("VITE_SUPABASE_PUBLISHABLE_KEY"),
+                        help="chave anon do projeto (padrão: a do stand-in)")
+    parser.add_argument("--access-token", default=os.environ.get("WEBAPP_SUPABASE_TOKEN"),
+                        help="token do usuário para o driver http (padrão: o usuário de teste do stand-in)")
+    args = parser.parse_args(argv)
+
+    if args.driver == "http" and not args.supabase_url:
+        parser.error("o driver http precisa de --supabase-url (ou de WEBAPP_SUPABASE_URL)")
+
+    config = LoadConfig(
+        args.base_url, args.scenarios, iterations=args.iterations, think_time=args.think_time,
+        ramp_up=args.ramp_up, items=args.items, timeout=args.timeout, seed=args.seed,
+        supabase_url=args.supabase_url,
+        supabase_key=args.supabase_key or supabase_stub.ANON_KEY,
+        access_token=args.access_token or supabase_stub.auth_session()["access_token"],
+        known_defects=KNOWN_DEFECTS if args.ignore_known_defects and args.driver == "browser" else None,
+    )
+
+    print("=" * 80)
+    print(f"🚦 TESTE DE CARGA ({args.driver}) - {config.base_url}")
+    print("=" * 80)
+    report = run_load_test(config, args.users, args.driver, args.p95_slo, args.max_error_rate,
+                           stop_on_failure=not args.no_stop)
+
+    print("\n" + "=" * 80)
+    if report["max_concurrent_users"] is None:
+        print("❌ Nenhum nível cumpriu os limites")
+    else:
+        print(f"✅ Máximo de requisitantes simultâneos dentro dos limites: {report['max_concurrent_users']}")
+    print(f"📄 Relatório salvo em: {save_load_report(report)}")
+    return 0 if report["max_concurrent_users"] is not None else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,456 @@
+"""
+Captura de rede por rota (waterfall) e análise de requisições desperdiçadas.
+
+A captura usa o domínio Network do CDP (Chromium), que informa o que a API
+do Playwright não expõe: quem iniciou cada requisição (parser, script e o
+arquivo/linha do script), se veio do cache (memória, disco, service worker)
+e os bytes transferidos vs. decodificados. Cada requisição vira uma entrada
+compacta, no estilo HAR, com tempos em ms relativos ao início da navegação:
+
+  {"url", "method", "type", "initiator", "initiator_url", "start", "ttfb",
+   "end", "status", "cache", "encoding", "encoded_size", "decoded_size", ...}
+
+O log é gravado ao lado do relatório de elementos (<rota>.network.json).
+Sobre ele, analyze() aponta:
+
+  - duplicate:    GETs repetidos ao REST do Supabase (mesma URL e query);
+  - n_plus_one:   a mesma consulta repetida só trocando o valor de um filtro
+                  eq. (ex.: um select em uasgs ou cargos por linha da tabela);
+  - uncompressed: JS/CSS/JSON/HTML/SVG transferidos sem gzip/brotli (só
+                  contra o build de produção: o servidor de desenvolvimento
+                  do Vite não comprime nada e a gravação/replay remove o
+                  Content-Encoding);
+  - chain:        requisições de dados em série (cada uma começa logo depois
+                  que a anterior termina), que poderiam ser paralelas;
+
+com uma estimativa dos milissegundos desperdiçados por achado e por rota.
+
+Uso: python3 tests/network_capture.py reports/routes/dfds.network.json [--waterfall]
+     python3 tests/network_capture.py reports/routes/
+"""
+
+import argparse
+import json
+import os
+import sys
+from bisect import bisect_right
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, List, Optional
+from urllib.parse import parse_qsl, urlsplit
+
+from playwright.sync_api import Page
+
+import route_crawler
+
+NETWORK_SUFFIX = ".network.json"
+
+REST_PATH = "/rest/v1/"
+DATA_TYPES = {"Fetch", "XHR"}
+COMPRESSIBLE_MIME = ("javascript", "css", "json", "html", "svg", "xml", "text/plain")
+# Abaixo disso a compressão não economiza um round trip
+MIN_COMPRESSIBLE_BYTES = 1400
+# Fração típica do tamanho original após gzip em JS/CSS/JSON
+ESTIMATED_COMPRESSION_RATIO = 0.3
+# Mínimo de consultas iguais (só trocando o valor de um filtro) para um N+1
+N_PLUS_ONE_MIN = 3
+# Uma requisição que começa até CHAIN_GAP_MS depois de outra terminar depende dela
+CHAIN_GAP_MS = 50
+CHAIN_MIN = 3
+
+
+def compression_expected() -> bool:
+    """A aplicação é servida pelo build de produção (--build), que comprime os assets."""
+    return route_crawler.server_mode() == "build"
+
+
+class NetworkCapture:
+    """Registra as requisições de uma página pelo CDP (vazio fora do Chromium)."""
+
+    def __init__(self, page: Page, check_compression: bool = False):
+        self.page = page
+        self.check_compression = check_compression
+        self.entries: List[dict] = []
+        self._pending: Dict[str, dict] = {}
+        self._origin: Optional[float] = None
+        self._cdp = None
+
+    def start(self) -> bool:
+        """Começa a registrar (chamar antes do page.goto); retorna False se o CDP não estiver disponível."""
+        self.entries = []
+        self._pending = {}
+        self._origin = None
+        if self._cdp is None:
+            try:
+                self._cdp = self.page.context.new_cdp_session(self.page)
+            except Exception:
+                return False
+            self._cdp.on("Network.requestWillBeSent", self._on_request)
+            self._cdp.on("Network.requestServedFromCache", self._on_served_from_cache)
+            self._cdp.on("Network.responseReceived", self._on_response)
+            self._cdp.on("Network.dataReceived", self._on_data)
+            self._cdp.on("Network.loadingFinished", self._on_finished)
+            self._cdp.on("Network.loadingFailed", self._on_failed)
+        self._cdp.send("Network.enable")
+        return True
+
+    def stop(self, url: Optional[str] = None) -> dict:
+        """Para a captura e retorna o log (entradas + análise); pendentes ficam sem "end"."""
+        if self._cdp is not None:
+            try:
+                self._cdp.send("Network.disable")
+            except Exception:
+                pass
+        self.entries.extend(self._pending.values())
+        self._pending = {}
+        self.entries.sort(key=lambda entry: entry["start"])
+        return {
+            "timestamp": datetime.now().isoformat(),
+            "url": url or self.page.url,
+            "entries": self.entries,
+            "compression_checked": self.check_compression,
+            "analysis": analyze(self.entries, self.check_compression),
+        }
+
+    def close(self):
+        if self._cdp is not None:
+            try:
+                self._cdp.detach()
+            except Exception:
+                pass
+            self._cdp = None
+
+    def _ms(self, timestamp: float) -> float:
+        if self._origin is None:
+            self._origin = timestamp
+        return round((timestamp - self._origin) * 1000, 1)
+
+    def _on_request(self, params: dict):
+        request_id = params["requestId"]
+        redirect = params.get("redirectResponse")
+        if redirect is not None and request_id in self._pending:
+            previous = self._pending.pop(request_id)
+            previous.update(status=redirect.get("status"), end=self._ms(params["timestamp"]), redirected=True)
+            self.entries.append(previous)
+
+        initiator = params.get("initiator", {})
+        frames = initiator.get("stack", {}).get("callFrames", [])
+        initiator_url = initiator.get("url") or (frames[0]["url"] if frames else "")
+        if frames:
+            initiator_url = f"{initiator_url}:{frames[0].get('lineNumber', 0) + 1}"
+
+        request = params["request"]
+        self._pending[request_id] = {
+            "url": request["url"],
+            "method": request["method"],
+            "type": params.get("type", "Other"),
+            "initiator": initiator.get("type", "other"),
+            "initiator_url": initiator_url,
+            "start": self._ms(params["timestamp"]),
+            "status": None,
+            "cache": "network",
+            "encoding": "",
+            "mime": "",
+            "encoded_size": 0,
+            "decoded_size": 0,
+        }
+
+    def _on_served_from_cache(self, params: dict):
+        entry = self._pending.get(params["requestId"])
+        if entry is not None:
+            entry["cache"] = "memory"
+
+    def _on_response(self, params: dict):
+        entry = self._pending.get(params["requestId"])
+        if entry is None:
+            return
+        response = params["response"]
+        headers = {name.lower(): value for name, value in response.get("headers", {}).items()}
+        entry.update(
+            status=response.get("status"),
+            ttfb=round(self._ms(params["timestamp"]) - entry["start"], 1),
+            mime=response.get("mimeType", ""),
+            encoding=headers.get("content-encoding", ""),
+            protocol=response.get("protocol", ""),
+        )
+        if response.get("fromServiceWorker"):
+            entry["cache"] = "service-worker"
+        elif response.get("fromPrefetchCache"):
+            entry["cache"] = "prefetch"
+        elif response.get("fromDiskCache"):
+            entry["cache"] = "disk"
+        elif response.get("status") == 304:
+            entry["cache"] = "revalidated"
+
+    def _on_data(self, params: dict):
+        entry = self._pending.get(params["requestId"])
+        if entry is not None:
+            entry["decoded_size"] += params.get("dataLength", 0)
+
+    def _on_finished(self, params: dict):
+        entry = self._pending.pop(params["requestId"], None)
+        if entry is None:
+            return
+        entry["end"] = self._ms(params["timestamp"])
+        entry["encoded_size"] = int(params.get("encodedDataLength", 0))
+        self.entries.append(entry)
+
+    def _on_failed(self, params: dict):
+        entry = self._pending.pop(params["requestId"], None)
+        if entry is None:
+            return
+        entry["end"] = self._ms(params["timestamp"])
+        entry["error"] = "canceled" if params.get("canceled") else params.get("errorText", "failed")
+        self.entries.append(entry)
+
+
+def _duration(entry: dict) -> float:
+    return max(0.0, entry.get("end", entry["start"]) - entry["start"])
+
+
+def _busy_time(entries: List[dict]) -> float:
+    """Tempo coberto pela união dos intervalos das requisições."""
+    total, current_start, current_end = 0.0, None, None
+    for entry in sorted(entries, key=lambda e: e["start"]):
+        start, end = entry["start"], entry.get("end", entry["start"])
+        if current_end is None or start > current_end:
+            if current_end is not None:
+                total += current_end - current_start
+            current_start, current_end = start, end
+        else:
+            current_end = max(current_end, end)
+    if current_end is not None:
+        total += current_end - current_start
+    return total
+
+
+def _rest_key(entry: dict):
+    """(método, tabela, query normalizada) de uma chamada ao REST do Supabase."""
+    parts = urlsplit(entry["url"])
+    if REST_PATH not in parts.path:
+        return None
+    return entry["method"], parts.path, tuple(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+
+
+def _finding(kind: str, entries: List[dict], wasted: float, detail: str) -> dict:
+    return {
+        "kind": kind,
+        "detail": detail,
+        "count": len(entries),
+        "wasted_ms": round(wasted, 1),
+        "urls": [entry["url"] for entry in entries],
+    }
+
+
+def find_duplicates(entries: List[dict]) -> List[dict]:
+    """GETs ao REST do Supabase com a mesma URL e query; o desperdício é o tempo das repetições."""
+    groups = defaultdict(list)
+    for entry in entries:
+        key = _rest_key(entry)
+        if key is not None and key[0] in ("GET", "HEAD") and entry["cache"] == "network":
+            groups[key].append(entry)
+    findings = []
+    for (method, path, _), group in groups.items():
+        if len(group) > 1:
+            table = path.split(REST_PATH, 1)[1]
+            wasted = sum(_duration(entry) for entry in group[1:])
+            findings.append(_finding("duplicate", group, wasted, f"{method} {table} repetido {len(group)}x"))
+    return findings
+
+
+def find_n_plus_one(entries: List[dict]) -> List[dict]:
+    """
+    Mesma consulta repetida trocando só o valor de um filtro eq. (uma por
+    linha). O desperdício é o tempo ocupado pelo grupo menos o de uma única
+    consulta com in.(...).
+    """
+    groups = defaultdict(list)
+    for entry in entries:
+        key = _rest_key(entry)
+        if key is None or key[0] != "GET":
+            continue
+        method, path, query = key
+        filters = [(name, value) for name, value in query if value.startswith("eq.")]
+        for name, value in filters:
+            shape = tuple((n, "eq.*" if n == name else v) for n, v in query)
+            groups[(path, name, shape)].append((value, entry))
+
+    findings, reported = [], set()
+    for (path, column, _), members in groups.items():
+        values = {value for value, _ in members}
+        group = [entry for _, entry in members]
+        if len(values) < N_PLUS_ONE_MIN or id(group[0]) in reported:
+            continue
+        reported.update(id(entry) for entry in group)
+        table = path.split(REST_PATH, 1)[1]
+        wasted = _busy_time(group) - max(_duration(entry) for entry in group)
+        findings.append(_finding("n_plus_one", group, wasted,
+                                 f"{len(group)} consultas a {table} por {column}=eq.<valor> (use {column}=in.(...))"))
+    return findings
+
+
+def find_uncompressed(entries: List[dict]) -> List[dict]:
+    """Assets de texto sem Content-Encoding; estima o tempo de download que a compressão pouparia."""
+    findings = []
+    for entry in entries:
+        if entry["encoding"] or entry["cache"] != "network" or entry.get("error"):
+            continue
+        if not any(kind in entry["mime"] for kind in COMPRESSIBLE_MIME):
+            continue
+        if entry["encoded_size"] < MIN_COMPRESSIBLE_BYTES:
+            continue
+        download = _duration(entry) - entry.get("ttfb", 0)
+        wasted = max(0.0, download) * (1 - ESTIMATED_COMPRESSION_RATIO)
+        findings.append(_finding("uncompressed", [entry], wasted,
+                                 f"{entry['mime']} de {entry['encoded_size']} bytes sem compressão"))
+    return findings
+
+
+def find_chains(entries: List[dict], gap: float = CHAIN_GAP_MS, minimum: int = CHAIN_MIN) -> List[dict]:
+    """
+    Requisições de dados (fetch/XHR) em série: cada uma começa até gap ms
+    depois que a anterior terminou. O desperdício é a duração da cadeia menos
+    a da requisição mais longa (se todas fossem disparadas juntas).
+    """
+    data = [entry for entry in entries if entry["type"] in DATA_TYPES and "end" in entry]
+    by_end = sorted(data, key=lambda entry: entry["end"])
+    ends = [entry["end"] for entry in by_end]
+
+    successor: Dict[int, dict] = {}
+    has_predecessor = set()
+    for entry in sorted(data, key=lambda entry: entry["start"]):
+        # A requisição que terminou mais perto (antes) do início desta
+        position = bisect_right(ends, entry["start"]) - 1
+        while position >= 0 and entry["start"] - ends[position] <= gap:
+            previous = by_end[position]
+            if previous is not entry and id(previous) not in successor:
+                successor[id(previous)] = entry
+                has_predecessor.add(id(entry))
+                break
+            position -= 1
+
+    findings = []
+    for entry in data:
+        if id(entry) in has_predecessor or id(entry) not in successor:
+            continue
+        chain = [entry]
+        while id(chain[-1]) in successor:
+            chain.append(successor[id(chain[-1])])
+        if len(chain) < minimum:
+            continue
+        span = chain[-1]["end"] - chain[0]["start"]
+        wasted = span - max(_duration(link) for link in chain)
+        findings.append(_finding("chain", chain, wasted, f"{len(chain)} requisições em série ({span:.0f}ms)"))
+    return findings
+
+
+def analyze(entries: List[dict], check_compression: bool = False) -> dict:
+    """
+    Achados do log de rede e os milissegundos desperdiçados (estimados) por
+    tipo e no total. check_compression liga o uncompressed (só faz sentido
+    contra o build de produção).
+    """
+    findings = find_duplicates(entries) + find_n_plus_one(entries) + find_chains(entries)
+    if check_compression:
+        findings += find_uncompressed(entries)
+    wasted_by_kind: Dict[str, float] = defaultdict(float)
+    for finding in findings:
+        wasted_by_kind[finding["kind"]] += finding["wasted_ms"]
+
+    finished = [entry for entry in entries if "end" in entry]
+    last = max(finished, key=lambda entry: entry["end"]) if finished else None
+    return {
+        "requests": len(entries),
+        "rest_requests": sum(1 for entry in entries if REST_PATH in entry["url"]),
+        "transfer_size": sum(entry["encoded_size"] for entry in entries),
+        "from_cache": sum(1 for entry in entries if entry["cache"] != "network"),
+        # Requisição que terminou por último: a que segurou a prontidão da rota
+        "last_request": {"url": last["url"], "end": last["end"]} if last else None,
+        "wasted_ms": round(sum(wasted_by_kind.values()), 1),
+        "wasted_by_kind": {kind: round(value, 1) for kind, value in wasted_by_kind.items()},
+        "findings": sorted(findings, key=lambda finding: -finding["wasted_ms"]),
+    }
+
+
+def summarize_network(log: Optional[dict]) -> dict:
+    """Resumo da análise (para o índice do crawl)."""
+    if not log:
+        return {}
+    analysis = log["analysis"]
+    return {
+        "requests": analysis["requests"],
+        "rest_requests": analysis["rest_requests"],
+        "wasted_ms": analysis["wasted_ms"],
+        "findings": {kind: sum(1 for f in analysis["findings"] if f["kind"] == kind)
+                     for kind in analysis["wasted_by_kind"]},
+    }
+
+
+def save_network(log: dict, report_path: str) -> str:
+    """Grava o log de rede ao lado do relatório de elementos."""
+    return route_crawler.save_sidecar(report_path, NETWORK_SUFFIX, log, indent=1)
+
+
+def print_waterfall(entries: List[dict], width: int = 60):
+    """Waterfall em texto: uma barra por requisição na escala do carregamento."""
+    total = max((entry.get("end", entry["start"]) for entry in entries), default=0) or 1
+    for entry in entries:
+        start = int(entry["start"] / total * width)
+        length = max(1, int(_duration(entry) / total * width))
+        bar = " " * start + "█" * min(length, width - start)
+        path = urlsplit(entry["url"]).path[-40:]
+        print(f"  {bar:<{width}} {entry['start']:>7.0f}ms {_duration(entry):>6.0f}ms {entry['cache'][:7]:<7} {path}")
+
+
+def print_analysis(log: dict, waterfall: bool = False):
+    analysis = log["analysis"]
+    print(f"\n🌐 {log['url']}: {analysis['requests']} requisições ({analysis['rest_requests']} ao REST), "
+          f"{analysis['transfer_size']} bytes, {analysis['from_cache']} do cache")
+    if analysis["last_request"]:
+        print(f"   ⏳ última a terminar: {analysis['last_request']['url']} ({analysis['last_request']['end']:.0f}ms)")
+    if waterfall:
+        print_waterfall(log["entries"])
+    if not analysis["findings"]:
+        print("   ✅ Nenhuma requisição desperdiçada")
+        return
+    print(f"   ⚠️  {analysis['wasted_ms']:.0f}ms desperdiçados (estimativa): " +
+          ", ".join(f"{kind} {value:.0f}ms" for kind, value in analysis["wasted_by_kind"].items()))
+    for finding in analysis["findings"]:
+        print(f"   - [{finding['kind']}] {finding['detail']}: {finding['wasted_ms']:.0f}ms")
+
+
+def main(argv=None):
+    """Analisa logs de rede gravados (arquivos ou diretórios com *.network.json)."""
+    parser = argparse.ArgumentParser(description="Análise dos logs de rede da descoberta")
+    parser.add_argument("paths", nargs="+", help="arquivos .network.json ou diretórios")
+    parser.add_argument("--waterfall", action="store_true", help="imprime o waterfall de cada rota")
+    parser.add_argument("--reanalyze", action="store_true", help="refaz a análise a partir das entradas")
+    parser.add_argument("--check-compression", action="store_true",
+                        help="com --reanalyze, aponta os assets sem compressão mesmo em logs do servidor de desenvolvimento")
+    args = parser.parse_args(argv)
+
+    files = []
+    for path in args.paths:
+        if os.path.isdir(path):
+            files.extend(sorted(os.path.join(path, name) for name in os.listdir(path) if name.endswith(NETWORK_SUFFIX)))
+        else:
+            files.append(path)
+    if not files:
+        print("❌ Nenhum log de rede encontrado")
+        return 1
+
+    total = 0.0
+    for path in files:
+        with open(path, "r", encoding="utf-8") as f:
+            log = json.load(f)
+        if args.reanalyze:
+            log["analysis"] = analyze(log["entries"], args.check_compression or log.get("compression_checked", False))
+        print_analysis(log, args.waterfall)
+        total += log["analysis"]["wasted_ms"]
+
+    print(f"\n📊 {len(files)} rota(s), {total:.0f}ms desperdiçados no total (estimativa)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,346 @@
+"""
+Gravação e reprodução das respostas de rede (modo offline).
+
+Em uma execução ao vivo com --network-mode record, toda resposta recebida
+pelas páginas (documento, bundle, REST/Auth/Storage do Supabase) é gravada
+em reports/replay/. Nas execuções seguintes, com --network-mode replay, as
+requisições são interceptadas no contexto do browser (context.route) e
+respondidas a partir do disco: não é preciso servidor do app nem backend, as
+respostas chegam na velocidade da memória e as métricas deixam de oscilar com
+a latência do Supabase. Uma latência fixa, ou a medida na gravação, pode ser
+injetada em cada resposta.
+
+    reports/replay/
+        index.sqlite            requisição (método, URL, corpo) -> respostas
+        objects/ab/abcdef...    corpos das respostas, endereçados pelo sha256
+
+A URL é normalizada: a origem do app fica relativa (a porta muda entre
+execuções) e os parâmetros da query são ordenados. Uma requisição repetida
+que recebeu respostas diferentes (ex.: um select depois de um insert) é
+reproduzida na ordem da gravação; depois da última, a última se repete.
+
+Uso: python3 tests/network_replay.py list [--route /dfds]
+     python3 tests/network_replay.py clear
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from datetime import datetime
+from typing import Dict, List, NamedTuple, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+from playwright.sync_api import BrowserContext, Request, Route
+
+import route_crawler
+from atomic_file import atomic_write
+
+REPLAY_DIR = os.path.join(route_crawler.REPORTS_DIR, "replay")
+INDEX_FILENAME = "index.sqlite"
+
+RECORDED_LATENCY = "recorded"
+
+# Cabeçalhos que descrevem a transferência original, não o corpo gravado (já decodificado)
+DROPPED_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "connection", "keep-alive"}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT NOT NULL,
+    body_digest TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    status INTEGER NOT NULL,
+    headers TEXT NOT NULL,
+    digest TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    elapsed REAL NOT NULL,
+    route TEXT,
+    recorded TEXT NOT NULL,
+    PRIMARY KEY (key, body_digest, seq)
+);
+CREATE INDEX IF NOT EXISTS responses_route ON responses (route);
+"""
+
+
+class Recorded(NamedTuple):
+    status: int
+    headers: Dict[str, str]
+    digest: str
+    elapsed: float
+
+
+def request_key(method: str, url: str, base_url: str) -> str:
+    """Método + URL normalizada (origem do app relativa, query ordenada)."""
+    parts = urlsplit(url)
+    base = urlsplit(base_url)
+    origin = "" if (parts.scheme, parts.netloc) == (base.scheme, base.netloc) else f"{parts.scheme}://{parts.netloc}"
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return f"{method} {origin}{parts.path or '/'}" + (f"?{query}" if query else "")
+
+
+def body_digest(body: Optional[bytes]) -> str:
+    return hashlib.sha256(body).hexdigest() if body else ""
+
+
+def parse_latency(value: Optional[str]):
+    """--replay-latency: milissegundos fixos ou "recorded" (a latência medida na gravação)."""
+    if value is None or value == RECORDED_LATENCY:
+        return value
+    try:
+        latency = float(value)
+    except ValueError:
+        raise ValueError(f"latência inválida: {value!r} (use milissegundos ou '{RECORDED_LATENCY}')")
+    if latency < 0:
+        raise ValueError(f"latência negativa: {value!r}")
+    return latency
+
+
+def _page_route(request: Request) -> Optional[str]:
+    """Rota da página que fez a requisição (requisições de service worker não têm frame)."""
+    try:
+        return urlsplit(request.frame.page.url).path or "/"
+    except Exception:
+        return None
+
+
+class ReplayStore:
+    """Índice SQLite das respostas gravadas + corpos endereçados pelo conteúdo."""
+
+    def __init__(self, root: str = REPLAY_DIR):
+        self.root = root
+        self.objects_dir = os.path.join(root, "objects")
+        os.makedirs(self.objects_dir, exist_ok=True)
+        # As respostas chegam pelos handlers do Playwright; as escritas são serializadas pelo lock
+        self.conn = sqlite3.connect(os.path.join(root, INDEX_FILENAME), timeout=30, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+        self._lock = threading.Lock()
+
+    def _object_path(self, digest: str) -> str:
+        return os.path.join(self.objects_dir, digest[:2], digest)
+
+    def put_body(self, body: bytes) -> str:
+        digest = hashlib.sha256(body).hexdigest()
+        path = self._object_path(digest)
+        if not os.path.exists(path):
+            atomic_write(path, body)
+        return digest
+
+    def get_body(self, digest: str) -> bytes:
+        with open(self._object_path(digest), "rb") as f:
+            return f.read()
+
+    def get_meta(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_meta(self, key: str, value: str):
+        with self._lock, self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    def replace(self, key: str, request_body: str, seq: int, recorded: Recorded, size: int,
+                route: Optional[str]):
+        """Grava a resposta número seq; seq 0 descarta as respostas de gravações anteriores."""
+        with self._lock, self.conn:
+            if seq == 0:
+                self.conn.execute("DELETE FROM responses WHERE key = ? AND body_digest = ?", (key, request_body))
+            self.conn.execute(
+                "INSERT OR REPLACE INTO responses (key, body_digest, seq, status, headers, digest, size, "
+                "elapsed, route, recorded) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, request_body, seq, recorded.status, json.dumps(recorded.headers), recorded.digest,
+                 size, round(recorded.elapsed, 1), route, datetime.now().isoformat()),
+            )
+
+    def load(self) -> Dict[Tuple[str, str], List[Recorded]]:
+        """Todas as respostas gravadas, por (chave, corpo da requisição), em ordem."""
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT key, body_digest, status, headers, digest, elapsed FROM responses ORDER BY key, body_digest, seq"
+            ).fetchall()
+        responses = defaultdict(list)
+        for key, request_body, status, headers, digest, elapsed in rows:
+            responses[(key, request_body)].append(Recorded(status, json.loads(headers), digest, elapsed))
+        return responses
+
+    def entries(self, route: Optional[str] = None) -> List[tuple]:
+        query = "SELECT route, key, COUNT(*), MAX(status), SUM(size) FROM responses"
+        params = ()
+        if route is not None:
+            query += " WHERE route = ?"
+            params = (route,)
+        with self._lock:
+            return self.conn.execute(query + " GROUP BY route, key, body_digest ORDER BY route, key", params).fetchall()
+
+    def clear(self):
+        self.close()
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def close(self):
+        self.conn.close()
+
+
+class NetworkRecorder:
+    """Responde às requisições pela rede (route.fetch) e grava cada resposta no store."""
+
+    def __init__(self, store: ReplayStore, base_url: str):
+        self.store = store
+        self.base_url = base_url
+        self.recorded = 0
+        # (chave, corpo) -> (próximo seq, última resposta gravada) nesta execução
+        self._last: Dict[Tuple[str, str], Tuple[int, Recorded]] = {}
+        self._lock = threading.Lock()
+        store.set_meta("base_url", base_url)
+
+    def attach(self, context: BrowserContext):
+        context.route("**/*", self._handle)
+
+    def _handle(self, route: Route, request: Request):
+        started = time.perf_counter()
+        try:
+            # Redirecionamentos são gravados como tal; o browser segue e grava o destino
+            response = route.fetch(max_redirects=0)
+            body = response.body()
+        except Exception:
+            # Falha de rede: o browser reporta o erro normalmente e nada é gravado
+            route.continue_()
+            return
+        elapsed = (time.perf_counter() - started) * 1000
+        headers = {name: value for name, value in response.headers.items() if name not in DROPPED_HEADERS}
+        recorded = Recorded(response.status, headers, self.store.put_body(body), elapsed)
+        self._save(request, recorded, len(body))
+        route.fulfill(status=response.status, headers=headers, body=body)
+
+    def _save(self, request: Request, recorded: Recorded, size: int):
+        key = request_key(request.method, request.url, self.base_url)
+        request_body = body_digest(request.post_data_buffer)
+        with self._lock:
+            seq, last = self._last.get((key, request_body), (0, None))
+            # Respostas iguais repetidas (aquecimento do pool, recargas) ficam uma só vez
+            if last is not None and (last.status, last.digest) == (recorded.status, recorded.digest):
+                return
+            self._last[(key, request_body)] = (seq + 1, recorded)
+            self.recorded += 1
+        self.store.replace(key, request_body, seq, recorded, size, _page_route(request))
+
+    def print_summary(self):
+        print(f"\n📼 {self.recorded} resposta(s) gravada(s) em {self.store.root}")
+
+
+class NetworkReplay:
+    """Responde às requisições a partir das gravações, sem acessar a rede."""
+
+    def __init__(self, store: ReplayStore, latency=None):
+        self.store = store
+        self.latency = latency
+        self.base_url = store.get_meta("base_url") or route_crawler.DEFAULT_BASE_URL
+        self.responses = store.load()
+        # Sem o corpo da requisição: POSTs cujo corpo muda a cada execução (ex.: refresh do token)
+        self.by_key: Dict[str, List[Recorded]] = {}
+        for (key, _), recorded in self.responses.items():
+            self.by_key.setdefault(key, recorded)
+        self.served = 0
+        self.misses: Counter = Counter()
+        self._position: Counter = Counter()
+        self._bodies: Dict[str, bytes] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.responses)
+
+    def attach(self, context: BrowserContext):
+        context.route("**/*", self._handle)
+
+    def lookup(self, method: str, url: str, post_data: Optional[bytes] = None) -> Optional[Recorded]:
+        """Próxima resposta gravada para a requisição (a última se repete)."""
+        key = request_key(method, url, self.base_url)
+        slot = (key, body_digest(post_data))
+        recorded = self.responses.get(slot)
+        if recorded is None:
+            recorded = self.by_key.get(key)
+            slot = (key, None)
+        if recorded is None:
+            return None
+        with self._lock:
+            position = self._position[slot]
+            self._position[slot] += 1
+        return recorded[min(position, len(recorded) - 1)]
+
+    def _body(self, digest: str) -> bytes:
+        body = self._bodies.get(digest)
+        if body is None:
+            body = self._bodies[digest] = self.store.get_body(digest)
+        return body
+
+    def _delay(self, request: Request, recorded: Recorded):
+        delay = recorded.elapsed if self.latency == RECORDED_LATENCY else (self.latency or 0)
+        if delay <= 0:
+            return
+        try:
+            # Espera cooperativa: as outras requisições da página continuam sendo respondidas
+            request.frame.page.wait_for_timeout(delay)
+        except Exception:
+            time.sleep(delay / 1000)
+
+    def _handle(self, route: Route, request: Request):
+        recorded = self.lookup(request.method, request.url, request.post_data_buffer)
+        if recorded is None:
+            with self._lock:
+                self.misses[request_key(request.method, request.url, self.base_url)] += 1
+            route.abort("internetdisconnected")
+            return
+        self._delay(request, recorded)
+        route.fulfill(status=recorded.status, headers=recorded.headers, body=self._body(recorded.digest))
+        with self._lock:
+            self.served += 1
+
+    def print_summary(self, limit: int = 10):
+        print(f"\n📼 {self.served} resposta(s) reproduzida(s) de {self.store.root}")
+        if self.misses:
+            print(f"  ⚠️  {sum(self.misses.values())} requisição(ões) sem gravação (abortadas):")
+            for key, count in self.misses.most_common(limit):
+                print(f"     {count}x {key}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Gravações de rede para o modo offline (replay)")
+    parser.add_argument("--dir", default=REPLAY_DIR, help="diretório das gravações")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    list_parser = subparsers.add_parser("list", help="lista as respostas gravadas por rota")
+    list_parser.add_argument("--route", default=None, help="apenas as requisições feitas por esta rota")
+    subparsers.add_parser("clear", help="remove todas as gravações")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "clear":
+        ReplayStore(args.dir).clear()
+        print(f"🗑️  Gravações removidas de {args.dir}")
+        return 0
+
+    store = ReplayStore(args.dir)
+    entries = store.entries(args.route)
+    print(f"📼 Gravado a partir de {store.get_meta('base_url') or '-'}")
+    current = object()
+    for route, key, count, status, size in entries:
+        if route != current:
+            print(f"\n{route or '(sem página)'}")
+            current = route
+        print(f"  {status}  {size:>10,} B  {f'{count}x ' if count > 1 else ''}{key}")
+    print(f"\n{len(entries)} requisição(ões) gravada(s)")
+    store.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,213 @@
+"""
+Métricas de performance das páginas, coletadas junto com a descoberta.
+Usa as APIs de Performance do browser (Navigation Timing, paint, LCP,
+layout shifts, long tasks, Resource Timing) e, no Chromium, o domínio
+Performance do CDP (heap JS, nós, tempo de script/layout).
+
+Os observers são instalados como init script, antes do código do app, para
+que LCP, layout shifts e long tasks do carregamento inicial sejam registrados.
+"""
+
+import weakref
+from datetime import datetime
+from typing import Dict, Optional
+
+from playwright.sync_api import Page
+
+import route_crawler
+from page_readiness import wait_for_route_settled
+
+METRICS_SUFFIX = ".metrics.json"
+
+# Roda em todo documento carregado na página, antes dos scripts do app
+OBSERVER_SCRIPT = """
+(() => {
+    if (window.__pcaPerf) return;
+    const perf = window.__pcaPerf = { lcp: 0, layoutShifts: [], longTasks: [] };
+    const observe = (type, callback) => {
+        try {
+            new PerformanceObserver((list) => list.getEntries().forEach(callback))
+                .observe({ type, buffered: true });
+        } catch (e) {}
+    };
+    observe("largest-contentful-paint", (entry) => { perf.lcp = entry.startTime; });
+    observe("layout-shift", (entry) => {
+        if (!entry.hadRecentInput) perf.layoutShifts.push({ start: entry.startTime, value: entry.value });
+    });
+    observe("longtask", (entry) => {
+        perf.longTasks.push({ start: entry.startTime, duration: entry.duration });
+    });
+})();
+"""
+
+COLLECT_SCRIPT = """
+() => {
+    const perf = window.__pcaPerf || { lcp: 0, layoutShifts: [], longTasks: [] };
+    const round = (value) => Math.round((value || 0) * 10) / 10;
+    const nav = performance.getEntriesByType("navigation")[0] || {};
+    const paint = {};
+    performance.getEntriesByType("paint").forEach((entry) => { paint[entry.name] = entry.startTime; });
+    const fcp = paint["first-contentful-paint"] || 0;
+    // Marca publicada pelo app quando a rota termina de carregar os dados (src/lib/routeSettled.ts)
+    const settled = performance.getEntriesByName("route-settled", "mark")[0];
+
+    // CLS: maior janela de sessão (shifts a menos de 1s entre si, janela de até 5s)
+    let cls = 0, current = 0, windowStart = 0, previous = -Infinity;
+    perf.layoutShifts.forEach((shift) => {
+        if (shift.start - previous > 1000 || shift.start - windowStart > 5000) {
+            current = 0;
+            windowStart = shift.start;
+        }
+        current += shift.value;
+        previous = shift.start;
+        cls = Math.max(cls, current);
+    });
+
+    // Total Blocking Time: parcela acima de 50ms das long tasks após o FCP
+    const tbt = perf.longTasks
+        .filter((task) => task.start >= fcp)
+        .reduce((total, task) => total + Math.max(0, task.duration - 50), 0);
+
+    const resources = performance.getEntriesByType("resource");
+    // transferSize é ~0 para recursos vindos do cache (contextos do pool já
+    // aquecidos, assets immutable do --build); encodedBodySize é o tamanho
+    // do corpo entregue, com ou sem cache
+    const byType = {};
+    resources.forEach((entry) => {
+        const type = entry.initiatorType || "other";
+        const bucket = byType[type] = byType[type] || { count: 0, transfer_size: 0, encoded_size: 0, decoded_size: 0 };
+        bucket.count += 1;
+        bucket.transfer_size += entry.transferSize || 0;
+        bucket.encoded_size += entry.encodedBodySize || 0;
+        bucket.decoded_size += entry.decodedBodySize || 0;
+    });
+
+    return {
+        navigation: {
+            ttfb: round(nav.responseStart),
+            dom_interactive: round(nav.domInteractive),
+            dom_content_loaded: round(nav.domContentLoadedEventEnd),
+            load: round(nav.loadEventEnd),
+            duration: round(nav.duration),
+            route_settled: round(settled && settled.startTime),
+            transfer_size: nav.transferSize || 0,
+        },
+        paint: {
+            first_paint: round(paint["first-paint"]),
+            first_contentful_paint: round(fcp),
+            largest_contentful_paint: round(perf.lcp),
+        },
+        layout_shift: {
+            cumulative: Math.round(cls * 10000) / 10000,
+            count: perf.layoutShifts.length,
+        },
+        long_tasks: {
+            count: perf.longTasks.length,
+            total_duration: round(perf.longTasks.reduce((total, task) => total + task.duration, 0)),
+            total_blocking_time: round(tbt),
+        },
+        resources: {
+            count: resources.length,
+            transfer_size: resources.reduce((total, entry) => total + (entry.transferSize || 0), 0),
+            encoded_size: resources.reduce((total, entry) => total + (entry.encodedBodySize || 0), 0),
+            by_type: byType,
+        },
+        dom: {
+            nodes: document.getElementsByTagName("*").length,
+        },
+        js_heap: performance.memory ? {
+            used: performance.memory.usedJSHeapSize,
+            total: performance.memory.totalJSHeapSize,
+        } : {},
+    };
+}
+"""
+
+# Métricas do Performance.getMetrics (CDP) registradas no relatório
+CDP_METRICS = (
+    "JSHeapUsedSize", "JSHeapTotalSize", "Nodes", "Documents", "JSEventListeners",
+    "LayoutCount", "RecalcStyleCount", "LayoutDuration", "RecalcStyleDuration",
+    "ScriptDuration", "TaskDuration",
+)
+
+# Páginas que já receberam o init script (páginas do pool são reutilizadas)
+_instrumented = weakref.WeakSet()
+
+
+class PageMetricsCollector:
+    """Coleta as métricas de performance de cada navegação de uma página."""
+
+    def __init__(self, page: Page):
+        self.page = page
+        self.results: Dict[str, dict] = {}
+        self.last: Optional[dict] = None
+        self._cdp = None
+
+    def install(self):
+        """Registra os observers de performance para as próximas navegações."""
+        if self.page not in _instrumented:
+            self.page.add_init_script(OBSERVER_SCRIPT)
+            _instrumented.add(self.page)
+        return self
+
+    def _cdp_metrics(self) -> dict:
+        """Métricas do domínio Performance do CDP (vazio fora do Chromium)."""
+        try:
+            if self._cdp is None:
+                self._cdp = self.page.context.new_cdp_session(self.page)
+                self._cdp.send("Performance.enable")
+            response = self._cdp.send("Performance.getMetrics")
+        except Exception:
+            return {}
+        return {m["name"]: m["value"] for m in response.get("metrics", []) if m["name"] in CDP_METRICS}
+
+    def collect(self, url: Optional[str] = None) -> dict:
+        """Lê as métricas do documento atual (chamar com a rota pronta)."""
+        url = url or self.page.url
+        metrics = {"timestamp": datetime.now().isoformat(), "url": url}
+        metrics.update(self.page.evaluate(COLLECT_SCRIPT))
+
+        cdp = self._cdp_metrics()
+        if cdp:
+            metrics["cdp"] = cdp
+            metrics["js_heap"] = {"used": cdp.get("JSHeapUsedSize", 0), "total": cdp.get("JSHeapTotalSize", 0)}
+
+        self.results[url] = metrics
+        self.last = metrics
+        return metrics
+
+    def measure(self, url: str) -> dict:
+        """Navega até a URL, aguarda a rota ficar pronta e coleta as métricas."""
+        self.install()
+        self.page.goto(url)
+        wait_for_route_settled(self.page)
+        return self.collect(url)
+
+    def close(self):
+        if self._cdp is not None:
+            try:
+                self._cdp.detach()
+            except Exception:
+                pass
+            self._cdp = None
+
+
+def summarize(metrics: dict) -> dict:
+    """Resumo das principais métricas (para o índice do crawl e logs)."""
+    return {
+        "load": metrics["navigation"]["load"],
+        "route_settled": metrics["navigation"].get("route_settled", 0),
+        "first_contentful_paint": metrics["paint"]["first_contentful_paint"],
+        "largest_contentful_paint": metrics["paint"]["largest_contentful_paint"],
+        "cumulative_layout_shift": metrics["layout_shift"]["cumulative"],
+        "total_blocking_time": metrics["long_tasks"]["total_blocking_time"],
+        "resources": metrics["resources"]["count"],
+        "transfer_size": metrics["resources"]["transfer_size"],
+        "dom_nodes": metrics["dom"]["nodes"],
+        "js_heap_used": metrics["js_heap"].get("used", 0),
+    }
+
+
+def save_metrics(metrics: dict, report_path: str) -> str:
+    """Grava as métricas ao lado do relatório de elementos."""
+    return route_crawler.save_sidecar(report_path, METRICS_SUFFIX, metrics)
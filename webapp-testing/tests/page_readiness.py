@@ -0,0 +1,80 @@
+"""
+Espera pela prontidão da rota, no lugar do wait_for_load_state("networkidle").
+
+O networkidle acrescenta no mínimo 500ms sem rede a cada navegação e nunca
+chega quando o app refaz consultas em segundo plano. O app publica um sinal
+próprio (src/lib/routeSettled.ts): o atributo data-route-settled do <html>
+fica vazio enquanto a rota carrega e recebe o caminho da rota quando as
+requisições ao Supabase terminam.
+
+Páginas sem o sinal (builds antigos, outros apps) ou que não o publicam a
+tempo caem na heurística de quiescência do DOM: a rota é considerada pronta
+depois de QUIET_MS sem mutações no documento.
+"""
+
+from typing import Optional
+
+from playwright.sync_api import Page
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+
+SETTLED_ATTRIBUTE = "data-route-settled"
+DEFAULT_TIMEOUT = 15000         # ms para o sinal do app
+QUIET_MS = 200                  # ms sem mutações do DOM na heurística
+QUIESCENCE_TIMEOUT = 10000      # ms máximos esperando a quiescência
+
+# Como a espera terminou
+MARKER = "marker"
+QUIESCENCE = "quiescence"
+TIMEOUT = "timeout"
+
+SETTLED_SCRIPT = """
+([attribute, path]) => {
+    const value = document.documentElement.getAttribute(attribute);
+    return Boolean(value) && (path === null || value === path);
+}
+"""
+
+QUIESCENCE_SCRIPT = """
+([quietMs, timeoutMs]) => new Promise((resolve) => {
+    let quiet;
+    const finish = (settled) => {
+        observer.disconnect();
+        clearTimeout(quiet);
+        clearTimeout(deadline);
+        resolve(settled);
+    };
+    const observer = new MutationObserver(() => {
+        clearTimeout(quiet);
+        quiet = setTimeout(() => finish(true), quietMs);
+    });
+    observer.observe(document, { subtree: true, childList: true, attributes: true, characterData: true });
+    quiet = setTimeout(() => finish(true), quietMs);
+    const deadline = setTimeout(() => finish(false), timeoutMs);
+})
+"""
+
+
+def has_settled_signal(page: Page) -> bool:
+    """O documento atual publica o sinal de prontidão."""
+    return page.evaluate("(attribute) => document.documentElement.hasAttribute(attribute)", SETTLED_ATTRIBUTE)
+
+
+def wait_for_quiescence(page: Page, quiet_ms: int = QUIET_MS, timeout: int = QUIESCENCE_TIMEOUT) -> str:
+    """Aguarda quiet_ms sem mutações no DOM."""
+    settled = page.evaluate(QUIESCENCE_SCRIPT, [quiet_ms, timeout])
+    return QUIESCENCE if settled else TIMEOUT
+
+
+def wait_for_route_settled(page: Page, path: Optional[str] = None, timeout: int = DEFAULT_TIMEOUT) -> str:
+    """
+    Aguarda a rota atual ficar pronta (chamar após o goto). path restringe o
+    sinal a uma rota (navegações pelo próprio SPA). Retorna como a espera
+    terminou: MARKER, QUIESCENCE ou TIMEOUT.
+    """
+    if has_settled_signal(page):
+        try:
+            page.wait_for_function(SETTLED_SCRIPT, arg=[SETTLED_ATTRIBUTE, path], timeout=timeout)
+            return MARKER
+        except PlaywrightTimeoutError:
+            print(f"  ⚠️  Sinal de prontidão não publicado em {timeout}ms; usando a quiescência do DOM")
+    return wait_for_quiescence(page)
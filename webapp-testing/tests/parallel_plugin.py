@@ -0,0 +1,158 @@
+"""
+Plugin do pytest para a execução em paralelo (pytest-xdist).
+
+- Grava a duração de cada teste em reports/test_durations.json (média
+  móvel); com -n, o agendador usa esse histórico para distribuir os testes
+  dos mais longos para os mais curtos (ver duration_scheduling.py).
+- O controlador define o identificador da execução e o repassa aos workers
+  (workerinput), para que as capturas de todos caiam na mesma execução.
+- Os workers não gravam arquivos combinados em reports/: os resultados
+  coletados (ex.: o índice do crawl) voltam ao controlador em workeroutput
+  e são gravados uma única vez, ao final.
+
+Sem o xdist (ou com -n 0) o processo único faz o papel do controlador.
+"""
+
+import json
+import os
+import statistics
+from collections import defaultdict
+from typing import Dict, List
+
+import pytest
+
+import route_crawler
+from atomic_file import atomic_write_json
+
+DURATIONS_PATH = os.path.join(route_crawler.REPORTS_DIR, "test_durations.json")
+# Peso da última execução na média móvel das durações
+SMOOTHING = 0.5
+# Estimativa para testes sem histórico quando nenhum teste tem histórico
+DEFAULT_DURATION = 5.0
+
+collected_key = pytest.StashKey[Dict[str, list]]()
+run_id_key = pytest.StashKey[str]()
+recorder_key = pytest.StashKey["DurationRecorder"]()
+
+
+def is_worker(config) -> bool:
+    """Processo worker do xdist."""
+    return hasattr(config, "workerinput")
+
+
+def is_controller(config) -> bool:
+    """Controlador de uma execução distribuída (não roda testes)."""
+    return config.pluginmanager.has_plugin("dsession")
+
+
+def worker_id(config) -> str:
+    return config.workerinput["workerid"] if is_worker(config) else "master"
+
+
+def load_durations(path: str = DURATIONS_PATH) -> Dict[str, float]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f).get("durations", {})
+    except (OSError, ValueError):
+        return {}
+
+
+def save_durations(measured: Dict[str, float], path: str = DURATIONS_PATH):
+    """Atualiza a média móvel com as durações desta execução (gravação atômica)."""
+    durations = load_durations(path)
+    for nodeid, seconds in measured.items():
+        previous = durations.get(nodeid)
+        durations[nodeid] = round(seconds if previous is None else
+                                  SMOOTHING * seconds + (1 - SMOOTHING) * previous, 3)
+    atomic_write_json(path, {"durations": durations}, indent=2, sort_keys=True)
+
+
+def estimate_durations(nodeids: List[str], durations: Dict[str, float]) -> Dict[str, float]:
+    """Duração estimada de cada teste; os sem histórico recebem a mediana dos conhecidos."""
+    known = [durations[nodeid] for nodeid in nodeids if nodeid in durations]
+    fallback = statistics.median(known) if known else DEFAULT_DURATION
+    return {nodeid: durations.get(nodeid, fallback) for nodeid in nodeids}
+
+
+def shared_run_id(config) -> str:
+    """Identificador da execução: o do controlador nos workers, WEBAPP_RUN_ID ou um novo."""
+    if is_worker(config):
+        return config.workerinput["webapp_run_id"]
+    if run_id_key not in config.stash:
+        from perf_budget import current_revision
+        from screenshot_store import new_run_id
+        config.stash[run_id_key] = os.environ.get("WEBAPP_RUN_ID") or new_run_id(current_revision())
+    return config.stash[run_id_key]
+
+
+def collect(config, kind: str, entry):
+    """Guarda um resultado do processo; no controlador, os de todos os workers são juntados."""
+    config.stash.setdefault(collected_key, defaultdict(list))[kind].append(entry)
+
+
+def collected(config, kind: str) -> list:
+    return config.stash.get(collected_key, {}).get(kind, [])
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("parallel", "execução em paralelo (pytest-xdist)")
+    group.addoption("--no-duration-scheduling", action="store_true",
+                    help="usa o agendamento padrão do xdist em vez do baseado nas durações")
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_xdist_make_scheduler(config, log):
+    """Com --dist load (o padrão do -n), agenda pelas durações históricas (LPT)."""
+    if config.getoption("dist") != "load" or config.getoption("--no-duration-scheduling"):
+        return None
+    from duration_scheduling import DurationScheduling
+    return DurationScheduling(config, log, load_durations())
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_configure_node(node):
+    node.workerinput["webapp_run_id"] = shared_run_id(node.config)
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_testnodedown(node, error):
+    for kind, entries in getattr(node, "workeroutput", {}).get("webapp_collected", {}).items():
+        for entry in entries:
+            collect(node.config, kind, entry)
+
+
+class DurationRecorder:
+    """Soma setup + call + teardown de cada teste (no controlador chegam os relatórios dos workers)."""
+
+    def __init__(self):
+        self.measured: Dict[str, float] = defaultdict(float)
+
+    def pytest_runtest_logreport(self, report):
+        if report.outcome != "skipped":
+            self.measured[report.nodeid] += report.duration
+
+
+def pytest_configure(config):
+    if not is_worker(config):
+        recorder = DurationRecorder()
+        config.stash[recorder_key] = recorder
+        config.pluginmanager.register(recorder, "webapp-durations")
+
+
+def pytest_sessionfinish(session, exitstatus):
+    config = session.config
+    if is_worker(config):
+        config.workeroutput["webapp_collected"] = dict(config.stash.get(collected_key, {}))
+        return
+
+    recorder = config.stash.get(recorder_key, None)
+    if recorder is not None and recorder.measured:
+        save_durations(recorder.measured)
+
+    crawls = collected(config, "crawl")
+    if crawls:
+        order = {route: position for position, route in enumerate(route_crawler.load_routes())}
+        results = sorted((result for crawl in crawls for result in crawl["results"]),
+                         key=lambda result: order.get(result["route"], len(order)))
+        index_path = route_crawler.write_crawl_index(results, crawls[0]["base_url"])
+        print(f"\n📄 Índice do crawl salvo em: {index_path}")
@@ -0,0 +1,233 @@
+"""
+Orçamentos de performance por rota e histórico das execuções.
+Os limites ficam em budgets.json (raiz do webapp-testing); cada execução é
+gravada em uma série temporal SQLite (reports/perf_history.sqlite), usada
+para detectar regressões em relação à mediana das últimas execuções no
+mesmo modo de servidor: o Vite de desenvolvimento e o build de produção
+(--build) têm tempos e tamanhos de JS muito diferentes e não se comparam.
+
+Formato do budgets.json:
+
+    {
+      "regression": {"window": 10, "threshold": 0.2, "min_samples": 3,
+                     "metrics": ["load", "js_bytes", "dom_nodes"]},
+      "routes": {
+        "*": {"load": 5000, "dom_nodes": 3000},
+        "/dfds/novo": {"load": 6000, "elements.inputs": 80}
+      }
+    }
+
+As métricas de "*" valem para todas as rotas e são sobrescritas pelas da
+rota. Métricas de elementos usam o prefixo "elements." e vêm do bloco
+statistics da descoberta.
+"""
+
+import json
+import os
+import sqlite3
+import statistics
+import subprocess
+import threading
+from datetime import datetime
+from typing import Dict, List, NamedTuple, Optional
+
+import route_crawler
+
+BUDGET_PATH = os.path.join(route_crawler.WEBAPP_TESTING_DIR, "budgets.json")
+HISTORY_PATH = os.path.join(route_crawler.REPORTS_DIR, "perf_history.sqlite")
+# Execuções com a rede reproduzida (--network-mode replay) têm série própria
+REPLAY_HISTORY_PATH = os.path.join(route_crawler.REPORTS_DIR, "perf_history.replay.sqlite")
+
+DEFAULT_WINDOW = 10
+DEFAULT_THRESHOLD = 0.2
+DEFAULT_MIN_SAMPLES = 3
+DEFAULT_REGRESSION_METRICS = ("load", "route_settled", "largest_contentful_paint", "total_blocking_time", "js_bytes", "dom_nodes")
+ALL_ROUTES = "*"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    timestamp TEXT NOT NULL,
+    revision TEXT,
+    base_url TEXT,
+    server_mode TEXT,
+    session TEXT
+);
+CREATE TABLE IF NOT EXISTS samples (
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    route TEXT NOT NULL,
+    metric TEXT NOT NULL,
+    value REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS samples_series ON samples (route, metric, run_id);
+"""
+# Colunas adicionadas depois da primeira versão do esquema (bancos antigos são migrados)
+RUN_COLUMNS = {"server_mode": "TEXT", "session": "TEXT"}
+
+
+def flatten(metrics: Optional[dict] = None, statistics: Optional[dict] = None,
+            network: Optional[dict] = None) -> Dict[str, float]:
+    """Métricas no formato plano dos orçamentos (page_metrics, statistics e/ou log de rede)."""
+    values = {}
+    if metrics:
+        scripts = metrics["resources"]["by_type"].get("script", {})
+        values.update({
+            "load": metrics["navigation"]["load"],
+            "route_settled": metrics["navigation"].get("route_settled", 0),
+            "first_contentful_paint": metrics["paint"]["first_contentful_paint"],
+            "largest_contentful_paint": metrics["paint"]["largest_contentful_paint"],
+            "cumulative_layout_shift": metrics["layout_shift"]["cumulative"],
+            "total_blocking_time": metrics["long_tasks"]["total_blocking_time"],
+            "js_bytes": scripts.get("encoded_size", 0),
+            "transfer_size": metrics["resources"]["transfer_size"],
+            "dom_nodes": metrics["dom"]["nodes"],
+        })
+    if statistics:
+        values.update({f"elements.{category}": count for category, count in statistics.items()})
+    if network:
+        values.update({
+            "requests": network["analysis"]["requests"],
+            "rest_requests": network["analysis"]["rest_requests"],
+            "wasted_ms": network["analysis"]["wasted_ms"],
+        })
+    return values
+
+
+def load_budgets(path: str = BUDGET_PATH) -> dict:
+    """Lê o arquivo de orçamentos (vazio se não existir)."""
+    if not os.path.exists(path):
+        return {"routes": {}}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def current_revision() -> Optional[str]:
+    """Commit atual do repositório, para identificar as execuções no histórico."""
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=route_crawler.PROJECT_ROOT, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+        )
+    except OSError:
+        return None
+    return result.stdout.decode("utf-8").strip() or None
+
+
+class PerfHistory:
+    """Série temporal das métricas por rota em SQLite."""
+
+    def __init__(self, path: str = HISTORY_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Acesso a partir de threads do crawl; as escritas são serializadas pelo lock
+        self.conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+        self._migrate()
+        self._lock = threading.Lock()
+
+    def _migrate(self):
+        existing = {row[1] for row in self.conn.execute("PRAGMA table_info(runs)")}
+        with self.conn:
+            for column, kind in RUN_COLUMNS.items():
+                if column not in existing:
+                    self.conn.execute(f"ALTER TABLE runs ADD COLUMN {column} {kind}")
+            # Uma run por sessão do pytest, mesmo com vários workers do xdist
+            self.conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS runs_session ON runs (session)")
+
+    def start_run(self, base_url: str = None, server_mode: str = "dev", session: Optional[str] = None) -> int:
+        """
+        Inicia uma execução no histórico. Processos com a mesma session (os
+        workers de uma execução do xdist) compartilham a mesma run.
+        """
+        with self._lock, self.conn:
+            cursor = self.conn.execute(
+                "INSERT OR IGNORE INTO runs (timestamp, revision, base_url, server_mode, session) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (datetime.now().isoformat(), current_revision(), base_url, server_mode, session),
+            )
+            if cursor.rowcount or session is None:
+                return cursor.lastrowid
+            return self.conn.execute("SELECT id FROM runs WHERE session = ?", (session,)).fetchone()[0]
+
+    def record(self, run_id: int, route: str, values: Dict[str, float]):
+        with self._lock, self.conn:
+            self.conn.executemany(
+                "INSERT INTO samples (run_id, route, metric, value) VALUES (?, ?, ?, ?)",
+                [(run_id, route, metric, value) for metric, value in values.items()],
+            )
+
+    def recent(self, route: str, metric: str, before_run: int, window: int = DEFAULT_WINDOW) -> List[float]:
+        """Valores das últimas execuções anteriores a before_run, no mesmo modo de servidor."""
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT s.value FROM samples s JOIN runs r ON r.id = s.run_id "
+                "WHERE s.route = ? AND s.metric = ? AND s.run_id < ? "
+                "AND r.server_mode = (SELECT server_mode FROM runs WHERE id = ?) "
+                "ORDER BY s.run_id DESC LIMIT ?",
+                (route, metric, before_run, before_run, window),
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def close(self):
+        self.conn.close()
+
+
+class Violation(NamedTuple):
+    route: str
+    metric: str
+    value: float
+    limit: float
+    kind: str  # "budget" ou "regression"
+
+    def describe(self) -> str:
+        if self.kind == "budget":
+            return f"{self.route} {self.metric}={self.value:g} excede o orçamento de {self.limit:g}"
+        return f"{self.route} {self.metric}={self.value:g} regrediu em relação à mediana recente ({self.limit:g})"
+
+
+class BudgetChecker:
+    """Confere as métricas de cada rota contra os orçamentos e o histórico."""
+
+    def __init__(self, budgets: dict, history: Optional[PerfHistory] = None, base_url: str = None,
+                 threshold: Optional[float] = None, session: Optional[str] = None):
+        self.budgets = budgets
+        regression = budgets.get("regression", {})
+        self.window = regression.get("window", DEFAULT_WINDOW)
+        self.threshold = threshold if threshold is not None else regression.get("threshold", DEFAULT_THRESHOLD)
+        self.min_samples = regression.get("min_samples", DEFAULT_MIN_SAMPLES)
+        self.regression_metrics = set(regression.get("metrics", DEFAULT_REGRESSION_METRICS))
+        self.history = history
+        # Execuções distribuídas (xdist) compartilham a run pela session
+        self.run_id = history.start_run(base_url, route_crawler.server_mode(), session) if history is not None else None
+        self.violations: List[Violation] = []
+        self._lock = threading.Lock()
+
+    def limits_for(self, route: str) -> Dict[str, float]:
+        routes = self.budgets.get("routes", {})
+        return {**routes.get(ALL_ROUTES, {}), **routes.get(route, {})}
+
+    def check(self, route: str, values: Dict[str, float]) -> List[Violation]:
+        """Registra as métricas da rota no histórico e retorna as violações encontradas."""
+        found = []
+        for metric, limit in self.limits_for(route).items():
+            if metric in values and values[metric] > limit:
+                found.append(Violation(route, metric, values[metric], limit, "budget"))
+
+        if self.history is not None:
+            for metric in self.regression_metrics & values.keys():
+                recent = self.history.recent(route, metric, self.run_id, self.window)
+                if len(recent) < self.min_samples:
+                    continue
+                baseline = statistics.median(recent)
+                if baseline > 0 and values[metric] > baseline * (1 + self.threshold):
+                    found.append(Violation(route, metric, values[metric], baseline, "regression"))
+            self.history.record(self.run_id, route, values)
+
+        with self._lock:
+            self.violations.extend(found)
+        return found
+
+    def print_violations(self):
+        for violation in self.violations:
+            print(f"  ❌ {violation.describe()}")
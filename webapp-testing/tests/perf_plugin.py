@@ -0,0 +1,96 @@
+"""
+Plugin do pytest para os orçamentos de performance.
+Os testes registram as métricas de cada rota pela fixture perf_budget; ao
+final, a execução falha se algum orçamento foi excedido ou se alguma
+métrica regrediu além do limiar em relação ao histórico.
+
+A run do histórico só é criada quando um teste usa a fixture perf_budget
+(uma execução só de testes unitários não toca o histórico). Com o
+pytest-xdist, os workers compartilham a mesma run pelo identificador da
+execução repassado pelo controlador; as violações de cada worker voltam ao
+controlador, que as reporta e decide o resultado da execução.
+"""
+
+import pytest
+
+import perf_budget as budget
+
+checker_key = pytest.StashKey[budget.BudgetChecker]()
+merged_key = pytest.StashKey[list]()
+
+
+def history_path(config) -> str:
+    """Histórico das métricas; as execuções com a rede reproduzida não se misturam às ao vivo."""
+    path = config.getoption("--perf-history")
+    if path is not None:
+        return path
+    replay = config.getoption("--network-mode", default="live") == "replay"
+    return budget.REPLAY_HISTORY_PATH if replay else budget.HISTORY_PATH
+
+
+def history_enabled(config) -> bool:
+    """Sem --no-perf-history; com --js-coverage as métricas são distorcidas pela instrumentação."""
+    return not (config.getoption("--no-perf-history") or config.getoption("--js-coverage", default=False))
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("perf", "orçamentos de performance")
+    group.addoption("--perf-budget", default=budget.BUDGET_PATH,
+                    help="arquivo de orçamentos por rota (padrão: budgets.json)")
+    group.addoption("--perf-history", default=None,
+                    help="banco SQLite com o histórico das métricas (padrão: reports/perf_history.sqlite; "
+                         "com --network-mode replay, reports/perf_history.replay.sqlite)")
+    group.addoption("--perf-threshold", type=float, default=None,
+                    help="regressão tolerada em relação à mediana recente (ex.: 0.2 = 20%%)")
+    group.addoption("--no-perf-history", action="store_true",
+                    help="não grava nem compara com o histórico (apenas os orçamentos)")
+
+
+@pytest.fixture(scope="session")
+def perf_budget(pytestconfig, base_url):
+    """Verificador de orçamentos compartilhado pela sessão (por worker, com o xdist)."""
+    from parallel_plugin import shared_run_id
+
+    history = budget.PerfHistory(history_path(pytestconfig)) if history_enabled(pytestconfig) else None
+    checker = budget.BudgetChecker(
+        budget.load_budgets(pytestconfig.getoption("--perf-budget")),
+        history,
+        base_url=base_url,
+        threshold=pytestconfig.getoption("--perf-threshold"),
+        session=shared_run_id(pytestconfig),
+    )
+    pytestconfig.stash[checker_key] = checker
+    yield checker
+    if history is not None:
+        history.close()
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_testnodedown(node, error):
+    """Controlador do xdist: junta as violações encontradas pelo worker."""
+    violations = getattr(node, "workeroutput", {}).get("perf_violations", [])
+    node.config.stash.setdefault(merged_key, []).extend(budget.Violation(*v) for v in violations)
+
+
+def _violations(config) -> list:
+    checker = config.stash.get(checker_key, None)
+    return (checker.violations if checker is not None else []) + config.stash.get(merged_key, [])
+
+
+def pytest_sessionfinish(session, exitstatus):
+    config = session.config
+    if hasattr(config, "workeroutput"):
+        checker = config.stash.get(checker_key, None)
+        config.workeroutput["perf_violations"] = [list(v) for v in checker.violations] if checker else []
+        return
+    if _violations(config) and exitstatus == pytest.ExitCode.OK:
+        session.exitstatus = pytest.ExitCode.TESTS_FAILED
+
+
+def pytest_terminal_summary(terminalreporter, exitstatus, config):
+    violations = _violations(config)
+    if not violations:
+        return
+    terminalreporter.section("orçamentos de performance", sep="=", red=True)
+    for violation in violations:
+        terminalreporter.line(f"❌ {violation.describe()}")
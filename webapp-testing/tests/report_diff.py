@@ -0,0 +1,257 @@
+"""
+Diff entre dois relatórios de descoberta (save_report ou NDJSON).
+
+Para cada categoria (inputs, buttons, links...) informa os elementos que
+apareceram, os que sumiram e os que mudaram de atributos. Os elementos não
+têm identificador estável além do "index" (a posição na página), então o
+pareamento é feito em etapas, sempre por índices em hash (tempo linear):
+
+  1. elementos idênticos (todos os atributos menos o "index") e depois
+     chaves exatas, em ordem de confiança: id, data-testid, aria-label,
+     name, text, href, placeholder, src. Valores repetidos (o mesmo botão
+     "Editar" em cada linha de uma tabela) são pareados na ordem da página;
+  2. fallback aproximado para o que sobrou: índice invertido dos tokens dos
+     atributos, candidatos só pelos tokens pouco frequentes e similaridade
+     de Jaccard, com a proximidade do "index" como desempate.
+
+Uso: python3 tests/report_diff.py reports/routes/dfds.json /tmp/dfds.json [--category buttons] [--json diff.json]
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+from collections import defaultdict, deque
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import report_stream
+
+MATCH_KEYS = ("id", "data-testid", "aria-label", "name", "text", "href", "placeholder", "src")
+IGNORED_ATTRIBUTES = {"index"}
+FUZZY_THRESHOLD = 0.5
+MAX_POSTING = 50          # tokens presentes em mais elementos que isso não geram candidatos
+MAX_CANDIDATES = 20
+DEFAULT_LIMIT = 20
+
+TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+
+def load_any_report(path: str) -> dict:
+    """Lê um relatório em JSON (save_report) ou NDJSON (open_stream)."""
+    if path.endswith(".ndjson"):
+        return report_stream.load_report(path)
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _value(element: dict, field: str) -> str:
+    value = element.get(field, "")
+    if isinstance(value, list):
+        value = " ".join(value)
+    return " ".join(str(value).split())
+
+
+def _scope(element: dict) -> str:
+    """Elementos de "interactive" só se comparam com os do mesmo seletor."""
+    return element.get("selector", "")
+
+
+def _key(element: dict, field: str) -> Optional[tuple]:
+    value = _value(element, field)
+    return (_scope(element), value) if value else None
+
+
+def _tokens(element: dict) -> frozenset:
+    tokens = set()
+    for field, value in element.items():
+        if field in IGNORED_ATTRIBUTES or isinstance(value, bool) or value in ("", None):
+            continue
+        text = " ".join(value) if isinstance(value, list) else str(value)
+        tokens.update(f"{field}:{token.lower()}" for token in TOKEN_PATTERN.findall(text))
+    return frozenset(tokens)
+
+
+def _signature(element: dict) -> tuple:
+    """Todos os atributos menos o "index": elementos idênticos têm a mesma assinatura."""
+    return tuple(sorted(
+        (field, tuple(value) if isinstance(value, list) else value)
+        for field, value in element.items() if field not in IGNORED_ATTRIBUTES
+    ))
+
+
+def _changes(old: dict, new: dict) -> Dict[str, list]:
+    """Atributos com valores diferentes ({atributo: [antes, depois]})."""
+    return {
+        field: [old.get(field), new.get(field)]
+        for field in sorted(set(old) | set(new))
+        if field not in IGNORED_ATTRIBUTES and old.get(field) != new.get(field)
+    }
+
+
+def _match_exact(old: List[dict], new: List[dict], old_free: set, new_free: set,
+                 pairs: List[Tuple[int, int, str]]):
+    """Pareamento pelas chaves exatas: elementos idênticos primeiro, depois uma passada por chave."""
+    for field in ("identical",) + MATCH_KEYS:
+        key = _signature if field == "identical" else lambda element, field=field: _key(element, field)
+        buckets: Dict[tuple, deque] = defaultdict(deque)
+        for j in sorted(new_free):
+            value = key(new[j])
+            if value:
+                buckets[value].append(j)
+        if not buckets:
+            continue
+        for i in sorted(old_free):
+            value = key(old[i])
+            if not value:
+                continue
+            bucket = buckets.get(value)
+            while bucket and bucket[0] not in new_free:
+                bucket.popleft()
+            if bucket:
+                j = bucket.popleft()
+                old_free.discard(i)
+                new_free.discard(j)
+                pairs.append((i, j, field))
+
+
+def _match_fuzzy(old: List[dict], new: List[dict], old_free: set, new_free: set,
+                 pairs: List[Tuple[int, int, str]], threshold: float = FUZZY_THRESHOLD):
+    """Pareamento aproximado pelos tokens dos atributos (índice invertido)."""
+    if not old_free or not new_free:
+        return
+    new_tokens = {j: _tokens(new[j]) for j in new_free}
+    postings: Dict[tuple, List[int]] = defaultdict(list)
+    for j in sorted(new_free):
+        for token in new_tokens[j]:
+            postings[(_scope(new[j]), token)].append(j)
+
+    for i in sorted(old_free):
+        tokens = _tokens(old[i])
+        scope = _scope(old[i])
+        counts: Dict[int, int] = defaultdict(int)
+        for token in tokens:
+            posting = postings.get((scope, token))
+            if posting and len(posting) <= MAX_POSTING:
+                for j in posting:
+                    if j in new_free:
+                        counts[j] += 1
+        if not counts:
+            continue
+
+        position = old[i].get("index", i)
+        best, best_score = None, (threshold, 0)
+        for j, _ in sorted(counts.items(), key=lambda item: -item[1])[:MAX_CANDIDATES]:
+            union = len(tokens | new_tokens[j])
+            similarity = len(tokens & new_tokens[j]) / union if union else 0.0
+            score = (similarity, -abs(new[j].get("index", j) - position))
+            if score >= best_score:
+                best, best_score = j, score
+        if best is not None:
+            old_free.discard(i)
+            new_free.discard(best)
+            pairs.append((i, best, "fuzzy"))
+
+
+def diff_category(old: List[dict], new: List[dict], fuzzy: bool = True) -> dict:
+    """Diff de uma categoria: adicionados, removidos, alterados e como cada par foi casado."""
+    old_free, new_free = set(range(len(old))), set(range(len(new)))
+    pairs: List[Tuple[int, int, str]] = []
+    _match_exact(old, new, old_free, new_free, pairs)
+    if fuzzy:
+        _match_fuzzy(old, new, old_free, new_free, pairs)
+
+    matched_by: Dict[str, int] = defaultdict(int)
+    changed = []
+    for i, j, method in sorted(pairs):
+        matched_by[method] += 1
+        changes = _changes(old[i], new[j])
+        if changes:
+            changed.append({"old_index": old[i].get("index", i), "new_index": new[j].get("index", j),
+                            "matched_by": method, "changes": changes, "element": new[j]})
+
+    return {
+        "added": [new[j] for j in sorted(new_free)],
+        "removed": [old[i] for i in sorted(old_free)],
+        "changed": changed,
+        "unchanged": len(pairs) - len(changed),
+        "matched_by": dict(matched_by),
+    }
+
+
+def diff_reports(old: dict, new: dict, categories: Optional[Iterable[str]] = None, fuzzy: bool = True) -> dict:
+    """Diff de todas as categorias (ou das informadas) de dois relatórios."""
+    old_elements, new_elements = old.get("elements", {}), new.get("elements", {})
+    names = list(categories) if categories else \
+        [c for c in report_stream.CATEGORIES if c in old_elements or c in new_elements]
+    result = {
+        "old": {"url": old.get("url"), "timestamp": old.get("timestamp")},
+        "new": {"url": new.get("url"), "timestamp": new.get("timestamp")},
+        "categories": {},
+    }
+    for category in names:
+        result["categories"][category] = diff_category(
+            old_elements.get(category, []), new_elements.get(category, []), fuzzy)
+    return result
+
+
+def has_differences(diff: dict) -> bool:
+    return any(c["added"] or c["removed"] or c["changed"] for c in diff["categories"].values())
+
+
+def describe_element(element: dict) -> str:
+    for field in MATCH_KEYS:
+        value = _value(element, field)
+        if value:
+            return f"{field}={value[:60]!r}"
+    return f"index={element.get('index')}"
+
+
+def print_diff(diff: dict, limit: int = DEFAULT_LIMIT):
+    print(f"\n🔍 {diff['old']['url'] or 'antigo'} ({diff['old']['timestamp']}) → "
+          f"{diff['new']['url'] or 'novo'} ({diff['new']['timestamp']})")
+    for category, result in diff["categories"].items():
+        counts = f"+{len(result['added'])} -{len(result['removed'])} ~{len(result['changed'])} " \
+                 f"={result['unchanged']}"
+        print(f"\n📂 {category}: {counts}")
+        for element in result["added"][:limit]:
+            print(f"   + {describe_element(element)}")
+        for element in result["removed"][:limit]:
+            print(f"   - {describe_element(element)}")
+        for change in result["changed"][:limit]:
+            details = ", ".join(f"{field}: {before!r} → {after!r}" for field, (before, after) in
+                                change["changes"].items())
+            print(f"   ~ {describe_element(change['element'])} [{change['matched_by']}] {details}")
+        hidden = sum(max(0, len(result[k]) - limit) for k in ("added", "removed", "changed"))
+        if hidden:
+            print(f"   ... e mais {hidden} diferença(s) (use --limit ou --json)")
+
+
+def main(argv=None):
+    """Compara dois relatórios de descoberta; sai com 1 se houver diferenças."""
+    parser = argparse.ArgumentParser(description="Diff entre dois relatórios de descoberta de elementos")
+    parser.add_argument("old", help="relatório antigo (.json ou .ndjson)")
+    parser.add_argument("new", help="relatório novo (.json ou .ndjson)")
+    parser.add_argument("--category", nargs="+", choices=report_stream.CATEGORIES, metavar="CATEGORIA",
+                        help="categorias a comparar (padrão: todas)")
+    parser.add_argument("--no-fuzzy", action="store_true", help="desliga o pareamento aproximado")
+    parser.add_argument("--limit", type=int, default=DEFAULT_LIMIT, help="diferenças listadas por tipo e categoria")
+    parser.add_argument("--json", metavar="ARQUIVO", help="grava o diff completo em JSON")
+    args = parser.parse_args(argv)
+
+    for path in (args.old, args.new):
+        if not os.path.exists(path):
+            parser.error(f"relatório não encontrado: {path}")
+
+    diff = diff_reports(load_any_report(args.old), load_any_report(args.new), args.category, not args.no_fuzzy)
+    print_diff(diff, args.limit)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(diff, f, indent=2, ensure_ascii=False)
+        print(f"\n📄 Diff salvo em: {args.json}")
+    return 1 if has_differences(diff) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
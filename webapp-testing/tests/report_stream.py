@@ -0,0 +1,191 @@
+"""
+Relatórios de descoberta em NDJSON (um objeto JSON por linha).
+Os elementos são gravados à medida que são descobertos, sem montar o
+relatório em memória nem serializá-lo de uma vez. A extração da página
+(page.evaluate ou o índice do BeautifulSoup) ainda lê todos os elementos
+de uma vez, então o pico de memória segue proporcional ao tamanho da
+página. Formato das linhas:
+
+    {"meta": {"timestamp": ..., "url": ...}}
+    {"category": "buttons", "element": {"index": 0, "text": ...}}
+    ...
+    {"statistics": {"inputs": 3, "buttons": 12, ...}}
+
+O leitor percorre o arquivo linha a linha e filtra por categoria antes de
+fazer o parse do JSON, então consultas não carregam o arquivo inteiro.
+"""
+
+import json
+import os
+from typing import Callable, Dict, Iterable, Iterator, Optional, Tuple
+
+import route_crawler
+
+CATEGORIES = ("inputs", "buttons", "links", "forms", "headings", "images", "interactive")
+
+
+def _category_prefix(category: str) -> str:
+    return '{"category": ' + json.dumps(category, ensure_ascii=False) + ","
+
+
+class NDJSONReportWriter:
+    """Grava um relatório de descoberta em NDJSON, elemento por elemento."""
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._file = open(path, "w", encoding="utf-8")
+        self.counts: Dict[str, int] = {category: 0 for category in CATEGORIES}
+
+    def _write(self, record: dict):
+        self._file.write(json.dumps(record, ensure_ascii=False))
+        self._file.write("\n")
+
+    def write_meta(self, **fields):
+        """Grava a linha de metadados (timestamp, url...)."""
+        self._write({"meta": fields})
+
+    def write_element(self, category: str, element_info: dict):
+        """Grava um elemento descoberto."""
+        self._write({"category": category, "element": element_info})
+        self.counts[category] = self.counts.get(category, 0) + 1
+
+    def write_statistics(self, statistics: Optional[dict] = None):
+        """Grava a linha final de estatísticas (por padrão, as contagens gravadas)."""
+        self._write({"statistics": statistics if statistics is not None else dict(self.counts)})
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class StreamingReportMixin:
+    """
+    Gravação opcional do relatório em NDJSON para as classes de descoberta.
+    Requer o atributo discovered_elements; as subclasses podem sobrescrever
+    _log e _stream_closed (ex.: para gravar os arquivos auxiliares).
+    """
+
+    stream: Optional[NDJSONReportWriter] = None
+
+    def _log(self, message: str = ""):
+        print(message)
+
+    def open_stream(self, filename: str) -> str:
+        """
+        Passa a gravar os elementos em NDJSON (reports/<filename>) à medida que
+        são descobertos, sem acumulá-los em discovered_elements.
+        """
+        filepath = os.path.join(route_crawler.REPORTS_DIR, filename)
+        self.stream = NDJSONReportWriter(filepath)
+        return filepath
+
+    def _add_element(self, category: str, element_info: dict):
+        """Registra um elemento no relatório em memória ou no stream NDJSON."""
+        if self.stream is not None:
+            self.stream.write_element(category, element_info)
+        else:
+            self.discovered_elements["elements"][category].append(element_info)
+
+    def _close_stream(self, statistics: dict = None):
+        """Finaliza o stream com a linha de estatísticas."""
+        self.stream.write_statistics(statistics)
+        self.stream.close()
+        self._log(f"\n📄 Relatório NDJSON salvo em: {self.stream.path}")
+        self._stream_closed(self.stream.path)
+        self.stream = None
+
+    def _stream_closed(self, path: str):
+        """Chamado depois que o relatório NDJSON foi finalizado."""
+
+    def discard_stream(self):
+        """
+        Fecha o stream que não chegou a ser finalizado (descoberta com erro) e
+        remove o arquivo truncado, que não teria a linha de estatísticas.
+        Sem stream aberto, não faz nada; chamar em um finally.
+        """
+        if self.stream is None:
+            return
+        self.stream.close()
+        if os.path.exists(self.stream.path):
+            os.remove(self.stream.path)
+        self.stream = None
+
+
+def iter_records(path: str) -> Iterator[dict]:
+    """Percorre todas as linhas do relatório."""
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def iter_elements(path: str, categories: Optional[Iterable[str]] = None,
+                  where: Optional[Callable[[dict], bool]] = None) -> Iterator[Tuple[str, dict]]:
+    """
+    Retorna (categoria, elemento) para os elementos do relatório.
+
+    categories restringe as categorias lidas (as demais linhas nem passam
+    pelo parse do JSON); where filtra os elementos já decodificados.
+    """
+    prefixes = tuple(_category_prefix(c) for c in categories) if categories else ('{"category": ',)
+
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.startswith(prefixes):
+                continue
+            record = json.loads(line)
+            element = record["element"]
+            if where is None or where(element):
+                yield record["category"], element
+
+
+def read_meta(path: str) -> dict:
+    """Lê apenas a primeira linha (metadados)."""
+    with open(path, "r", encoding="utf-8") as f:
+        first = f.readline()
+    return json.loads(first).get("meta", {}) if first.strip() else {}
+
+
+def read_statistics(path: str, block_size: int = 4096) -> dict:
+    """
+    Lê apenas a última linha (estatísticas), a partir do fim do arquivo.
+    Retorna {} se o relatório não foi finalizado (sem a linha de estatísticas).
+    """
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        position = f.tell()
+        tail = b""
+        while position > 0:
+            step = min(block_size, position)
+            position -= step
+            f.seek(position)
+            tail = f.read(step) + tail
+            lines = tail.rstrip(b"\n").split(b"\n")
+            if len(lines) > 1 or position == 0:
+                try:
+                    record = json.loads(lines[-1].decode("utf-8"))
+                except ValueError:
+                    # Relatório truncado no meio de uma linha (processo interrompido)
+                    return {}
+                return record.get("statistics", {})
+    return {}
+
+
+def load_report(path: str) -> dict:
+    """Reconstrói o relatório no formato JSON de save_report."""
+    report = {"elements": {category: [] for category in CATEGORIES}, "statistics": {}}
+    for record in iter_records(path):
+        if "element" in record:
+            report["elements"].setdefault(record["category"], []).append(record["element"])
+        elif "meta" in record:
+            report = {**record["meta"], **report}
+        elif "statistics" in record:
+            report["statistics"] = record["statistics"]
+    return report
@@ -0,0 +1,149 @@
+"""
+Modo crawl da descoberta de elementos.
+Lê a tabela de rotas de src/App.tsx (ou uma lista fornecida) e executa a
+descoberta de todas as rotas em paralelo, com um pool limitado de workers.
+Gera um relatório por rota e um índice combinado.
+"""
+
+import os
+import re
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+WEBAPP_TESTING_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROJECT_ROOT = os.path.dirname(WEBAPP_TESTING_DIR)
+APP_TSX_PATH = os.path.join(PROJECT_ROOT, "src", "App.tsx")
+REPORTS_DIR = os.path.join(WEBAPP_TESTING_DIR, "reports")
+# Módulos de scripts/ (servidor, stand-in do Supabase, gravação atômica) usados pelos testes
+SCRIPTS_DIR = os.path.join(WEBAPP_TESTING_DIR, "scripts")
+if SCRIPTS_DIR not in sys.path:
+    sys.path.insert(0, SCRIPTS_DIR)
+
+from atomic_file import atomic_write_json  # noqa: E402
+
+# O with_server.py informa a porta escolhida (pode não ser a 5173) via WEBAPP_BASE_URL
+DEFAULT_BASE_URL = os.environ.get("WEBAPP_BASE_URL", "http://localhost:5173")
+# ... e o modo do servidor ("dev" ou "build") via WEBAPP_SERVER_MODE
+SERVER_MODE_ENV = "WEBAPP_SERVER_MODE"
+
+# Relatórios por rota ficam em reports/routes/, o índice em reports/
+ROUTES_SUBDIR = "routes"
+INDEX_FILENAME = "crawl_index.json"
+DEFAULT_WORKERS = 4
+
+# <Route path="/dfds/novo" element={<NovoDFD />} />
+ROUTE_PATTERN = re.compile(r'<Route\s+path="([^"]+)"\s+element=\{<(\w+)\s*/>\}')
+
+
+def server_mode() -> str:
+    """Modo do servidor da aplicação (sem o with_server.py, o Vite de desenvolvimento)."""
+    return os.environ.get(SERVER_MODE_ENV) or "dev"
+
+
+def parse_app_routes(app_tsx_path: str = APP_TSX_PATH) -> List[Dict[str, str]]:
+    """Extrai as rotas (path e componente) declaradas em src/App.tsx, sem o catch-all."""
+    with open(app_tsx_path, "r", encoding="utf-8") as f:
+        source = f.read()
+
+    routes = []
+    for path, component in ROUTE_PATTERN.findall(source):
+        if "*" in path or ":" in path:
+            continue
+        routes.append({"path": path, "component": component})
+    return routes
+
+
+def load_routes(app_tsx_path: str = APP_TSX_PATH) -> List[str]:
+    """Retorna apenas os paths das rotas de src/App.tsx."""
+    return [route["path"] for route in parse_app_routes(app_tsx_path)]
+
+
+def route_slug(route: str) -> str:
+    """Converte uma rota em um nome de arquivo ("/" -> "root", "/dfds/novo" -> "dfds_novo")."""
+    slug = re.sub(r"[^A-Za-z0-9]+", "_", route.strip("/")).strip("_")
+    return slug or "root"
+
+
+def route_report_filename(route: str, extension: str = ".json") -> str:
+    """Caminho do relatório da rota, relativo a reports/."""
+    return os.path.join(ROUTES_SUBDIR, f"{route_slug(route)}{extension}")
+
+
+def sidecar_path(report_path: str, suffix: str) -> str:
+    """Caminho de um arquivo auxiliar (métricas, rede, cobertura) ao lado do relatório de elementos."""
+    root, _ = os.path.splitext(report_path)
+    return f"{root}{suffix}"
+
+
+def save_sidecar(report_path: str, suffix: str, data: dict, indent: int = 2) -> str:
+    """Grava um arquivo auxiliar ao lado do relatório de elementos (gravação atômica)."""
+    path = sidecar_path(report_path, suffix)
+    atomic_write_json(path, data, indent=indent)
+    return path
+
+
+def crawl(routes: List[str], discover_route: Callable[[str], Optional[dict]],
+          max_workers: int = DEFAULT_WORKERS) -> List[dict]:
+    """
+    Executa discover_route para cada rota com um pool limitado de threads.
+
+    discover_route recebe a rota e retorna um dicionário com "report" e
+    "statistics" (ou None em caso de falha). O resultado mantém a ordem
+    das rotas recebidas.
+    """
+    results: Dict[str, dict] = {}
+
+    def timed(route: str):
+        start = time.perf_counter()
+        try:
+            return discover_route(route), None, time.perf_counter() - start
+        except Exception as e:
+            return None, str(e), time.perf_counter() - start
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        futures = {executor.submit(timed, route): route for route in routes}
+
+        for future in as_completed(futures):
+            route = futures[future]
+            summary, error, elapsed = future.result()
+            duration = round(elapsed, 3)
+            if error is None and not summary:
+                error = "descoberta falhou"
+
+            entry = {
+                "route": route,
+                "status": "ok" if error is None else "error",
+                "duration": duration,
+                "report": summary.get("report", "") if summary else "",
+                "statistics": summary.get("statistics", {}) if summary else {},
+            }
+            if error is not None:
+                entry["error"] = error
+            results[route] = entry
+
+            icon = "✅" if error is None else "❌"
+            print(f"  {icon} {route} ({duration}s){'' if error is None else f' - {error}'}")
+
+    return [results[route] for route in routes]
+
+
+def write_crawl_index(results: List[dict], base_url: str, filename: str = INDEX_FILENAME) -> str:
+    """Salva o índice combinado do crawl em reports/."""
+    os.makedirs(REPORTS_DIR, exist_ok=True)
+    filepath = os.path.join(REPORTS_DIR, filename)
+
+    index = {
+        "timestamp": datetime.now().isoformat(),
+        "base_url": base_url,
+        "routes": results,
+        "totals": {
+            "routes": len(results),
+            "failed": sum(1 for r in results if r["status"] != "ok"),
+        },
+    }
+
+    atomic_write_json(filepath, index, indent=2)
+    return filepath
@@ -0,0 +1,357 @@
+"""
+Armazenamento das capturas de tela das execuções, endereçado pelo conteúdo.
+
+Cada captura é identificada pelo sha256 dos pixels (não do PNG), então a
+mesma página renderizada igual em execuções diferentes ocupa um único blob.
+Capturas quase iguais à última captura completa do mesmo nome são gravadas
+como delta: apenas os blocos (TILE x TILE) que mudaram, comprimidos, com
+referência à captura completa (o delta nunca aponta para outro delta).
+
+    reports/screenshots/
+        index.sqlite                 execuções, blobs e capturas (execução, nome) -> blob
+        objects/ab/abcdef....png     captura completa (o PNG original)
+        objects/cd/cdef01....npz     delta contra uma captura completa
+
+A retenção remove as execuções mais antigas (por quantidade, idade e espaço
+ocupado) e em seguida os blobs que nenhuma execução restante usa.
+
+Uso: python3 tests/screenshot_store.py list
+     python3 tests/screenshot_store.py export RUN_ID DIRETÓRIO
+     python3 tests/screenshot_store.py prune [--keep-runs 20] [--max-age-days 30] [--max-mb 500]
+"""
+
+import argparse
+import hashlib
+import io
+import os
+import sqlite3
+import sys
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, List, NamedTuple, Optional
+
+import numpy as np
+
+import route_crawler
+from atomic_file import atomic_write
+from perf_budget import current_revision
+from visual_regression import TILE, dirty_tiles, load_image, save_image
+
+SCREENSHOTS_DIR = os.path.join(route_crawler.REPORTS_DIR, "screenshots")
+INDEX_FILENAME = "index.sqlite"
+
+MAX_DELTA_TILES = 0.3           # fração máxima de blocos alterados para gravar como delta
+DEFAULT_KEEP_RUNS = 20
+DEFAULT_MAX_AGE_DAYS = 30
+DEFAULT_MAX_BYTES = 500 * 1024 * 1024
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id TEXT PRIMARY KEY,
+    timestamp TEXT NOT NULL,
+    revision TEXT
+);
+CREATE TABLE IF NOT EXISTS blobs (
+    digest TEXT PRIMARY KEY,
+    kind TEXT NOT NULL CHECK (kind IN ('full', 'delta')),
+    base TEXT REFERENCES blobs(digest),
+    width INTEGER NOT NULL,
+    height INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    created TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS captures (
+    run_id TEXT NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    digest TEXT NOT NULL REFERENCES blobs(digest),
+    PRIMARY KEY (run_id, name)
+);
+CREATE INDEX IF NOT EXISTS captures_digest ON captures (digest);
+CREATE INDEX IF NOT EXISTS captures_name ON captures (name, run_id);
+CREATE INDEX IF NOT EXISTS blobs_base ON blobs (base);
+"""
+
+
+def pixel_digest(pixels: np.ndarray) -> str:
+    """sha256 das dimensões e dos pixels RGB."""
+    digest = hashlib.sha256(f"{pixels.shape[0]}x{pixels.shape[1]}:".encode("ascii"))
+    digest.update(np.ascontiguousarray(pixels).data)
+    return digest.hexdigest()
+
+
+class StoredCapture(NamedTuple):
+    """Resultado de ScreenshotStore.put."""
+    name: str
+    digest: str
+    kind: str            # full, delta
+    size: int            # bytes gravados (0 quando o blob já existia)
+    deduplicated: bool
+
+
+class PruneResult(NamedTuple):
+    runs: List[str]
+    blobs: int
+    freed: int
+
+
+def new_run_id(revision: Optional[str] = None) -> str:
+    """Identificador de execução: data/hora + revisão do git."""
+    run_id = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+    return f"{run_id}_{revision[:8]}" if revision else run_id
+
+
+class ScreenshotStore:
+    """Capturas endereçadas pelo conteúdo, com deltas e retenção."""
+
+    def __init__(self, root: str = SCREENSHOTS_DIR, tile: int = TILE, max_delta_tiles: float = MAX_DELTA_TILES):
+        self.root = root
+        self.objects_dir = os.path.join(root, "objects")
+        self.tile = tile
+        self.max_delta_tiles = max_delta_tiles
+        os.makedirs(root, exist_ok=True)
+        self.conn = sqlite3.connect(os.path.join(root, INDEX_FILENAME), timeout=30, check_same_thread=False)
+        # Os workers do pytest-xdist gravam no mesmo índice
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        self.conn.executescript(SCHEMA)
+        self._lock = threading.Lock()
+        self._keyframes: Dict[str, tuple] = {}   # nome -> (digest, pixels) da última captura completa
+        self.run_id: Optional[str] = None
+
+    def object_path(self, digest: str, kind: str = "full") -> str:
+        """Caminho do blob no disco (objects/ab/abcdef....png ou .npz)."""
+        extension = ".png" if kind == "full" else ".npz"
+        return os.path.join(self.objects_dir, digest[:2], f"{digest}{extension}")
+
+    def begin_run(self, run_id: Optional[str] = None) -> str:
+        """Registra uma execução (padrão: data/hora + revisão do git) e a torna a atual."""
+        revision = current_revision()
+        if run_id is None:
+            run_id = new_run_id(revision)
+        with self._lock, self.conn:
+            self.conn.execute("INSERT OR IGNORE INTO runs (id, timestamp, revision) VALUES (?, ?, ?)",
+                              (run_id, datetime.now().isoformat(), revision))
+        self.run_id = run_id
+        return run_id
+
+    def _keyframe(self, name: str) -> Optional[tuple]:
+        """Última captura completa do nome (em memória ou pelo índice)."""
+        if name in self._keyframes:
+            return self._keyframes[name]
+        row = self.conn.execute(
+            "SELECT b.digest FROM captures c JOIN blobs b ON b.digest = c.digest "
+            "JOIN runs r ON r.id = c.run_id WHERE c.name = ? AND b.kind = 'full' "
+            "ORDER BY r.timestamp DESC LIMIT 1", (name,),
+        ).fetchone()
+        if row is None or not os.path.exists(self.object_path(row[0])):
+            return None
+        keyframe = (row[0], load_image(self.object_path(row[0])))
+        self._keyframes[name] = keyframe
+        return keyframe
+
+    def _encode_delta(self, base_digest: str, base: np.ndarray, pixels: np.ndarray) -> Optional[bytes]:
+        """Delta com os blocos alterados, ou None se a captura mudou demais."""
+        ty, tx = dirty_tiles(base, pixels, self.tile)
+        total = -(-pixels.shape[0] // self.tile) * -(-pixels.shape[1] // self.tile)
+        if len(ty) > total * self.max_delta_tiles:
+            return None
+        t = self.tile
+        tiles = [pixels[y * t:(y + 1) * t, x * t:(x + 1) * t] for y, x in zip(ty, tx)]
+        buffer = io.BytesIO()
+        np.savez_compressed(
+            buffer, base=np.array(base_digest), shape=np.array(pixels.shape), tile=np.array(t),
+            coords=np.stack([ty, tx], axis=1).astype(np.int32),
+            # blocos da borda direita/inferior podem ser menores: gravados achatados, na ordem de coords
+            data=np.concatenate([block.ravel() for block in tiles]) if tiles else np.zeros(0, np.uint8),
+        )
+        return buffer.getvalue()
+
+    def put(self, name: str, png: bytes, run_id: Optional[str] = None) -> StoredCapture:
+        """Grava a captura (PNG) do nome na execução (padrão: a atual), reaproveitando blobs existentes."""
+        run_id = run_id or self.run_id
+        pixels = load_image(png)
+        digest = pixel_digest(pixels)
+        with self._lock:
+            exists = self.conn.execute("SELECT kind FROM blobs WHERE digest = ?", (digest,)).fetchone()
+            kind, size = (exists[0], 0) if exists else ("full", len(png))
+
+            if not exists:
+                keyframe = self._keyframe(name)
+                data = png
+                if keyframe is not None and keyframe[1].shape == pixels.shape:
+                    delta = self._encode_delta(keyframe[0], keyframe[1], pixels)
+                    if delta is not None and len(delta) < len(png):
+                        kind, data = "delta", delta
+                size = len(data)
+                # Outro worker do xdist pode ter gravado o mesmo blob desde o SELECT:
+                # quem insere a linha grava o objeto; o outro o reaproveita
+                with self.conn:
+                    inserted = self.conn.execute(
+                        "INSERT OR IGNORE INTO blobs (digest, kind, base, width, height, size, created) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        (digest, kind, keyframe[0] if kind == "delta" else None,
+                         pixels.shape[1], pixels.shape[0], size, datetime.now().isoformat()),
+                    ).rowcount
+                if inserted:
+                    try:
+                        atomic_write(self.object_path(digest, kind), data)
+                    except OSError:
+                        with self.conn:
+                            self.conn.execute("DELETE FROM blobs WHERE digest = ?", (digest,))
+                        raise
+                else:
+                    exists = self.conn.execute("SELECT kind FROM blobs WHERE digest = ?", (digest,)).fetchone()
+                    kind, size = exists[0], 0
+                if kind == "full":
+                    self._keyframes[name] = (digest, pixels)
+
+            with self.conn:
+                self.conn.execute("INSERT OR REPLACE INTO captures (run_id, name, digest) VALUES (?, ?, ?)",
+                                  (run_id, name, digest))
+        return StoredCapture(name, digest, kind, size, exists is not None)
+
+    def load(self, digest: str) -> np.ndarray:
+        """Pixels RGB de um blob, reconstruindo deltas a partir da captura completa."""
+        row = self.conn.execute("SELECT kind FROM blobs WHERE digest = ?", (digest,)).fetchone()
+        if row is None:
+            raise KeyError(digest)
+        if row[0] == "full":
+            return load_image(self.object_path(digest))
+
+        with np.load(self.object_path(digest, "delta")) as delta:
+            pixels = self.load(str(delta["base"])).copy()
+            t = int(delta["tile"])
+            data, offset = delta["data"], 0
+            for y, x in delta["coords"]:
+                block = pixels[y * t:(y + 1) * t, x * t:(x + 1) * t]
+                block[...] = data[offset:offset + block.size].reshape(block.shape)
+                offset += block.size
+        return pixels
+
+    def export(self, run_id: str, dest: str) -> List[str]:
+        """Materializa as capturas da execução como PNGs em dest (ex.: artefato de CI)."""
+        os.makedirs(dest, exist_ok=True)
+        paths = []
+        for name, digest in self.conn.execute(
+                "SELECT name, digest FROM captures WHERE run_id = ? ORDER BY name", (run_id,)):
+            path = os.path.join(dest, f"{name}.png")
+            save_image(self.load(digest), path)
+            paths.append(path)
+        return paths
+
+    def runs(self) -> List[dict]:
+        """Execuções registradas, da mais recente para a mais antiga."""
+        rows = self.conn.execute(
+            "SELECT r.id, r.timestamp, r.revision, COUNT(c.name) FROM runs r "
+            "LEFT JOIN captures c ON c.run_id = r.id GROUP BY r.id ORDER BY r.timestamp DESC"
+        ).fetchall()
+        return [{"id": r[0], "timestamp": r[1], "revision": r[2], "captures": r[3]} for r in rows]
+
+    def stats(self) -> dict:
+        full, delta, stored = self.conn.execute(
+            "SELECT COALESCE(SUM(kind = 'full'), 0), COALESCE(SUM(kind = 'delta'), 0), "
+            "COALESCE(SUM(size), 0) FROM blobs"
+        ).fetchone()
+        captures = self.conn.execute("SELECT COUNT(*) FROM captures").fetchone()[0]
+        return {"runs": len(self.runs()), "captures": captures, "full": full, "delta": delta, "bytes": stored}
+
+    def prune(self, keep_runs: int = DEFAULT_KEEP_RUNS, max_age_days: Optional[float] = DEFAULT_MAX_AGE_DAYS,
+              max_bytes: Optional[int] = DEFAULT_MAX_BYTES, keep: Optional[List[str]] = None) -> PruneResult:
+        """
+        Aplica a retenção: mantém as keep_runs execuções mais recentes, remove
+        as mais velhas que max_age_days e, se o total ainda passar de
+        max_bytes, as mais antigas até caber. Execuções em keep nunca saem.
+        Depois remove os blobs órfãos (deltas antes das capturas completas).
+        """
+        keep = set(keep or [])
+        runs = [r["id"] for r in self.runs()]
+        cutoff = (datetime.now() - timedelta(days=max_age_days)).isoformat() if max_age_days is not None else None
+        timestamps = dict(self.conn.execute("SELECT id, timestamp FROM runs").fetchall())
+
+        evicted = [
+            run_id for position, run_id in enumerate(runs)
+            if run_id not in keep and (position >= keep_runs or (cutoff and timestamps[run_id] < cutoff))
+        ]
+        with self._lock:
+            removed_blobs, freed = self._evict(evicted)
+            if max_bytes is not None:
+                remaining = [r for r in runs if r not in evicted and r not in keep]
+                while remaining and self.stats()["bytes"] > max_bytes:
+                    run_id = remaining.pop()
+                    evicted.append(run_id)
+                    count, size = self._evict([run_id])
+                    removed_blobs += count
+                    freed += size
+        return PruneResult(evicted, removed_blobs, freed)
+
+    def _evict(self, run_ids: List[str]):
+        with self.conn:
+            self.conn.executemany("DELETE FROM captures WHERE run_id = ?", [(r,) for r in run_ids])
+            self.conn.executemany("DELETE FROM runs WHERE id = ?", [(r,) for r in run_ids])
+        removed, freed = 0, 0
+        # Deltas órfãos primeiro: podem ser os últimos a referenciar uma captura completa
+        for kind in ("delta", "full"):
+            orphans = self.conn.execute(
+                "SELECT digest, size FROM blobs b WHERE kind = ? "
+                "AND NOT EXISTS (SELECT 1 FROM captures c WHERE c.digest = b.digest) "
+                "AND NOT EXISTS (SELECT 1 FROM blobs d WHERE d.base = b.digest)", (kind,),
+            ).fetchall()
+            with self.conn:
+                self.conn.executemany("DELETE FROM blobs WHERE digest = ?", [(d,) for d, _ in orphans])
+            for digest, size in orphans:
+                path = self.object_path(digest, kind)
+                if os.path.exists(path):
+                    os.remove(path)
+                self._keyframes = {n: k for n, k in self._keyframes.items() if k[0] != digest}
+                removed += 1
+                freed += size
+        return removed, freed
+
+    def close(self):
+        self.conn.close()
+
+
+def main(argv=None):
+    """Lista, exporta ou aplica a retenção nas capturas armazenadas."""
+    parser = argparse.ArgumentParser(description="Armazenamento das capturas de tela das execuções")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("list", help="lista as execuções e o espaço ocupado")
+
+    export_parser = subparsers.add_parser("export", help="grava as capturas de uma execução como PNG")
+    export_parser.add_argument("run_id")
+    export_parser.add_argument("dest")
+
+    prune_parser = subparsers.add_parser("prune", help="aplica a política de retenção")
+    prune_parser.add_argument("--keep-runs", type=int, default=DEFAULT_KEEP_RUNS,
+                              help="execuções mais recentes mantidas")
+    prune_parser.add_argument("--max-age-days", type=float, default=DEFAULT_MAX_AGE_DAYS,
+                              help="remove execuções mais antigas que isso")
+    prune_parser.add_argument("--max-mb", type=float, default=DEFAULT_MAX_BYTES / (1024 * 1024),
+                              help="espaço máximo ocupado pelos blobs")
+    args = parser.parse_args(argv)
+
+    store = ScreenshotStore()
+    try:
+        if args.command == "list":
+            for run in store.runs():
+                print(f"   {run['id']:<40} {run['timestamp'][:19]}  {run['captures']} captura(s)")
+            stats = store.stats()
+            print(f"\n📦 {stats['captures']} captura(s) em {stats['runs']} execução(ões): "
+                  f"{stats['full']} completas + {stats['delta']} deltas, {stats['bytes'] / 1024:.0f} KB")
+            return 0
+
+        if args.command == "export":
+            paths = store.export(args.run_id, args.dest)
+            print(f"📄 {len(paths)} captura(s) exportada(s) para {args.dest}")
+            return 0 if paths else 1
+
+        result = store.prune(args.keep_runs, args.max_age_days, int(args.max_mb * 1024 * 1024))
+        print(f"🧹 {len(result.runs)} execução(ões) e {result.blobs} blob(s) removidos, "
+              f"{result.freed / 1024:.0f} KB liberados")
+        return 0
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
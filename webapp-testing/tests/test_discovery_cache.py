@@ -0,0 +1,92 @@
+"""
+Testes unitários da divisão em trechos e do cache de descoberta (sem browser).
+"""
+
+import os
+import time
+
+from discovery_cache import CHUNK_ELEMENTS, Chunk, DiscoveryCache, Shell, split_document
+from test_login_discovery_simple import SimpleElementDiscovery
+
+
+def _page(rows: int, changed_row: int = None) -> str:
+    body = "".join(
+        f'<div class="linha"><input id="campo-{i}" placeholder="{"alterado" if i == changed_row else "valor"}">'
+        f'<button role="tab">Aba {i}</button></div>'
+        for i in range(rows)
+    )
+    return f'<html><head><title>DFDs</title></head><body><main id="app">{body}</main></body></html>'
+
+
+def _index(html: str, cache: DiscoveryCache = None) -> dict:
+    discovery = SimpleElementDiscovery("http://localhost", verbose=False, cache=cache)
+    discovery._load_html(html, "http://localhost/dfds")
+    return discovery._build_index()
+
+
+def test_small_page_is_a_single_chunk_under_the_html_shell():
+    segments = split_document("<html><head><title>x</title></head><body><p>oi</p></body></html>")
+
+    assert segments[0] == Shell("html", {})
+    assert [type(s) for s in segments[1:]] == [Chunk]
+    assert segments[1].context == ["html"] and segments[1].count == 2
+
+
+def test_large_containers_are_split_into_bounded_chunks():
+    segments = split_document(_page(500))
+
+    shells = [s.name for s in segments if isinstance(s, Shell)]
+    chunks = [s for s in segments if isinstance(s, Chunk)]
+    assert shells == ["html", "body", "main"]
+    # Cada linha tem 3 elementos: os 500 divs ficam em trechos de até CHUNK_ELEMENTS elementos
+    main_chunks = [c for c in chunks if c.context == ["html", "body", "main"]]
+    assert sum(c.count for c in main_chunks) == 500
+    assert all(c.count * 3 <= CHUNK_ELEMENTS for c in main_chunks)
+
+
+def test_undividable_document_returns_none():
+    assert split_document("") is None
+
+
+def test_incremental_index_matches_the_full_parse(tmp_path):
+    html = _page(300)
+
+    assert _index(html, DiscoveryCache(str(tmp_path))) == _index(html)
+
+
+def test_changed_chunk_is_the_only_one_reanalyzed(tmp_path):
+    cache = DiscoveryCache(str(tmp_path))
+    _index(_page(500), cache)
+    chunks = sum(1 for s in split_document(_page(500)) if isinstance(s, Chunk))
+    cache.hits = cache.misses = 0
+
+    index = _index(_page(500, changed_row=499), cache)
+
+    assert cache.misses == 1 and cache.hits == chunks - 1
+    assert index == _index(_page(500, changed_row=499))
+    assert index["input"][499]["placeholder"] == "alterado"
+
+
+def test_corrupted_entry_is_a_miss(tmp_path):
+    cache = DiscoveryCache(str(tmp_path))
+    key = cache.key("<div></div>")
+    cache.put_subtree(key, {"input": []})
+    with open(cache._path("subtrees", key), "w", encoding="utf-8") as f:
+        f.write("{trunc")
+
+    assert cache.get_subtree(key) is None
+    assert (cache.hits, cache.misses) == (0, 1)
+
+
+def test_prune_removes_expired_then_least_recently_used_entries(tmp_path):
+    cache = DiscoveryCache(str(tmp_path), max_bytes=250, max_age_days=1)
+    now = time.time()
+    for name, age in (("antiga", 3 * 86400), ("usada", 60), ("recente", 30), ("nova", 0)):
+        cache.put_page(cache.key(name), {"elements": "x" * 100})
+        os.utime(cache._path("pages", cache.key(name)), (now - age, now - age))
+
+    removed = cache.prune()
+
+    remaining = {name for name in ("antiga", "usada", "recente", "nova")
+                 if cache.get_page(cache.key(name)) is not None}
+    assert removed == 2 and remaining == {"recente", "nova"}
@@ -0,0 +1,83 @@
+"""
+Testes unitários do agendamento por duração (sem workers reais do xdist).
+"""
+
+from duration_scheduling import DurationScheduling
+from parallel_plugin import estimate_durations
+
+
+class FakeConfig:
+    def __init__(self, workers: int):
+        self.workers = workers
+
+    def getvalue(self, name):
+        return [f"{self.workers}*popen"] if name == "tx" else None
+
+    def getoption(self, name):
+        return None
+
+
+class FakeGateway:
+    def __init__(self, gateway_id: str):
+        self.id = gateway_id
+
+
+class FakeNode:
+    def __init__(self, name: str):
+        self.gateway = FakeGateway(name)
+        self.shutting_down = False
+        self.sent = []
+
+    def send_runtest_some(self, indices):
+        self.sent.extend(indices)
+
+    def shutdown(self):
+        self.shutting_down = True
+
+
+def _scheduler(collection, durations, workers: int = 2):
+    scheduler = DurationScheduling(FakeConfig(workers), durations=durations)
+    nodes = [FakeNode(f"gw{i}") for i in range(workers)]
+    for node in nodes:
+        scheduler.add_node(node)
+    for node in nodes:
+        scheduler.add_node_collection(node, collection)
+    scheduler.schedule()
+    return scheduler, nodes
+
+
+def test_estimate_durations_uses_the_median_for_unknown_tests():
+    estimates = estimate_durations(["a", "b", "c", "novo"], {"a": 1.0, "b": 4.0, "c": 10.0, "removido": 99.0})
+
+    assert estimates == {"a": 1.0, "b": 4.0, "c": 10.0, "novo": 4.0}
+
+
+def test_longest_tests_start_first_and_second_round_is_reversed():
+    collection = ["a", "b", "c", "d", "e"]
+    durations = {"a": 1.0, "b": 5.0, "c": 3.0, "d": 2.0, "e": 0.5}
+
+    scheduler, (first, second) = _scheduler(collection, durations)
+
+    assert [collection[i] for i in first.sent] == ["b", "a"]
+    assert [collection[i] for i in second.sent] == ["c", "d"]
+    assert [collection[i] for i in scheduler.pending] == ["e"]
+
+
+def test_finished_worker_gets_the_longest_pending_test():
+    collection = ["a", "b", "c", "d", "e", "f"]
+    durations = {"a": 6.0, "b": 5.0, "c": 4.0, "d": 3.0, "e": 2.0, "f": 1.0}
+
+    scheduler, (first, second) = _scheduler(collection, durations)
+    scheduler.mark_test_complete(second, collection.index("b"))
+
+    assert [collection[i] for i in second.sent] == ["b", "c", "e"]
+    assert [collection[i] for i in scheduler.pending] == ["f"]
+
+
+def test_workers_shut_down_when_nothing_is_pending():
+    collection = ["a", "b"]
+
+    scheduler, nodes = _scheduler(collection, {"a": 2.0, "b": 1.0})
+
+    assert not scheduler.pending
+    assert all(node.shutting_down for node in nodes)
@@ -0,0 +1,106 @@
+"""
+Testes unitários do grafo de imports e da seleção de rotas do impact_analysis (sem browser).
+"""
+
+import os
+
+import pytest
+
+import impact_analysis
+from impact_analysis import ImpactAnalyzer, ImportGraph
+
+# Projeto mínimo: duas páginas que compartilham um hook, uma página com um
+# componente próprio e um layout comum importado pelo App
+SOURCES = {
+    "src/main.tsx": 'import App from "./App";\nimport "./index.css";\n',
+    "src/index.css": "body {}\n",
+    "src/App.tsx": (
+        'import Layout from "@/components/Layout";\n'
+        'import DFDs from "./pages/DFDs";\n'
+        'import NovoDFD from "./pages/NovoDFD";\n'
+        'import Consolidacao from "./pages/Consolidacao";\n'
+        'import NotFound from "./pages/NotFound";\n'
+        '<Route path="/dfds" element={<DFDs />} />\n'
+        '<Route path="/dfds/novo" element={<NovoDFD />} />\n'
+        '<Route path="/consolidacao" element={<Consolidacao />} />\n'
+        '<Route path="*" element={<NotFound />} />\n'
+    ),
+    "src/components/Layout.tsx": 'import { cn } from "@/lib/utils";\n',
+    "src/lib/utils.ts": 'import { clsx } from "clsx";\n',
+    "src/pages/DFDs.tsx": 'import { useDFDs } from "@/hooks/useDFDs";\n',
+    "src/pages/NovoDFD.tsx": 'import { useDFDs } from "../hooks/useDFDs";\nimport { Form } from "@/components/form";\n',
+    "src/pages/Consolidacao.tsx": 'const Grafico = lazy(() => import("@/components/Grafico"));\n',
+    "src/pages/NotFound.tsx": 'import { cn } from "@/lib/utils";\n',
+    "src/hooks/useDFDs.ts": 'import { supabase } from "@/integrations/supabase/client";\n',
+    "src/integrations/supabase/client.ts": 'export { createClient } from "@supabase/supabase-js";\n',
+    "src/components/form/index.tsx": 'export * from "./Campo";\n',
+    "src/components/form/Campo.tsx": "export const Campo = () => null;\n",
+    "src/components/Grafico.tsx": "export default () => null;\n",
+}
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    for path, source in SOURCES.items():
+        os.makedirs(os.path.dirname(tmp_path / path), exist_ok=True)
+        (tmp_path / path).write_text(source, encoding="utf-8")
+    monkeypatch.setattr(impact_analysis, "PROJECT_ROOT", str(tmp_path))
+    return tmp_path
+
+
+def _analyzer(project) -> ImpactAnalyzer:
+    graph = ImportGraph(str(project / "src"), str(project / "cache" / "import_graph.json"))
+    return ImpactAnalyzer(graph, str(project / "src" / "App.tsx"))
+
+
+def test_routes_exclude_the_catch_all_and_keep_app_order(project):
+    assert _analyzer(project).routes == ["/dfds", "/dfds/novo", "/consolidacao"]
+
+
+def test_imports_resolve_aliases_relative_paths_index_files_and_dynamic_imports(project):
+    analyzer = _analyzer(project)
+
+    assert analyzer.route_modules["/dfds/novo"] == {
+        "src/pages/NovoDFD.tsx", "src/hooks/useDFDs.ts", "src/integrations/supabase/client.ts",
+        "src/components/form/index.tsx", "src/components/form/Campo.tsx",
+    }
+    assert analyzer.route_modules["/consolidacao"] == {"src/pages/Consolidacao.tsx", "src/components/Grafico.tsx"}
+
+
+def test_change_selects_only_the_routes_that_import_it(project):
+    analyzer = _analyzer(project)
+
+    assert analyzer.affected(["src/hooks/useDFDs.ts"]) == {
+        "/dfds": ["src/hooks/useDFDs.ts"], "/dfds/novo": ["src/hooks/useDFDs.ts"]}
+    assert list(analyzer.affected(["src/components/form/Campo.tsx"])) == ["/dfds/novo"]
+    assert analyzer.affected(["README.md", "src/pages/NotFound.tsx"]) == {}
+
+
+@pytest.mark.parametrize("path", [
+    "src/components/Layout.tsx",     # importado pelo App, fora das páginas
+    "src/lib/utils.ts",              # alcançado pelo App, mesmo também usado pelo NotFound
+    "src/index.css",
+    "package.json",
+    "supabase/migrations/20260101000000_x.sql",
+    "webapp-testing/tests/route_crawler.py",
+])
+def test_shared_changes_select_every_route(project, path):
+    analyzer = _analyzer(project)
+
+    affected = analyzer.affected([path, "src/hooks/useDFDs.ts"])
+
+    assert list(affected) == analyzer.routes
+    assert all(reasons == [path] for reasons in affected.values())
+
+
+def test_graph_rereads_only_changed_files(project):
+    cache_path = str(project / "cache" / "import_graph.json")
+    assert ImportGraph(str(project / "src"), cache_path).update() == len(SOURCES)
+
+    page = project / "src" / "pages" / "DFDs.tsx"
+    page.write_text('import { useDFDs } from "@/hooks/useDFDs";\nimport Grafico from "@/components/Grafico";\n',
+                    encoding="utf-8")
+    graph = ImportGraph(str(project / "src"), cache_path)
+
+    assert graph.update() == 1
+    assert "src/components/Grafico.tsx" in graph.closure("src/pages/DFDs.tsx")
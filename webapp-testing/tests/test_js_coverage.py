@@ -0,0 +1,52 @@
+"""
+Testes unitários da decodificação de source maps e dos trechos executados do js_coverage (sem browser).
+"""
+
+import pytest
+
+from js_coverage import decode_vlq, executed_ranges
+
+
+@pytest.mark.parametrize("segment, values", [
+    ("AAAA", [0, 0, 0, 0]),
+    ("AACA", [0, 0, 1, 0]),
+    ("D", [-1]),
+    ("gB", [16]),
+    ("2H", [123]),
+    ("2HAAD", [123, 0, 0, -1]),
+])
+def test_decode_vlq(segment, values):
+    assert decode_vlq(segment) == values
+
+
+def _function(*ranges) -> dict:
+    return {"ranges": [{"startOffset": start, "endOffset": end, "count": count} for start, end, count in ranges]}
+
+
+def test_executed_ranges_excludes_nested_blocks_not_executed():
+    functions = [_function((0, 100, 1), (20, 40, 0))]
+
+    assert executed_ranges(functions) == [(0, 20), (40, 100)]
+
+
+def test_executed_ranges_innermost_count_wins():
+    functions = [_function((0, 100, 0), (10, 30, 2), (15, 20, 0))]
+
+    assert executed_ranges(functions) == [(10, 15), (20, 30)]
+
+
+def test_executed_ranges_nests_functions_that_never_ran():
+    functions = [_function((0, 100, 1)), _function((30, 60, 0)), _function((70, 80, 3))]
+
+    assert executed_ranges(functions) == [(0, 30), (60, 100)]
+
+
+def test_executed_ranges_merges_adjacent_ranges():
+    functions = [_function((0, 10, 1)), _function((10, 20, 1))]
+
+    assert executed_ranges(functions) == [(0, 20)]
+
+
+def test_executed_ranges_of_a_script_that_never_ran():
+    assert executed_ranges([_function((0, 50, 0))]) == []
+    assert executed_ranges([]) == []
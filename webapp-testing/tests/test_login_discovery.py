@@ -7,15 +7,120 @@ import pytest
 import json
 import os
 from datetime import datetime
+from typing import Optional
 from playwright.sync_api import Page, expect
 
+import parallel_plugin
+import route_crawler
+from perf_budget import BudgetChecker, flatten
+from js_coverage import JSCoverage, save_coverage, summarize_coverage
+from network_capture import NetworkCapture, save_network, summarize_network
+from page_metrics import PageMetricsCollector, save_metrics, summarize
+from page_readiness import wait_for_route_settled
+from report_stream import StreamingReportMixin
+from screenshot_store import ScreenshotStore
+from visual_regression import BaselineStore
+
+# Extrai todas as categorias no browser de uma vez, evitando uma ida e volta
+# (get_attribute, inner_text, is_visible...) por campo de cada elemento.
+# Os campos espelham o que os métodos discover_* registravam via locators.
+EXTRACTION_SCRIPT = """
+(interactiveSelectors) => {
+    const all = (selector) => Array.from(document.querySelectorAll(selector));
+    const attr = (el, name) => el.getAttribute(name) || "";
+    const text = (el) => el.innerText || "";
+    const isVisible = (el) => {
+        const style = window.getComputedStyle(el);
+        if (style.visibility !== "visible") return false;
+        const rect = el.getBoundingClientRect();
+        return rect.width > 0 && rect.height > 0;
+    };
+
+    return {
+        inputs: all("input").map((el, index) => ({
+            index,
+            type: el.getAttribute("type") || "text",
+            name: attr(el, "name"),
+            id: attr(el, "id"),
+            placeholder: attr(el, "placeholder"),
+            class: attr(el, "class"),
+            required: el.hasAttribute("required"),
+            visible: isVisible(el),
+        })),
+        buttons: all("button").map((el, index) => ({
+            index,
+            text: text(el),
+            type: attr(el, "type"),
+            id: attr(el, "id"),
+            class: attr(el, "class"),
+            disabled: el.hasAttribute("disabled"),
+            visible: isVisible(el),
+        })),
+        links: all("a").map((el, index) => ({
+            index,
+            text: text(el),
+            href: attr(el, "href"),
+            id: attr(el, "id"),
+            class: attr(el, "class"),
+            visible: isVisible(el),
+        })),
+        forms: all("form").map((el, index) => ({
+            index,
+            action: attr(el, "action"),
+            method: attr(el, "method"),
+            id: attr(el, "id"),
+            class: attr(el, "class"),
+        })),
+        headings: [1, 2, 3, 4, 5, 6].flatMap((level) => all(`h${level}`).map((el, index) => ({
+            level,
+            index,
+            text: text(el),
+            id: attr(el, "id"),
+            class: attr(el, "class"),
+            visible: isVisible(el),
+        }))),
+        images: all("img").map((el, index) => ({
+            index,
+            src: attr(el, "src"),
+            alt: attr(el, "alt"),
+            id: attr(el, "id"),
+            class: attr(el, "class"),
+            visible: isVisible(el),
+        })),
+        interactive: interactiveSelectors.flatMap((selector) => all(selector).map((el, index) => ({
+            selector,
+            index,
+            tag: el.tagName.toLowerCase(),
+            text: text(el),
+            id: attr(el, "id"),
+            class: attr(el, "class"),
+            "data-testid": attr(el, "data-testid"),
+            visible: isVisible(el),
+        }))),
+    };
+}
+"""
+
 
-class ElementDiscovery:
+class ElementDiscovery(StreamingReportMixin):
     """Classe para descoberta e documentação de elementos."""
 
-    def __init__(self, page: Page, base_url: str):
+    INTERACTIVE_SELECTORS = ["select", "textarea", "[role='button']", "[onclick]", "[data-testid]"]
+
+    def __init__(self, page: Page, base_url: str, metrics_collector: PageMetricsCollector = None,
+                 network_capture: NetworkCapture = None, js_coverage: Optional[JSCoverage] = None):
         self.page = page
         self.base_url = base_url
+        self.stream = None
+        self._payload = None
+        self.metrics_collector = metrics_collector or PageMetricsCollector(page)
+        self.metrics = None
+        self.network_capture = network_capture or NetworkCapture(page)
+        self.network = None
+        # Cobertura de JS só com --js-coverage (desotimiza o código medido)
+        self.js_coverage = js_coverage
+        self.coverage = None
+        self.readiness = None
         self.discovered_elements = {
             "timestamp": datetime.now().isoformat(),
             "url": "",
@@ -30,151 +135,107 @@ class ElementDiscovery:
             }
         }
 
+    def extract_elements(self) -> dict:
+        """
+        Coleta todas as categorias em uma única chamada page.evaluate.
+        O payload já segue o esquema de discovered_elements["elements"].
+        """
+        if self._payload is None:
+            self._payload = self.page.evaluate(EXTRACTION_SCRIPT, self.INTERACTIVE_SELECTORS)
+        return self._payload
+
+    def _stream_closed(self, path: str):
+        """Grava as métricas, a rede e a cobertura ao lado do relatório NDJSON."""
+        if self.metrics is not None:
+            save_metrics(self.metrics, path)
+        if self.network is not None:
+            save_network(self.network, path)
+        if self.coverage is not None:
+            save_coverage(self.coverage, path)
+
+    def collect_metrics(self, url: str) -> dict:
+        """Coleta as métricas de performance da página carregada."""
+        print("\n⏱️  Coletando métricas de performance...")
+        self.metrics = self.metrics_collector.collect(url)
+        summary = summarize(self.metrics)
+        print(f"  ✓ Load: {summary['load']}ms, FCP: {summary['first_contentful_paint']}ms, "
+              f"LCP: {summary['largest_contentful_paint']}ms")
+        print(f"  ✓ CLS: {summary['cumulative_layout_shift']}, TBT: {summary['total_blocking_time']}ms, "
+              f"nós no DOM: {summary['dom_nodes']}")
+        print(f"  ✓ Recursos: {summary['resources']} ({summary['transfer_size']} bytes), "
+              f"heap JS: {summary['js_heap_used']} bytes")
+        return self.metrics
+
+    def report_network(self, url: str) -> Optional[dict]:
+        """Encerra a captura de rede da navegação e imprime o resumo da análise."""
+        self.network = self.network_capture.stop(url)
+        analysis = self.network["analysis"]
+        print(f"  ✓ Rede: {analysis['requests']} requisições ({analysis['rest_requests']} ao REST), "
+              f"{analysis['from_cache']} do cache")
+        if analysis["last_request"]:
+            print(f"  ✓ Última a terminar: {analysis['last_request']['url']} ({analysis['last_request']['end']:.0f}ms)")
+        for finding in analysis["findings"]:
+            print(f"  ⚠️  [{finding['kind']}] {finding['detail']}: ~{finding['wasted_ms']:.0f}ms")
+        return self.network
+
+    def report_coverage(self, url: str) -> Optional[dict]:
+        """Lê a cobertura de JS da navegação e imprime os módulos com mais código sem uso."""
+        self.coverage = self.js_coverage.stop(url)
+        totals = self.coverage["totals"]
+        print(f"  ✓ JS: {totals['shipped']:,} entregues, {totals['executed']:,} executados "
+              f"({totals['unused_pct']:.0f}% sem uso)")
+        for module in self.coverage["modules"][:3]:
+            print(f"  ✓ {module['module']}: {module['shipped'] - module['executed']:,} sem uso")
+        return self.coverage
+
     def discover_inputs(self):
         """Descobre todos os campos de input."""
         print("\n🔍 Descobrindo campos de input...")
-        inputs = self.page.locator("input").all()
-
-        for idx, input_elem in enumerate(inputs):
-            try:
-                element_info = {
-                    "index": idx,
-                    "type": input_elem.get_attribute("type") or "text",
-                    "name": input_elem.get_attribute("name") or "",
-                    "id": input_elem.get_attribute("id") or "",
-                    "placeholder": input_elem.get_attribute("placeholder") or "",
-                    "class": input_elem.get_attribute("class") or "",
-                    "required": input_elem.get_attribute("required") is not None,
-                    "visible": input_elem.is_visible(),
-                }
-                self.discovered_elements["elements"]["inputs"].append(element_info)
-                print(f"  ✓ Input {idx}: type='{element_info['type']}', id='{element_info['id']}', placeholder='{element_info['placeholder']}'")
-            except Exception as e:
-                print(f"  ⚠️  Erro ao processar input {idx}: {e}")
+        for element_info in self.extract_elements()["inputs"]:
+            self._add_element("inputs", element_info)
+            print(f"  ✓ Input {element_info['index']}: type='{element_info['type']}', id='{element_info['id']}', placeholder='{element_info['placeholder']}'")
 
     def discover_buttons(self):
         """Descobre todos os botões."""
         print("\n🔍 Descobrindo botões...")
-        buttons = self.page.locator("button").all()
-
-        for idx, button in enumerate(buttons):
-            try:
-                element_info = {
-                    "index": idx,
-                    "text": button.inner_text() or "",
-                    "type": button.get_attribute("type") or "",
-                    "id": button.get_attribute("id") or "",
-                    "class": button.get_attribute("class") or "",
-                    "disabled": button.get_attribute("disabled") is not None,
-                    "visible": button.is_visible(),
-                }
-                self.discovered_elements["elements"]["buttons"].append(element_info)
-                print(f"  ✓ Button {idx}: text='{element_info['text']}', type='{element_info['type']}', id='{element_info['id']}'")
-            except Exception as e:
-                print(f"  ⚠️  Erro ao processar button {idx}: {e}")
+        for element_info in self.extract_elements()["buttons"]:
+            self._add_element("buttons", element_info)
+            print(f"  ✓ Button {element_info['index']}: text='{element_info['text']}', type='{element_info['type']}', id='{element_info['id']}'")
 
     def discover_links(self):
         """Descobre todos os links."""
         print("\n🔍 Descobrindo links...")
-        links = self.page.locator("a").all()
-
-        for idx, link in enumerate(links):
-            try:
-                element_info = {
-                    "index": idx,
-                    "text": link.inner_text() or "",
-                    "href": link.get_attribute("href") or "",
-                    "id": link.get_attribute("id") or "",
-                    "class": link.get_attribute("class") or "",
-                    "visible": link.is_visible(),
-                }
-                self.discovered_elements["elements"]["links"].append(element_info)
-                print(f"  ✓ Link {idx}: text='{element_info['text']}', href='{element_info['href']}'")
-            except Exception as e:
-                print(f"  ⚠️  Erro ao processar link {idx}: {e}")
+        for element_info in self.extract_elements()["links"]:
+            self._add_element("links", element_info)
+            print(f"  ✓ Link {element_info['index']}: text='{element_info['text']}', href='{element_info['href']}'")
 
     def discover_forms(self):
         """Descobre todos os formulários."""
         print("\n🔍 Descobrindo formulários...")
-        forms = self.page.locator("form").all()
-
-        for idx, form in enumerate(forms):
-            try:
-                element_info = {
-                    "index": idx,
-                    "action": form.get_attribute("action") or "",
-                    "method": form.get_attribute("method") or "",
-                    "id": form.get_attribute("id") or "",
-                    "class": form.get_attribute("class") or "",
-                }
-                self.discovered_elements["elements"]["forms"].append(element_info)
-                print(f"  ✓ Form {idx}: action='{element_info['action']}', method='{element_info['method']}', id='{element_info['id']}'")
-            except Exception as e:
-                print(f"  ⚠️  Erro ao processar form {idx}: {e}")
+        for element_info in self.extract_elements()["forms"]:
+            self._add_element("forms", element_info)
+            print(f"  ✓ Form {element_info['index']}: action='{element_info['action']}', method='{element_info['method']}', id='{element_info['id']}'")
 
     def discover_headings(self):
         """Descobre todos os headings (h1-h6)."""
         print("\n🔍 Descobrindo headings...")
-        for level in range(1, 7):
-            headings = self.page.locator(f"h{level}").all()
-            for idx, heading in enumerate(headings):
-                try:
-                    element_info = {
-                        "level": level,
-                        "index": idx,
-                        "text": heading.inner_text() or "",
-                        "id": heading.get_attribute("id") or "",
-                        "class": heading.get_attribute("class") or "",
-                        "visible": heading.is_visible(),
-                    }
-                    self.discovered_elements["elements"]["headings"].append(element_info)
-                    print(f"  ✓ H{level} {idx}: text='{element_info['text']}'")
-                except Exception as e:
-                    print(f"  ⚠️  Erro ao processar h{level} {idx}: {e}")
+        for element_info in self.extract_elements()["headings"]:
+            self._add_element("headings", element_info)
+            print(f"  ✓ H{element_info['level']} {element_info['index']}: text='{element_info['text']}'")
 
     def discover_images(self):
         """Descobre todas as imagens."""
         print("\n🔍 Descobrindo imagens...")
-        images = self.page.locator("img").all()
-
-        for idx, img in enumerate(images):
-            try:
-                element_info = {
-                    "index": idx,
-                    "src": img.get_attribute("src") or "",
-                    "alt": img.get_attribute("alt") or "",
-                    "id": img.get_attribute("id") or "",
-                    "class": img.get_attribute("class") or "",
-                    "visible": img.is_visible(),
-                }
-                self.discovered_elements["elements"]["images"].append(element_info)
-                print(f"  ✓ Image {idx}: alt='{element_info['alt']}', src='{element_info['src'][:50]}...'")
-            except Exception as e:
-                print(f"  ⚠️  Erro ao processar image {idx}: {e}")
+        for element_info in self.extract_elements()["images"]:
+            self._add_element("images", element_info)
+            print(f"  ✓ Image {element_info['index']}: alt='{element_info['alt']}', src='{element_info['src'][:50]}...'")
 
     def discover_interactive(self):
         """Descobre elementos interativos adicionais."""
         print("\n🔍 Descobrindo elementos interativos...")
-        selectors = ["select", "textarea", "[role='button']", "[onclick]", "[data-testid]"]
-
-        for selector in selectors:
-            elements = self.page.locator(selector).all()
-            for idx, elem in enumerate(elements):
-                try:
-                    element_info = {
-                        "selector": selector,
-                        "index": idx,
-                        "tag": elem.evaluate("el => el.tagName.toLowerCase()"),
-                        "text": elem.inner_text() or "",
-                        "id": elem.get_attribute("id") or "",
-                        "class": elem.get_attribute("class") or "",
-                        "data-testid": elem.get_attribute("data-testid") or "",
-                        "visible": elem.is_visible(),
-                    }
-                    self.discovered_elements["elements"]["interactive"].append(element_info)
-                    print(f"  ✓ {selector} {idx}: tag='{element_info['tag']}', id='{element_info['id']}'")
-                except Exception as e:
-                    print(f"  ⚠️  Erro ao processar {selector} {idx}: {e}")
+        for element_info in self.extract_elements()["interactive"]:
+            self._add_element("interactive", element_info)
+            print(f"  ✓ {element_info['selector']} {element_info['index']}: tag='{element_info['tag']}', id='{element_info['id']}'")
 
     def discover_all(self, url: str):
         """Executa todas as descobertas."""
@@ -186,8 +247,22 @@ class ElementDiscovery:
         print(f"{'=' * 80}")
 
         self.discovered_elements["url"] = url
+        self.metrics_collector.install()
+        capturing = self.network_capture.start()
+        covering = self.js_coverage is not None and self.js_coverage.start()
         self.page.goto(url)
-        self.page.wait_for_load_state("networkidle")
+        self.readiness = wait_for_route_settled(self.page)
+        print(f"⏳ Rota pronta ({self.readiness})")
+        self._payload = None
+
+        self.collect_metrics(url)
+        if capturing:
+            self.report_network(url)
+        if covering:
+            self.report_coverage(url)
+
+        if self.stream is not None:
+            self.stream.write_meta(timestamp=self.discovered_elements["timestamp"], url=url)
 
         # Executa todas as descobertas
         self.discover_inputs()
@@ -198,6 +273,10 @@ class ElementDiscovery:
         self.discover_images()
         self.discover_interactive()
 
+        if self.stream is not None:
+            self.discovered_elements["statistics"] = dict(self.stream.counts)
+            self._close_stream()
+
         return self.discovered_elements
 
     def save_report(self, filename: str = None):
@@ -210,12 +289,19 @@ class ElementDiscovery:
         os.makedirs(reports_dir, exist_ok=True)
 
         filepath = os.path.join(reports_dir, filename)
+        os.makedirs(os.path.dirname(filepath), exist_ok=True)
 
         with open(filepath, "w", encoding="utf-8") as f:
             json.dump(self.discovered_elements, f, indent=2, ensure_ascii=False)
 
         print(f"\n{'=' * 80}")
         print(f"📄 Relatório salvo em: {filepath}")
+        if self.metrics is not None:
+            print(f"⏱️  Métricas salvas em: {save_metrics(self.metrics, filepath)}")
+        if self.network is not None:
+            print(f"🌐 Log de rede salvo em: {save_network(self.network, filepath)}")
+        if self.coverage is not None:
+            print(f"📦 Cobertura de JS salva em: {save_coverage(self.coverage, filepath)}")
         print(f"{'=' * 80}")
 
         return filepath
@@ -235,13 +321,22 @@ class ElementDiscovery:
         print(f"{'=' * 80}\n")
 
 
-@pytest.fixture(scope="session")
-def base_url():
-    """URL base para os testes."""
-    return "http://localhost:5173"
+@pytest.fixture(scope="module")
+def crawl_results(pytestconfig, base_url: str):
+    """
+    Acumula os resultados do crawl. O índice combinado é gravado uma vez ao
+    final da execução (pelo controlador, quando há workers do xdist).
+    """
+    results = []
+    yield results
+    if results:
+        parallel_plugin.collect(pytestconfig, "crawl", {"base_url": base_url, "results": results})
 
 
-def test_login_page_element_discovery(page: Page, base_url: str):
+@pytest.mark.route("/")
+def test_login_page_element_discovery(pooled_page: Page, base_url: str, page_metrics: PageMetricsCollector,
+                                     network_capture: NetworkCapture, js_coverage: Optional[JSCoverage],
+                                     perf_budget: BudgetChecker):
     """
     Teste de descoberta de elementos na página de Login.
 
@@ -251,7 +346,7 @@ def test_login_page_element_discovery(page: Page, base_url: str):
     3. Gera um relatório JSON com os elementos encontrados
     """
     # Cria o descobridor de elementos
-    discovery = ElementDiscovery(page, base_url)
+    discovery = ElementDiscovery(pooled_page, base_url, page_metrics, network_capture, js_coverage)
 
     # Executa a descoberta (página principal por enquanto, adaptar para /login quando existir)
     # TODO: Alterar para "/login" quando a página de login for implementada
@@ -263,34 +358,89 @@ def test_login_page_element_discovery(page: Page, base_url: str):
     discovery.print_summary()
 
     # Salva relatório
-    report_path = discovery.save_report("login_page_discovery.json")
+    # Nome próprio: o login_page_discovery.json é do test_login_discovery_simple.py
+    report_path = discovery.save_report("login_page_discovery_playwright.json")
+
+    # Registra no histórico e confere os orçamentos (violações falham a execução ao final)
+    statistics = {k: len(v) for k, v in discovered["elements"].items()}
+    perf_budget.check("/", flatten(discovery.metrics, statistics, discovery.network))
 
     # Verificações básicas
     assert discovered is not None, "Descoberta deve retornar dados"
     assert discovered["url"] == login_url, "URL deve estar registrada"
+    assert page_metrics.results[login_url]["navigation"]["load"] > 0, "Métricas de carregamento devem ser coletadas"
 
     print(f"\n✅ Teste de descoberta concluído com sucesso!")
     print(f"📄 Relatório disponível em: {report_path}")
 
 
-def test_login_page_screenshot(page: Page, base_url: str):
-    """Captura screenshot da página de login para referência visual."""
+@pytest.mark.discovery
+@pytest.mark.crawl
+@pytest.mark.parametrize("route", route_crawler.load_routes(), ids=route_crawler.route_slug)
+def test_route_element_discovery(pooled_page: Page, base_url: str, route: str, crawl_results: list,
+                                 page_metrics: PageMetricsCollector, network_capture: NetworkCapture,
+                                 js_coverage: Optional[JSCoverage],
+                                 perf_budget: BudgetChecker, visual_baselines: BaselineStore, screenshot_store: ScreenshotStore):
+    """
+    Descoberta de elementos em cada rota de src/App.tsx (modo crawl).
+
+    Cada rota gera seu relatório em reports/routes/ e entra no índice
+    combinado reports/crawl_index.json. As rotas rodam em paralelo quando
+    o pytest é executado com múltiplos workers.
+    """
+    url = f"{base_url}{route}"
+    # Rotas que falham também entram no índice do crawl, com o erro
+    entry = {"route": route, "status": "error", "report": "", "statistics": {}}
+    try:
+        discovery = ElementDiscovery(pooled_page, base_url, page_metrics, network_capture, js_coverage)
+        discovered = discovery.discover_all(url)
+        report_path = discovery.save_report(route_crawler.route_report_filename(route))
+
+        screenshot = pooled_page.screenshot(full_page=True)
+        screenshot_store.put(route_crawler.route_slug(route), screenshot)
+        visual = visual_baselines.compare(route_crawler.route_slug(route), screenshot)
+        print(visual.describe())
+
+        statistics = {k: len(v) for k, v in discovered["elements"].items()}
+        entry.update({
+            "status": "ok",
+            "report": report_path,
+            "statistics": statistics,
+            "metrics": summarize(page_metrics.last),
+            "network": summarize_network(discovery.network),
+            "readiness": discovery.readiness,
+            "coverage": summarize_coverage(discovery.coverage),
+            "visual": visual.status,
+        })
+    except Exception as e:
+        entry["error"] = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        crawl_results.append(entry)
+    perf_budget.check(route, flatten(page_metrics.last, statistics, discovery.network))
+
+    assert discovered["url"] == url, "URL deve estar registrada"
+    assert not visual.regressed, f"Regressão visual em {route} (heatmap: {visual.heatmap_path})"
+
+
+@pytest.mark.route("/")
+def test_login_page_screenshot(pooled_page: Page, base_url: str, visual_baselines: BaselineStore,
+                               screenshot_store: ScreenshotStore):
+    """Compara a página de login com a baseline visual aprovada."""
     login_url = f"{base_url}/"
 
     print(f"\n📸 Capturando screenshot da página...")
-    page.goto(login_url)
-    page.wait_for_load_state("networkidle")
-
-    screenshots_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "reports", "screenshots")
-    os.makedirs(screenshots_dir, exist_ok=True)
+    pooled_page.goto(login_url)
+    wait_for_route_settled(pooled_page)
 
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    screenshot_path = os.path.join(screenshots_dir, f"login_page_{timestamp}.png")
+    screenshot = pooled_page.screenshot(full_page=True)
+    stored = screenshot_store.put("login_page", screenshot)
+    print(f"📦 Captura {stored.digest[:12]} ({stored.kind}, {stored.size} bytes gravados)")
 
-    page.screenshot(path=screenshot_path, full_page=True)
+    result = visual_baselines.compare("login_page", screenshot)
 
-    print(f"✅ Screenshot salvo em: {screenshot_path}")
-    assert os.path.exists(screenshot_path), "Screenshot deve ser criado"
+    print(result.describe())
+    assert not result.regressed, f"Regressão visual na página de login (heatmap: {result.heatmap_path})"
 
 
 if __name__ == "__main__":
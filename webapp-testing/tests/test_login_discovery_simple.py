@@ -4,20 +4,155 @@ Este teste explora a página de Login e documenta todos os elementos encontrados
 Versão que não requer browsers - usa BeautifulSoup.
 """
 
-import json
+import argparse
+import itertools
 import os
 import sys
 from datetime import datetime
+from typing import Optional
 import requests
-from bs4 import BeautifulSoup
-
-
-class SimpleElementDiscovery:
+from bs4 import BeautifulSoup, Tag
+from requests.adapters import HTTPAdapter
+
+import impact_analysis
+import route_crawler
+from atomic_file import atomic_write_json
+from report_stream import NDJSONReportWriter, StreamingReportMixin
+from dom_snapshots import SnapshotStore, route_key
+from discovery_cache import Chunk, DiscoveryCache, Shell, split_document
+from perf_budget import BUDGET_PATH, BudgetChecker, PerfHistory, flatten, load_budgets
+
+
+def _describe_input(elem) -> dict:
+    return {
+        "type": elem.get("type", "text"),
+        "name": elem.get("name", ""),
+        "id": elem.get("id", ""),
+        "placeholder": elem.get("placeholder", ""),
+        "class": elem.get("class", []),
+        "required": elem.has_attr("required"),
+        "value": elem.get("value", ""),
+        "aria-label": elem.get("aria-label", ""),
+    }
+
+
+def _describe_button(elem) -> dict:
+    return {
+        "text": elem.get_text(strip=True),
+        "type": elem.get("type", ""),
+        "id": elem.get("id", ""),
+        "class": elem.get("class", []),
+        "disabled": elem.has_attr("disabled"),
+        "aria-label": elem.get("aria-label", ""),
+        "data-testid": elem.get("data-testid", ""),
+    }
+
+
+def _describe_link(elem) -> dict:
+    return {
+        "text": elem.get_text(strip=True),
+        "href": elem.get("href", ""),
+        "id": elem.get("id", ""),
+        "class": elem.get("class", []),
+        "aria-label": elem.get("aria-label", ""),
+        "target": elem.get("target", ""),
+    }
+
+
+def _describe_form(elem) -> dict:
+    return {
+        "action": elem.get("action", ""),
+        "method": elem.get("method", ""),
+        "id": elem.get("id", ""),
+        "class": elem.get("class", []),
+        "name": elem.get("name", ""),
+    }
+
+
+def _describe_heading(elem) -> dict:
+    return {
+        "text": elem.get_text(strip=True),
+        "id": elem.get("id", ""),
+        "class": elem.get("class", []),
+    }
+
+
+def _describe_image(elem) -> dict:
+    return {
+        "src": elem.get("src", ""),
+        "alt": elem.get("alt", ""),
+        "id": elem.get("id", ""),
+        "class": elem.get("class", []),
+        "width": elem.get("width", ""),
+        "height": elem.get("height", ""),
+    }
+
+
+def _describe_select(elem) -> dict:
+    options = [opt.get_text(strip=True) for opt in elem.find_all("option")]
+    return {
+        "id": elem.get("id", ""),
+        "name": elem.get("name", ""),
+        "class": elem.get("class", []),
+        "options_count": len(options),
+        "options": options[:10],  # Limita a 10 para não sobrecarregar
+    }
+
+
+def _describe_textarea(elem) -> dict:
+    return {
+        "id": elem.get("id", ""),
+        "name": elem.get("name", ""),
+        "class": elem.get("class", []),
+        "placeholder": elem.get("placeholder", ""),
+    }
+
+
+def _describe_role(elem) -> dict:
+    return {
+        "tag": elem.name,
+        "role": elem.get("role", ""),
+        "id": elem.get("id", ""),
+        "class": elem.get("class", []),
+        "aria-label": elem.get("aria-label", ""),
+    }
+
+
+# Descrição de cada tag indexada (sem "index"/"level"/"type", que dependem
+# da posição do elemento na página inteira e são atribuídos pelos discover_*)
+DESCRIBERS = {
+    "input": _describe_input,
+    "button": _describe_button,
+    "a": _describe_link,
+    "form": _describe_form,
+    "img": _describe_image,
+    "select": _describe_select,
+    "textarea": _describe_textarea,
+    **{f"h{level}": _describe_heading for level in range(1, 7)},
+}
+
+
+class SimpleElementDiscovery(StreamingReportMixin):
     """Classe para descoberta e documentação de elementos usando BeautifulSoup."""
 
-    def __init__(self, base_url: str):
+    # Tags indexadas pela varredura única da árvore (ver _build_index)
+    INDEXED_TAGS = (
+        "input", "button", "a", "form", "img", "select", "textarea",
+        "h1", "h2", "h3", "h4", "h5", "h6",
+    )
+    ROLE_KEY = "[role]"
+
+    def __init__(self, base_url: str, session: Optional[requests.Session] = None, verbose: bool = True,
+                 snapshots: Optional[SnapshotStore] = None, cache: Optional[DiscoveryCache] = None):
         self.base_url = base_url
+        self.session = session
+        self.snapshots = snapshots
+        self.cache = cache
+        self.stream: Optional[NDJSONReportWriter] = None
+        self.verbose = verbose
+        self.html = None
         self.soup = None
+        self._index = None
         self.discovered_elements = {
             "timestamp": datetime.now().isoformat(),
             "url": "",
@@ -34,209 +169,275 @@ class SimpleElementDiscovery:
         }
 
     def fetch_page(self, url: str):
-        """Busca a página HTML."""
-        print(f"\n🌐 Buscando página: {url}")
+        """Busca a página HTML (ou o snapshot renderizado, se houver um store)."""
+        if self.snapshots is not None:
+            return self.load_snapshot(url)
+
+        self._log(f"\n🌐 Buscando página: {url}")
         try:
-            response = requests.get(url, timeout=10)
+            http = self.session or requests
+            response = http.get(url, timeout=10)
             response.raise_for_status()
-            self.soup = BeautifulSoup(response.text, 'lxml')
-            self.discovered_elements["url"] = url
-            print(f"✅ Página carregada com sucesso ({len(response.text)} bytes)")
+            self._load_html(response.text, url)
+            self._log(f"✅ Página carregada com sucesso ({len(response.text)} bytes)")
             return True
         except Exception as e:
-            print(f"❌ Erro ao buscar página: {e}")
+            self._log(f"❌ Erro ao buscar página: {e}")
+            return False
+
+    def load_snapshot(self, url: str):
+        """Carrega o snapshot do DOM renderizado da rota (ver dom_snapshots.py)."""
+        self._log(f"\n📸 Carregando snapshot: {url}")
+        html = self.snapshots.load(url)
+        if html is None:
+            self._log(f"❌ Nenhum snapshot para {route_key(url)} (execute tests/dom_snapshots.py)")
+            return False
+        if not self.snapshots.is_current(url):
+            self._log(f"❌ Snapshot de {route_key(url)} renderizado a partir de outra versão do código "
+                      f"(execute tests/dom_snapshots.py)")
             return False
 
+        self._load_html(html, url)
+        self.discovered_elements["snapshot"] = self.snapshots.resolve(url)
+        self._log(f"✅ Snapshot carregado com sucesso ({len(html)} bytes)")
+        return True
+
+    def _load_html(self, html: str, url: str):
+        """Registra o HTML da página; o parse só acontece quando for necessário."""
+        self.html = html
+        self.soup = None
+        self._index = None
+        self.discovered_elements["url"] = url
+
+    def _get_soup(self) -> BeautifulSoup:
+        if self.soup is None:
+            self.soup = BeautifulSoup(self.html, 'lxml')
+        return self.soup
+
+    def _log(self, message: str = ""):
+        """Imprime mensagens de progresso (silenciado no modo crawl)."""
+        if self.verbose:
+            print(message)
+
+    def _describe_elements(self, elements) -> dict:
+        """
+        Percorre os elementos uma única vez e distribui cada tag para todas as
+        categorias que a consomem (nome da tag e/ou atributo role).
+        A ordem do documento é preservada em cada categoria, então o resultado
+        é idêntico ao de um find_all por categoria.
+        """
+        index = {name: [] for name in self.INDEXED_TAGS}
+        index[self.ROLE_KEY] = []
+        role_elements = index[self.ROLE_KEY]
+
+        for elem in elements:
+            describe = DESCRIBERS.get(elem.name)
+            if describe is not None:
+                index[elem.name].append(describe(elem))
+            if elem.get("role") is not None:
+                role_elements.append(_describe_role(elem))
+
+        return index
+
+    def _build_index(self):
+        """Monta o índice da página, reaproveitando trechos já analisados quando há cache."""
+        index = self._build_index_incremental() if self.cache is not None else None
+        if index is None:
+            index = self._describe_elements(self._get_soup().find_all(True))
+        self._index = index
+        return index
+
+    def _build_index_incremental(self) -> Optional[dict]:
+        """
+        Divide a página em trechos (ver discovery_cache.split_document) e só
+        faz o parse/análise com BeautifulSoup dos trechos que não estão no cache.
+        Retorna None se a página não puder ser analisada por trechos.
+        """
+        segments = split_document(self.html)
+        if segments is None:
+            return None
+
+        shell_soup = BeautifulSoup("", 'lxml')
+        parts = []
+        chunks = reused = 0
+        for segment in segments:
+            if isinstance(segment, Shell):
+                tag = shell_soup.new_tag(segment.name, attrs=segment.attrs)
+                parts.append(self._describe_elements([tag]))
+                continue
+
+            chunks += 1
+            key = self.cache.key(segment.html)
+            described = self.cache.get_subtree(key)
+            if described is None:
+                described = self._describe_chunk(segment)
+                if described is None:
+                    return None
+                self.cache.put_subtree(key, described)
+            else:
+                reused += 1
+            parts.append(described)
+
+        self._log(f"♻️  {reused}/{chunks} trechos da página reaproveitados do cache")
+        return {key: [info for part in parts for info in part[key]] for key in parts[0]}
+
+    def _describe_chunk(self, chunk: Chunk) -> Optional[dict]:
+        """Faz o parse de um trecho no contexto original e descreve seus elementos."""
+        node = BeautifulSoup(chunk.wrapped(), 'lxml')
+        for name in chunk.context:
+            node = node.find(name, recursive=False)
+            if node is None:
+                return None
+
+        roots = [child for child in node.children if isinstance(child, Tag)]
+        if len(roots) != chunk.count:
+            return None
+
+        return self._describe_elements(
+            itertools.chain.from_iterable(itertools.chain([root], root.find_all(True)) for root in roots)
+        )
+
+    def _find(self, key: str):
+        """Retorna as descrições dos elementos de uma categoria a partir do índice da página."""
+        if self._index is None:
+            self._build_index()
+        return self._index[key]
+
     def discover_inputs(self):
         """Descobre todos os campos de input."""
-        print("\n🔍 Descobrindo campos de input...")
-        inputs = self.soup.find_all("input")
-
-        for idx, input_elem in enumerate(inputs):
-            element_info = {
-                "index": idx,
-                "type": input_elem.get("type", "text"),
-                "name": input_elem.get("name", ""),
-                "id": input_elem.get("id", ""),
-                "placeholder": input_elem.get("placeholder", ""),
-                "class": input_elem.get("class", []),
-                "required": input_elem.has_attr("required"),
-                "value": input_elem.get("value", ""),
-                "aria-label": input_elem.get("aria-label", ""),
-            }
-            self.discovered_elements["elements"]["inputs"].append(element_info)
-            print(f"  ✓ Input {idx}: type='{element_info['type']}', id='{element_info['id']}', placeholder='{element_info['placeholder']}'")
+        self._log("\n🔍 Descobrindo campos de input...")
+        inputs = self._find("input")
+
+        for idx, info in enumerate(inputs):
+            element_info = {"index": idx, **info}
+            self._add_element("inputs", element_info)
+            self._log(f"  ✓ Input {idx}: type='{element_info['type']}', id='{element_info['id']}', placeholder='{element_info['placeholder']}'")
 
         return len(inputs)
 
     def discover_buttons(self):
         """Descobre todos os botões."""
-        print("\n🔍 Descobrindo botões...")
-        buttons = self.soup.find_all("button")
-
-        for idx, button in enumerate(buttons):
-            element_info = {
-                "index": idx,
-                "text": button.get_text(strip=True),
-                "type": button.get("type", ""),
-                "id": button.get("id", ""),
-                "class": button.get("class", []),
-                "disabled": button.has_attr("disabled"),
-                "aria-label": button.get("aria-label", ""),
-                "data-testid": button.get("data-testid", ""),
-            }
-            self.discovered_elements["elements"]["buttons"].append(element_info)
-            print(f"  ✓ Button {idx}: text='{element_info['text'][:50]}', type='{element_info['type']}', id='{element_info['id']}'")
+        self._log("\n🔍 Descobrindo botões...")
+        buttons = self._find("button")
+
+        for idx, info in enumerate(buttons):
+            element_info = {"index": idx, **info}
+            self._add_element("buttons", element_info)
+            self._log(f"  ✓ Button {idx}: text='{element_info['text'][:50]}', type='{element_info['type']}', id='{element_info['id']}'")
 
         return len(buttons)
 
     def discover_links(self):
         """Descobre todos os links."""
-        print("\n🔍 Descobrindo links...")
-        links = self.soup.find_all("a")
-
-        for idx, link in enumerate(links):
-            element_info = {
-                "index": idx,
-                "text": link.get_text(strip=True),
-                "href": link.get("href", ""),
-                "id": link.get("id", ""),
-                "class": link.get("class", []),
-                "aria-label": link.get("aria-label", ""),
-                "target": link.get("target", ""),
-            }
-            self.discovered_elements["elements"]["links"].append(element_info)
+        self._log("\n🔍 Descobrindo links...")
+        links = self._find("a")
+
+        for idx, info in enumerate(links):
+            element_info = {"index": idx, **info}
+            self._add_element("links", element_info)
             if element_info['text']:  # Apenas mostrar links com texto
-                print(f"  ✓ Link {idx}: text='{element_info['text'][:50]}', href='{element_info['href'][:50]}'")
+                self._log(f"  ✓ Link {idx}: text='{element_info['text'][:50]}', href='{element_info['href'][:50]}'")
 
         return len(links)
 
     def discover_forms(self):
         """Descobre todos os formulários."""
-        print("\n🔍 Descobrindo formulários...")
-        forms = self.soup.find_all("form")
-
-        for idx, form in enumerate(forms):
-            element_info = {
-                "index": idx,
-                "action": form.get("action", ""),
-                "method": form.get("method", ""),
-                "id": form.get("id", ""),
-                "class": form.get("class", []),
-                "name": form.get("name", ""),
-            }
-            self.discovered_elements["elements"]["forms"].append(element_info)
-            print(f"  ✓ Form {idx}: action='{element_info['action']}', method='{element_info['method']}', id='{element_info['id']}'")
+        self._log("\n🔍 Descobrindo formulários...")
+        forms = self._find("form")
+
+        for idx, info in enumerate(forms):
+            element_info = {"index": idx, **info}
+            self._add_element("forms", element_info)
+            self._log(f"  ✓ Form {idx}: action='{element_info['action']}', method='{element_info['method']}', id='{element_info['id']}'")
 
         return len(forms)
 
     def discover_headings(self):
         """Descobre todos os headings (h1-h6)."""
-        print("\n🔍 Descobrindo headings...")
+        self._log("\n🔍 Descobrindo headings...")
         count = 0
         for level in range(1, 7):
-            headings = self.soup.find_all(f"h{level}")
-            for idx, heading in enumerate(headings):
-                element_info = {
-                    "level": level,
-                    "index": idx,
-                    "text": heading.get_text(strip=True),
-                    "id": heading.get("id", ""),
-                    "class": heading.get("class", []),
-                }
-                self.discovered_elements["elements"]["headings"].append(element_info)
-                print(f"  ✓ H{level} {idx}: text='{element_info['text'][:80]}'")
+            headings = self._find(f"h{level}")
+            for idx, info in enumerate(headings):
+                element_info = {"level": level, "index": idx, **info}
+                self._add_element("headings", element_info)
+                self._log(f"  ✓ H{level} {idx}: text='{element_info['text'][:80]}'")
                 count += 1
 
         return count
 
     def discover_images(self):
         """Descobre todas as imagens."""
-        print("\n🔍 Descobrindo imagens...")
-        images = self.soup.find_all("img")
-
-        for idx, img in enumerate(images):
-            element_info = {
-                "index": idx,
-                "src": img.get("src", ""),
-                "alt": img.get("alt", ""),
-                "id": img.get("id", ""),
-                "class": img.get("class", []),
-                "width": img.get("width", ""),
-                "height": img.get("height", ""),
-            }
-            self.discovered_elements["elements"]["images"].append(element_info)
-            print(f"  ✓ Image {idx}: alt='{element_info['alt']}', src='{element_info['src'][:60]}'")
+        self._log("\n🔍 Descobrindo imagens...")
+        images = self._find("img")
+
+        for idx, info in enumerate(images):
+            element_info = {"index": idx, **info}
+            self._add_element("images", element_info)
+            self._log(f"  ✓ Image {idx}: alt='{element_info['alt']}', src='{element_info['src'][:60]}'")
 
         return len(images)
 
     def discover_interactive(self):
         """Descobre elementos interativos adicionais."""
-        print("\n🔍 Descobrindo elementos interativos...")
+        self._log("\n🔍 Descobrindo elementos interativos...")
         count = 0
 
         # Selects
-        selects = self.soup.find_all("select")
-        for idx, elem in enumerate(selects):
-            options = [opt.get_text(strip=True) for opt in elem.find_all("option")]
-            element_info = {
-                "type": "select",
-                "index": idx,
-                "id": elem.get("id", ""),
-                "name": elem.get("name", ""),
-                "class": elem.get("class", []),
-                "options_count": len(options),
-                "options": options[:10],  # Limita a 10 para não sobrecarregar
-            }
-            self.discovered_elements["elements"]["interactive"].append(element_info)
-            print(f"  ✓ Select {idx}: id='{element_info['id']}', options={len(options)}")
+        selects = self._find("select")
+        for idx, info in enumerate(selects):
+            element_info = {"type": "select", "index": idx, **info}
+            self._add_element("interactive", element_info)
+            self._log(f"  ✓ Select {idx}: id='{element_info['id']}', options={element_info['options_count']}")
             count += 1
 
         # Textareas
-        textareas = self.soup.find_all("textarea")
-        for idx, elem in enumerate(textareas):
-            element_info = {
-                "type": "textarea",
-                "index": idx,
-                "id": elem.get("id", ""),
-                "name": elem.get("name", ""),
-                "class": elem.get("class", []),
-                "placeholder": elem.get("placeholder", ""),
-            }
-            self.discovered_elements["elements"]["interactive"].append(element_info)
-            print(f"  ✓ Textarea {idx}: id='{element_info['id']}'")
+        textareas = self._find("textarea")
+        for idx, info in enumerate(textareas):
+            element_info = {"type": "textarea", "index": idx, **info}
+            self._add_element("interactive", element_info)
+            self._log(f"  ✓ Textarea {idx}: id='{element_info['id']}'")
             count += 1
 
         # Elementos com role
-        role_elements = self.soup.find_all(attrs={"role": True})
-        for idx, elem in enumerate(role_elements):
-            element_info = {
-                "type": "role_element",
-                "index": idx,
-                "tag": elem.name,
-                "role": elem.get("role", ""),
-                "id": elem.get("id", ""),
-                "class": elem.get("class", []),
-                "aria-label": elem.get("aria-label", ""),
-            }
-            self.discovered_elements["elements"]["interactive"].append(element_info)
-            print(f"  ✓ Role element {idx}: tag='{elem.name}', role='{elem.get('role')}'")
+        role_elements = self._find(self.ROLE_KEY)
+        for idx, info in enumerate(role_elements):
+            element_info = {"type": "role_element", "index": idx, **info}
+            self._add_element("interactive", element_info)
+            self._log(f"  ✓ Role element {idx}: tag='{element_info['tag']}', role='{element_info['role']}'")
             count += 1
 
         return count
 
     def discover_all(self, url: str):
         """Executa todas as descobertas."""
-        print(f"\n{'=' * 80}")
-        print(f"🔍 TESTE DE DESCOBERTA DE ELEMENTOS")
-        print(f"{'=' * 80}")
-        print(f"URL: {url}")
-        print(f"Timestamp: {self.discovered_elements['timestamp']}")
-        print(f"{'=' * 80}")
+        self._log(f"\n{'=' * 80}")
+        self._log(f"🔍 TESTE DE DESCOBERTA DE ELEMENTOS")
+        self._log(f"{'=' * 80}")
+        self._log(f"URL: {url}")
+        self._log(f"Timestamp: {self.discovered_elements['timestamp']}")
+        self._log(f"{'=' * 80}")
 
         if not self.fetch_page(url):
             return None
 
+        if self.stream is not None:
+            self.stream.write_meta(timestamp=self.discovered_elements["timestamp"], url=url)
+
+        page_key = None
+        if self.cache is not None:
+            page_key = self.cache.key(self.html)
+            cached = self.cache.get_page(page_key)
+            if cached is not None:
+                for category, elements in cached["elements"].items():
+                    for element_info in elements:
+                        self._add_element(category, element_info)
+                self.discovered_elements["statistics"] = cached["statistics"]
+                self._log("\n♻️  Página inalterada: relatório reaproveitado do cache")
+                if self.stream is not None:
+                    self._close_stream(cached["statistics"])
+                return self.discovered_elements
+
         # Executa todas as descobertas
         stats = {}
         stats['inputs'] = self.discover_inputs()
@@ -249,6 +450,15 @@ class SimpleElementDiscovery:
 
         self.discovered_elements['statistics'] = stats
 
+        if self.stream is not None:
+            # Os elementos não ficaram em memória: não há relatório completo para cachear
+            self._close_stream(stats)
+        elif page_key is not None:
+            self.cache.put_page(page_key, {
+                "elements": self.discovered_elements["elements"],
+                "statistics": stats,
+            })
+
         return self.discovered_elements
 
     def save_report(self, filename: str = None):
@@ -261,13 +471,13 @@ class SimpleElementDiscovery:
         os.makedirs(reports_dir, exist_ok=True)
 
         filepath = os.path.join(reports_dir, filename)
+        os.makedirs(os.path.dirname(filepath), exist_ok=True)
 
-        with open(filepath, "w", encoding="utf-8") as f:
-            json.dump(self.discovered_elements, f, indent=2, ensure_ascii=False)
+        atomic_write_json(filepath, self.discovered_elements, indent=2)
 
-        print(f"\n{'=' * 80}")
-        print(f"📄 Relatório salvo em: {filepath}")
-        print(f"{'=' * 80}")
+        self._log(f"\n{'=' * 80}")
+        self._log(f"📄 Relatório salvo em: {filepath}")
+        self._log(f"{'=' * 80}")
 
         return filepath
 
@@ -288,26 +498,99 @@ class SimpleElementDiscovery:
         print(f"{'=' * 80}\n")
 
 
-def main():
-    """Função principal para executar o teste."""
-    # Configura a URL base
-    base_url = "http://localhost:5173"
+def discover_route(base_url: str, route: str, session: requests.Session,
+                   snapshots: Optional[SnapshotStore] = None,
+                   cache: Optional[DiscoveryCache] = None, ndjson: bool = False) -> Optional[dict]:
+    """Descobre os elementos de uma rota e salva o relatório em reports/routes/."""
+    discovery = SimpleElementDiscovery(base_url, session=session, verbose=False,
+                                       snapshots=snapshots, cache=cache)
+    if ndjson:
+        report_path = discovery.open_stream(route_crawler.route_report_filename(route, ".ndjson"))
+
+    try:
+        result = discovery.discover_all(f"{base_url}{route}")
+    finally:
+        discovery.discard_stream()
+    if not result:
+        return None
+
+    if not ndjson:
+        report_path = discovery.save_report(route_crawler.route_report_filename(route))
+    return {"report": report_path, "statistics": result["statistics"]}
+
+
+def crawl_main(base_url: str, routes: list, workers: int, snapshots: Optional[SnapshotStore] = None,
+               cache: Optional[DiscoveryCache] = None, ndjson: bool = False,
+               budget: Optional[BudgetChecker] = None) -> int:
+    """Executa a descoberta de várias rotas em paralelo com uma sessão HTTP compartilhada."""
+    print(f"\n{'=' * 80}")
+    print(f"🕸️  CRAWL DE ROTAS ({len(routes)} rotas, {workers} workers)")
+    print(f"{'=' * 80}")
+
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=workers)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+
+    try:
+        results = route_crawler.crawl(
+            routes,
+            lambda route: discover_route(base_url, route, session, snapshots, cache, ndjson),
+            max_workers=workers,
+        )
+    finally:
+        session.close()
+
+    index_path = route_crawler.write_crawl_index(results, base_url)
+    failed = [r["route"] for r in results if r["status"] != "ok"]
+
+    print(f"\n📄 Índice do crawl salvo em: {index_path}")
+    if failed:
+        print(f"❌ Falha na descoberta de {len(failed)} rota(s): {', '.join(failed)}\n")
+        return 1
 
+    if budget is not None:
+        for result in results:
+            budget.check(result["route"], flatten(statistics=result["statistics"]))
+        if budget.violations:
+            print(f"❌ Orçamentos de performance excedidos:")
+            budget.print_violations()
+            return 1
+
+    print(f"✅ Crawl concluído com sucesso!\n")
+    return 0
+
+
+def discover_single(base_url: str, snapshots: Optional[SnapshotStore] = None,
+                    cache: Optional[DiscoveryCache] = None, ndjson: bool = False,
+                    budget: Optional[BudgetChecker] = None) -> int:
+    """Descobre os elementos da página de login e salva o relatório."""
     # TODO: Alterar para "/login" quando a página de login for implementada
     login_url = f"{base_url}/"
 
     # Cria o descobridor
-    discovery = SimpleElementDiscovery(base_url)
+    discovery = SimpleElementDiscovery(base_url, snapshots=snapshots, cache=cache)
+    if ndjson:
+        report_path = discovery.open_stream("login_page_discovery.ndjson")
 
     # Executa a descoberta
-    result = discovery.discover_all(login_url)
+    try:
+        result = discovery.discover_all(login_url)
+    finally:
+        discovery.discard_stream()
 
     if result:
         # Imprime resumo
         discovery.print_summary()
 
         # Salva relatório
-        report_path = discovery.save_report("login_page_discovery.json")
+        if not ndjson:
+            report_path = discovery.save_report("login_page_discovery.json")
+
+        if budget is not None and budget.check("/", flatten(statistics=result["statistics"])):
+            print(f"\n❌ Orçamentos de performance excedidos:")
+            budget.print_violations()
+            return 1
 
         print(f"\n✅ Teste de descoberta concluído com sucesso!")
         print(f"📄 Relatório disponível em: {report_path}\n")
@@ -317,5 +600,56 @@ def main():
         return 1
 
 
+def parse_args(argv=None):
+    """Lê os argumentos de linha de comando."""
+    parser = argparse.ArgumentParser(description="Descoberta de elementos com BeautifulSoup")
+    parser.add_argument("--base-url", default=route_crawler.DEFAULT_BASE_URL, help="URL base da aplicação")
+    parser.add_argument("--crawl", action="store_true", help="descobre todas as rotas de src/App.tsx")
+    parser.add_argument("--routes", nargs="+", metavar="ROTA", help="lista de rotas a descobrir (implica --crawl)")
+    parser.add_argument("--changed-since", metavar="REF",
+                        help="descobre só as rotas afetadas pelas mudanças desde REF do git (implica --crawl)")
+    parser.add_argument("--workers", type=int, default=route_crawler.DEFAULT_WORKERS,
+                        help="número máximo de rotas descobertas em paralelo")
+    parser.add_argument("--snapshot", action="store_true",
+                        help="analisa os snapshots do DOM renderizado em vez do HTML servido")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="ignora o cache de descoberta (reports/cache/) e reanalisa tudo")
+    parser.add_argument("--ndjson", action="store_true",
+                        help="grava os elementos em NDJSON à medida que são descobertos")
+    parser.add_argument("--budget", nargs="?", const=BUDGET_PATH, metavar="ARQUIVO",
+                        help="registra as contagens no histórico e confere os orçamentos (padrão: budgets.json)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Função principal para executar o teste."""
+    args = parse_args(argv)
+
+    # Configura a URL base
+    base_url = args.base_url.rstrip("/")
+
+    snapshots = SnapshotStore() if args.snapshot else None
+    cache = None if args.no_cache else DiscoveryCache()
+    history = PerfHistory() if args.budget else None
+    budget = BudgetChecker(load_budgets(args.budget), history, base_url=base_url) if args.budget else None
+
+    try:
+        if args.crawl or args.routes or args.changed_since:
+            routes = args.routes or route_crawler.load_routes()
+            if args.changed_since:
+                affected = set(impact_analysis.affected_routes(args.changed_since))
+                routes = [route for route in routes if route in affected]
+                print(f"\n🎯 {len(routes)} rota(s) afetada(s) desde {args.changed_since}")
+                if not routes:
+                    return 0
+            return crawl_main(base_url, routes, args.workers, snapshots, cache, args.ndjson, budget)
+        return discover_single(base_url, snapshots, cache, args.ndjson, budget)
+    finally:
+        if cache is not None:
+            cache.prune()
+        if history is not None:
+            history.close()
+
+
 if __name__ == "__main__":
     sys.exit(main())
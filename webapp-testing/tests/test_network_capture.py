@@ -0,0 +1,113 @@
+"""
+Testes unitários da análise do log de rede do network_capture (sem browser).
+"""
+
+import pytest
+
+import route_crawler
+from network_capture import analyze, compression_expected, summarize_network
+
+REST = "http://localhost:54321/rest/v1"
+
+
+def _entry(url: str, start: float, end: float, method: str = "GET", type_: str = "Fetch",
+           cache: str = "network", mime: str = "application/json", encoding: str = "gzip",
+           size: int = 500, ttfb: float = 0.0) -> dict:
+    return {"url": url, "method": method, "type": type_, "start": start, "end": end, "ttfb": ttfb,
+            "cache": cache, "mime": mime, "encoding": encoding, "encoded_size": size}
+
+
+def _kinds(analysis: dict) -> dict:
+    return {finding["kind"]: finding for finding in analysis["findings"]}
+
+
+def test_repeated_gets_waste_the_time_of_the_repetitions():
+    entries = [
+        _entry(f"{REST}/uasgs?select=*&order=numero_uasg.asc", 0, 40),
+        _entry(f"{REST}/uasgs?order=numero_uasg.asc&select=*", 10, 70),   # mesma query em outra ordem
+        _entry(f"{REST}/uasgs?select=*&order=numero_uasg.asc", 0, 5, cache="memory"),
+        _entry(f"{REST}/uasgs?select=*&order=numero_uasg.asc", 80, 90, method="POST"),
+    ]
+
+    duplicate = _kinds(analyze(entries))["duplicate"]
+
+    assert duplicate["count"] == 2 and duplicate["wasted_ms"] == 60
+    assert duplicate["detail"] == "GET uasgs repetido 2x"
+
+
+def test_one_query_per_row_is_reported_as_n_plus_one():
+    entries = [_entry(f"{REST}/materiais_servicos?select=*&dfd_id=eq.{i}", start=10 * i, end=10 * i + 30)
+               for i in range(4)]
+
+    analysis = analyze(entries)
+
+    (finding,) = analysis["findings"]
+    assert finding["kind"] == "n_plus_one" and finding["count"] == 4
+    # Ocupam 0..60ms; uma única consulta com in.(...) levaria 30ms
+    assert finding["wasted_ms"] == 30
+    assert "dfd_id=in.(...)" in finding["detail"]
+
+
+def test_two_distinct_values_are_not_n_plus_one():
+    entries = [_entry(f"{REST}/dfds?select=*&id=eq.{i}", 0, 20) for i in range(2)]
+
+    assert analyze(entries)["findings"] == []
+
+
+def test_serial_data_requests_form_a_chain():
+    entries = [
+        _entry(f"{REST}/uasgs?select=*", 0, 100),
+        _entry(f"{REST}/areas_requisitantes?select=*", 120, 200),
+        _entry(f"{REST}/dfds?select=*", 210, 300),
+        # Script não entra na cadeia
+        _entry("http://localhost:5173/src/main.tsx", 300, 400, type_="Script", mime="application/javascript"),
+    ]
+
+    chain = _kinds(analyze(entries))["chain"]
+
+    assert chain["count"] == 3
+    # 300ms de ponta a ponta contra 100ms se as três fossem disparadas juntas
+    assert chain["wasted_ms"] == 200
+
+
+def test_gap_longer_than_the_threshold_breaks_the_chain():
+    entries = [_entry(f"{REST}/t{i}?select=*", start=200 * i, end=200 * i + 100) for i in range(3)]
+
+    assert "chain" not in _kinds(analyze(entries))
+
+
+def test_uncompressed_assets_are_only_checked_when_requested():
+    bundle = _entry("http://localhost:4173/assets/index.js", 0, 400, type_="Script", mime="application/javascript",
+                    encoding="", size=200_000, ttfb=100)
+    small = _entry("http://localhost:4173/assets/logo.svg", 0, 50, type_="Image", mime="image/svg+xml",
+                   encoding="", size=800)
+
+    assert analyze([bundle, small])["findings"] == []
+    (finding,) = analyze([bundle, small], check_compression=True)["findings"]
+    # 300ms de download, 70% dos quais seriam poupados
+    assert finding["kind"] == "uncompressed" and finding["wasted_ms"] == 210
+
+
+def test_totals_and_summary():
+    entries = [
+        _entry(f"{REST}/dfds?select=*", 0, 50),
+        _entry(f"{REST}/dfds?select=*", 60, 90),
+        _entry("http://localhost:5173/", 0, 20, type_="Document", mime="text/html", cache="disk", size=0),
+        _entry("http://localhost:5173/favicon.ico", 5, 130, type_="Other"),
+    ]
+
+    log = {"analysis": analyze(entries)}
+
+    assert log["analysis"]["requests"] == 4 and log["analysis"]["rest_requests"] == 2
+    assert log["analysis"]["transfer_size"] == 1500 and log["analysis"]["from_cache"] == 1
+    assert log["analysis"]["last_request"] == {"url": "http://localhost:5173/favicon.ico", "end": 130}
+    assert summarize_network(log) == {"requests": 4, "rest_requests": 2, "wasted_ms": 30.0,
+                                      "findings": {"duplicate": 1}}
+    assert summarize_network(None) == {}
+
+
+@pytest.mark.parametrize("mode, expected", [("build", True), ("dev", False), ("", False)])
+def test_compression_is_expected_only_from_the_production_build(monkeypatch, mode, expected):
+    monkeypatch.setenv(route_crawler.SERVER_MODE_ENV, mode)
+
+    assert compression_expected() is expected
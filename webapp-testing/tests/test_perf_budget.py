@@ -0,0 +1,67 @@
+"""
+Testes unitários dos orçamentos e da detecção de regressões do perf_budget (sem browser).
+"""
+
+import pytest
+
+import route_crawler
+from perf_budget import BudgetChecker, PerfHistory
+
+BUDGETS = {
+    "regression": {"window": 5, "threshold": 0.2, "min_samples": 3, "metrics": ["load"]},
+    "routes": {"*": {"load": 5000, "dom_nodes": 3000}, "/dfds/novo": {"load": 6000}},
+}
+
+
+@pytest.fixture
+def history(tmp_path):
+    history = PerfHistory(str(tmp_path / "perf_history.sqlite"))
+    yield history
+    history.close()
+
+
+def _run(history, mode, monkeypatch, route="/dfds", **values):
+    monkeypatch.setenv(route_crawler.SERVER_MODE_ENV, mode)
+    checker = BudgetChecker(BUDGETS, history)
+    return checker.check(route, values)
+
+
+def test_route_limits_override_the_wildcard():
+    checker = BudgetChecker(BUDGETS)
+
+    assert checker.limits_for("/dfds/novo") == {"load": 6000, "dom_nodes": 3000}
+    assert [v.metric for v in checker.check("/dfds/novo", {"load": 5500, "dom_nodes": 3500})] == ["dom_nodes"]
+
+
+def test_regression_needs_min_samples_and_exceeds_the_median(history, monkeypatch):
+    for load in (1000, 1100):
+        assert _run(history, "dev", monkeypatch, load=load) == []
+    # Só duas amostras anteriores: ainda não compara
+    assert _run(history, "dev", monkeypatch, load=4000) == []
+
+    # Mediana de [1000, 1100, 4000] = 1100: 1300 está dentro dos 20%; depois, mediana = 1200
+    assert _run(history, "dev", monkeypatch, load=1300) == []
+    found = _run(history, "dev", monkeypatch, load=2000)
+
+    assert [(v.kind, v.metric, v.limit) for v in found] == [("regression", "load", 1200)]
+
+
+def test_build_runs_are_not_compared_with_dev_runs(history, monkeypatch):
+    for load in (3000, 3100, 3200):
+        _run(history, "dev", monkeypatch, load=load)
+    for load in (1000, 1000):
+        assert _run(history, "build", monkeypatch, load=load) == []
+
+    # Sem as execuções de dev, o build ainda não tem amostras suficientes
+    assert _run(history, "build", monkeypatch, load=2500) == []
+    assert [v.kind for v in _run(history, "build", monkeypatch, load=2500)] == ["regression"]
+    assert _run(history, "dev", monkeypatch, load=3300) == []
+
+
+def test_workers_of_the_same_session_share_the_run(history):
+    first = history.start_run("http://localhost:5173", "dev", session="sessao-1")
+    second = history.start_run("http://localhost:5173", "dev", session="sessao-1")
+    other = history.start_run("http://localhost:5173", "dev", session="sessao-2")
+
+    assert first == second
+    assert other != first
@@ -0,0 +1,109 @@
+"""
+Testes unitários do pareamento do report_diff (sem browser).
+"""
+
+from report_diff import diff_category, diff_reports, has_differences
+
+
+def _button(index: int, text: str, **attributes) -> dict:
+    return {"index": index, "text": text, "type": "button", **attributes}
+
+
+def test_identical_elements_are_unchanged_even_when_reordered():
+    old = [_button(0, "Salvar"), _button(1, "Cancelar")]
+    new = [_button(0, "Cancelar"), _button(1, "Salvar")]
+
+    diff = diff_category(old, new)
+
+    assert diff["added"] == [] and diff["removed"] == [] and diff["changed"] == []
+    assert diff["unchanged"] == 2
+    assert diff["matched_by"] == {"identical": 2}
+
+
+def test_exact_keys_are_tried_in_confidence_order():
+    old = [_button(0, "Salvar", id="salvar", name="acao")]
+    new = [_button(0, "Gravar", id="salvar", name="acao")]
+
+    diff = diff_category(old, new)
+
+    assert diff["matched_by"] == {"id": 1}
+    assert diff["changed"][0]["changes"] == {"text": ["Salvar", "Gravar"]}
+
+
+def test_duplicate_values_are_paired_in_page_order():
+    # O mesmo botão "Editar" em cada linha da tabela; só o segundo mudou de classe
+    old = [_button(i, "Editar", **{"class": ["btn"], "data-row": str(i)}) for i in range(3)]
+    new = [dict(element) for element in old]
+    new[1]["class"] = ["btn", "btn-primary"]
+    new[1]["data-row"] = "x"
+
+    diff = diff_category(old, new)
+
+    assert diff["added"] == [] and diff["removed"] == []
+    assert [(c["old_index"], c["new_index"]) for c in diff["changed"]] == [(1, 1)]
+    assert diff["matched_by"] == {"identical": 2, "text": 1}
+
+
+def test_extra_duplicate_is_reported_as_added_at_the_end():
+    old = [_button(0, "Editar"), _button(1, "Editar")]
+    new = [_button(0, "Editar"), _button(1, "Editar"), _button(2, "Editar")]
+
+    diff = diff_category(old, new)
+
+    assert diff["unchanged"] == 2
+    assert [element["index"] for element in diff["added"]] == [2]
+
+
+def test_interactive_elements_only_match_within_the_same_selector():
+    old = [{"index": 0, "selector": "[role=tab]", "text": "Resumo"}]
+    new = [{"index": 0, "selector": "[role=menuitem]", "text": "Resumo"}]
+
+    diff = diff_category(old, new)
+
+    assert len(diff["added"]) == 1 and len(diff["removed"]) == 1
+    assert diff["unchanged"] == 0
+
+
+def test_fuzzy_fallback_pairs_elements_without_exact_keys():
+    old = [{"index": 3, "class": ["card", "card-dfd", "pendente"], "role": "article"}]
+    new = [{"index": 4, "class": ["card", "card-dfd", "aprovado"], "role": "article"}]
+
+    diff = diff_category(old, new)
+
+    assert diff["matched_by"] == {"fuzzy": 1}
+    assert diff["changed"][0]["changes"] == {
+        "class": [["card", "card-dfd", "pendente"], ["card", "card-dfd", "aprovado"]]}
+
+
+def test_fuzzy_fallback_prefers_the_closest_index_on_ties():
+    old = [{"index": 5, "class": ["linha", "tabela", "dfd", "antiga"]}]
+    new = [{"index": 0, "class": ["linha", "tabela", "dfd", "nova"]},
+           {"index": 6, "class": ["linha", "tabela", "dfd", "nova"]}]
+
+    diff = diff_category(old, new)
+
+    assert diff["changed"][0]["new_index"] == 6
+    assert [element["index"] for element in diff["added"]] == [0]
+
+
+def test_fuzzy_fallback_respects_the_threshold_and_can_be_disabled():
+    old = [{"index": 0, "class": ["a", "b", "c", "d"]}]
+    new = [{"index": 0, "class": ["a", "x", "y", "z"]}]
+
+    assert diff_category(old, new)["matched_by"] == {}
+
+    similar = [{"index": 0, "class": ["a", "b", "c", "z"]}]
+    assert diff_category(old, similar)["matched_by"] == {"fuzzy": 1}
+    assert diff_category(old, similar, fuzzy=False)["matched_by"] == {}
+
+
+def test_diff_reports_covers_categories_of_both_reports():
+    old = {"url": "/dfds", "elements": {"buttons": [_button(0, "Salvar")]}}
+    new = {"url": "/dfds", "elements": {"buttons": [_button(0, "Salvar")], "links": [{"index": 0, "href": "/"}]}}
+
+    diff = diff_reports(old, new)
+
+    assert set(diff["categories"]) == {"buttons", "links"}
+    assert len(diff["categories"]["links"]["added"]) == 1
+    assert has_differences(diff)
+    assert not has_differences(diff_reports(old, old))
@@ -0,0 +1,110 @@
+"""
+Testes unitários da gravação e leitura dos relatórios NDJSON (sem browser).
+"""
+
+import os
+
+import pytest
+
+import report_stream
+from report_stream import (NDJSONReportWriter, StreamingReportMixin, iter_elements, load_report, read_meta,
+                           read_statistics)
+
+
+def _write_report(path: str, finish: bool = True) -> str:
+    with NDJSONReportWriter(path) as writer:
+        writer.write_meta(timestamp="2026-01-01T00:00:00", url="http://localhost/dfds")
+        writer.write_element("buttons", {"index": 0, "text": "Salvar"})
+        writer.write_element("inputs", {"index": 0, "id": "descrição"})
+        writer.write_element("buttons", {"index": 1, "text": "Cancelar"})
+        if finish:
+            writer.write_statistics()
+    return path
+
+
+def test_round_trip_of_a_finished_report(tmp_path):
+    path = _write_report(str(tmp_path / "routes" / "dfds.ndjson"))
+
+    assert read_meta(path)["url"] == "http://localhost/dfds"
+    assert read_statistics(path)["buttons"] == 2 and read_statistics(path)["inputs"] == 1
+    assert [e["text"] for _, e in iter_elements(path, ["buttons"])] == ["Salvar", "Cancelar"]
+    assert [e["text"] for _, e in iter_elements(path, where=lambda e: e.get("text") == "Cancelar")] == ["Cancelar"]
+
+    report = load_report(path)
+    assert report["url"] == "http://localhost/dfds"
+    assert report["elements"]["inputs"] == [{"index": 0, "id": "descrição"}]
+
+
+def test_statistics_line_longer_than_the_read_block(tmp_path):
+    path = str(tmp_path / "grande.ndjson")
+    with NDJSONReportWriter(path) as writer:
+        writer.write_element("links", {"index": 0})
+        writer.write_statistics({f"categoria_{i}": i for i in range(500)})
+
+    assert read_statistics(path, block_size=64)["categoria_499"] == 499
+
+
+def test_report_without_statistics_line_reads_as_unfinished(tmp_path):
+    path = _write_report(str(tmp_path / "dfds.ndjson"), finish=False)
+
+    assert read_statistics(path) == {}
+    assert load_report(path)["statistics"] == {}
+
+
+def test_report_truncated_mid_line_reads_as_unfinished(tmp_path):
+    path = _write_report(str(tmp_path / "dfds.ndjson"))
+    with open(path, "r+b") as f:
+        f.truncate(os.path.getsize(path) - 10)
+
+    assert read_statistics(path) == {}
+
+
+def test_empty_report(tmp_path):
+    path = str(tmp_path / "vazio.ndjson")
+    open(path, "w").close()
+
+    assert read_meta(path) == {}
+    assert read_statistics(path) == {}
+
+
+class Discovery(StreamingReportMixin):
+    def __init__(self):
+        self.discovered_elements = {"elements": {"buttons": []}}
+        self.closed = []
+
+    def _log(self, message: str = ""):
+        pass
+
+    def _stream_closed(self, path: str):
+        self.closed.append(path)
+
+
+@pytest.fixture
+def reports_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(report_stream.route_crawler, "REPORTS_DIR", str(tmp_path))
+    return tmp_path
+
+
+def test_discard_stream_removes_the_truncated_report(reports_dir):
+    discovery = Discovery()
+    path = discovery.open_stream("routes/dfds.ndjson")
+    discovery._add_element("buttons", {"index": 0})
+
+    discovery.discard_stream()
+
+    assert not os.path.exists(path)
+    assert discovery.stream is None and discovery.closed == []
+    # Sem stream aberto (ex.: já finalizado), não faz nada
+    discovery.discard_stream()
+
+
+def test_finished_stream_keeps_the_report_and_skips_memory(reports_dir):
+    discovery = Discovery()
+    path = discovery.open_stream("dfds.ndjson")
+    discovery._add_element("buttons", {"index": 0, "text": "Salvar"})
+    discovery._close_stream()
+    discovery.discard_stream()
+
+    assert discovery.closed == [path] and os.path.exists(path)
+    assert discovery.discovered_elements["elements"]["buttons"] == []
+    assert read_statistics(path)["buttons"] == 1
@@ -0,0 +1,124 @@
+"""
+Testes unitários do armazenamento de capturas do screenshot_store (sem browser).
+"""
+
+import io
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from screenshot_store import ScreenshotStore
+from visual_regression import TILE
+
+
+def _png(pixels: np.ndarray) -> bytes:
+    buffer = io.BytesIO()
+    Image.fromarray(pixels).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def _page(seed: int = 0) -> np.ndarray:
+    # Ruído: o PNG fica grande o bastante para um delta de poucos blocos compensar
+    return np.random.default_rng(seed).integers(0, 256, (4 * TILE, 4 * TILE, 3), dtype=np.uint8)
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ScreenshotStore(str(tmp_path / "screenshots"))
+    yield store
+    store.close()
+
+
+def test_blob_inserted_concurrently_by_another_worker_is_deduplicated(store, tmp_path, monkeypatch):
+    other = ScreenshotStore(str(tmp_path / "screenshots"))
+    other.begin_run("worker-2")
+    store.begin_run("worker-1")
+    png = _png(_page())
+
+    # O outro worker grava o mesmo blob entre a consulta e a inserção deste
+    def keyframe(name):
+        other.put(name, png)
+        return None
+
+    monkeypatch.setattr(store, "_keyframe", keyframe)
+    stored = store.put("inicio", png)
+    other.close()
+
+    assert stored.deduplicated and stored.kind == "full" and stored.size == 0
+    assert store.stats()["full"] == 1 and store.stats()["captures"] == 2
+    assert np.array_equal(store.load(stored.digest), _page())
+
+
+def test_small_change_is_stored_as_delta_and_round_trips(store):
+    # Altura fora do múltiplo de TILE: os blocos da borda inferior são menores
+    baseline = _page()[:4 * TILE - 7]
+    changed = baseline.copy()
+    changed[TILE + 2:TILE + 10, 5:30] = (10, 120, 10)
+    changed[-3:, -40:] = 0
+
+    store.begin_run("r1")
+    full = store.put("dfds", _png(baseline))
+    store.begin_run("r2")
+    delta = store.put("dfds", _png(changed))
+    other = store.put("consolidacao", _png(changed))
+
+    assert full.kind == "full"
+    assert delta.kind == "delta" and delta.size < full.size
+    assert np.array_equal(store.load(delta.digest), changed)
+    # Mesmos pixels com outro nome: o blob é reaproveitado
+    assert other.digest == delta.digest and other.deduplicated
+
+
+def test_identical_pixels_are_deduplicated_across_runs(store):
+    store.begin_run("r1")
+    first = store.put("inicio", _png(_page()))
+    store.begin_run("r2")
+    second = store.put("inicio", _png(_page()))
+
+    assert second.digest == first.digest and second.deduplicated and second.size == 0
+    assert store.stats()["full"] == 1 and store.stats()["captures"] == 2
+
+
+def test_export_materializes_deltas_as_png(store, tmp_path):
+    store.begin_run("r1")
+    store.put("dfds", _png(_page()))
+    changed = _page()
+    changed[0:5, 0:5] = 0
+    store.begin_run("r2")
+    store.put("dfds", _png(changed))
+
+    (path,) = store.export("r2", str(tmp_path / "export"))
+
+    assert np.array_equal(np.asarray(Image.open(path).convert("RGB")), changed)
+
+
+def test_prune_keeps_the_base_of_a_surviving_delta(store):
+    store.begin_run("r1")
+    base = store.put("dfds", _png(_page()))
+    changed = _page()
+    changed[0:5, 0:5] = 0
+    store.begin_run("r2")
+    delta = store.put("dfds", _png(changed))
+    store.conn.execute("UPDATE runs SET timestamp = '2000-01-01' WHERE id = 'r1'")
+
+    result = store.prune(keep_runs=1, max_age_days=None, max_bytes=None)
+
+    # r1 sai, mas a captura completa continua: o delta de r2 depende dela
+    assert result.runs == ["r1"] and result.blobs == 0
+    assert delta.kind == "delta"
+    assert np.array_equal(store.load(delta.digest), changed)
+    assert store.load(base.digest).shape == changed.shape
+
+
+def test_prune_removes_orphan_blobs_and_their_files(store):
+    for index in range(3):
+        store.begin_run(f"r{index}")
+        store.conn.execute("UPDATE runs SET timestamp = ? WHERE id = ?", (f"2000-01-0{index + 1}", f"r{index}"))
+        store.put("pagina", _png(_page(seed=index)))
+
+    result = store.prune(keep_runs=1, max_age_days=None, max_bytes=None, keep=["r0"])
+
+    assert result.runs == ["r1"] and result.blobs == 1 and result.freed > 0
+    assert [run["id"] for run in store.runs()] == ["r2", "r0"]
+    assert store.stats()["full"] + store.stats()["delta"] == 2
@@ -0,0 +1,122 @@
+"""
+Testes unitários do stand-in do Supabase (sem browser).
+"""
+
+import json
+import sqlite3
+import urllib.error
+import urllib.request
+
+import pytest
+
+from supabase_stub import PostgrestError, SupabaseStub
+
+REPRESENTATION = {"Prefer": "return=representation"}
+
+
+@pytest.fixture
+def stub():
+    stub = SupabaseStub()
+    central = stub.db.select("uasgs", [("numero_uasg", "eq.200999")])[0][0]
+    sul = stub.db.select("uasgs", [("numero_uasg", "eq.413001")])[0][0]
+    stub.db.insert("areas_requisitantes", [
+        {"nome": "Compras", "numero_uasg": "200999", "uasg_id": central["id"], "disponibilidade_orcamentaria": 100},
+        {"nome": "Obras", "numero_uasg": "200999", "uasg_id": central["id"], "disponibilidade_orcamentaria": 900},
+        {"nome": "Saúde", "numero_uasg": "413001", "uasg_id": sul["id"], "disponibilidade_orcamentaria": 500},
+    ])
+    yield stub
+    stub.stop()
+
+
+def _get(stub, table, *params, headers=None):
+    status, rows, _, _ = stub.handle_rest("GET", table, list(params), headers or {}, b"")
+    return status, rows
+
+
+def _names(rows):
+    return [row["nome"] for row in rows]
+
+
+def test_filters_order_and_limit(stub):
+    assert _names(_get(stub, "areas_requisitantes", ("numero_uasg", "eq.200999"), ("order", "nome.desc"))[1]) == [
+        "Obras", "Compras"]
+    assert _names(_get(stub, "areas_requisitantes", ("disponibilidade_orcamentaria", "gte.500"),
+                       ("order", "nome"))[1]) == ["Obras", "Saúde"]
+    assert _names(_get(stub, "areas_requisitantes", ("nome", "in.(Obras,\"Saúde\")"), ("order", "nome"))[1]) == [
+        "Obras", "Saúde"]
+    assert _names(_get(stub, "areas_requisitantes", ("nome", "ilike.OB*"))[1]) == ["Obras"]
+    assert _names(_get(stub, "areas_requisitantes", ("nome", "not.eq.Obras"), ("order", "nome"), ("limit", "1"))[1]) == [
+        "Compras"]
+    assert _names(_get(stub, "areas_requisitantes", ("or", "(nome.eq.Saúde,and(numero_uasg.eq.200999,"
+                                                           "disponibilidade_orcamentaria.lt.500))"),
+                       ("order", "nome"))[1]) == ["Compras", "Saúde"]
+
+
+def test_embedded_resources_in_both_directions(stub):
+    _, areas = _get(stub, "areas_requisitantes", ("select", "nome,uasg:uasgs(nome)"), ("order", "nome"))
+    _, uasgs = _get(stub, "uasgs", ("select", "numero_uasg,areas_requisitantes(nome)"), ("order", "numero_uasg"))
+
+    assert areas[0] == {"nome": "Compras", "uasg": {"nome": "UASG Central"}}
+    assert [(u["numero_uasg"], sorted(_names(u["areas_requisitantes"]))) for u in uasgs] == [
+        ("200999", ["Compras", "Obras"]), ("413001", ["Saúde"]), ("413002", [])]
+
+
+def test_inner_embed_drops_rows_without_related_resources(stub):
+    _, uasgs = _get(stub, "uasgs", ("select", "numero_uasg,areas_requisitantes!inner(nome)"), ("order", "numero_uasg"))
+
+    assert [u["numero_uasg"] for u in uasgs] == ["200999", "413001"]
+
+
+def test_insert_with_representation_returns_the_embedded_select(stub):
+    uasg = _get(stub, "uasgs", ("numero_uasg", "eq.413002"))[1][0]
+    body = json.dumps({"nome": "TI", "numero_uasg": "413002", "uasg_id": uasg["id"]}).encode("utf-8")
+
+    status, rows, _, _ = stub.handle_rest("POST", "areas_requisitantes", [("select", "nome,uasgs(numero_uasg)")],
+                                          REPRESENTATION, body)
+
+    assert status == 201
+    assert rows == [{"nome": "TI", "uasgs": {"numero_uasg": "413002"}}]
+
+
+def test_single_object_requires_exactly_one_row(stub):
+    accept = {"Accept": "application/vnd.pgrst.object+json"}
+
+    assert _get(stub, "uasgs", ("numero_uasg", "eq.200999"), headers=accept)[0] == 200
+    status, error = _get(stub, "uasgs", headers=accept)
+    assert status == 406 and error["code"] == "PGRST116"
+
+
+@pytest.mark.parametrize("method, table, params, body, status, code", [
+    ("GET", "responsaveis_dfd", [], b"", 404, "PGRST205"),
+    ("GET", "uasgs", [("nome_curto", "eq.x")], b"", 400, "42703"),
+    ("GET", "areas_requisitantes", [("numero", "eq.um")], b"", 400, "22P02"),
+    ("POST", "uasgs", [], b'{"numero_uasg": "200999", "nome": "Duplicada"}', 409, "23505"),
+    ("POST", "areas_requisitantes", [], b'{"nome": "Sem UASG", "numero_uasg": "1", "uasg_id": "inexistente"}', 409, "23503"),
+])
+def test_errors_use_postgrest_codes(stub, method, table, params, body, status, code):
+    with pytest.raises(PostgrestError) as raised:
+        stub.handle_rest(method, table, params, {}, body)
+
+    assert (raised.value.status, raised.value.code) == (status, code)
+
+
+def test_database_without_a_migrated_column_returns_42703(tmp_path):
+    # Banco (--db) criado antes da migração que adicionou numero_uasg
+    path = str(tmp_path / "antigo.sqlite")
+    with sqlite3.connect(path) as conn:
+        conn.execute('CREATE TABLE "uasgs" (id TEXT PRIMARY KEY, nome TEXT NOT NULL)')
+        conn.execute("INSERT INTO uasgs VALUES ('u1', 'UASG Antiga')")
+    stub = SupabaseStub(host="127.0.0.1", port=0, db_path=path)
+    stub.start()
+    stub.port = stub.httpd.server_address[1]
+    try:
+        request = urllib.request.Request(f"{stub.url}/rest/v1/uasgs", method="POST",
+                                         data=b'{"numero_uasg": "200999", "nome": "UASG Nova"}')
+        with pytest.raises(urllib.error.HTTPError) as raised:
+            urllib.request.urlopen(request, timeout=5)
+        payload = json.loads(raised.value.read())
+    finally:
+        stub.stop()
+
+    assert raised.value.code == 400
+    assert payload["code"] == "42703" and set(payload) == {"code", "message", "details", "hint"}
@@ -0,0 +1,109 @@
+"""
+Testes unitários do diff de imagens do visual_regression (sem browser).
+"""
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+from visual_regression import DEFAULT_THRESHOLD, TILE, diff_images, dirty_tiles
+
+
+def _image(height: int = 2 * TILE, width: int = 3 * TILE, value: int = 200) -> np.ndarray:
+    return np.full((height, width, 3), value, dtype=np.uint8)
+
+
+def test_identical_images_skip_every_tile():
+    image = _image()
+
+    diff = diff_images(image, image.copy())
+
+    assert diff.changed_pixels == 0
+    assert diff.tiles_total == 6 and diff.tiles_skipped == 6
+    assert diff.tiles_changed == 0 and diff.tiles == []
+    assert not diff.size_changed
+
+
+def test_dirty_tiles_finds_only_touched_tiles():
+    a = _image()
+    b = a.copy()
+    b[TILE + 3, 2 * TILE + 5] = (0, 0, 0)
+
+    ty, tx = dirty_tiles(a, b)
+
+    assert list(zip(ty.tolist(), tx.tolist())) == [(1, 2)]
+
+
+def test_changed_block_is_counted_in_its_tile():
+    baseline = _image()
+    current = baseline.copy()
+    current[4:12, 4:12] = (20, 20, 20)
+
+    diff = diff_images(baseline, current)
+
+    assert diff.changed_pixels == 64
+    assert diff.tiles_changed == 1 and diff.tiles_skipped == 5
+    assert [(ty, tx) for ty, tx, *_ in diff.tiles] == [(0, 0)]
+
+
+def test_differences_within_tolerance_are_ignored():
+    baseline = _image()
+    current = baseline.copy()
+    current[:, :] = 210
+
+    assert diff_images(baseline, current, tolerance=16).changed_pixels == 0
+    assert diff_images(baseline, current, tolerance=5).changed_pixels == baseline.shape[0] * baseline.shape[1]
+
+
+def test_antialiased_edge_pixels_are_not_counted_as_changed():
+    # Borda preto/branco com uma coluna de transição cinza renderizada com outro tom
+    baseline = _image(value=255)
+    baseline[:, :40] = 0
+    baseline[:, 40] = 128
+    current = baseline.copy()
+    current[:, 40] = 90
+
+    with_antialiasing = diff_images(baseline, current)
+    without_antialiasing = diff_images(baseline, current, antialiasing=False)
+
+    assert without_antialiasing.changed_pixels == baseline.shape[0]
+    assert with_antialiasing.changed_pixels == 0
+    assert with_antialiasing.antialiased_pixels == baseline.shape[0]
+
+
+def test_shifted_hard_edge_is_a_change_not_antialiasing():
+    baseline = _image(value=255)
+    baseline[:, :40] = 0
+    current = _image(value=255)
+    current[:, :41] = 0
+
+    diff = diff_images(baseline, current)
+
+    assert diff.changed_pixels == baseline.shape[0]
+    assert diff.antialiased_pixels == 0
+
+
+def _label(text: str) -> np.ndarray:
+    image = Image.new("RGB", (320, 48), "white")
+    ImageDraw.Draw(image).text((10, 10), text, fill=(30, 30, 30), font=ImageFont.load_default(size=14))
+    return np.asarray(image)
+
+
+def test_changed_label_is_reported_as_changed_not_antialiasing():
+    baseline, current = _label("Salvar rascunho"), _label("Enviar rascunho")
+
+    diff = diff_images(baseline, current)
+
+    assert diff.changed_pixels > diff.antialiased_pixels
+    assert diff.ratio > DEFAULT_THRESHOLD
+
+
+def test_size_change_counts_the_extra_region_as_changed():
+    baseline = _image(height=2 * TILE)
+    current = _image(height=2 * TILE + 10)
+
+    diff = diff_images(baseline, current)
+
+    assert diff.size_changed
+    assert diff.extra_region == (2 * TILE, 3 * TILE)
+    assert diff.changed_pixels == 10 * 3 * TILE
+    assert diff.tiles_total == 6
@@ -0,0 +1,557 @@
+"""
+Regressão visual das páginas: baselines aprovadas e diff vetorizado em NumPy.
+
+As baselines ficam em baselines/ (raiz do webapp-testing), com um índice
+(index.json) que guarda para cada captura o sha256 do PNG, o hash perceptual
+(pHash de 64 bits) e as dimensões. A comparação de uma captura nova:
+
+  1. sha256 igual ao da baseline: idêntica, sem nem decodificar o PNG;
+  2. a imagem é dividida em blocos (TILE x TILE); blocos sem nenhum byte
+     diferente são descartados já na primeira passada;
+  3. só nos blocos alterados é calculada a diferença por canal, com a
+     tolerância de cor e a detecção de anti-aliasing do pixelmatch (o
+     pixel é a transição de uma borda: no máximo 2 vizinhos com o mesmo
+     brilho e um vizinho em área plana nas duas imagens);
+  4. se a fração de pixels alterados passar do limiar, a captura atual e
+     um heatmap das diferenças são gravados em reports/visual/.
+
+Uma captura sem baseline com o mesmo nome sempre cria a sua própria. O pHash
+serve só para, de forma explícita, achar a baseline de uma rota renomeada
+(comando similar) e movê-la para o nome novo (comando rename).
+
+Uso: python3 tests/visual_regression.py diff BASELINE.png ATUAL.png [--heatmap saida.png]
+     python3 tests/visual_regression.py list
+     python3 tests/visual_regression.py approve login_page [dfds_novo ...]
+     python3 tests/visual_regression.py similar captura.png
+     python3 tests/visual_regression.py rename dfds_antigo dfds
+"""
+
+import argparse
+import fcntl
+import hashlib
+import io
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import List, NamedTuple, Optional, Tuple, Union
+
+import numpy as np
+from PIL import Image
+
+import route_crawler
+from atomic_file import atomic_write_json
+
+BASELINES_DIR = os.path.join(route_crawler.WEBAPP_TESTING_DIR, "baselines")
+VISUAL_DIR = os.path.join(route_crawler.REPORTS_DIR, "visual")
+INDEX_FILENAME = "index.json"
+
+TILE = 32
+HALO = 2                        # borda dos blocos: vizinhos dos vizinhos, para o anti-aliasing
+DEFAULT_TOLERANCE = 16          # diferença máxima por canal (0-255) tratada como igual
+DEFAULT_THRESHOLD = 0.001       # fração de pixels alterados tolerada (0,1%)
+MAX_PHASH_DISTANCE = 10         # bits diferentes para considerar duas capturas a mesma página
+HASH_SIZE = 8
+HASH_SAMPLE = 32
+
+# Brilho (Y do YIQ) e vizinhança 3x3 na ordem do pixelmatch (coluna por coluna)
+LUMA_WEIGHTS = np.array([0.29889531, 0.58662247, 0.11448223], dtype=np.float32)
+NEIGHBOURS = [(dy, dx) for dx in (-1, 0, 1) for dy in (-1, 0, 1) if dy or dx]
+OFFSETS = np.array(NEIGHBOURS)
+
+_DCT = np.cos(np.pi * np.outer(np.arange(HASH_SAMPLE), 2 * np.arange(HASH_SAMPLE) + 1) / (2 * HASH_SAMPLE))
+
+
+def sha256_bytes(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def load_image(source: Union[str, bytes]) -> np.ndarray:
+    """Decodifica um PNG (caminho ou bytes) em um array RGB uint8 (altura, largura, 3)."""
+    image = Image.open(io.BytesIO(source) if isinstance(source, bytes) else source)
+    return np.asarray(image.convert("RGB"))
+
+
+def save_image(pixels: np.ndarray, path: str):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    Image.fromarray(pixels).save(path, compress_level=1)
+
+
+def _area_resize(pixels: np.ndarray, size: int) -> np.ndarray:
+    """Reduz a imagem para size x size pela média das áreas (sem reamostragem do PIL)."""
+    h, w = pixels.shape[:2]
+    rows = np.linspace(0, h, size + 1).astype(int)[:-1]
+    cols = np.linspace(0, w, size + 1).astype(int)[:-1]
+    sums = np.add.reduceat(np.add.reduceat(pixels, rows, axis=0, dtype=np.uint32), cols, axis=1)
+    counts = np.outer(np.diff(np.append(rows, h)), np.diff(np.append(cols, w)))
+    return sums / counts[:, :, None]
+
+
+def perceptual_hash(pixels: np.ndarray) -> int:
+    """pHash de 64 bits: DCT da imagem reduzida a 32x32, bits acima da mediana das baixas frequências."""
+    # Amostragem de 1 a cada `step` pixels antes da média: o hash só usa as baixas frequências
+    step = max(1, min(pixels.shape[:2]) // (HASH_SAMPLE * 8))
+    gray = _area_resize(pixels[::step, ::step], HASH_SAMPLE) @ np.array([0.299, 0.587, 0.114])
+    coefficients = _DCT @ gray @ _DCT.T
+    low = coefficients[:HASH_SIZE, :HASH_SIZE].ravel()
+    bits = low > np.median(low[1:])
+    return int(np.packbits(bits).view(">u8")[0])
+
+
+def hamming_distances(hashes: np.ndarray, value: int) -> np.ndarray:
+    """Distâncias de Hamming de value para todos os hashes (uint64) de uma vez."""
+    return np.bitwise_count(hashes ^ np.uint64(value))
+
+
+class VisualDiff:
+    """Resultado da comparação de duas imagens, bloco a bloco."""
+
+    def __init__(self, shape: Tuple[int, int], tile: int):
+        self.shape = shape
+        self.tile = tile
+        self.size_changed = False
+        self.changed_pixels = 0
+        self.antialiased_pixels = 0
+        self.tiles_total = 0
+        self.tiles_skipped = 0
+        self.tiles_changed = 0
+        self.elapsed_ms = 0.0
+        # (linha, coluna) do bloco, máscara de alterados, máscara de anti-aliasing, diferença máxima por pixel
+        self.tiles: List[Tuple[int, int, np.ndarray, np.ndarray, np.ndarray]] = []
+        self.extra_region: Optional[Tuple[int, int]] = None
+
+    @property
+    def total_pixels(self) -> int:
+        return self.shape[0] * self.shape[1]
+
+    @property
+    def ratio(self) -> float:
+        return self.changed_pixels / self.total_pixels if self.total_pixels else 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            "shape": list(self.shape),
+            "size_changed": self.size_changed,
+            "changed_pixels": self.changed_pixels,
+            "antialiased_pixels": self.antialiased_pixels,
+            "ratio": round(self.ratio, 6),
+            "tiles_total": self.tiles_total,
+            "tiles_skipped": self.tiles_skipped,
+            "tiles_changed": self.tiles_changed,
+            "elapsed_ms": round(self.elapsed_ms, 2),
+        }
+
+    def heatmap(self, current: np.ndarray) -> np.ndarray:
+        """
+        Heatmap sobre a captura atual esmaecida: vermelho proporcional à
+        diferença nos pixels alterados, amarelo nos de anti-aliasing e
+        magenta na área que só existe em uma das imagens.
+        """
+        h, w = self.shape
+        canvas = np.zeros((h, w, 3), dtype=np.uint8)
+        ch, cw = min(h, current.shape[0]), min(w, current.shape[1])
+        luma = current[:ch, :cw].astype(np.uint16) @ np.array([77, 150, 29], dtype=np.uint16) >> 8
+        canvas[:ch, :cw] = (luma // 3 + 160).astype(np.uint8)[..., None]
+
+        if self.extra_region is not None:
+            common_h, common_w = self.extra_region
+            canvas[common_h:, :] = (255, 0, 255)
+            canvas[:, common_w:] = (255, 0, 255)
+
+        t = self.tile
+        for ty, tx, changed, antialiased, delta in self.tiles:
+            y, x = ty * t, tx * t
+            region = canvas[y:y + t, x:x + t]
+            th, tw = region.shape[:2]
+            changed, antialiased, delta = changed[:th, :tw], antialiased[:th, :tw], delta[:th, :tw]
+            region[antialiased] = (255, 210, 0)
+            intensity = (128 + delta[changed] // 2).astype(np.uint8)
+            region[changed] = np.stack([np.full_like(intensity, 255), 255 - intensity, 255 - intensity], axis=1)
+        return canvas
+
+
+def dirty_tiles(a: np.ndarray, b: np.ndarray, tile: int = TILE) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    (linhas, colunas) dos blocos com algum byte diferente entre duas imagens
+    do mesmo tamanho. Primeiro as faixas de linhas alteradas (uma redução
+    contígua por linha), depois os blocos só dessas faixas.
+    """
+    h, w = a.shape[:2]
+    rows, cols = -(-h // tile), -(-w // tile)
+    row_dirty = np.pad((a != b).reshape(h, -1).any(axis=1), (0, rows * tile - h))
+    dirty = np.zeros((rows, cols), dtype=bool)
+    for band in np.nonzero(row_dirty.reshape(rows, tile).any(axis=1))[0]:
+        y0, y1 = band * tile, min((band + 1) * tile, h)
+        touched = (a[y0:y1] != b[y0:y1]).reshape(y1 - y0, -1)
+        touched = np.pad(touched, ((0, 0), (0, (cols * tile - w) * a.shape[2])))
+        dirty[band] = touched.reshape(y1 - y0, cols, tile * a.shape[2]).any(axis=(0, 2))
+    return np.nonzero(dirty)
+
+
+def _gather_tiles(image: np.ndarray, ty: np.ndarray, tx: np.ndarray, tile: int,
+                  margin: int = HALO) -> np.ndarray:
+    """
+    Copia só os blocos pedidos, com `margin` pixels de borda: (k, tile+2m, tile+2m, canais).
+    Nas bordas da imagem os índices são presos aos limites (padding "edge").
+    """
+    h, w = image.shape[:2]
+    size = tile + 2 * margin
+    halos = np.empty((len(ty), size, size, image.shape[2]), dtype=image.dtype)
+    offsets = np.arange(-margin, tile + margin)
+    for i, (row, col) in enumerate(zip(ty * tile, tx * tile)):
+        if row >= margin and col >= margin and row + tile + margin <= h and col + tile + margin <= w:
+            halos[i] = image[row - margin:row + tile + margin, col - margin:col + tile + margin]
+        else:
+            rows = np.clip(row + offsets, 0, h - 1)
+            cols = np.clip(col + offsets, 0, w - 1)
+            halos[i] = image[rows[:, None], cols[None, :]]
+    return halos
+
+
+def _pack(halo: np.ndarray) -> np.ndarray:
+    """Cor RGB de cada pixel em um único inteiro (comparação de igualdade em uma operação)."""
+    pixels = halo.astype(np.uint32)
+    return pixels[..., 0] << 16 | pixels[..., 1] << 8 | pixels[..., 2]
+
+
+def _many_siblings(packed: np.ndarray, valid: np.ndarray, edge: np.ndarray,
+                   n: np.ndarray, y: np.ndarray, x: np.ndarray) -> np.ndarray:
+    """
+    Os pixels (n, y, x) do halo têm mais de 2 vizinhos idênticos (área
+    "plana")? Como no pixelmatch, os da borda da imagem já contam um.
+    """
+    equal = edge[n, y, x].astype(np.uint8)
+    color = packed[n, y, x]
+    for dy, dx in NEIGHBOURS:
+        equal += (packed[n, y + dy, x + dx] == color) & valid[n, y + dy, x + dx]
+    return equal > 2
+
+
+def _antialiased(luma: np.ndarray, packed: np.ndarray, other: np.ndarray, valid: np.ndarray, edge: np.ndarray,
+                 n: np.ndarray, y: np.ndarray, x: np.ndarray) -> np.ndarray:
+    """
+    Detecção de anti-aliasing do pixelmatch para os pixels (n, y, x) do halo:
+    no máximo 2 vizinhos com o mesmo brilho, vizinhos mais claros e mais
+    escuros, e o vizinho mais escuro (ou o mais claro) em uma área plana nas
+    duas imagens, ou seja, o pixel é a transição de uma borda.
+    """
+    center = luma[n, y, x]
+    deltas = np.stack([center - luma[n, y + dy, x + dx] for dy, dx in NEIGHBOURS])
+    in_bounds = np.stack([valid[n, y + dy, x + dx] for dy, dx in NEIGHBOURS])
+
+    zeroes = edge[n, y, x] + ((deltas == 0) & in_bounds).sum(axis=0)
+    # delta = centro - vizinho: o menor aponta o vizinho mais claro, o maior o mais escuro
+    brightest = np.where(in_bounds, deltas, np.inf).argmin(axis=0)
+    darkest = np.where(in_bounds, deltas, -np.inf).argmax(axis=0)
+    candidates = (zeroes <= 2) & (deltas.min(axis=0, initial=0, where=in_bounds) < 0) & \
+        (deltas.max(axis=0, initial=0, where=in_bounds) > 0)
+
+    result = np.zeros(len(n), dtype=bool)
+    for side in (brightest, darkest):
+        pending = candidates & ~result
+        ny, nx = y[pending] + OFFSETS[side[pending], 0], x[pending] + OFFSETS[side[pending], 1]
+        result[pending] = _many_siblings(packed, valid, edge, n[pending], ny, nx) & \
+            _many_siblings(other, valid, edge, n[pending], ny, nx)
+    return result
+
+
+def diff_images(baseline: np.ndarray, current: np.ndarray, tile: int = TILE,
+                tolerance: int = DEFAULT_TOLERANCE, antialiasing: bool = True) -> VisualDiff:
+    """
+    Compara duas imagens RGB. Capturas de página inteira com alturas
+    diferentes são comparadas na área comum; o restante conta como alterado.
+    """
+    started = time.perf_counter()
+    h, w = max(baseline.shape[0], current.shape[0]), max(baseline.shape[1], current.shape[1])
+    ch, cw = min(baseline.shape[0], current.shape[0]), min(baseline.shape[1], current.shape[1])
+    result = VisualDiff((h, w), tile)
+    if (ch, cw) != (h, w):
+        result.size_changed = True
+        result.extra_region = (ch, cw)
+        result.changed_pixels = h * w - ch * cw
+
+    a, b = baseline[:ch, :cw], current[:ch, :cw]
+    ty, tx = dirty_tiles(a, b, tile)
+    result.tiles_total = -(-ch // tile) * -(-cw // tile)
+    result.tiles_skipped = result.tiles_total - len(ty)
+
+    if len(ty):
+        halo_a = _gather_tiles(a, ty, tx, tile)
+        halo_b = _gather_tiles(b, ty, tx, tile)
+        center_a = halo_a[:, HALO:-HALO, HALO:-HALO]
+        center_b = halo_b[:, HALO:-HALO, HALO:-HALO]
+        channel_delta = np.abs(center_a.astype(np.int16) - center_b)
+        delta = np.maximum(np.maximum(channel_delta[..., 0], channel_delta[..., 1]), channel_delta[..., 2])
+
+        # Pixels de preenchimento (fora da imagem) não contam
+        inside = ((ty[:, None] * tile + np.arange(tile)) < ch)[:, :, None] & \
+                 ((tx[:, None] * tile + np.arange(tile)) < cw)[:, None, :]
+        different = (delta > tolerance) & inside
+
+        if antialiasing and different.any():
+            # Posição real de cada pixel do halo: vizinhos fora da imagem não contam
+            rows = ty[:, None] * tile + np.arange(-HALO, tile + HALO)
+            cols = tx[:, None] * tile + np.arange(-HALO, tile + HALO)
+            valid = ((rows >= 0) & (rows < ch))[:, :, None] & ((cols >= 0) & (cols < cw))[:, None, :]
+            edge = ((rows == 0) | (rows == ch - 1))[:, :, None] | ((cols == 0) | (cols == cw - 1))[:, None, :]
+            # Só os pixels diferentes são avaliados, em coordenadas do halo
+            n, y, x = np.nonzero(different)
+            y, x = y + HALO, x + HALO
+            packed_a, packed_b = _pack(halo_a), _pack(halo_b)
+            luma_a, luma_b = halo_a @ LUMA_WEIGHTS, halo_b @ LUMA_WEIGHTS
+            flags = _antialiased(luma_a, packed_a, packed_b, valid, edge, n, y, x)
+            pending = ~flags
+            flags[pending] = _antialiased(luma_b, packed_b, packed_a, valid, edge, n[pending], y[pending], x[pending])
+            antialiased = np.zeros_like(different)
+            antialiased[different] = flags
+        else:
+            antialiased = np.zeros_like(different)
+        changed = different & ~antialiased
+
+        result.changed_pixels += int(changed.sum())
+        result.antialiased_pixels = int(antialiased.sum())
+        tile_changed = changed.any(axis=(1, 2))
+        result.tiles_changed = int(tile_changed.sum())
+        result.tiles = [
+            (int(ty[i]), int(tx[i]), changed[i], antialiased[i], delta[i])
+            for i in np.nonzero(tile_changed | antialiased.any(axis=(1, 2)))[0]
+        ]
+
+    result.elapsed_ms = (time.perf_counter() - started) * 1000
+    return result
+
+
+class VisualResult(NamedTuple):
+    """Resultado da verificação de uma captura contra a baseline."""
+    name: str
+    status: str                  # new, identical, match, changed, updated
+    diff: Optional[VisualDiff]
+    threshold: float
+    current_path: Optional[str] = None
+    heatmap_path: Optional[str] = None
+
+    @property
+    def regressed(self) -> bool:
+        return self.status == "changed"
+
+    def describe(self) -> str:
+        if self.status == "new":
+            return f"🆕 {self.name}: baseline criada"
+        if self.status == "updated":
+            return f"🔄 {self.name}: baseline atualizada"
+        if self.status == "identical":
+            return f"✅ {self.name}: idêntica à baseline"
+        summary = f"{self.diff.ratio:.4%} dos pixels alterados em {self.diff.tiles_changed}/{self.diff.tiles_total} " \
+                  f"blocos, diff em {self.diff.elapsed_ms:.1f}ms"
+        if self.status == "match":
+            return f"✅ {self.name}: {summary}"
+        return f"❌ {self.name}: {summary} > limiar {self.threshold:.4%} — heatmap: {self.heatmap_path}"
+
+
+class BaselineStore:
+    """Baselines aprovadas (baselines/*.png) com índice por nome e por pHash."""
+
+    def __init__(self, root: str = BASELINES_DIR, output_dir: str = VISUAL_DIR,
+                 threshold: float = DEFAULT_THRESHOLD, tolerance: int = DEFAULT_TOLERANCE,
+                 update: bool = False):
+        self.root = root
+        self.output_dir = output_dir
+        self.threshold = threshold
+        self.tolerance = tolerance
+        self.update = update
+        self.index_path = os.path.join(root, INDEX_FILENAME)
+        self._lock = threading.Lock()
+        self.entries = self._load_index()
+
+    def _load_index(self) -> dict:
+        if not os.path.exists(self.index_path):
+            return {}
+        with open(self.index_path, "r", encoding="utf-8") as f:
+            return json.load(f).get("baselines", {})
+
+    @contextmanager
+    def _index_locked(self):
+        """Seção crítica entre processos (workers do xdist) sobre o index.json."""
+        os.makedirs(self.root, exist_ok=True)
+        with open(f"{self.index_path}.lock", "a+") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _save_index(self):
+        atomic_write_json(self.index_path, {"version": 1, "baselines": self.entries}, indent=2, sort_keys=True)
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.root, self.entries[name]["file"])
+
+    def similar(self, phash: int, width: int) -> Tuple[Optional[str], Optional[int]]:
+        """
+        Baseline de mesma largura mais próxima pelo pHash, com a distância.
+        Só para localizar a baseline de uma rota renomeada; a comparação
+        nunca usa outra baseline no lugar da do próprio nome.
+        """
+        candidates = [n for n, entry in self.entries.items() if entry["width"] == width]
+        if not candidates:
+            return None, None
+        hashes = np.array([int(self.entries[n]["phash"], 16) for n in candidates], dtype=np.uint64)
+        distances = hamming_distances(hashes, phash)
+        best = int(np.argmin(distances))
+        if distances[best] > MAX_PHASH_DISTANCE:
+            return None, None
+        return candidates[best], int(distances[best])
+
+    def save(self, name: str, png: bytes, pixels: np.ndarray, phash: int):
+        """Grava (ou substitui) a baseline do nome."""
+        with self._lock:
+            os.makedirs(self.root, exist_ok=True)
+            filename = f"{name}.png"
+            with open(os.path.join(self.root, filename), "wb") as f:
+                f.write(png)
+            entry = {
+                "file": filename,
+                "sha256": sha256_bytes(png),
+                "phash": f"{phash:016x}",
+                "width": int(pixels.shape[1]),
+                "height": int(pixels.shape[0]),
+                "updated": datetime.now().isoformat(),
+            }
+            # Relê o índice para não perder as baselines gravadas por outros processos
+            with self._index_locked():
+                self.entries = {**self._load_index(), name: entry}
+                self._save_index()
+
+    def rename(self, old: str, new: str) -> bool:
+        """Move a baseline de old para new (rota renomeada)."""
+        with self._lock, self._index_locked():
+            self.entries = self._load_index()
+            if old not in self.entries:
+                return False
+            entry = {**self.entries.pop(old), "file": f"{new}.png"}
+            os.replace(os.path.join(self.root, f"{old}.png"), os.path.join(self.root, entry["file"]))
+            self.entries[new] = entry
+            self._save_index()
+        return True
+
+    def compare(self, name: str, png: bytes) -> VisualResult:
+        """Compara a captura (bytes PNG) com a baseline do nome; sem baseline, cria a dela."""
+        entry = self.entries.get(name)
+        if entry is not None and entry["sha256"] == sha256_bytes(png):
+            return VisualResult(name, "identical", None, self.threshold)
+
+        current = load_image(png)
+        if entry is None or self.update:
+            self.save(name, png, current, perceptual_hash(current))
+            return VisualResult(name, "updated" if entry is not None else "new", None, self.threshold)
+
+        diff = diff_images(load_image(self.path(name)), current, tolerance=self.tolerance)
+        if diff.ratio <= self.threshold:
+            return VisualResult(name, "match", diff, self.threshold)
+
+        current_path = os.path.join(self.output_dir, f"{name}.png")
+        heatmap_path = os.path.join(self.output_dir, f"{name}.diff.png")
+        os.makedirs(self.output_dir, exist_ok=True)
+        with open(current_path, "wb") as f:
+            f.write(png)
+        save_image(diff.heatmap(current), heatmap_path)
+        with open(os.path.join(self.output_dir, f"{name}.diff.json"), "w", encoding="utf-8") as f:
+            json.dump({"name": name, "threshold": self.threshold, **diff.to_dict()}, f, indent=2)
+        return VisualResult(name, "changed", diff, self.threshold, current_path, heatmap_path)
+
+    def approve(self, name: str) -> bool:
+        """Promove a captura reprovada em reports/visual/<nome>.png a baseline."""
+        current_path = os.path.join(self.output_dir, f"{name}.png")
+        if not os.path.exists(current_path):
+            return False
+        with open(current_path, "rb") as f:
+            png = f.read()
+        pixels = load_image(png)
+        self.save(name, png, pixels, perceptual_hash(pixels))
+        for suffix in (".png", ".diff.png", ".diff.json"):
+            path = os.path.join(self.output_dir, f"{name}{suffix}")
+            if os.path.exists(path):
+                os.remove(path)
+        return True
+
+
+def main(argv=None):
+    """Compara duas imagens, lista as baselines ou aprova capturas reprovadas."""
+    parser = argparse.ArgumentParser(description="Regressão visual das páginas")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    diff_parser = subparsers.add_parser("diff", help="compara duas imagens PNG")
+    diff_parser.add_argument("baseline")
+    diff_parser.add_argument("current")
+    diff_parser.add_argument("--heatmap", metavar="ARQUIVO", help="grava o heatmap das diferenças")
+    diff_parser.add_argument("--tolerance", type=int, default=DEFAULT_TOLERANCE,
+                             help="diferença por canal tratada como igual (0-255)")
+    diff_parser.add_argument("--tile", type=int, default=TILE, help="tamanho dos blocos em pixels")
+    diff_parser.add_argument("--no-antialiasing", action="store_true", help="não ignora pixels de anti-aliasing")
+
+    subparsers.add_parser("list", help="lista as baselines do índice")
+
+    approve_parser = subparsers.add_parser("approve", help="promove capturas de reports/visual/ a baselines")
+    approve_parser.add_argument("names", nargs="+", metavar="NOME")
+
+    similar_parser = subparsers.add_parser("similar", help="baseline mais parecida (pHash) com uma captura")
+    similar_parser.add_argument("capture", metavar="CAPTURA")
+
+    rename_parser = subparsers.add_parser("rename", help="move a baseline de uma rota renomeada")
+    rename_parser.add_argument("old", metavar="ANTIGO")
+    rename_parser.add_argument("new", metavar="NOVO")
+    args = parser.parse_args(argv)
+
+    if args.command == "diff":
+        started = time.perf_counter()
+        baseline, current = load_image(args.baseline), load_image(args.current)
+        decoded = time.perf_counter()
+        diff = diff_images(baseline, current, tile=args.tile, tolerance=args.tolerance,
+                           antialiasing=not args.no_antialiasing)
+        print(f"🖼️  {diff.shape[1]}x{diff.shape[0]} | decodificação {(decoded - started) * 1000:.1f}ms | "
+              f"diff {diff.elapsed_ms:.1f}ms")
+        print(f"   Pixels alterados: {diff.changed_pixels} ({diff.ratio:.4%}), anti-aliasing: {diff.antialiased_pixels}")
+        print(f"   Blocos: {diff.tiles_changed} alterados, {diff.tiles_skipped} descartados de {diff.tiles_total}")
+        print(f"   pHash: distância {bin(perceptual_hash(baseline) ^ perceptual_hash(current)).count('1')}")
+        if args.heatmap:
+            save_image(diff.heatmap(current), args.heatmap)
+            print(f"📄 Heatmap salvo em: {args.heatmap}")
+        return 0 if diff.changed_pixels == 0 else 1
+
+    store = BaselineStore()
+    if args.command == "list":
+        for name, entry in sorted(store.entries.items()):
+            print(f"   {name:<40} {entry['width']}x{entry['height']}  pHash {entry['phash']}  {entry['updated']}")
+        print(f"\n📂 {len(store.entries)} baseline(s) em {store.root}")
+        return 0
+
+    if args.command == "similar":
+        pixels = load_image(args.capture)
+        name, distance = store.similar(perceptual_hash(pixels), pixels.shape[1])
+        if name is None:
+            print(f"❌ Nenhuma baseline de largura {pixels.shape[1]} a até {MAX_PHASH_DISTANCE} bits de distância")
+            return 1
+        print(f"🔎 {name} (pHash, distância {distance})")
+        return 0
+
+    if args.command == "rename":
+        if not store.rename(args.old, args.new):
+            print(f"❌ {args.old}: baseline não encontrada")
+            return 1
+        print(f"✅ {args.old} → {args.new}")
+        return 0
+
+    missing = [name for name in args.names if not store.approve(name)]
+    for name in args.names:
+        if name not in missing:
+            print(f"✅ {name}: baseline atualizada")
+    for name in missing:
+        print(f"❌ {name}: nenhuma captura em {os.path.join(store.output_dir, name + '.png')}")
+    return 1 if missing else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())